@@ -1,16 +1,25 @@
-from flask import Flask, render_template, request, send_file, flash, jsonify
+from flask import Flask, render_template, request, send_file, flash, jsonify, Response, stream_with_context
 import os
 from latex_converter import LatexConverter
+import io
 import tempfile
 import traceback
 import fitz  # PyMuPDF
-from your_model_utils import simplify_text, simplify_text_batch, simplify_full_text  # Your model's simplify function
-import concurrent.futures
-from transformers import AutoTokenizer, AutoModelForCausalLM
-import torch
+from prompt_template import PromptTemplate
+from deadline import Deadline, SimplificationResult, join_parts
+from pdf_extraction import extract_page_texts, open_pdf, page_count, parse_pages
+from pdf_layout import PageRewriter, extract_blocks
+from pdf_reflow import paragraphs, stream_paragraphs, write_reflowed_pdf
+from pdf_structure import DocumentStructure, classify_blocks, deduplicate
+from page_cache import PageCache
+from upload_buffer import SPOOL_THRESHOLD, SpooledRequest, upload_buffer
+from pipeline import Pipeline
 from dotenv import load_dotenv
 from security import security_manager, require_security_validation, validate_latex_content
+import json
 import logging
+import shutil
+import threading
 import time
 
 # Umgebungsvariablen laden
@@ -35,31 +44,252 @@ security_manager.init_app(app)
 # Set LaTeX compiler path
 os.environ['PATH'] = '/Library/TeX/texbin:' + os.environ['PATH']
 
-# Assume tokenizer and model are already loaded globally
+# Wartezeit früher Anfragen auf das Modell, danach 503 (Sekunden)
+MODEL_READY_TIMEOUT = float(os.getenv('MODEL_READY_TIMEOUT', 30))
+LATEX_COMPILER = os.getenv('LATEX_COMPILER', 'pdflatex')
+# Zeitbudget einer Vereinfachung (Sekunden), unter dem gunicorn-Timeout von 120 s;
+# danach bleiben restliche Chunks im Original
+SIMPLIFY_DEADLINE = float(os.getenv('SIMPLIFY_DEADLINE', 100))
+# Parallele Textextraktion großer PDFs: Prozesse pro Webworker, ab dieser Seitenzahl
+PDF_EXTRACTION_WORKERS = int(os.getenv(
+    'PDF_EXTRACTION_WORKERS', max(1, (os.cpu_count() or 1) // int(os.getenv('WEB_CONCURRENCY', 1)))
+))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 64))
+# blocks: jeder Textblock wird in seinem Rechteck ersetzt; text: neues PDF aus Fließtext
+PDF_LAYOUT_MODE = os.getenv('PDF_LAYOUT_MODE', 'blocks').lower()
+# Kopf-/Fußzeilen, Seitenzahlen und Tabellen unverändert lassen (Blockmodus)
+PDF_STRUCTURE_FILTER = os.getenv('PDF_STRUCTURE_FILTER', 'True').lower() == 'true'
+PDF_TABLE_DETECTION = os.getenv('PDF_TABLE_DETECTION', 'True').lower() == 'true'
+# Extraktion, Vereinfachung und Ausgabe überlappend in Stufen mit begrenzten Warteschlangen
+PDF_PIPELINE = os.getenv('PDF_PIPELINE', 'True').lower() == 'true'
+PDF_PIPELINE_QUEUE_SIZE = int(os.getenv('PDF_PIPELINE_QUEUE_SIZE', 16))
+# Verzeichnis für seitenweise abgerufene Dokumente und vereinfachte Seiten, von allen Workern geteilt
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', './cache/pages')
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+# Uploads bis zu dieser Größe bleiben im Speicher, größere werden gespoolt und speicherabgebildet
+PDF_SPOOL_THRESHOLD = int(os.getenv('PDF_SPOOL_THRESHOLD', SPOOL_THRESHOLD))
+# Nur Konvertierung ohne KI-Vereinfachung: torch wird nie importiert (lite_app.py)
+LITE_MODE = os.getenv('LITE_MODE', 'False').lower() == 'true'
+MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'False').lower() == 'true'
+# Unit-Tests starten kein echtes Laden des Modells
+TESTING = os.getenv('TESTING', 'False').lower() == 'true'
+
+_model_import_done = threading.Event()
+_model_import_error = None
+page_cache = PageCache(PAGE_CACHE_DIR, PAGE_CACHE_MAX_BYTES)
+
+class UploadRequest(SpooledRequest):
+    spool_threshold = PDF_SPOOL_THRESHOLD
+
+app.request_class = UploadRequest
+
+def model_utils():
+    """your_model_utils erst auf Vereinfachungsrouten importieren (torch, transformers)"""
+    import your_model_utils
+    return your_model_utils
+
+def _import_model_utils():
+    global _model_import_error
+    try:
+        # Der Import startet das Laden des Modells
+        model_utils()
+    except Exception as e:
+        logger.error(f"KI-Abhängigkeiten konnten nicht importiert werden: {e}")
+        _model_import_error = str(e)
+    finally:
+        _model_import_done.set()
+
+if LITE_MODE:
+    logger.info("Lite-Modus: nur Konvertierung, KI-Vereinfachung deaktiviert")
+elif TESTING:
+    logger.debug("Testmodus: Modell wird nicht beim Import geladen")
+elif MODEL_PRELOAD:
+    # Der gunicorn-Master lädt synchron, Threads überleben den fork nicht
+    _import_model_utils()
+else:
+    # Import und Laden im Hintergrund; der Worker nimmt sofort Verbindungen an
+    threading.Thread(target=_import_model_utils, name='model-import', daemon=True).start()
+
+def get_model_status():
+    """Modellzustand, ohne auf einen laufenden Import von torch zu warten"""
+    status = {'state': 'loading', 'ready': False, 'loaded': False, 'backend': None, 'error': None}
+    if LITE_MODE:
+        status['state'] = 'disabled'
+    elif _model_import_error is not None:
+        status.update(state='failed', error=_model_import_error)
+    elif _model_import_done.is_set():
+        status = model_utils().get_model_status()
+    return status
+
+def wait_for_initialization(timeout=None):
+    """Wartet auf Import und Laden des Modells; False falls beides noch läuft"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    if not _model_import_done.wait(timeout):
+        return False
+    if _model_import_error is not None:
+        return True
+    remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+    return model_utils().wait_for_initialization(remaining)
+
+def stream_full_text(text, target_language='de', deadline=None, result=None):
+    return model_utils().stream_full_text(text, target_language, deadline, result)
+
+def latex_available():
+    """Ob der LaTeX-Compiler im PATH gefunden wird"""
+    return shutil.which(LATEX_COMPILER) is not None
+
+def model_not_ready_response():
+    """503 mit Retry-After, falls das Modell nach MODEL_READY_TIMEOUT noch lädt"""
+    if LITE_MODE:
+        response = jsonify({'error': 'KI-Vereinfachung ist im Lite-Modus nicht verfügbar'})
+        response.status_code = 501
+        return response
+    if wait_for_initialization(MODEL_READY_TIMEOUT):
+        return None
+    response = jsonify({
+        'error': 'Modell wird noch geladen, bitte später erneut versuchen',
+        'model_state': get_model_status()['state']
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '10'
+    return response
 
 @app.route('/health')
 def health_check():
     """Health Check Endpoint"""
+    model_status = get_model_status()
     return jsonify({
         'status': 'healthy',
         'version': '2.0.0',
-        'model_loaded': True,  # TODO: Prüfe ob Modell geladen ist
-        'latex_available': True,  # TODO: Prüfe LaTeX-Installation
+        'model_loaded': model_status['loaded'],
+        'model_state': model_status['state'],
+        'latex_available': latex_available(),
         'timestamp': time.time()
     })
 
+@app.route('/health/live')
+def liveness_check():
+    """Liveness: der Prozess antwortet, unabhängig vom Modell"""
+    return jsonify({'status': 'alive', 'timestamp': time.time()})
+
+@app.route('/health/ready')
+def readiness_check():
+    """Readiness: Modell geladen und aufgewärmt, LaTeX-Compiler vorhanden"""
+    model_status = get_model_status()
+    checks = {'latex_available': latex_available()}
+    if not LITE_MODE:
+        checks['model_ready'] = model_status['ready']
+    ready = all(checks.values())
+    response = jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'checks': checks,
+        'model_state': model_status['state'],
+        'model_error': model_status['error'],
+        'timestamp': time.time()
+    })
+    response.status_code = 200 if ready else 503
+    return response
+
+def _sse_event(event, data):
+    """Formatiert ein Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/simplify/stream', methods=['POST'])
+@require_security_validation
+def simplify_stream():
+    """Streamt den vereinfachten Text als Server-Sent Events, Chunk für Chunk"""
+    deadline = Deadline(SIMPLIFY_DEADLINE)
+    text = request.form.get('text', '')
+    target_language = request.form.get('target_language', 'de')
+
+    if not text.strip():
+        return jsonify({'error': 'Text darf nicht leer sein'}), 400
+
+    not_ready = model_not_ready_response()
+    if not_ready is not None:
+        return not_ready
+
+    def events():
+        start = time.time()
+        time_to_first_token = None
+        current_chunk = None
+        total_chunks = 0
+        result = SimplificationResult()
+        try:
+            for index, total_chunks, piece in stream_full_text(text, target_language, deadline, result):
+                if current_chunk is not None and index != current_chunk:
+                    yield _sse_event('chunk_end', {
+                        'chunk': current_chunk,
+                        'total': total_chunks,
+                        'simplified': result.is_simplified(current_chunk)
+                    })
+                current_chunk = index
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start
+                    logger.info(f"Erstes Token nach {time_to_first_token:.2f}s")
+                yield _sse_event('token', {'chunk': index, 'total': total_chunks, 'text': piece})
+
+            if current_chunk is not None:
+                yield _sse_event('chunk_end', {
+                    'chunk': current_chunk,
+                    'total': total_chunks,
+                    'simplified': result.is_simplified(current_chunk)
+                })
+            yield _sse_event('done', {
+                'chunks': total_chunks,
+                'simplified_chunks': result.simplified_chunks,
+                'simplified_ratio': round(result.simplified_ratio, 3),
+                'partial': result.partial,
+                'skipped_chunks': result.skipped_chunks,
+                'tokens_saved': result.tokens_saved,
+                'time_to_first_token': time_to_first_token,
+                'total_time': time.time() - start
+            })
+        except Exception as e:
+            logger.error(f"Fehler beim Streaming der Vereinfachung: {e}")
+            yield _sse_event('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/', methods=['GET', 'POST'])
 @require_security_validation
 def index():
     if request.method == 'POST':
         file = request.files.get('file')
         if file and file.filename.lower().endswith('.pdf'):
-            with tempfile.TemporaryDirectory() as temp_dir:
-                input_pdf_path = os.path.join(temp_dir, 'input.pdf')
-                file.save(input_pdf_path)
-                output_pdf_path = os.path.join(temp_dir, 'simplified.pdf')
-                create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path, target_language='de')
-                return send_file(output_pdf_path, as_attachment=True, download_name='vereinfachtes_dokument.pdf', mimetype='application/pdf')
+            # Die Frist beginnt mit der Anfrage, inklusive Wartezeit auf das Modell
+            deadline = Deadline(SIMPLIFY_DEADLINE)
+            not_ready = model_not_ready_response()
+            if not_ready is not None:
+                return not_ready
+            # Upload und Ergebnis bleiben im Speicher, große Uploads speicherabgebildet
+            output = io.BytesIO()
+            with upload_buffer(file.stream) as data:
+                # Optional nur ausgewählte Seiten, z. B. "1-3, 7"
+                pages = None
+                page_spec = request.form.get('pages', '').strip()
+                if page_spec:
+                    try:
+                        total_pages = page_count(data)
+                        pages = parse_pages(page_spec, total_pages)
+                    except fitz.FileDataError:
+                        return jsonify({'error': 'Ungültige PDF-Datei'}), 400
+                    except ValueError as e:
+                        return jsonify({'error': str(e)}), 400
+                report = create_layout_preserving_simplified_pdf(
+                    data, output, target_language='de', deadline=deadline, pages=pages
+                )
+            output.seek(0)
+            response = send_file(output, as_attachment=True, download_name='vereinfachtes_dokument.pdf',
+                                 mimetype='application/pdf')
+            response.headers.update(simplification_headers(report))
+            if pages is not None:
+                response.headers['X-Selected-Pages'] = f"{len(pages)}/{total_pages}"
+            return response
         try:
             # Get the text from the form
             text = request.form.get('text', '')
@@ -142,89 +372,257 @@ def index():
     
     return render_template('index.html')
 
-def create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path, target_language='de'):
-    doc = fitz.open(input_pdf_path)
-    new_doc = fitz.open()
-    # 1. Gesamten Fließtext extrahieren
-    full_text = ""
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        blocks = page.get_text("dict")["blocks"]
-        for block in blocks:
-            if "lines" not in block:
-                continue
-            for line in block["lines"]:
-                for span in line["spans"]:
-                    full_text += span["text"] + " "
-        full_text += "\n"
-    full_text = full_text.strip()
-    print("EXTRAHIERTER TEXT:", full_text)
-    # 2. Vereinfachen
-    simplified = simplify_full_text(full_text, target_language=target_language)
-    # 3. Neues PDF mit vereinfachtem Text
-    for page_num in range(len(doc)):
-        page_obj = new_doc.new_page(width=doc[page_num].rect.width, height=doc[page_num].rect.height)
-        # Optional: Text auf mehrere Seiten aufteilen, falls zu lang
-        page_obj.insert_textbox(
-            fitz.Rect(0, 0, doc[page_num].rect.width, doc[page_num].rect.height),
-            simplified,
-            fontsize=12,
-            fontname="helv",
-            color=(0, 0, 0),
-            align=0
+@app.route('/pdf/documents', methods=['POST'])
+@require_security_validation
+def upload_document():
+    """Legt ein PDF für den seitenweisen Abruf ab; liefert Schlüssel (SHA-256) und Seitenzahl"""
+    file = request.files.get('file')
+    if not file or not file.filename.lower().endswith('.pdf'):
+        return jsonify({'error': 'Bitte eine PDF-Datei hochladen'}), 400
+    # Der Cache hält den Inhalt über die Anfrage hinaus; eine Abbildung wird dafür kopiert
+    with upload_buffer(file.stream) as buffer:
+        data = bytes(buffer)
+    try:
+        total_pages = page_count(data)
+    except fitz.FileDataError:
+        return jsonify({'error': 'Ungültige PDF-Datei'}), 400
+    key = page_cache.add_document(data, total_pages)
+    return jsonify({'document': key, 'pages': total_pages}), 201
+
+@app.route('/pdf/documents/<key>/pages/<int:number>')
+def simplified_page(key, number):
+    """Eine vereinfachte Seite (ab 1 gezählt) als PDF, erst beim Abruf berechnet und dann gespeichert"""
+    variant = f"{PDF_LAYOUT_MODE}-de"
+    cached = page_cache.page(key, number - 1, variant)
+    if cached is not None:
+        output, report = cached
+    else:
+        document = page_cache.document(key)
+        if document is None:
+            return jsonify({'error': 'Dokument unbekannt, bitte erneut hochladen'}), 404
+        data, total_pages = document
+        if not 1 <= number <= total_pages:
+            return jsonify({'error': f'Seite {number} außerhalb des Dokuments (1-{total_pages})'}), 404
+        deadline = Deadline(SIMPLIFY_DEADLINE)
+        not_ready = model_not_ready_response()
+        if not_ready is not None:
+            return not_ready
+        buffer = io.BytesIO()
+        report = create_layout_preserving_simplified_pdf(
+            data, buffer, target_language='de', deadline=deadline, pages=[number - 1]
         )
-        break  # Nur auf erster Seite, oder Text aufteilen!
-    new_doc.save(output_pdf_path)
-    new_doc.close()
+        output = buffer.getvalue()
+        # Nach Ablauf der Frist nur teilweise vereinfacht: der nächste Abruf versucht es erneut
+        if not report['partial']:
+            page_cache.put_page(key, number - 1, output, report, variant)
+    response = send_file(io.BytesIO(output), download_name=f'seite_{number}.pdf', mimetype='application/pdf')
+    response.headers.update(simplification_headers(report))
+    response.headers['X-Page-Cache'] = 'miss' if cached is None else 'hit'
+    return response
+
+def simplification_headers(report):
+    """Antwort-Header: wie viel des Dokuments vereinfacht und wie viel übersprungen wurde"""
+    return {
+        'X-Simplified-Chunks': f"{report['simplified_chunks']}/{report['total_chunks']}",
+        'X-Simplified-Ratio': f"{report['simplified_ratio']:.3f}",
+        'X-Simplification-Partial': 'true' if report['partial'] else 'false',
+        # Bereits einfache Abschnitte, die ohne Modell übernommen wurden
+        'X-Skipped-Chunks': str(report['skipped_chunks']),
+        'X-Tokens-Saved': str(report['tokens_saved']),
+        # Blockmodus: Kopf-/Fußzeilen, Seitenzahlen, Tabellen und Duplikate
+        **({
+            'X-Structural-Blocks': str(report['structural_blocks']),
+            'X-Tokens-Removed': str(report['tokens_removed']),
+        } if 'tokens_removed' in report else {}),
+        # Stufen-Pipeline: Auslastung je Stufe und höchste Füllung je Warteschlange
+        **({
+            'X-Pipeline-Utilization': ", ".join(
+                f"{name}={stage['utilization']:.2f}" for name, stage in report['pipeline']['stages'].items()
+            ),
+            'X-Pipeline-Queue-Depth': ", ".join(
+                f"{name}={channel['max_depth']}/{channel['capacity']}"
+                for name, channel in report['pipeline']['queues'].items()
+            ),
+        } if 'pipeline' in report else {}),
+    }
+
+def create_layout_preserving_simplified_pdf(input_pdf, output_pdf, target_language='de', deadline=None,
+                                            layout=None, pages=None):
+    """Vereinfacht den Text eines PDFs und liefert den Bericht (vereinfachte Chunks, Anteil)
+
+    Eingabe ist ein Pfad oder der Inhalt im Speicher (``bytes``,
+    ``memoryview``), Ausgabe ein Pfad oder ein binärer Stream. ``pages``
+    (Seitenindizes ab 0, aufsteigend) beschränkt Extraktion, Vereinfachung
+    und Ausgabe auf diese Seiten.
+    """
+    if (layout or PDF_LAYOUT_MODE) == 'blocks':
+        return create_block_simplified_pdf(input_pdf, output_pdf, target_language, deadline, pages)
+    if PDF_PIPELINE:
+        return create_pipelined_text_pdf(input_pdf, output_pdf, target_language, deadline, pages)
+    doc = open_pdf(input_pdf)
+    # 1. Fließtext seitenweise extrahieren (große PDFs parallel)
+    full_text = "\n".join(extract_page_texts(
+        input_pdf, doc, workers=PDF_EXTRACTION_WORKERS, min_pages=PDF_PARALLEL_MIN_PAGES, pages=pages
+    )).strip()
+    logger.debug(f"Extrahierter Text: {len(full_text)} Zeichen aus {len(doc)} Seiten")
+    # 2. Vereinfachen; nach Ablauf der Frist bleiben restliche Chunks markiert im Original
+    result = simplify_full_text(full_text, target_language=target_language, deadline=deadline)
+    simplified = result.text
+    if result.partial:
+        logger.warning(f"Dokument nur teilweise vereinfacht: {result.report()}")
+    # 3. Neues PDF im Seitenformat der ersten Seite, fortlaufend über so viele Seiten wie nötig
+    page_rect = first_page_rect(doc, pages)
     doc.close()
+    pages = write_reflowed_pdf(paragraphs(simplified), output_pdf, page_rect)
+    logger.debug(f"Vereinfachter Text auf {pages} Seiten gesetzt")
+    return result.report()
 
-def simplify_text_batch(texts, target_language='de'):
-    prompts = [
-        f"Vereinfache den folgenden Text in leicht verständliches, einfaches Deutsch. "
-        f"Alle Informationen sollen erhalten bleiben, aber die Sätze sollen kürzer und klarer sein. "
-        f"Schreibe den gesamten Text um, ohne etwas wegzulassen oder hinzuzufügen.\n\n"
-        f"Text:\n{text}\n\nVereinfachter Text:"
-        for text in texts
-    ]
-    inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True)
-    input_ids = inputs["input_ids"].to(model.device)
-    attention_mask = inputs["attention_mask"].to(model.device)
-    with torch.no_grad():
-        outputs = model.generate(
-            input_ids=input_ids,
-            attention_mask=attention_mask,
-            max_new_tokens=512,
-            temperature=0.5,
-            top_p=0.8,
-            repetition_penalty=1.2,
-            do_sample=True,
-            pad_token_id=tokenizer.eos_token_id,
-        )
-    decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
-    split_key = "Vereinfachter Text:"
-    simplified = [out.split(split_key)[-1].strip() for out in decoded]
-    return simplified
-
-def simplify_full_text(text, target_language='de'):
-    prompt = f"Vereinfache folgenden Text auf einfachem Deutsch:\n\n{text}\n\nVereinfachter Text:"
-    inputs = tokenizer(prompt, return_tensors="pt", truncation=True, padding=True, max_length=2048)
-    input_ids = inputs["input_ids"].to(model.device)
-    attention_mask = inputs["attention_mask"].to(model.device)
-    with torch.no_grad():
-        outputs = model.generate(
-            input_ids=input_ids,
-            attention_mask=attention_mask,
-            max_new_tokens=1024,  # ggf. erhöhen für lange Texte
-            temperature=0.5,
-            top_p=0.8,
-            repetition_penalty=1.2,
-            do_sample=True,
-            pad_token_id=tokenizer.eos_token_id,
-        )
-    decoded = tokenizer.decode(outputs[0], skip_special_tokens=True)
-    split_key = "Vereinfachter Text:"
-    simplified = decoded.split(split_key)[-1].strip()
-    return simplified
+def first_page_rect(doc, pages=None):
+    """Format der ersten (ausgewählten) Seite für das Fließtext-PDF"""
+    if not len(doc):
+        return fitz.paper_rect('a4')
+    rect = doc[pages[0] if pages else 0].rect
+    return (0, 0, rect.width, rect.height)
+
+def create_pipelined_text_pdf(input_pdf, output_pdf, target_language='de', deadline=None, pages=None):
+    """Textmodus in drei überlappenden Stufen
+
+    Die Extraktion liefert Chunks, sobald genug Seiten gelesen sind, die
+    Vereinfachung verarbeitet sie in Gruppen und die Ausgabe setzt jeden
+    fertigen Absatz, während das Modell die nächsten Chunks rechnet.
+    """
+    with open_pdf(input_pdf) as doc:
+        page_rect = first_page_rect(doc, pages)
+    utils = model_utils()
+    result = SimplificationResult()
+    pipeline = Pipeline(PDF_PIPELINE_QUEUE_SIZE)
+    pipeline.add_source('extraction', lambda: utils.stream_chunks(extract_page_texts(
+        input_pdf, workers=PDF_EXTRACTION_WORKERS, min_pages=PDF_PARALLEL_MIN_PAGES, pages=pages
+    )))
+    # Gleiche Parameter wie simplify_full_text, nur gruppenweise
+    pipeline.add_stage('inference', lambda chunks: utils.simplify_stream(
+        chunks, result, lambda batch: simplify_blocks(batch, target_language, deadline)
+    ))
+    pipeline.add_stage('render', lambda parts: [write_reflowed_pdf(
+        stream_paragraphs(join_parts(parts)), output_pdf, page_rect
+    )])
+    pages, = pipeline.run()
+    pipeline.log_report()
+    logger.debug(f"Vereinfachter Text auf {pages} Seiten gesetzt")
+    if result.partial:
+        logger.warning(f"Dokument nur teilweise vereinfacht: {result.report()}")
+    report = result.report()
+    report['pipeline'] = pipeline.report()
+    return report
+
+def create_block_simplified_pdf(input_pdf, output_pdf, target_language='de', deadline=None, pages=None):
+    """Vereinfacht jeden Textblock und schreibt ihn in sein Rechteck zurück
+
+    Bilder, Vektorgrafiken und alle Seiten bleiben erhalten; übersprungene
+    und nicht mehr vereinfachte Blöcke behalten ihren Originaltext, ebenso
+    Kopf-/Fußzeilen, Seitenzahlen und Tabellen. Gleiche Blöcke gehen nur
+    einmal an das Modell. Mit ``PDF_PIPELINE`` wird jede Seite geschrieben,
+    sobald alle ihre Blöcke vereinfacht sind, während das Modell an den
+    nächsten rechnet. Mit ``pages`` enthält die Ausgabe nur diese Seiten;
+    Kopf- und Fußzeilen werden dann unter ihnen erkannt.
+    """
+    doc = open_pdf(input_pdf)
+    if pages is not None:
+        doc.select(pages)
+    state = {}
+    pipeline = None
+    try:
+        def extraction():
+            # Wiederkehrende Kopfzeilen und Duplikate erkennt erst der Blick auf alle Seiten
+            blocks = list(extract_blocks(doc))
+            if PDF_STRUCTURE_FILTER:
+                structure = classify_blocks(doc, blocks, PDF_TABLE_DETECTION)
+            else:
+                structure = DocumentStructure.all_body(blocks)
+            body = structure.body_indices
+            unique, positions = deduplicate([blocks[index].text for index in body])
+            groups = [[] for _ in unique]
+            for index, position in zip(body, positions):
+                groups[position].append(index)
+            state.update(blocks=blocks, structure=structure, body=body, unique=unique, positions=positions,
+                         rewriter=PageRewriter(doc, blocks, groups))
+            return unique
+
+        def render(outputs):
+            # Erst mit dem ersten Eintrag ist die Extraktion fertig und der Zustand gesetzt
+            for position, (_, output, skipped) in enumerate(outputs):
+                yield state['rewriter'].resolve(position, None if skipped else output)
+
+        if PDF_PIPELINE:
+            utils = model_utils()
+            result = SimplificationResult()
+            pipeline = Pipeline(PDF_PIPELINE_QUEUE_SIZE)
+            pipeline.add_source('extraction', extraction)
+            pipeline.add_stage('inference', lambda texts: utils.simplify_stream(
+                texts, result, lambda batch: simplify_blocks(batch, target_language, deadline)
+            ))
+            pipeline.add_stage('render', render)
+            pages = pipeline.run()
+            pipeline.log_report()
+        else:
+            result = simplify_blocks(extraction(), target_language, deadline)
+            pages = list(render(result.chunks()))
+        replaced = sum(sum(page.values()) for page in pages)
+        logger.info(f"{replaced} von {len(state['blocks'])} Blöcken auf {len(doc)} Seiten ersetzt")
+        doc.save(output_pdf, garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+    duplicate_tokens = 0
+    seen = set()
+    for index, position in zip(state['body'], state['positions']):
+        if position in seen:
+            duplicate_tokens += state['structure'].tokens[index]
+        seen.add(position)
+    report = result.report()
+    report.update(state['structure'].report(len(state['body']) - len(state['unique']), duplicate_tokens))
+    logger.info(
+        f"Struktur: {report['structural_blocks']} Blöcke unverändert, {report['duplicate_blocks']} Duplikate, "
+        f"{report['tokens_removed']} Tokens nicht an das Modell"
+    )
+    if pipeline is not None:
+        report['pipeline'] = pipeline.report()
+    return report
+
+# Prompt-Vorlage für die PDF-Vereinfachung (Präfix wird pro Modell gecacht)
+DOCUMENT_TEMPLATE = PromptTemplate(
+    'document',
+    prefix="Vereinfache folgenden Text auf einfachem Deutsch:\n\n",
+    tail="\n\nVereinfachter Text:"
+)
+
+def simplify_blocks(texts, target_language='de', deadline=None):
+    return model_utils().simplify_segments(
+        texts,
+        target_language,
+        deadline,
+        template=DOCUMENT_TEMPLATE,
+        max_length=2048,
+        max_new_tokens=1024,
+        temperature=0.5,
+        top_p=0.8,
+        repetition_penalty=1.2,
+        do_sample=True,
+    )
+
+def simplify_full_text(text, target_language='de', deadline=None):
+    return model_utils().simplify_document(
+        text,
+        target_language,
+        deadline,
+        template=DOCUMENT_TEMPLATE,
+        max_length=2048,
+        max_new_tokens=1024,  # Obergrenze; das Budget folgt aus der Textlänge
+        temperature=0.5,
+        top_p=0.8,
+        repetition_penalty=1.2,
+        do_sample=True,
+    )
 
 if __name__ == '__main__':
     # Try different ports if 5000 is in use
@@ -0,0 +1,127 @@
+"""
+Batch-Planung für die Text-Vereinfachung
+
+Sortiert Chunks nach Token-Länge in Buckets und schneidet daraus Batches,
+deren Größe durch ein Speicherbudget (Tokens × Batchgröße) begrenzt ist.
+Schlägt eine Allokation fehl, wird der Batch halbiert und erneut versucht.
+"""
+import gc
+import logging
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar('R')
+
+# Fehlermeldungen, an denen sich fehlgeschlagene Allokationen erkennen lassen
+_ALLOCATION_ERROR_MARKERS = (
+    'out of memory',
+    "can't allocate memory",
+    'cannot allocate memory',
+    'failed to allocate',
+)
+
+
+def is_allocation_error(exc: BaseException) -> bool:
+    """Prüft ob eine Exception auf zu wenig Speicher zurückgeht"""
+    if isinstance(exc, MemoryError):
+        return True
+    if isinstance(exc, RuntimeError):
+        message = str(exc).lower()
+        return any(marker in message for marker in _ALLOCATION_ERROR_MARKERS)
+    return False
+
+
+def length_bucket(length: int) -> int:
+    """Bucket einer Sequenzlänge (Zweierpotenzen: 1, 2, 3-4, 5-8, ...)"""
+    return max(0, length - 1).bit_length()
+
+
+def plan_batches(lengths: Sequence[int], token_budget: int, max_new_tokens: int = 0,
+                 max_batch_size: Optional[int] = None) -> List[List[int]]:
+    """Plant Batches als Listen von Indizes in ``lengths``
+
+    Die Kosten eines Batches sind ``(längste Sequenz + max_new_tokens) × Batchgröße``,
+    da alle Zeilen auf die längste gepaddet werden. Ein Batch überschreitet nie
+    einen Längen-Bucket und nie ``token_budget`` - außer eine einzelne Sequenz
+    ist bereits größer als das Budget, dann läuft sie allein.
+    """
+    if token_budget <= 0:
+        raise ValueError("token_budget muss positiv sein")
+
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_max = 0
+    current_bucket = None
+
+    for index in order:
+        cost = lengths[index] + max_new_tokens
+        bucket = length_bucket(lengths[index])
+        new_max = max(current_max, cost)
+        full = (
+            new_max * (len(current) + 1) > token_budget
+            or (max_batch_size is not None and len(current) >= max_batch_size)
+            or bucket != current_bucket
+        )
+        if current and full:
+            batches.append(current)
+            current = []
+            new_max = cost
+        current.append(index)
+        current_max = new_max
+        current_bucket = bucket
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_batches(batches: List[List[int]], run_batch: Callable[[List[int]], List[R]],
+                total: int) -> List[R]:
+    """Führt geplante Batches aus und gibt die Ergebnisse in Originalreihenfolge zurück
+
+    ``run_batch`` erhält die Indizes eines Batches und liefert je Index ein
+    Ergebnis. Bei einem Allokationsfehler wird der Batch halbiert; scheitert
+    bereits ein einzelner Eintrag, wird der Fehler weitergereicht.
+    """
+    results: List[Optional[R]] = [None] * total
+    pending = list(reversed(batches))
+
+    while pending:
+        batch = pending.pop()
+        try:
+            outputs = run_batch(batch)
+        except Exception as e:
+            if not is_allocation_error(e) or len(batch) == 1:
+                raise
+            gc.collect()
+            middle = len(batch) // 2
+            logger.warning(
+                f"Speicher reicht nicht für Batch mit {len(batch)} Einträgen, "
+                f"teile in {middle} + {len(batch) - middle}"
+            )
+            pending.append(batch[middle:])
+            pending.append(batch[:middle])
+            continue
+
+        if len(outputs) != len(batch):
+            raise ValueError(
+                f"Batch lieferte {len(outputs)} Ergebnisse für {len(batch)} Einträge"
+            )
+        for index, output in zip(batch, outputs):
+            results[index] = output
+
+    return results
+
+
+def run_planned_batches(lengths: Sequence[int], run_batch: Callable[[List[int]], List[R]],
+                        token_budget: int, max_new_tokens: int = 0,
+                        max_batch_size: Optional[int] = None) -> List[R]:
+    """Plant Batches für ``lengths`` und führt sie mit ``run_batch`` aus"""
+    batches = plan_batches(lengths, token_budget, max_new_tokens, max_batch_size)
+    logger.info(
+        f"{len(lengths)} Chunks in {len(batches)} Batches geplant "
+        f"(Budget {token_budget} Tokens)"
+    )
+    return run_batches(batches, run_batch, len(lengths))
@@ -0,0 +1,92 @@
+"""
+Kompilierte Generierung mit statischem KV-Cache
+
+``torch.compile`` übersetzt den Forward-Pass des Modells; der statische
+KV-Cache hält die Tensorformen während des Dekodierens konstant. Prompts
+werden links auf Längen-Buckets aufgefüllt, damit wenige Graphen alle
+Anfragen abdecken. Die Graphen werden beim Start für einige Buckets
+vorab kompiliert, damit die ersten Anfragen nicht die Kompilierzeit tragen.
+"""
+import logging
+import time
+from typing import Callable, List, Sequence
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def parse_buckets(value: str) -> List[int]:
+    """Liest Bucket-Längen aus einer kommagetrennten Liste"""
+    return sorted({int(part) for part in value.split(',') if part.strip()})
+
+
+def compile_model(model, backend: str = 'inductor'):
+    """Aktiviert statischen KV-Cache und kompiliert den Forward-Pass"""
+    model.generation_config.cache_implementation = 'static'
+    # dynamic=None: nach der ersten Formänderung wird ein Graph mit
+    # symbolischen Längen erzeugt statt für jede Länge neu zu kompilieren
+    model.forward = torch.compile(model.forward, backend=backend, dynamic=None)
+    model._compiled_generation = True
+    logger.info(f"Forward-Pass kompiliert (Backend: {backend}, statischer KV-Cache)")
+    return model
+
+
+def is_compiled(model) -> bool:
+    """Prüft ob ein Modell für kompilierte Generierung vorbereitet wurde"""
+    return getattr(model, '_compiled_generation', False) is True
+
+
+def bucket_length(length: int, buckets: Sequence[int]) -> int:
+    """Kleinster Bucket, der die Länge aufnimmt (sonst die Länge selbst)"""
+    for bucket in buckets:
+        if length <= bucket:
+            return bucket
+    return length
+
+
+def pad_to_bucket(input_ids: torch.Tensor, attention_mask: torch.Tensor, pad_token_id: int,
+                  buckets: Sequence[int]):
+    """Füllt ``input_ids`` und ``attention_mask`` links auf die Bucket-Länge auf"""
+    length = input_ids.shape[-1]
+    padding = bucket_length(length, buckets) - length
+    if padding <= 0:
+        return input_ids, attention_mask
+
+    pad_ids = torch.full(
+        (input_ids.shape[0], padding), pad_token_id, dtype=input_ids.dtype, device=input_ids.device
+    )
+    pad_mask = torch.zeros(
+        (attention_mask.shape[0], padding), dtype=attention_mask.dtype, device=attention_mask.device
+    )
+    return torch.cat([pad_ids, input_ids], dim=-1), torch.cat([pad_mask, attention_mask], dim=-1)
+
+
+def warmup(generate: Callable, tokenizer, buckets: Sequence[int], prompt: str, device,
+           max_new_tokens: int = 4) -> List[float]:
+    """Kompiliert die Graphen vorab mit einem aufgefüllten Prompt je Bucket
+
+    ``generate(input_ids, attention_mask, max_new_tokens=...)`` ist der
+    Generierungspfad der Anwendung. Wie bei echten Anfragen enthält jeder
+    Prompt Padding, sonst folgt die Generierung einem anderen Graphen.
+    Gibt die Dauer pro Bucket zurück.
+    """
+    prompt_ids = tokenizer(prompt)["input_ids"]
+    timings = []
+
+    for bucket in buckets:
+        input_ids = torch.tensor([prompt_ids[-(bucket - 1):]], dtype=torch.long)
+        input_ids, attention_mask = pad_to_bucket(
+            input_ids, torch.ones_like(input_ids), tokenizer.pad_token_id, [bucket]
+        )
+        start = time.perf_counter()
+        generate(
+            input_ids.to(device),
+            attention_mask.to(device),
+            max_new_tokens=max_new_tokens,
+            do_sample=False
+        )
+        timings.append(time.perf_counter() - start)
+        logger.info(f"Warmup Bucket {bucket}: {timings[-1]:.1f}s")
+
+    return timings
@@ -19,9 +19,49 @@ class Config:
     
     # Modell-Konfiguration
     MODEL_NAME = os.getenv('MODEL_NAME', 'microsoft/phi-4-mini-instruct')
+    INFERENCE_ENGINE = os.getenv('INFERENCE_ENGINE', 'transformers').lower()  # transformers | onnx (CPU)
+    DRAFT_MODEL_NAME = os.getenv('DRAFT_MODEL_NAME', '')  # Entwurfsmodell für assistiertes Dekodieren
     MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', './models')
     MODEL_MAX_LENGTH = int(os.getenv('MODEL_MAX_LENGTH', 1024))
     ENABLE_GPU = os.getenv('ENABLE_GPU', 'True').lower() == 'true'
+    MODEL_QUANTIZATION = os.getenv('MODEL_QUANTIZATION', 'none').lower()  # none | int8 (nur CPU)
+    MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'False').lower() == 'true'  # gunicorn preload_app, mmap-Gewichte
+    BATCH_TOKEN_BUDGET = int(os.getenv('BATCH_TOKEN_BUDGET', 4096))  # Tokens × Batchgröße
+    MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 8))
+    PREFIX_CACHE_ENABLED = os.getenv('PREFIX_CACHE_ENABLED', 'True').lower() == 'true'
+    GENERATION_EXPANSION_RATIO = float(os.getenv('GENERATION_EXPANSION_RATIO', 1.5))  # neue Tokens pro Text-Token
+    GENERATION_MIN_NEW_TOKENS = int(os.getenv('GENERATION_MIN_NEW_TOKENS', 16))
+    GENERATION_STOP_SEQUENCES = os.getenv('GENERATION_STOP_SEQUENCES', '\\n\\nText:|Vereinfachter Text:')
+    STREAM_TOKEN_TIMEOUT = float(os.getenv('STREAM_TOKEN_TIMEOUT', 60))  # Sekunden
+    MODEL_READY_TIMEOUT = float(os.getenv('MODEL_READY_TIMEOUT', 30))  # Wartezeit früher Anfragen, danach 503
+    SIMPLIFY_DEADLINE = float(os.getenv('SIMPLIFY_DEADLINE', 100))  # Sekunden pro Vereinfachung, unter dem gunicorn-Timeout
+    READABILITY_SKIP_ENABLED = os.getenv('READABILITY_SKIP_ENABLED', 'True').lower() == 'true'  # einfache Chunks ohne Modell
+    READABILITY_MIN_EASE = float(os.getenv('READABILITY_MIN_EASE', 70))  # Flesch-Lesewert nach Amstad
+    READABILITY_MAX_SENTENCE_WORDS = float(os.getenv('READABILITY_MAX_SENTENCE_WORDS', 15))
+    PDF_EXTRACTION_WORKERS = int(os.getenv(  # Prozesse pro Webworker für die Textextraktion
+        'PDF_EXTRACTION_WORKERS', max(1, (os.cpu_count() or 1) // int(os.getenv('WEB_CONCURRENCY', 1)))
+    ))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 64))  # ab dieser Seitenzahl parallel
+    PDF_LAYOUT_MODE = os.getenv('PDF_LAYOUT_MODE', 'blocks').lower()  # blocks: Text in Originalblöcke, text: Fließtext
+    # Kopf-/Fußzeilen, Seitenzahlen und Tabellen nicht vereinfachen
+    PDF_STRUCTURE_FILTER = os.getenv('PDF_STRUCTURE_FILTER', 'True').lower() == 'true'
+    PDF_TABLE_DETECTION = os.getenv('PDF_TABLE_DETECTION', 'True').lower() == 'true'  # Tabellen mit find_tables erkennen
+    PDF_PIPELINE = os.getenv('PDF_PIPELINE', 'True').lower() == 'true'  # Extraktion, Modell und Ausgabe überlappend
+    PDF_PIPELINE_QUEUE_SIZE = int(os.getenv('PDF_PIPELINE_QUEUE_SIZE', 16))  # Einträge je Warteschlange zwischen Stufen
+    PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', './cache/pages')  # von allen Workern geteilt
+    PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', 256 * 1024 * 1024))  # Dokumente und Seiten
+    PDF_SPOOL_THRESHOLD = int(os.getenv('PDF_SPOOL_THRESHOLD', 8 * 1024 * 1024))  # größere Uploads gespoolt und per mmap
+    LITE_MODE = os.getenv('LITE_MODE', 'False').lower() == 'true'  # nur Konvertierung, ohne torch (lite_app.py)
+    MODEL_COMPILE = os.getenv('MODEL_COMPILE', 'False').lower() == 'true'  # torch.compile + statischer KV-Cache
+    COMPILE_BACKEND = os.getenv('COMPILE_BACKEND', 'inductor')
+    COMPILE_BUCKETS = os.getenv('COMPILE_BUCKETS', '128,256,512,1024')  # Prompt-Längen für Warmup
+    THREAD_PLANNING_ENABLED = os.getenv('THREAD_PLANNING_ENABLED', 'True').lower() == 'true'
+    WORKER_COUNT = int(os.getenv('WEB_CONCURRENCY', 1))  # gunicorn-Worker
+    THREAD_PLAN_FILE = os.getenv('THREAD_PLAN_FILE', os.path.join(MODEL_CACHE_DIR, 'thread_plan.json'))
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'local').lower()  # local | server
+    INFERENCE_SOCKET = os.getenv('INFERENCE_SOCKET', '/tmp/latex-converter-inference.sock')
+    INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', 300))  # Sekunden
+    INFERENCE_BATCH_WINDOW = float(os.getenv('INFERENCE_BATCH_WINDOW', 0.02))  # Sekunden
     
     # LaTeX-Konfiguration
     LATEX_COMPILER = os.getenv('LATEX_COMPILER', 'pdflatex')
@@ -90,6 +130,31 @@ class Config:
                 'PyTorch nicht installiert - GPU-Features nicht verfügbar'
             )
         
+        if cls.MODEL_QUANTIZATION not in ('none', 'int8'):
+            validation_results['errors'].append(
+                f'Unbekannte MODEL_QUANTIZATION "{cls.MODEL_QUANTIZATION}" (erlaubt: none, int8)'
+            )
+            validation_results['valid'] = False
+
+        if cls.INFERENCE_ENGINE not in ('transformers', 'onnx'):
+            validation_results['errors'].append(
+                f'Unbekannte INFERENCE_ENGINE "{cls.INFERENCE_ENGINE}" (erlaubt: transformers, onnx)'
+            )
+            validation_results['valid'] = False
+        elif cls.INFERENCE_ENGINE == 'onnx':
+            try:
+                import onnxruntime  # noqa: F401
+            except ImportError:
+                validation_results['warnings'].append(
+                    'INFERENCE_ENGINE=onnx aber onnxruntime nicht installiert - transformers wird verwendet'
+                )
+
+        if cls.INFERENCE_BACKEND not in ('local', 'server'):
+            validation_results['errors'].append(
+                f'Unbekanntes INFERENCE_BACKEND "{cls.INFERENCE_BACKEND}" (erlaubt: local, server)'
+            )
+            validation_results['valid'] = False
+
         # LaTeX-Konfiguration prüfen
         import shutil
         if not shutil.which(cls.LATEX_COMPILER):
@@ -118,11 +183,25 @@ class Config:
         # Konfiguration sammeln
         validation_results['config'].update({
             'model_name': cls.MODEL_NAME,
+            'draft_model_name': cls.DRAFT_MODEL_NAME or None,
             'latex_compiler': cls.LATEX_COMPILER,
             'max_content_length': cls.MAX_CONTENT_LENGTH,
             'rate_limit': cls.RATE_LIMIT_PER_MINUTE,
             'log_level': cls.LOG_LEVEL,
-            'gpu_enabled': cls.ENABLE_GPU
+            'gpu_enabled': cls.ENABLE_GPU,
+            'model_quantization': cls.MODEL_QUANTIZATION,
+            'model_compile': cls.MODEL_COMPILE,
+            'inference_backend': cls.INFERENCE_BACKEND,
+            'inference_engine': cls.INFERENCE_ENGINE,
+            'model_preload': cls.MODEL_PRELOAD,
+            'simplify_deadline': cls.SIMPLIFY_DEADLINE,
+            'readability_skip_enabled': cls.READABILITY_SKIP_ENABLED,
+            'pdf_layout_mode': cls.PDF_LAYOUT_MODE,
+            'pdf_structure_filter': cls.PDF_STRUCTURE_FILTER,
+            'pdf_pipeline': cls.PDF_PIPELINE,
+            'page_cache_max_bytes': cls.PAGE_CACHE_MAX_BYTES,
+            'pdf_spool_threshold': cls.PDF_SPOOL_THRESHOLD,
+            'lite_mode': cls.LITE_MODE
         })
         
         return validation_results
@@ -0,0 +1,182 @@
+"""
+Fristen für lange Vereinfachungen
+
+Eine Anfrage erhält ein Zeitbudget unterhalb des gunicorn-Timeouts. Der
+Scheduler misst den Durchsatz der Generierung (Budget-Tokens pro Sekunde,
+gleitender Mittelwert über alle Anfragen des Prozesses) und startet den
+nächsten Chunk nur, wenn dessen geschätzte Dauer noch in die Restzeit
+passt. Chunks, die nicht mehr vereinfacht werden, behalten ihren
+Originaltext und werden im Ergebnis markiert.
+"""
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Kennzeichnung nicht vereinfachter Abschnitte im Ergebnistext
+UNSIMPLIFIED_MARKER = "[Nicht vereinfacht]"
+
+
+def join_parts(chunks: Iterable[Tuple[str, Optional[str], bool]]) -> Iterator[str]:
+    """Textteile aus (Original, Ausgabe, übersprungen) je Chunk, auch aus einem Strom
+
+    Benachbarte Originalchunks sind zusammenhängender Text; markiert werden
+    nur die nicht vereinfachten, nicht die übersprungenen. Mit Leerzeichen
+    verbunden ergeben die Teile ``SimplificationResult.text``.
+    """
+    run: List[str] = []
+    run_marked = False
+    for chunk, output, skipped in chunks:
+        original = output is None or skipped
+        if run and (not original or run_marked != (output is None)):
+            yield f"{UNSIMPLIFIED_MARKER} {''.join(run)}" if run_marked else "".join(run)
+            run = []
+        if original:
+            run.append(chunk)
+            run_marked = output is None
+        else:
+            yield output
+    if run:
+        yield f"{UNSIMPLIFIED_MARKER} {''.join(run)}" if run_marked else "".join(run)
+
+
+class Deadline:
+    """Zeitpunkt, bis zu dem eine Anfrage beantwortet sein muss (None: unbegrenzt)"""
+
+    def __init__(self, seconds: Optional[float], clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = None if seconds is None else clock() + seconds
+
+    @property
+    def bounded(self) -> bool:
+        return self.expires_at is not None
+
+    def remaining(self) -> float:
+        """Restzeit in Sekunden"""
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, estimate: Optional[float]) -> bool:
+        """Ob Arbeit mit der geschätzten Dauer vor Ablauf fertig wird (ohne Schätzung: ja)"""
+        if self.expired():
+            return False
+        return estimate is None or estimate <= self.remaining()
+
+
+class ThroughputEstimator:
+    """Gleitender Mittelwert der gemessenen Tokens pro Sekunde"""
+
+    def __init__(self, smoothing: float = 0.3):
+        self.smoothing = smoothing
+        self._rate: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, tokens: int, seconds: float):
+        """Verbucht eine abgeschlossene Generierung"""
+        if tokens <= 0 or seconds <= 0:
+            return
+        rate = tokens / seconds
+        with self._lock:
+            if self._rate is None:
+                self._rate = rate
+            else:
+                self._rate += self.smoothing * (rate - self._rate)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        return self._rate
+
+    def estimate(self, tokens: int) -> Optional[float]:
+        """Geschätzte Dauer für ``tokens`` in Sekunden; None ohne Messung"""
+        rate = self._rate
+        return None if rate is None else tokens / rate
+
+
+@dataclass
+class SimplificationResult:
+    """Ausgabe je Chunk; nicht vereinfachte Chunks (None) behalten ihren Originaltext
+
+    Bereits einfache Chunks werden ohne Modell übernommen (``skipped``) und
+    zählen als erledigt; ``tokens_saved`` summiert die dafür nicht
+    verarbeiteten Tokens. ``stopped`` zeigt an, dass die Vereinfachung
+    vorzeitig beendet wurde (Frist, Fehler); ein einzelner leerer
+    Modell-Output lässt den Chunk nur im Original.
+    """
+
+    originals: List[str] = field(default_factory=list)
+    outputs: List[Optional[str]] = field(default_factory=list)
+    skipped: List[bool] = field(default_factory=list)
+    tokens_saved: int = 0
+    stopped: bool = False
+
+    def __post_init__(self):
+        self.outputs.extend([None] * (len(self.originals) - len(self.outputs)))
+        self.skipped.extend([False] * (len(self.originals) - len(self.skipped)))
+
+    def add_chunks(self, chunks: List[str]):
+        self.originals.extend(chunks)
+        self.outputs.extend([None] * len(chunks))
+        self.skipped.extend([False] * len(chunks))
+
+    def skip(self, index: int, tokens: int):
+        """Übernimmt einen bereits einfachen Chunk unverändert"""
+        self.outputs[index] = self.originals[index]
+        self.skipped[index] = True
+        self.tokens_saved += tokens
+
+    def is_simplified(self, index: int) -> bool:
+        return 0 <= index < len(self.outputs) and self.outputs[index] is not None
+
+    @property
+    def simplified_chunks(self) -> int:
+        return sum(output is not None for output in self.outputs)
+
+    @property
+    def skipped_chunks(self) -> int:
+        return sum(self.skipped)
+
+    @property
+    def partial(self) -> bool:
+        return self.simplified_chunks < len(self.originals)
+
+    @property
+    def simplified_ratio(self) -> float:
+        """Anteil des Originaltextes (Zeichen), der vereinfacht wurde"""
+        total = sum(len(chunk) for chunk in self.originals)
+        if total == 0:
+            return 1.0
+        done = sum(len(chunk) for chunk, output in zip(self.originals, self.outputs) if output is not None)
+        return done / total
+
+    def chunks(self, start: int = 0) -> Iterator[Tuple[str, Optional[str], bool]]:
+        """(Original, Ausgabe, übersprungen) je Chunk ab ``start``"""
+        return zip(self.originals[start:], self.outputs[start:], self.skipped[start:])
+
+    def extend(self, other: 'SimplificationResult'):
+        """Hängt die Chunks eines Teilergebnisses an"""
+        self.originals.extend(other.originals)
+        self.outputs.extend(other.outputs)
+        self.skipped.extend(other.skipped)
+        self.tokens_saved += other.tokens_saved
+        self.stopped = self.stopped or other.stopped
+
+    @property
+    def text(self) -> str:
+        """Gesamttext; Originalabschnitte sind mit UNSIMPLIFIED_MARKER gekennzeichnet"""
+        return " ".join(join_parts(self.chunks()))
+
+    def report(self) -> dict:
+        return {
+            'total_chunks': len(self.originals),
+            'simplified_chunks': self.simplified_chunks,
+            'simplified_ratio': round(self.simplified_ratio, 3),
+            'partial': self.partial,
+            'skipped_chunks': self.skipped_chunks,
+            'skipped_ratio': round(self.skipped_chunks / len(self.originals), 3) if self.originals else 0.0,
+            'tokens_saved': self.tokens_saved,
+        }
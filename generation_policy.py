@@ -0,0 +1,73 @@
+"""
+Generierungsbudget und Stoppsequenzen
+
+Eine Vereinfachung ist etwa so lang wie ihr Eingabetext. Statt einer
+festen Obergrenze erhält jeder Chunk daher ``Eingabe-Tokens × Faktor``
+neue Tokens (mindestens ``min_new_tokens``, höchstens die Obergrenze des
+Aufrufers). Die Generierung endet zusätzlich an einer Stoppsequenz, etwa
+wenn das Modell einen neuen "Text:"-Abschnitt beginnt; der Text wird dort
+abgeschnitten.
+"""
+import math
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Tuple
+
+
+def parse_stop_sequences(value: str) -> Tuple[str, ...]:
+    """Stoppsequenzen aus einer Konfiguration wie ``\\n\\nText:|Vereinfachter Text:``"""
+    sequences = value.replace('\\n', '\n').split('|')
+    return tuple(sequence for sequence in sequences if sequence.strip())
+
+
+@dataclass
+class GenerationPolicy:
+    """Budget neuer Tokens pro Chunk und Stoppsequenzen"""
+
+    expansion_ratio: float = 1.5
+    min_new_tokens: int = 16
+    stop_sequences: Tuple[str, ...] = ()
+
+    def budget(self, input_tokens: int, ceiling: int) -> int:
+        """Neue Tokens für einen Chunk mit ``input_tokens`` Text-Tokens"""
+        wanted = max(self.min_new_tokens, math.ceil(input_tokens * self.expansion_ratio))
+        return max(1, min(ceiling, wanted))
+
+    def truncate(self, text: str) -> str:
+        """Schneidet den Text vor der ersten Stoppsequenz ab"""
+        for sequence in self.stop_sequences:
+            position = text.find(sequence)
+            if position != -1:
+                text = text[:position]
+        return text
+
+    def filter_stream(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Gibt gestreamte Stücke weiter, bis eine Stoppsequenz erscheint
+
+        Ein Ende, das noch zu einer Stoppsequenz werden kann, wird
+        zurückgehalten, bis das nächste Stück darüber entscheidet.
+        """
+        if not self.stop_sequences:
+            yield from pieces
+            return
+
+        pending = ""
+        for piece in pieces:
+            pending += piece
+            truncated = self.truncate(pending)
+            if truncated != pending:
+                if truncated:
+                    yield truncated
+                return
+
+            held = 0
+            for sequence in self.stop_sequences:
+                for length in range(min(len(sequence) - 1, len(pending)), held, -1):
+                    if pending.endswith(sequence[:length]):
+                        held = length
+                        break
+            if len(pending) > held:
+                yield pending[:len(pending) - held]
+                pending = pending[len(pending) - held:]
+
+        if pending:
+            yield pending
@@ -0,0 +1,17 @@
+"""
+gunicorn-Konfiguration (wird aus dem Arbeitsverzeichnis automatisch geladen)
+
+Mit MODEL_PRELOAD=True lädt der Master das Modell einmal, die Worker
+teilen die speicherabgebildeten Gewichte nach fork (copy-on-write).
+"""
+import os
+import sys
+
+preload_app = os.getenv('MODEL_PRELOAD', 'False').lower() == 'true'
+
+
+def post_fork(server, worker):
+    # Im Lite-Modus (lite_app:app) hat der Master kein Modell geladen
+    if preload_app and 'your_model_utils' in sys.modules:
+        import your_model_utils
+        your_model_utils.init_worker()
@@ -0,0 +1,37 @@
+"""
+Austauschbare Inferenz-Engines
+
+Eine Engine lädt ein Modell und erzeugt Vereinfachungen, entweder für
+einen Batch von Texten oder als Stream von Textstücken. Standard ist die
+transformers-Engine in ``your_model_utils`` (``model.generate``);
+``onnx_engine`` führt einen exportierten Decoder mit KV-Cache in ONNX
+Runtime auf der CPU aus. Auswahl über INFERENCE_ENGINE.
+"""
+from abc import ABC, abstractmethod
+from typing import Iterator, List
+
+from prompt_template import PromptTemplate
+
+
+class InferenceEngine(ABC):
+    """Schnittstelle: Modell laden, Batch generieren, einzelnen Text streamen"""
+
+    name = 'engine'
+
+    @abstractmethod
+    def load(self, model_name: str) -> bool:
+        """Lädt Tokenizer und Modell; False bei Fehlern"""
+
+    @abstractmethod
+    def is_loaded(self) -> bool:
+        """Ob Vereinfachungen möglich sind"""
+
+    @abstractmethod
+    def generate_batch(self, template: PromptTemplate, texts: List[str], target_language: str,
+                       max_length: int, max_new_tokens: int, **generation_kwargs) -> List[str]:
+        """Vereinfachungen für mehrere Texte, in derselben Reihenfolge"""
+
+    @abstractmethod
+    def stream(self, template: PromptTemplate, text: str, target_language: str,
+               max_length: int, max_new_tokens: int, **generation_kwargs) -> Iterator[str]:
+        """Vereinfachung eines Textes als Textstücke, sobald sie entstehen"""
@@ -0,0 +1,536 @@
+"""
+Inferenz-Server für alle Web-Worker
+
+Ein Prozess hält das Modell und beantwortet Vereinfachungen über einen
+Unix-Domain-Socket. Die gunicorn-Worker sind dünne Clients ohne eigenes
+Modell: der Speicher enthält nur eine Modellkopie, und Anfragen aller
+Worker werden gemeinsam gebatcht.
+
+Protokoll: jede Nachricht ist ein Frame aus Typ (1 Byte), Länge (4 Byte,
+Network Byte Order) und Nutzdaten. Strings sind längenpräfixiertes UTF-8,
+Generierungsparameter typisierte Schlüssel-Wert-Paare.
+
+Starten aus dem Projektverzeichnis:
+    python inference_server.py
+"""
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional
+
+from prompt_template import PromptTemplate
+
+logger = logging.getLogger(__name__)
+
+# Nachrichtentypen
+MSG_GENERATE = 1
+MSG_STREAM = 2
+MSG_PING = 3
+MSG_RESULT = 10
+MSG_TOKEN = 11
+MSG_END = 12
+MSG_PONG = 13
+MSG_ERROR = 14
+
+_HEADER = struct.Struct('!BI')
+_UINT = struct.Struct('!I')
+_INT = struct.Struct('!q')
+_FLOAT = struct.Struct('!d')
+
+
+class InferenceServerError(RuntimeError):
+    """Fehler, den der Inferenz-Server für eine Anfrage gemeldet hat"""
+
+
+@dataclass
+class InferenceRequest:
+    template: PromptTemplate
+    target_language: str
+    texts: List[str]
+    max_length: int
+    max_new_tokens: int
+    generation_kwargs: dict
+    # Absolute Frist (time.monotonic des Hosts); nicht Teil des Batch-Schlüssels
+    deadline_at: Optional[float] = None
+
+
+# --- Kodierung ---
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return _UINT.pack(len(data)) + data
+
+
+def _pack_value(value) -> bytes:
+    if value is None:
+        return b'n'
+    if isinstance(value, bool):
+        return b'b' + bytes([value])
+    if isinstance(value, int):
+        return b'i' + _INT.pack(value)
+    if isinstance(value, float):
+        return b'f' + _FLOAT.pack(value)
+    if isinstance(value, str):
+        return b's' + _pack_str(value)
+    if isinstance(value, (list, tuple)):
+        return b'l' + _UINT.pack(len(value)) + b''.join(_pack_value(item) for item in value)
+    raise TypeError(f"Nicht übertragbarer Parameter: {type(value).__name__}")
+
+
+class _Reader:
+    """Liest Felder nacheinander aus einem Nutzdatenblock"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def _take(self, size: int) -> bytes:
+        chunk = self.data[self.offset:self.offset + size]
+        if len(chunk) != size:
+            raise ValueError("Nachricht unvollständig")
+        self.offset += size
+        return chunk
+
+    def uint(self) -> int:
+        return _UINT.unpack(self._take(_UINT.size))[0]
+
+    def string(self) -> str:
+        return self._take(self.uint()).decode('utf-8')
+
+    def value(self):
+        tag = self._take(1)
+        if tag == b'n':
+            return None
+        if tag == b'b':
+            return self._take(1) != b'\x00'
+        if tag == b'i':
+            return _INT.unpack(self._take(_INT.size))[0]
+        if tag == b'f':
+            return _FLOAT.unpack(self._take(_FLOAT.size))[0]
+        if tag == b's':
+            return self.string()
+        if tag == b'l':
+            return [self.value() for _ in range(self.uint())]
+        raise ValueError(f"Unbekannter Werttyp: {tag!r}")
+
+
+def encode_strings(values: List[str]) -> bytes:
+    return _UINT.pack(len(values)) + b''.join(_pack_str(value) for value in values)
+
+
+def decode_strings(data: bytes) -> List[str]:
+    reader = _Reader(data)
+    return [reader.string() for _ in range(reader.uint())]
+
+
+def encode_request(request: InferenceRequest) -> bytes:
+    template = request.template
+    parts = [
+        _pack_str(template.name), _pack_str(template.prefix),
+        _pack_str(template.tail), _pack_str(template.separator),
+        _pack_str(request.target_language),
+        _UINT.pack(request.max_length), _UINT.pack(request.max_new_tokens),
+        _UINT.pack(len(request.generation_kwargs)),
+    ]
+    for key, value in sorted(request.generation_kwargs.items()):
+        parts.append(_pack_str(key) + _pack_value(value))
+    parts.append(encode_strings(request.texts))
+    parts.append(_pack_value(request.deadline_at))
+    return b''.join(parts)
+
+
+def decode_request(data: bytes) -> InferenceRequest:
+    reader = _Reader(data)
+    name, prefix, tail, separator = reader.string(), reader.string(), reader.string(), reader.string()
+    target_language = reader.string()
+    max_length, max_new_tokens = reader.uint(), reader.uint()
+    generation_kwargs = {reader.string(): reader.value() for _ in range(reader.uint())}
+    texts = [reader.string() for _ in range(reader.uint())]
+    deadline_at = reader.value()
+    return InferenceRequest(
+        PromptTemplate(name, prefix=prefix, tail=tail, separator=separator),
+        target_language, texts, max_length, max_new_tokens, generation_kwargs, deadline_at
+    )
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_frame(sock: socket.socket, message_type: int, payload: bytes = b''):
+    sock.sendall(_HEADER.pack(message_type, len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket):
+    """Liest einen Frame; (None, b'') wenn die Gegenseite geschlossen hat"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None, b''
+    message_type, length = _HEADER.unpack(header)
+    payload = _recv_exact(sock, length) if length else b''
+    if payload is None:
+        raise ConnectionError("Verbindung während einer Nachricht geschlossen")
+    return message_type, payload
+
+
+# --- Server ---
+
+@dataclass
+class _Job:
+    request: InferenceRequest
+    stream: bool = False
+    done: threading.Event = field(default_factory=threading.Event)
+    pieces: queue.Queue = field(default_factory=queue.Queue)
+    result: Optional[List[str]] = None
+    error: Optional[Exception] = None
+    cancelled: bool = False
+
+    def batch_key(self):
+        request = self.request
+        template = request.template
+        return (
+            template.name, template.prefix, template.tail, template.separator,
+            request.target_language, request.max_length, request.max_new_tokens,
+            repr(sorted(request.generation_kwargs.items())),
+        )
+
+
+class InferenceServer:
+    """Nimmt Anfragen aller Worker an und führt sie auf einem Modell-Thread aus
+
+    ``generate_batch(template, texts, target_language, max_length=..., max_new_tokens=..., **kwargs)``
+    und ``stream(template, text, target_language, ...)`` sind die Generierungsfunktionen
+    von ``your_model_utils``. Nicht-Streaming-Anfragen, die innerhalb von
+    ``batch_window`` Sekunden eintreffen und dieselbe Vorlage und Parameter
+    nutzen, laufen als ein gemeinsamer Aufruf.
+    """
+
+    def __init__(self, socket_path: str, generate_batch: Callable, stream: Callable,
+                 batch_window: float = 0.02, max_batch_texts: int = 64):
+        self.socket_path = socket_path
+        self.generate_batch = generate_batch
+        self.stream = stream
+        self.batch_window = batch_window
+        self.max_batch_texts = max_batch_texts
+        self._jobs = queue.Queue()
+        self._server = None
+        self._threads = []
+
+    def start(self):
+        """Öffnet den Socket und startet Modell- und Annahme-Thread"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server._handle_connection(self.request)
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        os.chmod(self.socket_path, 0o660)
+
+        self._threads = [
+            threading.Thread(target=self._run_jobs, name='inference-model', daemon=True),
+            threading.Thread(target=self._server.serve_forever, name='inference-accept', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Inferenz-Server lauscht auf {self.socket_path}")
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._jobs.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    # Verbindung (ein Thread pro Worker-Verbindung)
+
+    def _handle_connection(self, sock: socket.socket):
+        while True:
+            try:
+                message_type, payload = recv_frame(sock)
+            except (ConnectionError, OSError):
+                return
+            if message_type is None:
+                return
+
+            try:
+                if message_type == MSG_PING:
+                    send_frame(sock, MSG_PONG)
+                elif message_type == MSG_GENERATE:
+                    self._answer_generate(sock, decode_request(payload))
+                elif message_type == MSG_STREAM:
+                    self._answer_stream(sock, decode_request(payload))
+                else:
+                    send_frame(sock, MSG_ERROR, _pack_str(f"Unbekannter Nachrichtentyp {message_type}"))
+            except ValueError as e:
+                send_frame(sock, MSG_ERROR, _pack_str(f"Ungültige Anfrage: {e}"))
+            except OSError:
+                # Client hat die Verbindung getrennt
+                return
+
+    def _answer_generate(self, sock: socket.socket, request: InferenceRequest):
+        job = _Job(request)
+        self._jobs.put(job)
+        job.done.wait()
+        if job.error is not None:
+            send_frame(sock, MSG_ERROR, _pack_str(str(job.error)))
+        else:
+            send_frame(sock, MSG_RESULT, encode_strings(job.result))
+
+    def _answer_stream(self, sock: socket.socket, request: InferenceRequest):
+        job = _Job(request, stream=True)
+        self._jobs.put(job)
+        try:
+            while True:
+                piece = job.pieces.get()
+                if piece is None:
+                    break
+                send_frame(sock, MSG_TOKEN, _pack_str(piece))
+        except OSError:
+            # Client weg: Generierung abbrechen
+            job.cancelled = True
+            raise
+
+        if job.error is not None:
+            send_frame(sock, MSG_ERROR, _pack_str(str(job.error)))
+        else:
+            send_frame(sock, MSG_END)
+
+    # Modell-Thread
+
+    def _run_jobs(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.stream:
+                self._run_stream(job)
+                continue
+
+            batch, deferred, stop = self._collect_batch(job)
+            for group in self._group(batch):
+                self._run_group(group)
+            for stream_job in deferred:
+                self._run_stream(stream_job)
+            if stop:
+                return
+
+    def _collect_batch(self, first: _Job):
+        """Sammelt weitere Anfragen innerhalb des Batch-Fensters"""
+        batch, deferred = [first], []
+        texts = len(first.request.texts)
+        deadline = time.monotonic() + self.batch_window
+
+        while texts < self.max_batch_texts:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._jobs.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                return batch, deferred, True
+            if job.stream:
+                deferred.append(job)
+            else:
+                batch.append(job)
+                texts += len(job.request.texts)
+
+        return batch, deferred, False
+
+    @staticmethod
+    def _group(batch: List[_Job]) -> List[List[_Job]]:
+        groups = {}
+        for job in batch:
+            groups.setdefault(job.batch_key(), []).append(job)
+        return list(groups.values())
+
+    def _run_group(self, group: List[_Job]):
+        """Generiert eine Gruppe gemeinsam unter der engsten Frist ihrer Anfragen
+
+        Endet der Lauf an dieser Frist, sind die Ausgaben möglicherweise
+        abgeschnitten; Anfragen mit späterer Frist laufen dann erneut.
+        """
+        request = group[0].request
+        texts = [text for job in group for text in job.request.texts]
+        deadlines = [job.request.deadline_at for job in group if job.request.deadline_at is not None]
+        deadline_at = min(deadlines) if deadlines else None
+        kwargs = dict(request.generation_kwargs)
+        if deadline_at is not None:
+            kwargs['deadline_at'] = deadline_at
+        try:
+            results = self.generate_batch(
+                request.template,
+                texts,
+                request.target_language,
+                max_length=request.max_length,
+                max_new_tokens=request.max_new_tokens,
+                **kwargs
+            )
+        except Exception as e:
+            logger.error(f"Fehler bei der Batch-Generierung: {e}")
+            for job in group:
+                job.error = e
+                job.done.set()
+            return
+        if len(group) > 1:
+            logger.info(f"{len(group)} Anfragen mit {len(texts)} Texten gemeinsam generiert")
+
+        cut = deadline_at is not None and time.monotonic() >= deadline_at
+        rerun = []
+        position = 0
+        for job in group:
+            own = job.request.deadline_at
+            if cut and (own is None or own > deadline_at):
+                rerun.append(job)
+            else:
+                job.result = results[position:position + len(job.request.texts)]
+                job.done.set()
+            position += len(job.request.texts)
+        if rerun:
+            logger.info(f"{len(rerun)} Anfragen nach Frist einer gebündelten Anfrage erneut generiert")
+            self._run_group(rerun)
+
+    def _run_stream(self, job: _Job):
+        request = job.request
+        kwargs = dict(request.generation_kwargs)
+        if request.deadline_at is not None:
+            kwargs['deadline_at'] = request.deadline_at
+        try:
+            for piece in self.stream(
+                request.template,
+                request.texts[0],
+                request.target_language,
+                max_length=request.max_length,
+                max_new_tokens=request.max_new_tokens,
+                **kwargs
+            ):
+                if job.cancelled:
+                    break
+                job.pieces.put(piece)
+        except Exception as e:
+            logger.error(f"Fehler beim Streaming: {e}")
+            job.error = e
+        finally:
+            job.pieces.put(None)
+            job.done.set()
+
+
+# --- Client ---
+
+class InferenceClient:
+    """Dünner Client der Web-Worker; eine Verbindung pro Anfrage"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def ping(self) -> bool:
+        """Prüft ob der Server erreichbar ist"""
+        try:
+            with self._connect() as sock:
+                send_frame(sock, MSG_PING)
+                return recv_frame(sock)[0] == MSG_PONG
+        except OSError:
+            return False
+
+    def generate(self, template: PromptTemplate, texts: List[str], target_language: str,
+                 max_length: int, max_new_tokens: int, deadline_at: Optional[float] = None,
+                 **generation_kwargs) -> List[str]:
+        request = InferenceRequest(template, target_language, list(texts), max_length, max_new_tokens,
+                                   generation_kwargs, deadline_at)
+        with self._connect() as sock:
+            send_frame(sock, MSG_GENERATE, encode_request(request))
+            message_type, payload = recv_frame(sock)
+
+        if message_type == MSG_RESULT:
+            return decode_strings(payload)
+        if message_type == MSG_ERROR:
+            raise InferenceServerError(_Reader(payload).string())
+        raise ConnectionError("Inferenz-Server hat die Verbindung geschlossen")
+
+    def stream(self, template: PromptTemplate, text: str, target_language: str,
+               max_length: int, max_new_tokens: int, deadline_at: Optional[float] = None,
+               **generation_kwargs) -> Iterator[str]:
+        request = InferenceRequest(template, target_language, [text], max_length, max_new_tokens,
+                                   generation_kwargs, deadline_at)
+        with self._connect() as sock:
+            send_frame(sock, MSG_STREAM, encode_request(request))
+            while True:
+                message_type, payload = recv_frame(sock)
+                if message_type == MSG_TOKEN:
+                    yield _Reader(payload).string()
+                elif message_type == MSG_END:
+                    return
+                elif message_type == MSG_ERROR:
+                    raise InferenceServerError(_Reader(payload).string())
+                else:
+                    raise ConnectionError("Inferenz-Server hat die Verbindung geschlossen")
+
+
+def main():
+    # Dieser Prozess hält das Modell selbst und nutzt alle CPUs
+    os.environ['INFERENCE_BACKEND'] = 'local'
+    os.environ['WEB_CONCURRENCY'] = '1'
+    import your_model_utils
+
+    # Der Import lädt im Hintergrund; der Server nimmt erst danach Verbindungen an
+    your_model_utils.wait_for_initialization()
+    # Die ONNX-Engine setzt ``model`` nicht; maßgeblich ist die Engine
+    if not your_model_utils.is_model_available():
+        raise SystemExit("Modell konnte nicht geladen werden")
+
+    server = InferenceServer(
+        your_model_utils.INFERENCE_SOCKET,
+        your_model_utils.generate_simplifications,
+        your_model_utils.stream_simplification,
+        batch_window=your_model_utils.INFERENCE_BATCH_WINDOW,
+    )
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+"""
+Leichtgewichtiger Einstiegspunkt nur für die Konvertierung Markdown → LaTeX → PDF
+
+Startet dieselbe Flask-App ohne KI-Vereinfachung: torch, transformers und
+das Modell werden nie importiert, der Worker ist in Sekundenbruchteilen
+bereit. PDF-Vereinfachung und /simplify/stream antworten mit 501.
+
+    gunicorn lite_app:app
+"""
+import os
+
+os.environ['LITE_MODE'] = 'True'
+
+from app import app  # noqa: E402
+
+if __name__ == '__main__':
+    app.run(port=int(os.getenv('PORT', 5000)))
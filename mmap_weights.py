@@ -0,0 +1,103 @@
+"""
+Speicherabgebildete safetensors-Gewichte für geteilte Modellseiten
+
+Die Gewichte werden einmal im Ziel-Datentyp als safetensors-Datei in den
+Modell-Cache exportiert und danach direkt aus einer privaten
+Speicherabbildung (mmap) der Datei gelesen. Die Tensoren liegen damit im
+Page-Cache statt in anonymem Speicher: der Start kopiert keine Gewichte,
+und nach einem fork teilen alle Worker dieselben Seiten, solange niemand
+schreibt.
+"""
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from typing import Dict
+
+import torch
+from transformers import AutoConfig, AutoModelForCausalLM
+
+from quantization import no_init_weights
+
+logger = logging.getLogger(__name__)
+
+_DTYPES = {
+    'F64': torch.float64, 'F32': torch.float32, 'F16': torch.float16, 'BF16': torch.bfloat16,
+    'I64': torch.int64, 'I32': torch.int32, 'I16': torch.int16, 'I8': torch.int8,
+    'U8': torch.uint8, 'BOOL': torch.bool,
+}
+
+
+def mmap_cache_dir(cache_dir: str, model_name: str, dtype: torch.dtype) -> str:
+    """Verzeichnis des exportierten Modells im Cache"""
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '--', model_name.strip('/'))
+    return os.path.join(cache_dir, f"{safe_name}-{str(dtype).replace('torch.', '')}-mmap")
+
+
+def export_safetensors(model, directory: str):
+    """Speichert Konfiguration und Gewichte als safetensors (atomar per Umbenennen)"""
+    tmp_directory = f"{directory}.tmp"
+    model.save_pretrained(tmp_directory, safe_serialization=True)
+    os.replace(tmp_directory, directory)
+    logger.info(f"Gewichte für Speicherabbildung exportiert: {directory}")
+
+
+def load_mmap_state_dict(path: str) -> Dict[str, torch.Tensor]:
+    """Liest eine safetensors-Datei als Tensoren auf einer Speicherabbildung der Datei"""
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+        # ACCESS_COPY: Seiten bleiben mit dem Page-Cache geteilt, bis jemand schreibt
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    data_start = 8 + header_size
+    state_dict = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = _DTYPES[info['dtype']]
+        start, end = info['data_offsets']
+        element_size = torch.empty((), dtype=dtype).element_size()
+        count = (end - start) // element_size
+        if count == 0:
+            state_dict[name] = torch.empty(info['shape'], dtype=dtype)
+            continue
+        tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + start)
+        state_dict[name] = tensor.view(info['shape'])
+    return state_dict
+
+
+def load_mmap_model(model_name: str, cache_dir: str, dtype: torch.dtype = torch.float32):
+    """Lädt ein Modell mit speicherabgebildeten Gewichten; exportiert es beim ersten Start"""
+    directory = mmap_cache_dir(cache_dir, model_name, dtype)
+
+    if not os.path.isdir(directory):
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=dtype)
+        os.makedirs(cache_dir, exist_ok=True)
+        export_safetensors(model, directory)
+        # Das frisch geladene Modell liegt in anonymem Speicher; neu abbilden
+        del model
+
+    config = AutoConfig.from_pretrained(directory)
+    # Platzhalter ohne Initialisierung belegen keine Seiten
+    with no_init_weights():
+        model = AutoModelForCausalLM.from_config(config, torch_dtype=dtype)
+
+    state_dict = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.safetensors'):
+            state_dict.update(load_mmap_state_dict(os.path.join(directory, filename)))
+
+    # assign=True übernimmt die abgebildeten Tensoren statt sie zu kopieren
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+    # Gebundene Gewichte (z.B. lm_head = Embeddings) stehen nur einmal in der Datei
+    mapped = {tensor.data_ptr() for tensor in state_dict.values()}
+    missing = [name for name in missing if model.get_parameter(name).data_ptr() not in mapped]
+    if missing or unexpected:
+        raise ValueError(f"Gewichte passen nicht zum Modell: fehlend {missing}, unerwartet {unexpected}")
+
+    logger.info(f"Gewichte speicherabgebildet aus {directory}")
+    return model.eval()
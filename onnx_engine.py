@@ -0,0 +1,347 @@
+"""
+ONNX-Runtime-Engine für CPU-Inferenz
+
+Der Decoder wird einmal mit KV-Cache nach ONNX exportiert und samt
+Tokenizer und Konfiguration im Modell-Cache abgelegt. Ein einziger Graph
+dient für Prefill (leerer Cache) und Dekodierschritte (ein Token); die
+Generierungsschleife mit Greedy-Suche bzw. Sampling (Temperatur, top-p,
+Wiederholungsstrafe) läuft in numpy.
+
+Benötigt ``onnxruntime`` und für den Export ``onnx``.
+"""
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import warnings
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+import onnxruntime as ort
+import torch
+from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer, DynamicCache, GenerationConfig
+
+from batch_planner import run_planned_batches
+from generation_policy import GenerationPolicy
+from inference_engine import InferenceEngine
+from prompt_template import PromptTemplate
+
+logger = logging.getLogger(__name__)
+
+ONNX_FILENAME = 'decoder_with_past.onnx'
+
+
+def onnx_cache_dir(cache_dir: str, model_name: str) -> str:
+    """Verzeichnis des exportierten Decoders im Cache"""
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '--', model_name.strip('/'))
+    return os.path.join(cache_dir, f"{safe_name}-onnx")
+
+
+def _head_dim(config) -> int:
+    return getattr(config, 'head_dim', None) or config.hidden_size // config.num_attention_heads
+
+
+class _DecoderWithPast(torch.nn.Module):
+    """Forward mit KV-Cache als flache Tensorliste (ONNX kennt keine Cache-Objekte)"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, position_ids, *past):
+        cache = DynamicCache(config=self.model.config)
+        for layer in range(len(past) // 2):
+            cache.update(past[2 * layer], past[2 * layer + 1], layer)
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=cache,
+            use_cache=True,
+        )
+        present = []
+        for layer in outputs.past_key_values.layers:
+            present += [layer.keys, layer.values]
+        # Nur die Logits des letzten Tokens werden gebraucht
+        return (outputs.logits[:, -1, :], *present)
+
+
+def export_decoder(model, path: str, opset_version: int = 17):
+    """Exportiert den Decoder mit KV-Cache (dynamische Batch-, Sequenz- und Cache-Länge)"""
+    config = model.config
+    layers = config.num_hidden_layers
+    kv_heads = getattr(config, 'num_key_value_heads', None) or config.num_attention_heads
+    head_dim = _head_dim(config)
+
+    past_names = [f'past.{layer}.{kind}' for layer in range(layers) for kind in ('key', 'value')]
+    present_names = [f'present.{layer}.{kind}' for layer in range(layers) for kind in ('key', 'value')]
+    dynamic_axes = {
+        'input_ids': {0: 'batch', 1: 'sequence'},
+        'attention_mask': {0: 'batch', 1: 'total'},
+        'position_ids': {0: 'batch', 1: 'sequence'},
+        'logits': {0: 'batch'},
+    }
+    dynamic_axes.update({name: {0: 'batch', 2: 'past'} for name in past_names})
+    dynamic_axes.update({name: {0: 'batch', 2: 'total'} for name in present_names})
+
+    # Beispiel mit Batch 2, 3 neuen und 4 Cache-Positionen, damit keine Achse fest wird
+    batch, sequence, past_length = 2, 3, 4
+    example = (
+        torch.ones(batch, sequence, dtype=torch.long),
+        torch.ones(batch, past_length + sequence, dtype=torch.long),
+        torch.arange(past_length, past_length + sequence).expand(batch, sequence),
+        *[torch.zeros(batch, kv_heads, past_length, head_dim) for _ in past_names],
+    )
+    # Der Tracer warnt bei jeder Python-Verzweigung auf Tensorformen
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        torch.onnx.export(
+            _DecoderWithPast(model.eval()),
+            example,
+            path,
+            input_names=['input_ids', 'attention_mask', 'position_ids'] + past_names,
+            output_names=['logits'] + present_names,
+            dynamic_axes=dynamic_axes,
+            opset_version=opset_version,
+            dynamo=False,
+        )
+
+
+def export_model(model_name: str, directory: str):
+    """Exportiert Decoder, Tokenizer und Konfiguration (atomar per Umbenennen)"""
+    tmp_directory = f"{directory}.tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+    export_decoder(model, os.path.join(tmp_directory, ONNX_FILENAME))
+    model.config.save_pretrained(tmp_directory)
+    model.generation_config.save_pretrained(tmp_directory)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(tmp_directory)
+
+    os.replace(tmp_directory, directory)
+    logger.info(f"Decoder nach ONNX exportiert: {directory}")
+
+
+def apply_repetition_penalty(logits: np.ndarray, sequences: List[List[int]], penalty: float) -> np.ndarray:
+    """Wiederholungsstrafe wie in transformers: bereits vorhandene Tokens abwerten"""
+    for row, ids in enumerate(sequences):
+        ids = np.unique(ids)
+        scores = logits[row, ids]
+        logits[row, ids] = np.where(scores < 0, scores * penalty, scores / penalty)
+    return logits
+
+
+def select_next_tokens(logits: np.ndarray, do_sample: bool, temperature: float = 1.0,
+                       top_p: float = 1.0, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Nächstes Token je Zeile: argmax oder Sampling aus dem top-p-Kern"""
+    if not do_sample:
+        return logits.argmax(axis=-1)
+
+    rng = rng or np.random.default_rng()
+    logits = logits / max(temperature, 1e-5)
+    probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    probs /= probs.sum(axis=-1, keepdims=True)
+
+    if top_p < 1.0:
+        order = np.argsort(-probs, axis=-1)
+        sorted_probs = np.take_along_axis(probs, order, axis=-1)
+        # Tokens verwerfen, deren Vorgänger allein schon top_p erreichen
+        removed = np.cumsum(sorted_probs, axis=-1) - sorted_probs >= top_p
+        sorted_probs[removed] = 0.0
+        probs = np.zeros_like(probs)
+        np.put_along_axis(probs, order, sorted_probs, axis=-1)
+        probs /= probs.sum(axis=-1, keepdims=True)
+
+    return np.array([rng.choice(len(row), p=row) for row in probs])
+
+
+class OnnxEngine(InferenceEngine):
+    """Generierung mit einem exportierten Decoder in ONNX Runtime (CPU)"""
+
+    name = 'onnx'
+
+    def __init__(self, cache_dir: str, postprocess: Callable[[str], str] = str.strip,
+                 policy: Optional[GenerationPolicy] = None, token_budget: int = 4096,
+                 max_batch_size: int = 8, num_threads: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.postprocess = postprocess
+        self.policy = policy or GenerationPolicy()
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.num_threads = num_threads
+        self.tokenizer = None
+        self.session = None
+        self.eos_token_ids = set()
+        self._past_names: List[str] = []
+        self._past_shape = (0, 0)
+        self._stop_window = 0
+        # Eine Generierung zur Zeit; ONNX Runtime verteilt jede auf alle Threads
+        self._lock = threading.Lock()
+
+    def load(self, model_name: str) -> bool:
+        try:
+            directory = onnx_cache_dir(self.cache_dir, model_name)
+            if not os.path.isdir(directory):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                export_model(model_name, directory)
+
+            tokenizer = AutoTokenizer.from_pretrained(directory)
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = "left"
+
+            options = ort.SessionOptions()
+            # Threads wie vom Thread-Planer für torch festgelegt
+            options.intra_op_num_threads = self.num_threads or torch.get_num_threads()
+            options.inter_op_num_threads = 1
+            session = ort.InferenceSession(
+                os.path.join(directory, ONNX_FILENAME), options, providers=['CPUExecutionProvider']
+            )
+
+            eos = GenerationConfig.from_pretrained(directory).eos_token_id
+            if eos is None:
+                eos = AutoConfig.from_pretrained(directory).eos_token_id
+            if eos is None:
+                eos = tokenizer.eos_token_id
+            self.eos_token_ids = set(eos if isinstance(eos, list) else [eos])
+
+            past_inputs = [i for i in session.get_inputs() if i.name.startswith('past.')]
+            self._past_names = [i.name for i in past_inputs]
+            # [batch, kv_heads, past, head_dim]: Köpfe und Dimension sind fest
+            self._past_shape = (past_inputs[0].shape[1], past_inputs[0].shape[3])
+            # Letzte Tokens, in denen eine Stoppsequenz vollständig liegen kann
+            self._stop_window = max(
+                (len(tokenizer(sequence, add_special_tokens=False)["input_ids"]) + 1
+                 for sequence in self.policy.stop_sequences),
+                default=0
+            )
+            self.tokenizer, self.session = tokenizer, session
+
+            logger.info(f"ONNX-Decoder geladen: {directory}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des ONNX-Modells: {e}")
+            return False
+
+    def is_loaded(self) -> bool:
+        return self.session is not None
+
+    def _generate_tokens(self, prompt_ids: List[List[int]], max_new_tokens: int,
+                         do_sample: bool = False, temperature: float = 1.0, top_p: float = 1.0,
+                         repetition_penalty: float = 1.0, max_time: Optional[float] = None,
+                         deadline_at: Optional[float] = None, **ignored) -> Iterator[np.ndarray]:
+        """Liefert pro Schritt die neuen Tokens aller Zeilen (links gepaddet)
+
+        Wie ``model.generate`` endet die Schleife nach ``max_time`` Sekunden;
+        eine absolute Frist ``deadline_at`` (``time.monotonic``) gilt ab dem
+        Start. Generierungen verschiedener Threads laufen nacheinander.
+        """
+        with self._lock:
+            if deadline_at is not None:
+                remaining = max(0.0, deadline_at - time.monotonic())
+                max_time = remaining if max_time is None else min(max_time, remaining)
+            yield from self._generate_steps(prompt_ids, max_new_tokens, do_sample, temperature, top_p,
+                                            repetition_penalty, max_time)
+
+    def _generate_steps(self, prompt_ids: List[List[int]], max_new_tokens: int, do_sample: bool,
+                        temperature: float, top_p: float, repetition_penalty: float,
+                        max_time: Optional[float]) -> Iterator[np.ndarray]:
+        started = time.monotonic()
+        pad_token_id = self.tokenizer.pad_token_id
+        batch = len(prompt_ids)
+        width = max(len(ids) for ids in prompt_ids)
+        input_ids = np.full((batch, width), pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((batch, width), dtype=np.int64)
+        for row, ids in enumerate(prompt_ids):
+            input_ids[row, width - len(ids):] = ids
+            attention_mask[row, width - len(ids):] = 1
+
+        heads, head_dim = self._past_shape
+        feed = {
+            'input_ids': input_ids,
+            'attention_mask': attention_mask,
+            'position_ids': np.maximum(np.cumsum(attention_mask, axis=1) - 1, 0),
+        }
+        empty = np.zeros((batch, heads, 0, head_dim), dtype=np.float32)
+        feed.update({name: empty for name in self._past_names})
+
+        sequences = [list(ids) for ids in prompt_ids]
+        generated: List[List[int]] = [[] for _ in prompt_ids]
+        finished = np.zeros(batch, dtype=bool)
+        for _ in range(max_new_tokens):
+            logits, *present = self.session.run(None, feed)
+            if repetition_penalty != 1.0:
+                logits = apply_repetition_penalty(logits, sequences, repetition_penalty)
+            next_tokens = select_next_tokens(logits, do_sample, temperature, top_p)
+            next_tokens = np.where(finished, pad_token_id, next_tokens)
+            yield next_tokens
+
+            for row, token in enumerate(next_tokens):
+                sequences[row].append(int(token))
+                generated[row].append(int(token))
+            finished |= np.isin(next_tokens, list(self.eos_token_ids))
+            if self._stop_window:
+                for row in np.flatnonzero(~finished):
+                    tail = self.tokenizer.decode(generated[row][-self._stop_window:])
+                    finished[row] = any(sequence in tail for sequence in self.policy.stop_sequences)
+            if finished.all():
+                return
+            if max_time is not None and time.monotonic() - started >= max_time:
+                return
+
+            attention_mask = np.concatenate([attention_mask, np.ones((batch, 1), dtype=np.int64)], axis=1)
+            feed = {
+                'input_ids': next_tokens[:, None].astype(np.int64),
+                'attention_mask': attention_mask,
+                'position_ids': attention_mask.sum(axis=1, keepdims=True) - 1,
+            }
+            feed.update(zip(self._past_names, present))
+
+    def _encode(self, template: PromptTemplate, texts: List[str], target_language: str,
+                max_length: int) -> List[List[int]]:
+        prompts = [template.render(text, target_language) for text in texts]
+        return self.tokenizer(prompts, truncation=True, max_length=max_length)["input_ids"]
+
+    def _budgets(self, texts: List[str], ceiling: int) -> List[int]:
+        counts = self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [self.policy.budget(len(ids), ceiling) for ids in counts]
+
+    def generate_batch(self, template: PromptTemplate, texts: List[str], target_language: str,
+                       max_length: int, max_new_tokens: int, **generation_kwargs) -> List[str]:
+        encoded = self._encode(template, texts, target_language, max_length)
+        budgets = self._budgets(texts, max_new_tokens)
+
+        def run_batch(indices: List[int]) -> List[str]:
+            budget = max(budgets[i] for i in indices)
+            steps = list(self._generate_tokens([encoded[i] for i in indices], budget, **generation_kwargs))
+            new_tokens = np.stack(steps, axis=1) if steps else np.zeros((len(indices), 0), dtype=np.int64)
+            decoded = self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+            return [self.postprocess(text) for text in decoded]
+
+        return run_planned_batches(
+            [len(ids) for ids in encoded],
+            run_batch,
+            token_budget=self.token_budget,
+            max_new_tokens=max(budgets),
+            max_batch_size=self.max_batch_size
+        )
+
+    def stream(self, template: PromptTemplate, text: str, target_language: str,
+               max_length: int, max_new_tokens: int, **generation_kwargs) -> Iterator[str]:
+        encoded = self._encode(template, [text], target_language, max_length)
+        budget = self._budgets([text], max_new_tokens)[0]
+        new_tokens: List[int] = []
+        emitted = ""
+        for next_tokens in self._generate_tokens(encoded, budget, **generation_kwargs):
+            new_tokens.append(int(next_tokens[0]))
+            decoded = self.tokenizer.decode(new_tokens, skip_special_tokens=True)
+            # Unvollständige UTF-8-Sequenzen erst mit dem nächsten Token ausgeben
+            if decoded.endswith('\ufffd'):
+                continue
+            if len(decoded) > len(emitted):
+                yield decoded[len(emitted):]
+                emitted = decoded
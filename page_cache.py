@@ -0,0 +1,171 @@
+"""
+Hochgeladene PDFs und einzeln vereinfachte Seiten, geteilt zwischen Workern
+
+Ein Betrachter lädt ein Dokument einmal hoch und ruft dann nur die Seiten
+ab, die gelesen werden. Dokumente sind über den SHA-256 ihres Inhalts
+adressiert: dasselbe PDF erneut hochzuladen liefert denselben Schlüssel
+und trifft die bereits vereinfachten Seiten.
+
+Die Einträge liegen in einem Verzeichnis je Dokument (``<schlüssel>/``),
+damit jeder gunicorn-Worker Uploads und Seiten der anderen sieht:
+``document.pdf`` mit ``document.json`` (Seitenzahl) und je Seite
+``page-<n>-<variante>.pdf`` mit dem Bericht als JSON. Geschrieben wird
+in eine temporäre Datei und dann umbenannt, Leser sehen nie halbe
+Einträge. Dokumente und Seiten teilen sich ein Byte-Budget; bei
+Überschreitung fallen die am längsten nicht genutzten Einträge heraus
+(Zugriffe setzen die Änderungszeit).
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = 256 * 1024 * 1024
+
+_KEY = re.compile(r"^[0-9a-f]{64}$")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def document_key(data: bytes) -> str:
+    """Schlüssel eines Dokuments: SHA-256 des Inhalts"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class PageCache:
+    """Verzeichnis mit Dokumenten (Inhalt, Seitenzahl) und vereinfachten Seiten (PDF, Bericht)"""
+
+    def __init__(self, directory: str, max_bytes: int = MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Treffer dieses Workers
+        self.hits = 0
+        self.misses = 0
+
+    def add_document(self, data: bytes, page_count: int) -> str:
+        """Legt ein Dokument ab und liefert seinen Schlüssel"""
+        key = document_key(data)
+        self._put(key, 'document', data, {'pages': page_count})
+        return key
+
+    def document(self, key: str) -> Optional[Tuple[bytes, int]]:
+        """Inhalt und Seitenzahl eines Dokuments, None wenn unbekannt"""
+        entry = self._get(key, 'document')
+        return None if entry is None else (entry[0], entry[1]['pages'])
+
+    def page(self, key: str, page: int, variant: str = '') -> Optional[Tuple[bytes, Dict]]:
+        """Vereinfachte Seite (Index ab 0) als PDF und ihr Bericht, None wenn nicht vorhanden
+
+        ``variant`` unterscheidet Ergebnisse desselben Dokuments, z. B.
+        Layoutmodus und Zielsprache.
+        """
+        entry = self._get(key, self._page_name(page, variant))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put_page(self, key: str, page: int, data: bytes, report: Dict, variant: str = ''):
+        self._put(key, self._page_name(page, variant), data, report)
+
+    @staticmethod
+    def _page_name(page: int, variant: str) -> str:
+        return f"page-{page}-{_UNSAFE.sub('-', variant)}"
+
+    def _path(self, key: str, name: str) -> Optional[str]:
+        if not _KEY.match(key):
+            return None
+        return os.path.join(self.directory, key, name)
+
+    def _get(self, key: str, name: str) -> Optional[Tuple[bytes, Dict]]:
+        path = self._path(key, name)
+        if path is None:
+            return None
+        try:
+            with open(f"{path}.json") as f:
+                meta = json.load(f)
+            with open(f"{path}.pdf", 'rb') as f:
+                data = f.read()
+            os.utime(f"{path}.pdf")
+        except (OSError, ValueError):
+            # Fehlt oder wurde gerade von einem anderen Worker verdrängt
+            return None
+        return data, meta
+
+    def _put(self, key: str, name: str, data: bytes, meta: Dict):
+        if len(data) > self.max_bytes:
+            logger.warning(f"{len(data)} Bytes größer als der Seiten-Cache ({self.max_bytes}), nicht gespeichert")
+            return
+        path = self._path(key, name)
+        # Metadaten zuerst: ein Leser findet das PDF erst, wenn beides vollständig ist
+        self._write(f"{path}.json", json.dumps(meta).encode())
+        self._write(f"{path}.pdf", data)
+        self._evict()
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _entries(self) -> List[Tuple[int, int, str]]:
+        """(Zugriffszeit, Größe, Pfad ohne Endung) aller Einträge"""
+        entries = []
+        try:
+            keys = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for key in keys:
+            try:
+                with os.scandir(os.path.join(self.directory, key)) as files:
+                    for file in files:
+                        if file.name.endswith('.pdf'):
+                            stat = file.stat()
+                            entries.append((stat.st_mtime_ns, stat.st_size, file.path[:-len('.pdf')]))
+            except OSError:
+                continue
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            for suffix in ('.pdf', '.json'):
+                try:
+                    os.unlink(path + suffix)
+                except FileNotFoundError:
+                    pass
+            size -= entry_size
+            try:
+                # Nur leere Verzeichnisse; ein Worker, der gerade schreibt, legt es neu an
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+
+    def report(self) -> Dict[str, int]:
+        entries = self._entries()
+        documents = sum(1 for _, _, path in entries if os.path.basename(path) == 'document')
+        with self._lock:
+            return {
+                'documents': documents,
+                'pages': len(entries) - documents,
+                'bytes': sum(entry_size for _, entry_size, _ in entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,188 @@
+"""
+Seitenweise Textextraktion aus PDFs
+
+Der Text wird pro Seite erzeugt und erst beim Zusammenfügen verbunden
+(statt ``full_text += span + " "`` über alle Spans). Statt der schweren
+``get_text("dict")``-Struktur liefert ``get_text("blocks")`` nur die
+Textblöcke; daraus werden mit ``text_normalization`` Absätze (eine Zeile
+pro Absatz, Trennungen aufgelöst, Unicode gefaltet).
+
+Große Dokumente werden in Seitenbereiche geteilt und in einem Prozesspool
+extrahiert; jeder Prozess öffnet das PDF selbst, die Ergebnisse kommen in
+Seitenreihenfolge zurück. Mit ``pages`` werden nur ausgewählte Seiten
+gelesen (``parse_pages`` übersetzt Angaben wie "1-3, 7"). Der Pool
+startet Prozesse mit ``spawn``, da der Webworker Threads (Modell, torch)
+hat, und wird zwischen Anfragen wiederverwendet.
+
+Quelle ist ein Pfad oder ein Puffer im Speicher (``bytes``,
+``memoryview``, siehe ``upload_buffer``). Für den Pool wird ein Puffer
+einmal in gemeinsamen Speicher kopiert, den die Prozesse ohne weitere
+Kopie öffnen.
+"""
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import fitz  # PyMuPDF
+
+from text_normalization import page_paragraphs
+
+# Bereiche pro Prozess: kleine Bereiche verteilen die Last gleichmäßiger
+TASKS_PER_WORKER = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+_PAGE_SPEC = re.compile(r"^(\d*)\s*(-?)\s*(\d*)$")
+
+# Pfad oder Inhalt eines PDFs
+PdfSource = Union[str, os.PathLike, bytes, memoryview]
+
+
+def open_pdf(source: PdfSource) -> fitz.Document:
+    """Öffnet ein PDF aus einem Pfad oder aus einem Puffer im Speicher
+
+    PyMuPDF hält einen Puffer, bis das Dokument freigegeben ist, nicht nur
+    bis ``close``.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype='pdf')
+
+
+def page_count(source: PdfSource) -> int:
+    """Seitenzahl eines PDFs; das Dokument ist danach wieder freigegeben"""
+    with open_pdf(source) as doc:
+        return len(doc)
+
+
+def page_text(page) -> str:
+    """Normalisierter Text einer Seite, ein Absatz pro Zeile"""
+    return "\n".join(page_paragraphs(page.get_text("blocks")))
+
+
+def iter_page_texts(doc, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Liefert den Text der Seiten ``start`` bis ``stop`` eines geöffneten Dokuments"""
+    stop = len(doc) if stop is None else stop
+    for page_number in range(start, stop):
+        yield page_text(doc[page_number])
+
+
+def _extract_pages(source: Union[str, Tuple[str, int]], numbers: Sequence[int]) -> List[str]:
+    """Arbeit eines Pool-Prozesses: eigenes Dokument öffnen, Seiten extrahieren
+
+    ``source`` ist ein Pfad oder (Name, Größe) eines gemeinsamen Speichers.
+    """
+    if isinstance(source, str):
+        with fitz.open(source) as doc:
+            return [page_text(doc[number]) for number in numbers]
+    name, size = source
+    memory = shared_memory.SharedMemory(name=name)
+    view = memory.buf[:size]
+    try:
+        doc = fitz.open(stream=view, filetype='pdf')
+        try:
+            return [page_text(doc[number]) for number in numbers]
+        finally:
+            doc.close()
+            # Erst ohne Dokument lässt sich der Speicher wieder schließen
+            del doc
+    finally:
+        view.release()
+        memory.close()
+
+
+@contextmanager
+def _pool_source(source: PdfSource) -> Iterator[Union[str, Tuple[str, int]]]:
+    """Quelle für Pool-Prozesse: Pfade direkt, Puffer als gemeinsamer Speicher"""
+    if isinstance(source, (str, os.PathLike)):
+        yield os.fspath(source)
+        return
+    size = len(source)
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        memory.buf[:size] = source
+        yield memory.name, size
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    """Beendet den Prozesspool (Tests, Herunterfahren)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def page_ranges(page_count: int, parts: int) -> List[range]:
+    """Teilt die Seiten in höchstens ``parts`` zusammenhängende Bereiche"""
+    size = max(1, math.ceil(page_count / max(parts, 1)))
+    return [range(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def parse_pages(spec: str, page_count: int) -> List[int]:
+    """Seitenauswahl wie "1-3, 7, 10-" (ab 1 gezählt) als sortierte Seitenindizes ab 0
+
+    "-3" steht für die ersten drei Seiten, "10-" für Seite 10 bis zum Ende.
+    ValueError bei ungültiger Angabe oder Seiten außerhalb des Dokuments.
+    """
+    selected = set()
+    for part in spec.split(','):
+        match = _PAGE_SPEC.match(part.strip())
+        if not match or not (match.group(1) or match.group(3)):
+            raise ValueError(f"Ungültige Seitenangabe: '{part.strip()}'")
+        first, dash, last = match.groups()
+        start = int(first) if first else 1
+        stop = (int(last) if last else page_count) if dash else start
+        if not 1 <= start <= stop <= page_count:
+            raise ValueError(f"Seiten '{part.strip()}' außerhalb des Dokuments (1-{page_count})")
+        selected.update(range(start - 1, stop))
+    return sorted(selected)
+
+
+def extract_page_texts(source: PdfSource, doc=None, workers: int = 1, min_pages: int = 64,
+                       pages: Optional[Sequence[int]] = None) -> Iterator[str]:
+    """Text pro Seite in Seitenreihenfolge, mit ``pages`` nur dieser Seiten (Indizes ab 0)
+
+    Ab ``min_pages`` Seiten und mehr als einem Prozess wird parallel
+    extrahiert, sonst nacheinander aus ``doc`` (falls übergeben geöffnet).
+    """
+    opened = doc is None
+    if opened:
+        doc = open_pdf(source)
+    try:
+        numbers = range(len(doc)) if pages is None else list(pages)
+        if workers > 1 and len(numbers) >= min_pages:
+            pool = _get_pool(workers)
+            parts = [numbers[part.start:part.stop]
+                     for part in page_ranges(len(numbers), workers * TASKS_PER_WORKER)]
+            with _pool_source(source) as shared:
+                for texts in pool.map(_extract_pages, [shared] * len(parts), parts):
+                    yield from texts
+        else:
+            for number in numbers:
+                yield page_text(doc[number])
+    finally:
+        if opened:
+            doc.close()
@@ -0,0 +1,163 @@
+"""
+Blockweise Vereinfachung mit erhaltenem Layout
+
+Jeder Textblock behält Seite, Rechteck und Schriftgröße aus der
+Extraktion (über den ``SpanStore``, ein ``get_text("dict")`` je Seite). Die
+vereinfachten Texte werden in einer Kopie des Dokuments zurückgeschrieben:
+der Originaltext im Rechteck wird per Redaktion entfernt (Bilder und
+Vektorgrafiken bleiben unberührt, keine Füllung) und der neue Text in
+dasselbe Rechteck gesetzt, bei Bedarf in kleinerer Schrift (die größte
+passende Größe wird vorab berechnet, siehe ``text_fit``). Seiten sind
+voneinander unabhängig; Blöcke ohne neuen Text bleiben unverändert.
+"""
+import logging
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from span_store import SpanStore
+from text_fit import metrics_for
+from text_normalization import join_lines
+
+logger = logging.getLogger(__name__)
+
+FONT_NAME = 'helv'
+MIN_FONT_SIZE = 4.0
+# Zeilenhöhe relativ zur Schriftgröße bei der Schätzung der Originalgröße
+LINE_HEIGHT = 1.2
+
+_font = None
+
+
+def _get_font() -> fitz.Font:
+    global _font
+    if _font is None:
+        _font = fitz.Font(FONT_NAME)
+    return _font
+
+
+@dataclass
+class TextBlock:
+    """Textblock einer Seite mit seinem Rechteck"""
+
+    page: int
+    rect: Tuple[float, float, float, float]
+    text: str
+    line_count: int
+    # Gemessene Schriftgröße der Spans, sonst geschätzt
+    size: Optional[float] = None
+
+    @property
+    def font_size(self) -> float:
+        """Originalgröße: gemessen, sonst geschätzt aus Höhe und Zeilenzahl des Blocks"""
+        if self.size is not None:
+            return max(MIN_FONT_SIZE, self.size)
+        height = self.rect[3] - self.rect[1]
+        return max(MIN_FONT_SIZE, height / max(self.line_count, 1) / LINE_HEIGHT)
+
+
+def extract_blocks(doc) -> Iterator[TextBlock]:
+    """Textblöcke aller Seiten in Lesereihenfolge der Seiten; Zeilen eines Blocks normalisiert verbunden"""
+    spans = SpanStore.from_document(doc)
+    pages, boxes, sizes, block_lines = spans.blocks()
+    for page_number, rect, size, lines in zip(pages.tolist(), boxes.tolist(), sizes.tolist(), block_lines):
+        lines = [line.strip() for line in lines if line.strip()]
+        if lines:
+            yield TextBlock(page_number, tuple(rect), join_lines(lines), len(lines), size)
+
+
+def fit_text(rect: fitz.Rect, text: str, font_size: float, page_rect: fitz.Rect) -> Optional[fitz.TextWriter]:
+    """Setzt den Text in das Rechteck, bei Bedarf kleiner; None wenn er nicht passt
+
+    Größe und Zeilenumbruch werden ohne Probesatz berechnet (``text_fit``),
+    gesetzt wird nur einmal.
+    """
+    metrics = metrics_for(FONT_NAME)
+    size = metrics.fit_size(rect, text, font_size, MIN_FONT_SIZE)
+    if size is None:
+        return None
+    writer = fitz.TextWriter(page_rect)
+    for point, line in metrics.layout(rect, text, size):
+        writer.append(point, line, font=_get_font(), fontsize=size)
+    return writer
+
+
+def rewrite_page(page, blocks: List[TextBlock], texts: List[Optional[str]]) -> int:
+    """Ersetzt den Text der Blöcke einer Seite; liefert die Zahl ersetzter Blöcke
+
+    Blöcke mit ``None`` oder unverändertem Text bleiben stehen, ebenso
+    Blöcke, deren neuer Text auch in MIN_FONT_SIZE nicht passt.
+    """
+    writers = []
+    for block, text in zip(blocks, texts):
+        if text is None or text == block.text:
+            continue
+        rect = fitz.Rect(block.rect)
+        writer = fit_text(rect, text, block.font_size, page.rect)
+        if writer is None:
+            logger.warning(f"Vereinfachter Text passt nicht in Block auf Seite {block.page + 1}, Original bleibt")
+            continue
+        page.add_redact_annot(rect, fill=False)
+        writers.append(writer)
+
+    if writers:
+        page.apply_redactions(
+            images=fitz.PDF_REDACT_IMAGE_NONE,
+            graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+            text=fitz.PDF_REDACT_TEXT_REMOVE
+        )
+        for writer in writers:
+            writer.write_text(page)
+    return len(writers)
+
+
+def rewrite_blocks(doc, blocks: List[TextBlock], texts: List[Optional[str]]) -> Dict[int, int]:
+    """Schreibt die Texte Seite für Seite zurück; liefert ersetzte Blöcke je Seite"""
+    replaced = {}
+    pairs = sorted(zip(blocks, texts), key=lambda pair: pair[0].page)
+    for page_number, page_pairs in groupby(pairs, key=lambda pair: pair[0].page):
+        page_pairs = list(page_pairs)
+        replaced[page_number] = rewrite_page(
+            doc[page_number], [block for block, _ in page_pairs], [text for _, text in page_pairs]
+        )
+    return replaced
+
+
+class PageRewriter:
+    """Schreibt eine Seite zurück, sobald alle ihre Blöcke ihren Text haben
+
+    ``groups`` enthält je Text (z. B. je eindeutigem Text nach
+    ``deduplicate``) die Indizes der Blöcke, die ihn erhalten. Die Texte
+    können nacheinander eintreffen; jede Seite wird genau einmal
+    geschrieben, Seiten ohne zugeordnete Blöcke gar nicht.
+    """
+
+    def __init__(self, doc, blocks: List[TextBlock], groups: List[List[int]]):
+        self.doc = doc
+        self.blocks = blocks
+        self.groups = groups
+        self.texts: List[Optional[str]] = [None] * len(blocks)
+        self.page_indices: Dict[int, List[int]] = {}
+        for index, block in enumerate(blocks):
+            self.page_indices.setdefault(block.page, []).append(index)
+        self.pending: Dict[int, int] = {}
+        for group in groups:
+            for index in group:
+                page = blocks[index].page
+                self.pending[page] = self.pending.get(page, 0) + 1
+
+    def resolve(self, group: int, text: Optional[str]) -> Dict[int, int]:
+        """Setzt den Text einer Gruppe; liefert ersetzte Blöcke der dadurch fertigen Seiten"""
+        replaced = {}
+        for index in self.groups[group]:
+            self.texts[index] = text
+            page = self.blocks[index].page
+            self.pending[page] -= 1
+            if self.pending[page] == 0:
+                indices = self.page_indices[page]
+                replaced[page] = rewrite_page(
+                    self.doc[page], [self.blocks[i] for i in indices], [self.texts[i] for i in indices]
+                )
+        return replaced
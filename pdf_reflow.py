@@ -0,0 +1,112 @@
+"""
+Fließtext über beliebig viele Seiten
+
+Der vereinfachte Text wird mit ``fitz.Story`` gesetzt und über einen
+``fitz.DocumentWriter`` Seite für Seite in die Ausgabedatei geschrieben,
+statt in ein einziges Textfeld der ersten Seite (das überlaufenden Text
+stillschweigend verwirft). Die Absätze werden in Gruppen gelesen: jede
+Gruppe ist eine eigene Story, die dort weiterläuft, wo die vorige auf der
+Seite aufgehört hat. Es liegt daher nie das ganze Dokument als HTML-Baum im
+Speicher; MuPDF hält von fertigen Seiten nur deren Inhaltsströme bis zum
+Schließen der Datei.
+"""
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+import fitz  # PyMuPDF
+
+FONT_SIZE = 12
+MARGIN = 50
+# Absätze pro Story
+PARAGRAPHS_PER_STORY = 200
+CSS = f"""
+body {{margin: 0; font-family: sans-serif; font-size: {FONT_SIZE}pt;}}
+p {{margin-top: 0; margin-bottom: {FONT_SIZE // 2}pt;}}
+"""
+
+
+def paragraphs(text: str) -> Iterator[str]:
+    """Nicht leere Zeilen des Textes als Absätze"""
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            yield line
+
+
+def stream_paragraphs(pieces: Iterable[str], separator: str = " ") -> Iterator[str]:
+    """Wie ``paragraphs(separator.join(pieces))``, aber ohne auf das letzte Stück zu warten"""
+    buffer = None
+    for piece in pieces:
+        buffer = piece if buffer is None else buffer + separator + piece
+        lines = buffer.splitlines(keepends=True)
+        # Die letzte Zeile ohne Zeilenende kann im nächsten Stück weitergehen
+        last = lines[-1] if lines else ''
+        buffer = lines.pop() if last and last.splitlines()[0] == last else ''
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+    if buffer:
+        yield from paragraphs(buffer)
+
+
+def _batches(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _story(batch: List[str]) -> fitz.Story:
+    story = fitz.Story(user_css=CSS)
+    for paragraph in batch:
+        story.body.add_paragraph().add_text(paragraph)
+    return story
+
+
+def write_reflowed_pdf(texts: Iterable[str], output_path: Union[str, BinaryIO], page_rect: fitz.Rect,
+                       margin: float = MARGIN, paragraphs_per_story: int = PARAGRAPHS_PER_STORY) -> int:
+    """Schreibt die Absätze fortlaufend über so viele Seiten wie nötig; liefert die Seitenzahl
+
+    ``output_path`` ist ein Pfad oder ein binärer Stream (z. B. ``BytesIO``).
+    """
+    page_rect = fitz.Rect(page_rect)
+    content = page_rect + (margin, margin, -margin, -margin)
+    if content.is_empty or content.height < FONT_SIZE * 2:
+        raise ValueError(f"Seite {page_rect} zu klein für Text mit Rand {margin}")
+    writer = fitz.DocumentWriter(output_path)
+    device = None
+    area: Optional[fitz.Rect] = None
+    pages = 0
+    try:
+        for batch in _batches(texts, paragraphs_per_story):
+            story = _story(batch)
+            more = True
+            while more:
+                fresh = area is None
+                if fresh:
+                    if device is not None:
+                        writer.end_page()
+                    device = writer.begin_page(page_rect)
+                    pages += 1
+                    area = fitz.Rect(content)
+                more, filled = story.place(area)
+                filled = fitz.Rect(filled)
+                if more and fresh and filled.is_empty:
+                    raise ValueError("Absatz passt auf keine leere Seite")
+                story.draw(device)
+                if more or filled.y1 >= area.y1 - FONT_SIZE:
+                    area = None  # Seite voll
+                else:
+                    # Nächste Story unterhalb des belegten Bereichs fortsetzen
+                    area = fitz.Rect(area.x0, filled.y1, area.x1, area.y1)
+        if device is None:
+            # Leerer Text: eine leere Seite, damit das PDF gültig bleibt
+            writer.begin_page(page_rect)
+            pages = 1
+        writer.end_page()
+    finally:
+        writer.close()
+    return pages
@@ -0,0 +1,158 @@
+"""
+Seitenstruktur vor der Vereinfachung
+
+Kopf- und Fußzeilen, Seitenzahlen und Tabellenzellen stehen auf vielen
+Seiten und würden sonst pro Seite erneut vereinfacht. Die Textblöcke eines
+Dokuments werden daher klassifiziert:
+
+- ``repeated``: gleicher Text (Ziffern ignoriert) an derselben Position im
+  oberen oder unteren Seitenrand auf mindestens ``REPEAT_MIN_SHARE`` der Seiten
+- ``page_number``: nur Ziffern und Satzzeichen oder "Seite 3 von 10"
+- ``table``: Blockmitte in einer Tabelle aus ``page.find_tables()``
+- ``body``: Fließtext, nur dieser geht an das Modell
+
+Strukturblöcke bleiben unverändert stehen. Gleiche Fließtextblöcke werden
+nur einmal vereinfacht.
+"""
+import logging
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+
+from pdf_layout import TextBlock
+
+logger = logging.getLogger(__name__)
+
+BODY = 'body'
+REPEATED = 'repeated'
+PAGE_NUMBER = 'page_number'
+TABLE = 'table'
+
+# Anteil der Seiten, auf denen ein Randblock wiederkehren muss
+REPEAT_MIN_SHARE = 0.5
+# Oberer und unterer Seitenrand (Anteil der Seitenhöhe) für Kopf- und Fußzeilen
+MARGIN_SHARE = 0.15
+# Toleranz der Position wiederkehrender Blöcke (Punkte)
+POSITION_TOLERANCE = 6.0
+# Wie your_model_utils.CHARS_PER_TOKEN: Schätzung ohne Tokenizer
+CHARS_PER_TOKEN = 4
+
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(
+    r"^[\W_]*(?:(?:seite|s\.|page|p\.)\s*)?\d+(?:\s*(?:von|of|/)\s*\d+)?[\W_]*$", re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def is_page_number(text: str) -> bool:
+    """Seitenzahl wie "3", "- 3 -", "3 / 10" oder "Seite 3 von 10"
+
+    Andere Zahlenblöcke (Datum, Beträge, Telefonnummern) sind Inhalt.
+    """
+    return bool(_PAGE_NUMBER.match(text.strip()))
+
+
+def _position_key(block: TextBlock) -> Tuple[int, int, str]:
+    """Position und Text mit Platzhaltern für Ziffern ("Seite 3" = "Seite 4")"""
+    x0, y0 = block.rect[0], block.rect[1]
+    return round(x0 / POSITION_TOLERANCE), round(y0 / POSITION_TOLERANCE), _DIGITS.sub('#', block.text)
+
+
+def _in_margin(block: TextBlock, page_height: float) -> bool:
+    return block.rect[3] <= page_height * MARGIN_SHARE or block.rect[1] >= page_height * (1 - MARGIN_SHARE)
+
+
+def table_rects(page) -> List[fitz.Rect]:
+    """Tabellenbereiche einer Seite; Seiten ohne Vektorgrafik haben keine Linientabellen"""
+    if not page.get_cdrawings():
+        return []
+    try:
+        return [fitz.Rect(table.bbox) for table in page.find_tables().tables]
+    except Exception as e:
+        logger.debug(f"Tabellenerkennung auf Seite {page.number + 1} fehlgeschlagen: {e}")
+        return []
+
+
+@dataclass
+class DocumentStructure:
+    """Art jedes Blocks und die Einsparung gegenüber allen Blöcken"""
+
+    kinds: List[str]
+    tokens: List[int]
+
+    @classmethod
+    def all_body(cls, blocks: List[TextBlock]) -> 'DocumentStructure':
+        """Ohne Strukturerkennung: alle Blöcke sind Fließtext"""
+        return cls([BODY] * len(blocks), [estimate_tokens(block.text) for block in blocks])
+
+    @property
+    def body_indices(self) -> List[int]:
+        return [index for index, kind in enumerate(self.kinds) if kind == BODY]
+
+    def report(self, duplicate_blocks: int = 0, duplicate_tokens: int = 0) -> Dict[str, int]:
+        """Strukturblöcke je Art und eingesparte Tokens (Struktur und Duplikate)"""
+        counts = {kind: 0 for kind in (REPEATED, PAGE_NUMBER, TABLE)}
+        removed = duplicate_tokens
+        for kind, tokens in zip(self.kinds, self.tokens):
+            if kind != BODY:
+                counts[kind] += 1
+                removed += tokens
+        return {
+            'structural_blocks': sum(counts.values()),
+            'repeated_blocks': counts[REPEATED],
+            'page_number_blocks': counts[PAGE_NUMBER],
+            'table_blocks': counts[TABLE],
+            'duplicate_blocks': duplicate_blocks,
+            'tokens_removed': removed,
+        }
+
+
+def classify_blocks(doc, blocks: List[TextBlock], detect_tables: bool = True) -> DocumentStructure:
+    """Klassifiziert die Blöcke eines Dokuments (Reihenfolge wie ``blocks``)"""
+    kinds = [BODY] * len(blocks)
+    page_count = len(doc)
+
+    heights: Dict[int, float] = {}
+    pages_by_key = defaultdict(set)
+    for block in blocks:
+        if block.page not in heights:
+            heights[block.page] = doc[block.page].rect.height
+        if _in_margin(block, heights[block.page]):
+            pages_by_key[_position_key(block)].add(block.page)
+    min_pages = max(2, math.ceil(page_count * REPEAT_MIN_SHARE))
+
+    tables: Dict[int, List[fitz.Rect]] = {}
+    for index, block in enumerate(blocks):
+        if is_page_number(block.text):
+            kinds[index] = PAGE_NUMBER
+        elif len(pages_by_key.get(_position_key(block), ())) >= min_pages:
+            kinds[index] = REPEATED
+        elif detect_tables:
+            if block.page not in tables:
+                tables[block.page] = table_rects(doc[block.page])
+            x0, y0, x1, y1 = block.rect
+            center = fitz.Point((x0 + x1) / 2, (y0 + y1) / 2)
+            if any(center in rect for rect in tables[block.page]):
+                kinds[index] = TABLE
+
+    return DocumentStructure(kinds, [estimate_tokens(block.text) for block in blocks])
+
+
+def deduplicate(texts: List[str]) -> Tuple[List[str], List[int]]:
+    """Eindeutige Texte in erster Reihenfolge und die Position jedes Textes darin"""
+    positions: Dict[str, int] = {}
+    unique: List[str] = []
+    mapping = []
+    for text in texts:
+        if text not in positions:
+            positions[text] = len(unique)
+            unique.append(text)
+        mapping.append(positions[text])
+    return unique, mapping
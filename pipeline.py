@@ -0,0 +1,200 @@
+"""
+Verarbeitung in Stufen mit begrenzten Warteschlangen
+
+Extraktion, Vereinfachung und Ausgabe eines PDFs liefen nacheinander;
+während das Modell rechnet, stand die Extraktion still und umgekehrt.
+Hier läuft jede Stufe in einem eigenen Thread und gibt ihre Ergebnisse
+über eine begrenzte Warteschlange an die nächste Stufe weiter. Die
+Begrenzung hält den Speicher klein: ist die Warteschlange voll, wartet die
+schnellere Stufe. Torch und MuPDF geben beim Rechnen das GIL frei, die
+Stufen überlappen sich daher tatsächlich.
+
+Für jede Stufe werden Einträge, Arbeitszeit (ohne Warten auf Eingabe oder
+freien Platz in der Ausgabe) und Auslastung gemessen, für jede
+Warteschlange die mittlere und höchste Füllung. Eine Stufe nahe 100 %
+Auslastung mit voller Eingabe-Warteschlange ist der Engpass.
+"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 16
+# Wie oft wartende Stufen prüfen, ob die Pipeline abgebrochen wurde (Sekunden)
+POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+class _Cancelled(Exception):
+    """Eine andere Stufe ist fehlgeschlagen oder liest nicht mehr"""
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    busy: float = 0.0
+    input_wait: float = 0.0
+    output_wait: float = 0.0
+
+
+class _Channel:
+    """Begrenzte Warteschlange zwischen zwei Stufen, misst Füllung und Wartezeit"""
+
+    def __init__(self, name: str, capacity: int, cancelled: threading.Event):
+        self.name = name
+        self.capacity = capacity
+        self._queue = queue.Queue(maxsize=capacity)
+        self._cancelled = cancelled
+        # Der Leser ist fertig; weitere Einträge werden nicht mehr gebraucht
+        self.abandoned = False
+        self.samples = 0
+        self.total_depth = 0
+        self.max_depth = 0
+
+    def put(self, item) -> float:
+        """Stellt ein; liefert die Wartezeit auf freien Platz"""
+        started = time.perf_counter()
+        while True:
+            if self._cancelled.is_set() or self.abandoned:
+                raise _Cancelled()
+            try:
+                self._queue.put(item, timeout=POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        depth = self._queue.qsize()
+        self.samples += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+        return time.perf_counter() - started
+
+    def get(self) -> Tuple[object, float]:
+        """Nächster Eintrag und die Wartezeit darauf"""
+        started = time.perf_counter()
+        while True:
+            if self._cancelled.is_set():
+                raise _Cancelled()
+            try:
+                return self._queue.get(timeout=POLL_INTERVAL), time.perf_counter() - started
+            except queue.Empty:
+                continue
+
+    def report(self) -> Dict[str, float]:
+        return {
+            'capacity': self.capacity,
+            'mean_depth': round(self.total_depth / self.samples, 2) if self.samples else 0.0,
+            'max_depth': self.max_depth,
+        }
+
+
+class Pipeline:
+    """Stufen nacheinander hinzufügen, dann ``run``; die Ausgabe der letzten Stufe ist das Ergebnis
+
+    Die erste Stufe (``add_source``) erzeugt Einträge, jede weitere
+    (``add_stage``) erhält einen Iterator über die Ausgabe der vorigen und
+    liefert ihre eigenen Einträge.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._stages: List[Tuple[StageStats, Callable]] = []
+        self._channels: List[_Channel] = []
+        self._cancelled = threading.Event()
+        self._error: Optional[BaseException] = None
+        self.wall = 0.0
+
+    def add_source(self, name: str, function: Callable[[], Iterable]) -> 'Pipeline':
+        if self._stages:
+            raise ValueError("Die Quelle muss die erste Stufe sein")
+        self._stages.append((StageStats(name), lambda _: function()))
+        return self
+
+    def add_stage(self, name: str, function: Callable[[Iterator], Iterable]) -> 'Pipeline':
+        if not self._stages:
+            raise ValueError("Zuerst eine Quelle hinzufügen")
+        previous = self._stages[-1][0].name
+        self._channels.append(_Channel(f"{previous}->{name}", self.queue_size, self._cancelled))
+        self._stages.append((StageStats(name), function))
+        return self
+
+    def _inputs(self, channel: _Channel, stats: StageStats) -> Iterator:
+        while True:
+            item, waited = channel.get()
+            stats.input_wait += waited
+            if item is _END:
+                return
+            yield item
+
+    def _run_stage(self, index: int, outputs: List):
+        stats, function = self._stages[index]
+        source = self._channels[index - 1] if index > 0 else None
+        target = self._channels[index] if index < len(self._channels) else None
+        started = time.perf_counter()
+        try:
+            for item in function(self._inputs(source, stats) if source else iter(())):
+                stats.items += 1
+                if target is None:
+                    outputs.append(item)
+                else:
+                    stats.output_wait += target.put(item)
+            if target is not None:
+                stats.output_wait += target.put(_END)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._cancelled.set()
+        finally:
+            if source is not None:
+                source.abandoned = True
+            stats.busy = time.perf_counter() - started - stats.input_wait - stats.output_wait
+
+    def run(self) -> List:
+        """Startet alle Stufen und wartet auf sie; der erste Fehler einer Stufe wird weitergereicht"""
+        outputs: List = []
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._run_stage, args=(index, outputs), name=f"pipeline-{stats.name}")
+            for index, (stats, _) in enumerate(self._stages)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - started
+        if self._error is not None:
+            raise self._error
+        return outputs
+
+    def report(self) -> Dict:
+        """Auslastung je Stufe und Füllung je Warteschlange"""
+        return {
+            'wall_seconds': round(self.wall, 3),
+            'stages': {
+                stats.name: {
+                    'items': stats.items,
+                    'busy_seconds': round(stats.busy, 3),
+                    'utilization': round(stats.busy / self.wall, 3) if self.wall else 0.0,
+                }
+                for stats, _ in self._stages
+            },
+            'queues': {channel.name: channel.report() for channel in self._channels},
+        }
+
+    def log_report(self):
+        report = self.report()
+        stages = ", ".join(
+            f"{name} {stage['utilization']:.0%} ({stage['items']})" for name, stage in report['stages'].items()
+        )
+        queues = ", ".join(
+            f"{name} max {channel['max_depth']}/{channel['capacity']}, Mittel {channel['mean_depth']}"
+            for name, channel in report['queues'].items()
+        )
+        logger.info(f"Pipeline {report['wall_seconds']:.2f}s: {stages}; Warteschlangen: {queues}")
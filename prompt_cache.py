@@ -0,0 +1,102 @@
+"""
+Prompt-Vorlagen mit wiederverwendbarem KV-Cache für den Instruktions-Präfix
+
+Jeder Prompt beginnt mit demselben Instruktionstext. Dessen Token-IDs und
+``past_key_values`` werden je Vorlage und Zielsprache einmal pro geladenem
+Modell berechnet; pro Chunk muss dann nur noch der Text-Suffix vorbefüllt werden.
+"""
+import copy
+import logging
+from typing import Dict, List, Tuple
+
+import torch
+
+from prompt_template import PromptTemplate  # noqa: F401 (Re-Export)
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixEntry:
+    """Pre-tokenisierter Präfix und Abschluss samt KV-Cache des Präfix"""
+
+    def __init__(self, prefix_ids: List[int], tail_ids: List[int], past_key_values):
+        self.prefix_ids = prefix_ids
+        self.tail_ids = tail_ids
+        self.past_key_values = past_key_values
+
+
+class PrefixCache:
+    """KV-Caches der Instruktions-Präfixe für ein geladenes Modell"""
+
+    def __init__(self, tokenizer, model):
+        self.tokenizer = tokenizer
+        self.model = model
+        self._entries: Dict[Tuple[str, str], PrefixEntry] = {}
+
+    def get(self, template: PromptTemplate, target_language: str) -> PrefixEntry:
+        """Liefert (und berechnet beim ersten Aufruf) den Eintrag einer Vorlage"""
+        key = (template.name, target_language)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._build(template, target_language)
+            self._entries[key] = entry
+        return entry
+
+    def _build(self, template: PromptTemplate, target_language: str) -> PrefixEntry:
+        prefix_ids = self.tokenizer(template.render_prefix(target_language))["input_ids"]
+        tail_ids = self.tokenizer(template.tail, add_special_tokens=False)["input_ids"]
+
+        with torch.no_grad():
+            outputs = self.model(
+                input_ids=torch.tensor([prefix_ids], device=self.model.device),
+                use_cache=True
+            )
+
+        logger.info(
+            f"Präfix-Cache für Vorlage '{template.name}' ({target_language}) "
+            f"berechnet: {len(prefix_ids)} Tokens"
+        )
+        return PrefixEntry(list(prefix_ids), list(tail_ids), outputs.past_key_values)
+
+    def encode_texts(self, entry: PrefixEntry, template: PromptTemplate,
+                     texts: List[str], max_length: int) -> List[List[int]]:
+        """Tokenisiert nur die Chunk-Texte, gekürzt auf den Platz nach Präfix und Abschluss"""
+        room = max(1, max_length - len(entry.prefix_ids) - len(entry.tail_ids))
+        encoded = self.tokenizer(
+            [f"{template.separator}{text}" for text in texts],
+            add_special_tokens=False
+        )["input_ids"]
+        return [list(ids[:room]) + entry.tail_ids for ids in encoded]
+
+    def expand(self, entry: PrefixEntry, batch_size: int):
+        """Kopie des Präfix-Caches für einen Batch (generate verändert den Cache)"""
+        past_key_values = copy.deepcopy(entry.past_key_values)
+        if batch_size > 1:
+            past_key_values.batch_repeat_interleave(batch_size)
+        return past_key_values
+
+
+def build_prefixed_inputs(prefix_ids: List[int], suffix_ids: List[List[int]],
+                          pad_token_id: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Baut ``input_ids`` und ``attention_mask`` im Layout [Präfix][Padding][Suffix]
+
+    Der Präfix muss für alle Zeilen an denselben Positionen stehen, damit der
+    gemeinsame KV-Cache passt. Aufgefüllt wird deshalb zwischen Präfix und Suffix;
+    die Positionen des Suffix ergeben sich aus der Attention-Maske.
+    """
+    prefix_length = len(prefix_ids)
+    suffix_length = max(len(ids) for ids in suffix_ids)
+    total_length = prefix_length + suffix_length
+
+    input_ids = torch.full((len(suffix_ids), total_length), pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(suffix_ids), total_length), dtype=torch.long)
+    prefix = torch.tensor(prefix_ids, dtype=torch.long)
+
+    for row, ids in enumerate(suffix_ids):
+        input_ids[row, :prefix_length] = prefix
+        attention_mask[row, :prefix_length] = 1
+        if ids:
+            input_ids[row, total_length - len(ids):] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, total_length - len(ids):] = 1
+
+    return input_ids, attention_mask
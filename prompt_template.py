@@ -0,0 +1,25 @@
+"""
+Prompt-Vorlagen ohne KI-Abhängigkeiten
+
+Liegt getrennt von ``prompt_cache``, damit Web-App und Inferenz-Client
+Vorlagen nutzen können, ohne torch zu importieren.
+"""
+
+
+class PromptTemplate:
+    """Prompt aus festem Präfix, Chunk-Text und festem Abschluss"""
+
+    def __init__(self, name: str, prefix: str, tail: str, separator: str = ""):
+        self.name = name
+        self.prefix = prefix
+        self.tail = tail
+        # Trenner wird mit dem Text tokenisiert (z.B. Leerzeichen vor dem ersten Wort)
+        self.separator = separator
+
+    def render_prefix(self, target_language: str) -> str:
+        """Instruktions-Präfix für eine Zielsprache"""
+        return self.prefix.format(target_language=target_language)
+
+    def render(self, text: str, target_language: str) -> str:
+        """Vollständiger Prompt als Text"""
+        return f"{self.render_prefix(target_language)}{self.separator}{text}{self.tail}"
@@ -0,0 +1,84 @@
+"""
+INT8-Quantisierung für CPU-Inferenz
+
+Die Linear-Layer werden nach dem Laden dynamisch auf int8 quantisiert
+(Gewichte int8, Aktivierungen zur Laufzeit). Die quantisierten Gewichte
+lassen sich im Modell-Cache ablegen, damit spätere Starts das fp32-Modell
+nicht erneut laden und quantisieren müssen.
+"""
+import contextlib
+import logging
+import os
+import re
+import warnings
+
+import torch
+from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+from transformers import AutoConfig, AutoModelForCausalLM
+
+try:
+    from transformers.initialization import no_init_weights
+except ImportError:  # ältere transformers-Versionen
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        no_init_weights = contextlib.nullcontext
+
+logger = logging.getLogger(__name__)
+
+
+def quantize_model_int8(model):
+    """Quantisiert alle Linear-Layer außer dem Ausgabe-Layer dynamisch auf int8 (in-place)"""
+    # lm_head bleibt in fp32: wenig Gewinn, aber spürbarer Qualitätsverlust.
+    # In-place, sonst hält eine tiefe Kopie die fp32-Gewichte doppelt im Speicher
+    qconfig_spec = {torch.nn.Linear: default_dynamic_qconfig, 'lm_head': None}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        return quantize_dynamic(model.eval(), qconfig_spec, dtype=torch.qint8, inplace=True)
+
+
+def quantized_cache_path(cache_dir: str, model_name: str) -> str:
+    """Pfad der gespeicherten int8-Gewichte eines Modells"""
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '--', model_name.strip('/'))
+    torch_version = torch.__version__.split('+')[0]
+    return os.path.join(cache_dir, f"{safe_name}-int8-torch{torch_version}.pt")
+
+
+def save_quantized(model, path: str):
+    """Speichert die quantisierten Gewichte"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+    logger.info(f"Quantisierte Gewichte gespeichert: {path}")
+
+
+def load_quantized(model_name: str, path: str):
+    """Baut das quantisierte Modell aus der Konfiguration und lädt die int8-Gewichte"""
+    config = AutoConfig.from_pretrained(model_name)
+    # Ohne Initialisierung bleiben die fp32-Platzhalter ungenutzte Seiten
+    with no_init_weights():
+        model = AutoModelForCausalLM.from_config(config)
+    model = quantize_model_int8(model)
+    model.load_state_dict(torch.load(path, map_location='cpu', weights_only=True, mmap=True))
+    logger.info(f"Quantisierte Gewichte geladen: {path}")
+    return model.eval()
+
+
+def load_int8_model(model_name: str, cache_dir: str):
+    """Lädt ein int8-Modell aus dem Cache oder quantisiert das fp32-Modell und speichert es"""
+    path = quantized_cache_path(cache_dir, model_name)
+
+    if os.path.exists(path):
+        try:
+            return load_quantized(model_name, path)
+        except Exception as e:
+            logger.warning(f"Quantisierter Cache unbrauchbar, quantisiere neu: {e}")
+
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+    model = quantize_model_int8(model)
+    try:
+        save_quantized(model, path)
+    except OSError as e:
+        logger.warning(f"Konnte quantisierte Gewichte nicht speichern: {e}")
+    return model
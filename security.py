@@ -1,6 +1,7 @@
 """
 Security utilities für LaTeX Converter
 """
+import io
 import os
 import re
 import hashlib
@@ -96,15 +97,24 @@ class SecurityManager:
         if not file:
             return False, "Keine Datei hochgeladen"
         
-        file.seek(0, 2)  # Ende der Datei
-        size = file.tell()
-        file.seek(0)     # Zurück zum Anfang
+        # Immer messen: die Länge im Multipart-Teil gibt der Client an. Gemessen wird
+        # ohne den Upload zu lesen oder zu kopieren
+        size = self._stream_size(getattr(file, 'stream', file))
         
         if size > self.max_file_size:
             return False, f"Datei zu groß (max. {self.max_file_size // (1024*1024)}MB)"
         
         return True, "OK"
     
+    def _stream_size(self, stream):
+        """Größe eines Upload-Streams; Puffer im Speicher direkt, sonst ohne die Position zu verändern"""
+        if isinstance(stream, io.BytesIO):
+            return stream.getbuffer().nbytes
+        position = stream.tell()
+        size = stream.seek(0, io.SEEK_END)
+        stream.seek(position)
+        return size
+    
     def check_rate_limit(self):
         """Rate Limiting prüfen"""
         client_ip = request.remote_addr
@@ -0,0 +1,212 @@
+"""
+Spaltenweiser Speicher für die Spans eines PDFs
+
+``page.get_text("dict")`` liefert pro Span ein Python-Dict mit Tupeln und
+Strings; für große Dokumente kostet jedes Feld Dutzende Bytes Verwaltung.
+Der ``SpanStore`` hält stattdessen je Feld ein NumPy-Array (Seite, Block,
+Zeile, Rechteck, Schriftgröße, Flags, Schrift-Nummer), die Schriftnamen
+einmal (interniert) und den Text aller Spans in einem String mit Offsets.
+
+Gefüllt wird Seite für Seite: das Dict einer Seite wird sofort in Spalten
+übertragen und verworfen. Abfragen (Bereich, Schriftgröße, Zeilen) laufen
+als Array-Operationen über alle Spans. ``pdf_layout.extract_blocks``
+bildet seine Textblöcke aus ``blocks()``; die Schriftgröße eines Blocks
+ist dann gemessen statt aus Höhe und Zeilenzahl geschätzt.
+"""
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# Wie "dict", aber ohne Bilddaten
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+_COLUMNS = {
+    'page': np.int32,
+    'block': np.int32,
+    'line': np.int32,
+    'font': np.int16,
+    'flags': np.int32,
+    'size': np.float32,
+    'bbox': np.float32,
+    'text_end': np.int64,
+}
+
+
+class SpanStore:
+    """Spans eines Dokuments in Spalten; Index ``i`` ist der i-te Span in Lesereihenfolge"""
+
+    def __init__(self):
+        self.fonts: List[str] = []
+        self._font_ids: Dict[str, int] = {}
+        self._chunks: Dict[str, List[np.ndarray]] = {name: [] for name in _COLUMNS}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._text_parts: List[str] = []
+        self._text = ''
+        self._text_length = 0
+        self._block_count = 0
+        self._line_count = 0
+
+    @classmethod
+    def from_document(cls, doc, pages: Optional[Iterable[int]] = None) -> 'SpanStore':
+        store = cls()
+        for page_number in (range(len(doc)) if pages is None else pages):
+            store.add_page(doc[page_number])
+        return store
+
+    def _font_id(self, name: str) -> int:
+        font_id = self._font_ids.get(name)
+        if font_id is None:
+            font_id = self._font_ids[name] = len(self.fonts)
+            self.fonts.append(name)
+        return font_id
+
+    def add_page(self, page) -> int:
+        """Überträgt die Spans einer Seite; liefert die Anzahl der Spans"""
+        blocks, lines, fonts, flags, sizes, boxes, ends, texts = [], [], [], [], [], [], [], []
+        end = self._text_length
+        for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]:
+            span_count = len(texts)
+            for line in block.get("lines", ()):
+                for span in line["spans"]:
+                    blocks.append(self._block_count)
+                    lines.append(self._line_count)
+                    fonts.append(self._font_id(span["font"]))
+                    flags.append(span["flags"])
+                    sizes.append(span["size"])
+                    boxes.append(span["bbox"])
+                    end += len(span["text"])
+                    ends.append(end)
+                    texts.append(span["text"])
+                self._line_count += 1
+            if len(texts) > span_count:
+                self._block_count += 1
+        if not texts:
+            return 0
+        values = {
+            'page': np.full(len(texts), page.number),
+            'block': blocks, 'line': lines, 'font': fonts, 'flags': flags, 'size': sizes,
+            'bbox': boxes, 'text_end': ends,
+        }
+        for name, dtype in _COLUMNS.items():
+            self._chunks[name].append(np.asarray(values[name], dtype=dtype))
+        self._text_parts.append(''.join(texts))
+        self._text_length = end
+        return len(texts)
+
+    def _column(self, name: str) -> np.ndarray:
+        """Spalte als ein Array; neue Seiten werden beim ersten Zugriff angehängt"""
+        chunks = self._chunks[name]
+        if chunks:
+            existing = [self._columns[name]] if name in self._columns else []
+            self._columns[name] = np.concatenate(existing + chunks)
+            chunks.clear()
+        elif name not in self._columns:
+            shape = (0, 4) if name == 'bbox' else (0,)
+            self._columns[name] = np.zeros(shape, dtype=_COLUMNS[name])
+        return self._columns[name]
+
+    @property
+    def text(self) -> str:
+        if self._text_parts:
+            self._text = self._text + ''.join(self._text_parts)
+            self._text_parts.clear()
+        return self._text
+
+    page = property(lambda self: self._column('page'))
+    block = property(lambda self: self._column('block'))
+    line = property(lambda self: self._column('line'))
+    font = property(lambda self: self._column('font'))
+    flags = property(lambda self: self._column('flags'))
+    size = property(lambda self: self._column('size'))
+    bbox = property(lambda self: self._column('bbox'))
+
+    @property
+    def text_start(self) -> np.ndarray:
+        ends = self._column('text_end')
+        return np.concatenate(([0], ends[:-1])).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self._column('page'))
+
+    def span_text(self, index: int) -> str:
+        end = int(self._column('text_end')[index])
+        start = int(self._column('text_end')[index - 1]) if index > 0 else 0
+        return self.text[start:end]
+
+    def texts(self, indices: Iterable[int]) -> List[str]:
+        text, starts, ends = self.text, self.text_start, self._column('text_end')
+        return [text[starts[index]:ends[index]] for index in indices]
+
+    def in_region(self, page: Optional[int], rect, contained: bool = False) -> np.ndarray:
+        """Indizes der Spans auf ``page`` (None: alle Seiten), die ``rect`` schneiden oder darin liegen"""
+        x0, y0, x1, y1 = rect
+        bbox = self.bbox
+        if contained:
+            inside = (bbox[:, 0] >= x0) & (bbox[:, 1] >= y0) & (bbox[:, 2] <= x1) & (bbox[:, 3] <= y1)
+        else:
+            inside = (bbox[:, 0] < x1) & (bbox[:, 2] > x0) & (bbox[:, 1] < y1) & (bbox[:, 3] > y0)
+        if page is not None:
+            inside &= self.page == page
+        return np.flatnonzero(inside)
+
+    def with_font_size(self, minimum: float, maximum: float = np.inf) -> np.ndarray:
+        """Indizes der Spans mit ``minimum <= Größe <= maximum`` (z. B. Überschriften)"""
+        size = self.size
+        return np.flatnonzero((size >= minimum) & (size <= maximum))
+
+    def lines(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """Je Zeile: Seite, umschließendes Rechteck und Text"""
+        line = self.line
+        if not len(line):
+            return np.zeros(0, dtype=np.int32), np.zeros((0, 4), dtype=np.float32), []
+        starts = np.flatnonzero(np.concatenate(([True], line[1:] != line[:-1])))
+        bbox = self.bbox
+        boxes = np.column_stack((
+            np.minimum.reduceat(bbox[:, 0], starts), np.minimum.reduceat(bbox[:, 1], starts),
+            np.maximum.reduceat(bbox[:, 2], starts), np.maximum.reduceat(bbox[:, 3], starts),
+        ))
+        ends = self._column('text_end')
+        span_ends = np.concatenate((starts[1:], [len(line)])) - 1
+        text_starts = self.text_start[starts]
+        text = self.text
+        texts = [text[start:end] for start, end in zip(text_starts, ends[span_ends])]
+        return self.page[starts], boxes, texts
+
+    def blocks(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[List[str]]]:
+        """Je Textblock: Seite, umschließendes Rechteck, Schriftgröße und Zeilentexte
+
+        Die Schriftgröße ist der nach Zeichen gewichtete Mittelwert der Spans
+        des Blocks.
+        """
+        block = self.block
+        if not len(block):
+            return (np.zeros(0, dtype=np.int32), np.zeros((0, 4), dtype=np.float32),
+                    np.zeros(0, dtype=np.float32), [])
+        starts = np.flatnonzero(np.concatenate(([True], block[1:] != block[:-1])))
+        bbox = self.bbox
+        boxes = np.column_stack((
+            np.minimum.reduceat(bbox[:, 0], starts), np.minimum.reduceat(bbox[:, 1], starts),
+            np.maximum.reduceat(bbox[:, 2], starts), np.maximum.reduceat(bbox[:, 3], starts),
+        ))
+        chars = (self._column('text_end') - self.text_start).astype(np.float64)
+        size = self.size.astype(np.float64)
+        weights = np.add.reduceat(chars, starts)
+        sizes = np.where(weights > 0, np.add.reduceat(size * chars, starts) / np.maximum(weights, 1),
+                         np.maximum.reduceat(size, starts))
+
+        # Zeilen den Blöcken zuordnen; Spans eines Blocks und einer Zeile liegen hintereinander
+        line = self.line
+        line_starts = np.flatnonzero(np.concatenate(([True], line[1:] != line[:-1])))
+        line_texts = self.lines()[2]
+        block_lines: List[List[str]] = [[] for _ in starts]
+        for position, text in zip(np.searchsorted(starts, line_starts, side='right') - 1, line_texts):
+            block_lines[position].append(text)
+        return self.page[starts], boxes, sizes.astype(np.float32), block_lines
+
+    @property
+    def nbytes(self) -> int:
+        """Belegter Speicher: Arrays, Text und Schriftnamen"""
+        arrays = sum(self._column(name).nbytes for name in _COLUMNS)
+        return arrays + sys.getsizeof(self.text) + sum(sys.getsizeof(font) for font in self.fonts)
@@ -0,0 +1,96 @@
+"""
+Spekulatives (assistiertes) Dekodieren mit einem kleinen Entwurfsmodell
+
+Das Entwurfsmodell schlägt mehrere Tokens vor, das Hauptmodell prüft sie in
+einem einzigen Forward-Pass. Die Statistik zählt die Forward-Passes beider
+Modelle, um Akzeptanzrate und Tokens pro Hauptmodell-Schritt zu berichten.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+
+class AssistedDecodingStats:
+    """Zähler für assistiertes Dekodieren"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.generate_calls = 0
+        self.generated_tokens = 0
+        self.target_steps = 0
+        self.draft_steps = 0
+
+    def record(self, generated_tokens: int, target_steps: int, draft_steps: int):
+        with self._lock:
+            self.generate_calls += 1
+            self.generated_tokens += generated_tokens
+            self.target_steps += target_steps
+            self.draft_steps += draft_steps
+
+    @property
+    def accepted_tokens(self) -> int:
+        # Jeder Prüfschritt liefert die akzeptierten Vorschläge plus ein eigenes Token
+        return max(0, self.generated_tokens - self.target_steps)
+
+    @property
+    def acceptance_rate(self) -> float:
+        """Anteil der vorgeschlagenen Tokens, die das Hauptmodell übernommen hat"""
+        return self.accepted_tokens / self.draft_steps if self.draft_steps else 0.0
+
+    @property
+    def tokens_per_target_step(self) -> float:
+        """Generierte Tokens pro Forward-Pass des Hauptmodells (1.0 ohne Assistenz)"""
+        return self.generated_tokens / self.target_steps if self.target_steps else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'generate_calls': self.generate_calls,
+            'generated_tokens': self.generated_tokens,
+            'target_steps': self.target_steps,
+            'draft_steps': self.draft_steps,
+            'accepted_tokens': self.accepted_tokens,
+            'acceptance_rate': self.acceptance_rate,
+            'tokens_per_target_step': self.tokens_per_target_step,
+        }
+
+
+@contextmanager
+def count_forward_passes(*models):
+    """Zählt Forward-Passes der übergebenen Modelle; liefert eine Liste der Zähler
+
+    Bei parallel laufenden Generierungen auf demselben Modell sind die Zähler
+    nur näherungsweise, da die Hooks alle Aufrufe sehen.
+    """
+    counts = [0] * len(models)
+    handles = []
+
+    for position, module in enumerate(models):
+        def hook(_module, _inputs, _output, position=position):
+            counts[position] += 1
+        handles.append(module.register_forward_hook(hook))
+
+    try:
+        yield counts
+    finally:
+        for handle in handles:
+            handle.remove()
+
+
+def load_draft_model(draft_model_name: str, tokenizer, device: str, dtype: torch.dtype):
+    """Lädt das Entwurfsmodell; es muss das Vokabular des Hauptmodells teilen"""
+    draft_tokenizer = AutoTokenizer.from_pretrained(draft_model_name)
+    if draft_tokenizer.get_vocab() != tokenizer.get_vocab():
+        raise ValueError(
+            f"Entwurfsmodell {draft_model_name} nutzt ein anderes Vokabular als das Hauptmodell"
+        )
+
+    draft_model = AutoModelForCausalLM.from_pretrained(draft_model_name, torch_dtype=dtype)
+    return draft_model.to(device).eval()
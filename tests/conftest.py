@@ -0,0 +1,23 @@
+import os
+
+import pytest
+from tests.tiny_model import save_tiny_model
+
+# app startet beim Import sonst das Laden des echten Modells im Hintergrund
+os.environ.setdefault('TESTING', 'True')
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory):
+    """Lokales Verzeichnis mit einem kleinen Zufallsmodell"""
+    return save_tiny_model(str(tmp_path_factory.mktemp("tiny-model")))
+
+
+@pytest.fixture
+def loaded_model(tiny_model_dir):
+    """Kleines Modell laden und danach Originalzustand wiederherstellen"""
+    import your_model_utils
+    original = (your_model_utils.tokenizer, your_model_utils.model, your_model_utils.prefix_cache)
+    assert your_model_utils.load_model(tiny_model_dir) is True
+    yield your_model_utils
+    your_model_utils.tokenizer, your_model_utils.model, your_model_utils.prefix_cache = original
@@ -0,0 +1,122 @@
+"""
+Benchmark: kompilierte Generierung (statischer KV-Cache) kalt gegen aufgewärmt
+
+Gemessen wird die Latenz der ersten Anfrage ohne Warmup (enthält die
+Kompilierung), die Dauer des Warmups beim Start und die Latenz danach,
+jeweils im Vergleich zum nicht kompilierten Modell. Der Inductor legt
+kompilierte Kernel zusätzlich auf der Platte ab; wiederholte Läufe
+starten daher schneller als der allererste.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_compile --model microsoft/phi-4-mini-instruct
+    python -m tests.performance.benchmark_compile --tiny
+"""
+import argparse
+import statistics
+import time
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from compiled_generation import compile_model, pad_to_bucket, parse_buckets, warmup
+
+TEXTS = [
+    "Die Verwaltung prüft den Antrag innerhalb von vier Wochen.",
+    "Der Bescheid enthält eine Rechtsbehelfsbelehrung.",
+    "Gegen den Bescheid kann innerhalb eines Monats nach Bekanntgabe Widerspruch erhoben werden. "
+    "Der Widerspruch ist schriftlich oder zur Niederschrift bei der Behörde einzulegen, "
+    "die den Bescheid erlassen hat.",
+]
+
+
+def prompt(text):
+    return f"Vereinfache den folgenden Text in einfaches de:\n\n{text}\n\nVereinfachter Text:"
+
+
+def make_generate(model, tokenizer, buckets):
+    def generate(input_ids, attention_mask, **kwargs):
+        if buckets:
+            input_ids, attention_mask = pad_to_bucket(input_ids, attention_mask, tokenizer.pad_token_id, buckets)
+        with torch.no_grad():
+            return model.generate(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                pad_token_id=tokenizer.pad_token_id,
+                **kwargs
+            )
+    return generate
+
+
+def request_latencies(generate, tokenizer, max_new_tokens, rounds):
+    latencies = []
+    for _ in range(rounds):
+        for text in TEXTS:
+            inputs = tokenizer(prompt(text), return_tensors='pt')
+            start = time.perf_counter()
+            generate(
+                inputs['input_ids'],
+                inputs['attention_mask'],
+                max_new_tokens=max_new_tokens,
+                min_new_tokens=max_new_tokens,
+                do_sample=False
+            )
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(load, tokenizer, buckets, backend, max_new_tokens, rounds):
+    eager = request_latencies(make_generate(load(), tokenizer, None), tokenizer, max_new_tokens, rounds)
+
+    # Kalt: die erste Anfrage trägt die Kompilierung
+    torch._dynamo.reset()
+    cold_model = compile_model(load(), backend)
+    cold = request_latencies(make_generate(cold_model, tokenizer, buckets), tokenizer, max_new_tokens, 1)
+    del cold_model
+
+    # Warm: Kompilierung im Warmup beim Start, danach nur Anfragen
+    torch._dynamo.reset()
+    warm_model = compile_model(load(), backend)
+    generate = make_generate(warm_model, tokenizer, buckets)
+    warmup_start = time.perf_counter()
+    warmup(generate, tokenizer, buckets, prompt(TEXTS[0]), warm_model.device)
+    warmup_time = time.perf_counter() - warmup_start
+    warm = request_latencies(generate, tokenizer, max_new_tokens, rounds)
+
+    print(f"Ohne Kompilierung:         Median {statistics.median(eager) * 1000:8.1f} ms")
+    print(f"Kompiliert, kalt:          erste Anfrage {cold[0] * 1000:8.1f} ms")
+    print(f"Kompiliert, Warmup:        {warmup_time:8.1f} s für Buckets {buckets}")
+    print(f"Kompiliert, aufgewärmt:    Median {statistics.median(warm) * 1000:8.1f} ms, "
+          f"erste Anfrage {warm[0] * 1000:8.1f} ms")
+    print(f"Speedup aufgewärmt:        {statistics.median(eager) / statistics.median(warm):.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='microsoft/phi-4-mini-instruct')
+    parser.add_argument('--tiny', action='store_true', help='kleines Zufallsmodell verwenden')
+    parser.add_argument('--backend', default='inductor')
+    parser.add_argument('--buckets', default='64,128')
+    parser.add_argument('--max-new-tokens', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.tiny:
+        from tests.tiny_model import build_tiny_model, build_tiny_tokenizer
+        tokenizer = build_tiny_tokenizer()
+
+        def load():
+            return build_tiny_model(tokenizer, hidden_size=256, num_hidden_layers=4)
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(args.model)
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = 'left'
+
+        def load():
+            return AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32).eval()
+
+    run(load, tokenizer, parse_buckets(args.buckets), args.backend, args.max_new_tokens, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: feste Obergrenze gegen adaptives Budget mit Stoppsequenzen
+
+Vorher durfte jeder Chunk bis zur festen Obergrenze generieren, und der
+gesamte Prompt samt Ausgabe wurde dekodiert und am "Vereinfachter Text:"
+getrennt. Jetzt bestimmt die Eingabelänge das Budget, die Generierung
+endet an Stoppsequenzen, und nur die neuen Tokens werden dekodiert.
+Gemessen werden Dekodierschritte, Generierungszeit und Detokenisierung.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_generation_budget --model microsoft/phi-4-mini-instruct
+    python -m tests.performance.benchmark_generation_budget --tiny
+"""
+import argparse
+import os
+import tempfile
+import time
+
+TEXTS = [
+    "Der Antrag wird geprüft.",
+    "Die Verwaltung prüft den Antrag innerhalb von vier Wochen und teilt das Ergebnis schriftlich mit.",
+    "Gegen den Bescheid kann innerhalb eines Monats nach Bekanntgabe Widerspruch erhoben werden. "
+    "Der Widerspruch ist schriftlich oder zur Niederschrift bei der Behörde einzulegen, "
+    "die den Bescheid erlassen hat.",
+]
+
+
+def run(model_name, ceiling, rounds):
+    os.environ['MODEL_NAME'] = model_name
+    import your_model_utils as utils
+    from generation_policy import GenerationPolicy
+    utils.wait_for_initialization()
+
+    steps = []
+    generate = utils._generate
+
+    def counting_generate(*args, **kwargs):
+        new_tokens = generate(*args, **kwargs)
+        steps.append(new_tokens.shape[-1])
+        return new_tokens
+
+    utils._generate = counting_generate
+    fixed = GenerationPolicy(min_new_tokens=ceiling, stop_sequences=())
+    policies = [('Feste Obergrenze', fixed), ('Adaptives Budget', utils.GENERATION_POLICY)]
+
+    for label, policy in policies:
+        utils.GENERATION_POLICY = policy
+        steps.clear()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in TEXTS:
+                utils.generate_simplification(
+                    utils.SIMPLIFY_TEMPLATE, text, 'de', max_new_tokens=ceiling, do_sample=False
+                )
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {sum(steps) / rounds:6.0f} Dekodierschritte pro Runde, "
+              f"{elapsed / rounds * 1000:8.1f} ms pro Runde")
+
+    # Detokenisierung: ganzer Prompt samt Ausgabe gegen nur die neuen Tokens
+    tokenizer = utils.tokenizer
+    prompt_ids = tokenizer(utils.SIMPLIFY_TEMPLATE.render(TEXTS[-1], 'de'))["input_ids"]
+    new_ids = tokenizer(TEXTS[-1], add_special_tokens=False)["input_ids"]
+    for label, ids, split in (('Prompt + Ausgabe', prompt_ids + new_ids, True), ('Nur neue Tokens', new_ids, False)):
+        start = time.perf_counter()
+        for _ in range(1000):
+            decoded = tokenizer.decode(ids, skip_special_tokens=True)
+            if split:
+                decoded.split(utils.SPLIT_KEY)[-1].strip()
+        print(f"Detokenisierung {label}: {(time.perf_counter() - start) * 1000:6.3f} µs pro Aufruf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='microsoft/phi-4-mini-instruct')
+    parser.add_argument('--tiny', action='store_true', help='kleines Zufallsmodell verwenden')
+    parser.add_argument('--ceiling', type=int, default=256, help='bisherige feste Obergrenze')
+    parser.add_argument('--rounds', type=int, default=2)
+    args = parser.parse_args()
+
+    if args.tiny:
+        from tests.tiny_model import save_tiny_model
+        with tempfile.TemporaryDirectory() as model_dir:
+            save_tiny_model(model_dir, hidden_size=256, num_hidden_layers=4)
+            run(model_dir, args.ceiling, args.rounds)
+    else:
+        run(args.model, args.ceiling, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: Tokens vor und nach der Textnormalisierung
+
+Erzeugt ein PDF mit Silbentrennung am Zeilenende, Ligaturen (MuPDF setzt
+"fi"/"fl" als Ligatur-Glyphen), geschützten Leerzeichen und mehreren
+Absätzen pro Seite. Verglichen werden die bisherige Extraktion (Zeilen von
+``get_text("text")`` mit Leerzeichen verbunden) und ``page_text`` mit
+Normalisierung: Zeichen, Tokens des Tokenizers, geschätzte Tokens
+(Zeichen / 4) und Laufzeit.
+
+Ohne ``--model`` zählt der kleine Test-Tokenizer aus ``tests.tiny_model``;
+mit ``--model`` der Tokenizer des echten Modells (Name oder Pfad).
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_normalization
+    python -m tests.performance.benchmark_normalization --pages 200 --model ./models/mein-modell
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import fitz
+
+from pdf_extraction import page_text
+from tests.tiny_model import build_tiny_tokenizer
+
+WORDS = (
+    "Die Verwaltung prüft den finalen Antrag auf Förderung innerhalb der gesetzlichen Frist. "
+    "Eine Verlängerung ist nur in begründeten Einzelfällen möglich und muss schriftlich beantragt werden. "
+    "Die Bewilligung erfolgt unter dem Vorbehalt der Verfügbarkeit öffentlicher Haushaltsmittel. "
+    "Auflagen aus dem Zuwendungsbescheid sind verbindlich und werden regelmäßig überprüft. "
+).split()
+LINE_LENGTH = 62
+CSS = "body {font-family: sans-serif; font-size: 10pt;} p {margin-bottom: 8pt;}"
+
+
+def hyphenated_lines(words, width=LINE_LENGTH):
+    """Bricht Wörter in Zeilen um und trennt lange Wörter am Zeilenende"""
+    lines, line = [], ""
+    for word in words:
+        candidate = f"{line} {word}".strip()
+        if len(candidate) <= width:
+            line = candidate
+            continue
+        room = width - len(line) - 2
+        if len(word) >= 8 and room >= 4:
+            # Silbentrennung grob in der Wortmitte, nur wenn genug Platz bleibt
+            cut = min(room, len(word) // 2)
+            lines.append(f"{line} {word[:cut]}-".strip())
+            line = word[cut:]
+        else:
+            lines.append(line)
+            line = word
+    lines.append(line)
+    return lines
+
+
+def paragraph_html(offset, length=60):
+    words = [WORDS[(offset + index) % len(WORDS)] for index in range(length)]
+    lines = hyphenated_lines(words)
+    # Geschützte und doppelte Leerzeichen wie in Satzvorlagen
+    lines = [line.replace(" § ", " §&#160;", 1).replace(". ", ".&#160; ") for line in lines]
+    return "<p>" + "<br>".join(lines) + "</p>"
+
+
+def build_pdf(path, pages):
+    writer = fitz.DocumentWriter(path)
+    page_rect = fitz.paper_rect('a4')
+    for number in range(pages):
+        story = fitz.Story("".join(paragraph_html(number * 7 + index * 13) for index in range(4)), user_css=CSS)
+        device = writer.begin_page(page_rect)
+        story.place(page_rect + (50, 50, -50, -50))
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+
+
+def line_extraction(page):
+    """Bisherige Extraktion: Zeilen mit Leerzeichen verbunden"""
+    return " ".join(line for line in page.get_text("text").splitlines() if line.strip())
+
+
+def measure(path, extract, tokenizer):
+    start = time.perf_counter()
+    with fitz.open(path) as doc:
+        texts = [extract(page) for page in doc]
+    seconds = time.perf_counter() - start
+    text = "\n".join(texts)
+    return {
+        'Zeichen': len(text),
+        'Tokens': len(tokenizer(text, add_special_tokens=False)['input_ids']),
+        'Tokens (Zeichen/4)': math.ceil(len(text) / 4),
+        'Zeit (ms)': seconds * 1000,
+    }, text
+
+
+def load_tokenizer(model):
+    if model is None:
+        return build_tiny_tokenizer(), "Test-Tokenizer"
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(model), model
+
+
+def run(pages, model):
+    tokenizer, name = load_tokenizer(model)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'getrennt.pdf')
+        build_pdf(path, pages)
+        before, old_text = measure(path, line_extraction, tokenizer)
+        after, new_text = measure(path, page_text, tokenizer)
+
+    print(f"PDF: {pages} Seiten, Tokenizer: {name}")
+    print(f"{'':>20} {'vorher':>10} {'nachher':>10} {'Änderung':>9}")
+    for key in before:
+        change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        print(f"{key:>20} {before[key]:10.0f} {after[key]:10.0f} {change:8.1f}%")
+    print(f"Ligaturen: {sum(old_text.count(c) for c in 'ﬀﬁﬂﬃﬄ')} vorher, "
+          f"{sum(new_text.count(c) for c in 'ﬀﬁﬂﬃﬄ')} nachher")
+    print(f"Absätze: {len(new_text.splitlines())} (vorher eine Zeile pro Seite)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--model', default=None, help="Tokenizer des Modells (Name oder Pfad)")
+    args = parser.parse_args()
+    run(args.pages, args.model)
+
+
+if __name__ == '__main__':
+    main()
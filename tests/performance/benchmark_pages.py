@@ -0,0 +1,75 @@
+"""
+Benchmark: ganzes Dokument gegenüber einer Seite auf Abruf
+
+Vergleicht die Vereinfachung eines mehrseitigen PDFs im Blockmodus als
+Ganzes mit dem Abruf einer einzelnen Seite über
+``/pdf/documents/<schlüssel>/pages/<n>``, zuerst berechnet und dann aus
+dem Seiten-Cache. Das Modell ist simuliert (``--seconds-per-chunk`` pro
+Block), damit Extraktion und Ausgabe sichtbar bleiben.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_pages
+    python -m tests.performance.benchmark_pages --pages 400 --seconds-per-chunk 0.01
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import app
+from deadline import SimplificationResult
+from page_cache import PageCache
+from tests.performance.benchmark_pdf_extraction import build_pdf
+
+
+def fake_model(seconds_per_chunk):
+    def simplify(texts, *args):
+        time.sleep(seconds_per_chunk * len(texts))
+        return SimplificationResult(list(texts), [text.upper() for text in texts])
+    return simplify
+
+
+def run(pages, seconds_per_chunk):
+    with tempfile.TemporaryDirectory() as directory, \
+            patch('app.simplify_blocks', side_effect=fake_model(seconds_per_chunk)), \
+            patch('app.wait_for_initialization', return_value=True), \
+            patch('app.page_cache', PageCache(os.path.join(directory, 'seiten'))):
+        path = os.path.join(directory, 'eingabe.pdf')
+        build_pdf(path, pages)
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        start = time.perf_counter()
+        report = app.create_layout_preserving_simplified_pdf(path, os.path.join(directory, 'ausgabe.pdf'),
+                                                             layout='blocks')
+        whole = time.perf_counter() - start
+
+        client = app.app.test_client()
+        key = client.post('/pdf/documents', data={'file': (io.BytesIO(data), 'eingabe.pdf')},
+                          content_type='multipart/form-data').get_json()['document']
+        timings = {}
+        for label in ('miss', 'hit'):
+            start = time.perf_counter()
+            response = client.get(f"/pdf/documents/{key}/pages/{pages // 2}")
+            timings[label] = time.perf_counter() - start
+            assert response.headers['X-Page-Cache'] == label
+
+    print(f"PDF: {pages} Seiten, {report['total_chunks']} Blöcke an das Modell, "
+          f"Modell {seconds_per_chunk * 1000:.1f} ms/Block")
+    print(f"   ganzes Dokument: {whole * 1000:8.1f} ms")
+    print(f"  eine Seite (neu): {timings['miss'] * 1000:8.1f} ms ({whole / timings['miss']:5.1f}x)")
+    print(f" eine Seite (Cache): {timings['hit'] * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--seconds-per-chunk', type=float, default=0.004)
+    args = parser.parse_args()
+    run(args.pages, args.seconds_per_chunk)
+
+
+if __name__ == '__main__':
+    main()
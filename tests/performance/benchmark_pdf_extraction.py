@@ -0,0 +1,103 @@
+"""
+Benchmark: Textextraktion großer PDFs
+
+Vergleicht die bisherige Extraktion (``get_text("dict")`` über alle Spans,
+``full_text += span + " "``) mit der seitenweisen Extraktion über
+``get_text("text")``, nacheinander und im Prozesspool. Der erste
+Pool-Aufruf startet die Prozesse (kalt), weitere Aufrufe verwenden sie
+wieder (warm). Das Test-PDF hat mehrere Absätze pro Seite.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_pdf_extraction
+    python -m tests.performance.benchmark_pdf_extraction --pages 2000 --workers 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz
+
+from pdf_extraction import extract_page_texts, shutdown_pool
+
+PARAGRAPH = (
+    "Gegen diesen Bescheid kann innerhalb eines Monats nach Bekanntgabe Widerspruch erhoben werden. "
+    "Der Widerspruch ist schriftlich oder zur Niederschrift bei der Behörde einzulegen, "
+    "die den Bescheid erlassen hat. "
+)
+
+
+def build_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        text = f"Seite {number + 1}\n\n" + "\n\n".join([PARAGRAPH * 2] * 5)
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), text, fontsize=10, fontname="helv")
+    doc.save(path)
+    doc.close()
+
+
+def dict_extraction(path):
+    """Bisherige Extraktion aus create_layout_preserving_simplified_pdf"""
+    doc = fitz.open(path)
+    full_text = ""
+    for page_num in range(len(doc)):
+        for block in doc[page_num].get_text("dict")["blocks"]:
+            if "lines" not in block:
+                continue
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    full_text += span["text"] + " "
+        full_text += "\n"
+    doc.close()
+    return full_text.strip()
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run(pages, workers, rounds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'gross.pdf')
+        build_pdf(path, pages)
+        print(f"PDF: {pages} Seiten, {os.path.getsize(path) / 2 ** 20:.1f} MB, {workers} Prozesse "
+              f"({os.cpu_count()} CPUs)")
+
+        def sequential():
+            return "\n".join(extract_page_texts(path)).strip()
+
+        def parallel():
+            return "\n".join(extract_page_texts(path, workers=workers, min_pages=1)).strip()
+
+        cold, parallel_text = timed(parallel)
+        results = {
+            'dict + String-Verkettung': min(timed(lambda: dict_extraction(path))[0] for _ in range(rounds)),
+            'seitenweise, nacheinander': min(timed(sequential)[0] for _ in range(rounds)),
+            'Prozesspool (kalt)': cold,
+            'Prozesspool (warm)': min(timed(parallel)[0] for _ in range(rounds)),
+        }
+        shutdown_pool()
+
+        baseline = results['dict + String-Verkettung']
+        for label, seconds in results.items():
+            print(f"{label:>26}: {seconds * 1000:8.0f} ms ({baseline / seconds:4.1f}x)")
+
+        words_old = dict_extraction(path).split()
+        assert sequential().split() == words_old == parallel_text.split(), "Extrahierter Text weicht ab"
+        print(f"Gleicher Text: {len(words_old)} Wörter")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=600)
+    parser.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    run(args.pages, args.workers, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
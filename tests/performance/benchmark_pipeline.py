@@ -0,0 +1,71 @@
+"""
+Benchmark: PDF-Vereinfachung nacheinander und als Stufen-Pipeline
+
+Setzt ein mehrseitiges PDF im Textmodus einmal nacheinander
+(``PDF_PIPELINE=False``: erst Extraktion, dann alle Chunks, dann Ausgabe)
+und einmal als Pipeline um. Das Modell ist simuliert: jede Gruppe dauert
+``--seconds-per-chunk`` pro Chunk und gibt dabei wie torch das GIL frei.
+Ausgegeben werden Laufzeit, Auslastung je Stufe und Füllung der
+Warteschlangen.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_pipeline
+    python -m tests.performance.benchmark_pipeline --pages 400 --seconds-per-chunk 0.002
+"""
+import argparse
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import app
+from deadline import SimplificationResult
+from tests.performance.benchmark_pdf_extraction import build_pdf
+from your_model_utils import split_into_chunks
+
+
+def fake_model(seconds_per_chunk):
+    def simplify(chunks, *args, **kwargs):
+        time.sleep(seconds_per_chunk * len(chunks))
+        return SimplificationResult(list(chunks), [chunk.upper() for chunk in chunks])
+    return simplify
+
+
+def run(pages, seconds_per_chunk):
+    simplify = fake_model(seconds_per_chunk)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'eingabe.pdf')
+        build_pdf(path, pages)
+        results = {}
+        for pipelined in (False, True):
+            output = os.path.join(directory, f'ausgabe_{pipelined}.pdf')
+            with patch('app.PDF_PIPELINE', pipelined), \
+                    patch('app.simplify_blocks', side_effect=lambda texts, *args: simplify(texts)), \
+                    patch('app.simplify_full_text',
+                          side_effect=lambda text, *args, **kwargs: simplify(split_into_chunks(text))):
+                start = time.perf_counter()
+                report = app.create_layout_preserving_simplified_pdf(path, output, layout='text')
+                results[pipelined] = (time.perf_counter() - start, report)
+
+    sequential, report = results[False]
+    pipelined, pipeline_report = results[True]
+    print(f"PDF: {pages} Seiten, {report['total_chunks']} Chunks, Modell {seconds_per_chunk * 1000:.1f} ms/Chunk")
+    print(f"   nacheinander: {sequential:6.2f} s")
+    print(f"       Pipeline: {pipelined:6.2f} s ({sequential / pipelined:4.2f}x)")
+    for name, stage in pipeline_report['pipeline']['stages'].items():
+        print(f"{name:>15}: Auslastung {stage['utilization']:5.1%}, {stage['busy_seconds']:6.2f} s, "
+              f"{stage['items']} Einträge")
+    for name, channel in pipeline_report['pipeline']['queues'].items():
+        print(f"{name:>22}: max {channel['max_depth']}/{channel['capacity']}, Mittel {channel['mean_depth']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--seconds-per-chunk', type=float, default=0.004)
+    args = parser.parse_args()
+    run(args.pages, args.seconds_per_chunk)
+
+
+if __name__ == '__main__':
+    main()
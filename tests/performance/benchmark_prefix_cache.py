@@ -0,0 +1,102 @@
+"""
+Benchmark: Prefill-Zeit pro Chunk mit und ohne Präfix-Cache
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_prefix_cache --model microsoft/phi-4-mini-instruct
+    python -m tests.performance.benchmark_prefix_cache --tiny
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from prompt_cache import PrefixCache, PromptTemplate, build_prefixed_inputs
+
+# Entspricht app.DOCUMENT_TEMPLATE (Import würde das Standardmodell laden)
+TEMPLATE = PromptTemplate(
+    'document_batch',
+    prefix=(
+        "Vereinfache den folgenden Text in leicht verständliches, einfaches Deutsch. "
+        "Alle Informationen sollen erhalten bleiben, aber die Sätze sollen kürzer und klarer sein. "
+        "Schreibe den gesamten Text um, ohne etwas wegzulassen oder hinzuzufügen.\n\n"
+        "Text:\n"
+    ),
+    tail="\n\nVereinfachter Text:"
+)
+
+CHUNK = (
+    "Die Verwaltung prüft den Antrag innerhalb von vier Wochen "
+    "und teilt das Ergebnis schriftlich mit."
+)
+
+
+def load(model_name):
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32).eval()
+    return tokenizer, model
+
+
+def time_prefill(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with torch.no_grad():
+            fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(tokenizer, model, repeats, batch_size):
+    cache = PrefixCache(tokenizer, model)
+    entry = cache.get(TEMPLATE, 'de')
+    texts = [CHUNK] * batch_size
+    suffix_ids = cache.encode_texts(entry, TEMPLATE, texts, 1024)
+    input_ids, attention_mask = build_prefixed_inputs(entry.prefix_ids, suffix_ids, tokenizer.pad_token_id)
+    prefix_length = len(entry.prefix_ids)
+
+    def full_prefill():
+        model(input_ids=input_ids, attention_mask=attention_mask, use_cache=True)
+
+    def cached_prefill():
+        model(
+            input_ids=input_ids[:, prefix_length:],
+            attention_mask=attention_mask,
+            past_key_values=cache.expand(entry, batch_size),
+            use_cache=True
+        )
+
+    full_prefill()
+    cached_prefill()
+    full = time_prefill(full_prefill, repeats)
+    cached = time_prefill(cached_prefill, repeats)
+
+    print(f"Präfix: {prefix_length} Tokens, Suffix: {input_ids.shape[1] - prefix_length} Tokens, Batch: {batch_size}")
+    print(f"Prefill ohne Cache: {full / batch_size * 1000:.2f} ms/Chunk")
+    print(f"Prefill mit Cache:  {cached / batch_size * 1000:.2f} ms/Chunk")
+    print(f"Gespart:            {(full - cached) / batch_size * 1000:.2f} ms/Chunk ({(1 - cached / full) * 100:.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='microsoft/phi-4-mini-instruct')
+    parser.add_argument('--tiny', action='store_true', help='kleines Zufallsmodell verwenden')
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=4)
+    args = parser.parse_args()
+
+    if args.tiny:
+        from tests.tiny_model import save_tiny_model
+        with tempfile.TemporaryDirectory() as model_dir:
+            save_tiny_model(model_dir, hidden_size=256, num_hidden_layers=4)
+            run(*load(model_dir), args.repeats, args.batch_size)
+    else:
+        run(*load(args.model), args.repeats, args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
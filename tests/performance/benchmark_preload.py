@@ -0,0 +1,163 @@
+"""
+Benchmark: Modell pro Worker gegen vorgeladenes Modell mit geteilten Seiten
+
+Wie gunicorn startet ein Master-Prozess mehrere Worker per fork. Ohne
+Preload lädt jeder Worker sein eigenes Modell; mit MODEL_PRELOAD=True lädt
+der Master die speicherabgebildeten Gewichte und die Worker teilen sie.
+Jeder Worker generiert und liest danach alle Gewichte, bevor er seinen
+Unique Set Size (USS, nur ihm gehörende Seiten) meldet. Gemessen wird erst,
+wenn alle Worker ihre Gewichte gelesen haben: Seiten, die der Master nie
+berührt hat, zählen sonst beim ersten Worker als privat.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_preload --model microsoft/phi-4-mini-instruct --workers 4
+    python -m tests.performance.benchmark_preload --tiny
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEXT = "Die Verwaltung prüft den Antrag innerhalb von vier Wochen."
+
+
+def memory_mb() -> dict:
+    """USS, PSS, RSS und anonymer Speicher des Prozesses in MB"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+        'pss': values.get('Pss', 0),
+        'rss': values.get('Rss', 0),
+        'anonymous': values.get('Anonymous', 0),
+    }
+
+
+def run_worker(utils, preload):
+    """Arbeit eines Workers nach fork: generieren und alle Gewichte lesen"""
+    if preload:
+        utils.init_worker()
+    else:
+        import your_model_utils as utils
+        utils.wait_for_initialization()
+
+    import torch
+    utils.generate_simplification(utils.SIMPLIFY_TEMPLATE, TEXT, 'de', max_new_tokens=8, do_sample=False)
+    # Alle Gewichtsseiten anfassen, wie nach vielen Anfragen
+    with torch.no_grad():
+        for parameter in utils.model.parameters():
+            parameter.sum()
+
+
+def weights_mb(model) -> float:
+    unique = {parameter.data_ptr(): parameter.nbytes for parameter in model.parameters()}
+    return sum(unique.values()) / 2 ** 20
+
+
+def child_main(workers, preload):
+    """Master-Prozess: optional vorladen, dann Worker forken und Messwerte sammeln"""
+    utils = None
+    if preload:
+        import your_model_utils as utils
+
+    # Barriere: Worker melden sich fertig und messen erst nach dem Startsignal
+    ready_read, ready_write = os.pipe()
+    go_read, go_write = os.pipe()
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            error = None
+            try:
+                run_worker(utils, preload)
+            except Exception as e:
+                error = str(e)
+            os.write(ready_write, b'.')
+            os.read(go_read, 1)
+            result = {'error': error} if error else memory_mb()
+            if not preload and not error:
+                import your_model_utils
+                result['weights_mb'] = weights_mb(your_model_utils.model)
+            os.write(write_fd, json.dumps(result).encode())
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    for _ in range(workers):
+        os.read(ready_read, 1)
+    os.write(go_write, b'.' * workers)
+
+    results = []
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd, 'rb') as reader:
+            results.append(json.loads(reader.read()))
+        os.waitpid(pid, 0)
+
+    report = {'workers': results, 'master': memory_mb()}
+    report['weights_mb'] = weights_mb(utils.model) if preload else results[0].get('weights_mb', 0)
+    print(json.dumps(report))
+
+
+def measure_workers(model_name: str, cache_dir: str, workers: int, preload: bool) -> dict:
+    """Startet einen frischen Master-Prozess und liefert die Messwerte seiner Worker"""
+    env = dict(
+        os.environ,
+        MODEL_NAME=model_name,
+        MODEL_CACHE_DIR=cache_dir,
+        MODEL_PRELOAD=str(preload),
+        WEB_CONCURRENCY=str(workers),
+    )
+    completed = subprocess.run(
+        [sys.executable, '-m', 'tests.performance.benchmark_preload', '--child',
+         '--workers', str(workers)] + (['--preload'] if preload else []),
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(model_name, cache_dir, workers):
+    # Erster Preload-Lauf exportiert die safetensors-Datei in den Cache
+    measure_workers(model_name, cache_dir, 1, True)
+    for preload in (False, True):
+        report = measure_workers(model_name, cache_dir, workers, preload)
+        uss = [worker['uss'] for worker in report['workers']]
+        label = 'Preload (geteilt)' if preload else 'Modell pro Worker'
+        print(f"{label:>18}: Gewichte {report['weights_mb']:.0f} MB, "
+              f"USS pro Worker {min(uss):.0f}-{max(uss):.0f} MB, "
+              f"PSS gesamt {sum(worker['pss'] for worker in report['workers']) + report['master']['pss']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='microsoft/phi-4-mini-instruct')
+    parser.add_argument('--tiny', action='store_true', help='kleines Zufallsmodell verwenden')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--preload', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.workers, args.preload)
+        return
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if args.tiny:
+            from tests.tiny_model import save_tiny_model
+            with tempfile.TemporaryDirectory() as model_dir:
+                save_tiny_model(model_dir, hidden_size=1024, num_hidden_layers=4)
+                run(model_dir, cache_dir, args.workers)
+        else:
+            run(args.model, cache_dir, args.workers)
+
+
+if __name__ == '__main__':
+    main()
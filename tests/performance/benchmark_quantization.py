@@ -0,0 +1,131 @@
+"""
+Benchmark: fp32 gegen dynamisches int8 auf CPU (Tokens/s, RSS, Übereinstimmung)
+
+Jeder Modus läuft in einem eigenen Prozess, damit der RSS vergleichbar ist.
+Beim Zufallsmodell (--tiny) sind die Logits fast gleichverteilt; die
+Übereinstimmung ist dort nur ein Funktionstest, aussagekräftig ist sie
+erst mit dem echten Modell.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_quantization --model microsoft/phi-4-mini-instruct
+    python -m tests.performance.benchmark_quantization --tiny
+"""
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+PROMPTS = [
+    "Vereinfache den folgenden Text in einfaches de:\n\n"
+    "Die Verwaltung prüft den Antrag innerhalb von vier Wochen.\n\nVereinfachter Text:",
+    "Vereinfache den folgenden Text in einfaches de:\n\n"
+    "Der Bescheid enthält eine Rechtsbehelfsbelehrung.\n\nVereinfachter Text:",
+]
+
+
+def rss_mb() -> float:
+    """Aktueller Resident Set Size des Prozesses in MB"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_mode(mode, model_name, cache_dir, max_new_tokens, queue):
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    from quantization import load_int8_model
+
+    torch.manual_seed(0)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    baseline = rss_mb()
+    load_start = time.perf_counter()
+    if mode == 'int8':
+        model = load_int8_model(model_name, cache_dir)
+    else:
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32).eval()
+    load_time = time.perf_counter() - load_start
+
+    outputs = []
+    generated = 0
+    start = time.perf_counter()
+    with torch.no_grad():
+        for prompt in PROMPTS:
+            input_ids = tokenizer(prompt, return_tensors='pt')['input_ids']
+            output = model.generate(
+                input_ids=input_ids,
+                max_new_tokens=max_new_tokens,
+                min_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id,
+            )
+            new_tokens = output[0, input_ids.shape[1]:].tolist()
+            generated += len(new_tokens)
+            outputs.append(new_tokens)
+    elapsed = time.perf_counter() - start
+    # Nach der Generierung sind alle Gewichtsseiten tatsächlich angefasst
+    model_rss = rss_mb() - baseline
+
+    queue.put({
+        'mode': mode,
+        'load_time': load_time,
+        'rss_mb': model_rss,
+        'tokens_per_second': generated / elapsed,
+        'outputs': outputs,
+    })
+
+
+def measure(mode, model_name, cache_dir, max_new_tokens):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_mode, args=(mode, model_name, cache_dir, max_new_tokens, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def agreement(reference, candidate):
+    """Anteil übereinstimmender Tokens an gleicher Position"""
+    matches = total = 0
+    for ref_tokens, cand_tokens in zip(reference, candidate):
+        total += len(ref_tokens)
+        matches += sum(1 for a, b in zip(ref_tokens, cand_tokens) if a == b)
+    return matches / total if total else 1.0
+
+
+def run(model_name, cache_dir, max_new_tokens):
+    # Erster int8-Lauf quantisiert und füllt den Cache, der zweite misst den Warmstart
+    fp32 = measure('fp32', model_name, cache_dir, max_new_tokens)
+    measure('int8', model_name, cache_dir, max_new_tokens)
+    int8 = measure('int8', model_name, cache_dir, max_new_tokens)
+
+    for result in (fp32, int8):
+        print(
+            f"{result['mode']:>5}: {result['tokens_per_second']:8.1f} Tokens/s, "
+            f"Modell-RSS {result['rss_mb']:8.1f} MB, Ladezeit {result['load_time']:.2f}s"
+        )
+    print(f"Speedup: {int8['tokens_per_second'] / fp32['tokens_per_second']:.2f}x")
+    print(f"Token-Übereinstimmung int8 vs. fp32 (greedy): {agreement(fp32['outputs'], int8['outputs']) * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='microsoft/phi-4-mini-instruct')
+    parser.add_argument('--tiny', action='store_true', help='kleines Zufallsmodell verwenden')
+    parser.add_argument('--max-new-tokens', type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if args.tiny:
+            from tests.tiny_model import save_tiny_model
+            with tempfile.TemporaryDirectory() as model_dir:
+                save_tiny_model(model_dir, hidden_size=1024, num_hidden_layers=4)
+                run(model_dir, cache_dir, args.max_new_tokens)
+        else:
+            run(args.model, cache_dir, args.max_new_tokens)
+
+
+if __name__ == '__main__':
+    main()
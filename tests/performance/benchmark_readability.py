@@ -0,0 +1,107 @@
+"""
+Benchmark: Lesbarkeitsbewertung vor der Inferenz
+
+Ein Dokument aus einfachen Abschnitten (Anschrift, kurze Sätze) und
+Amtsdeutsch wird in Chunks geteilt. Gemessen werden die Zeit der
+vektorisierten Bewertung aller Chunks gegen eine Python-Schleife mit
+regulären Ausdrücken pro Chunk, der Anteil übersprungener Chunks und die
+eingesparten Tokens (Text plus Generierungsbudget). Ohne Modell: die
+Token-Längen werden wie beim Inferenzserver aus der Zeichenzahl geschätzt.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_readability
+    python -m tests.performance.benchmark_readability --chunks 20000
+"""
+import argparse
+import math
+import re
+import time
+
+import numpy as np
+
+from generation_policy import GenerationPolicy
+from readability import ReadabilityFilter
+
+SIMPLE = (
+    "Stadt Musterstadt. Bürgeramt. Das Amt prüft Ihren Antrag. Das dauert vier Wochen. "
+    "Sie bekommen dann einen Brief. Bitte bringen Sie Ihren Ausweis mit. "
+)
+COMPLEX = (
+    "Gegen diesen Bescheid kann innerhalb eines Monats nach Bekanntgabe Widerspruch erhoben werden, "
+    "wobei die Inanspruchnahme der Rechtsbehelfsbelehrung die fristgerechte Einreichung sämtlicher "
+    "erforderlichen Unterlagen bei der zuständigen Verwaltungsbehörde voraussetzt. "
+)
+CHUNK_SIZE = 500
+CHARS_PER_TOKEN = 4
+MAX_NEW_TOKENS = 1024
+
+_WORD = re.compile(r"[^\W\d_]+")
+_VOWEL_GROUP = re.compile(r"[aeiouyäöü]+")
+_SENTENCE_END = re.compile(r"[.!?]+")
+
+
+def python_mask(chunks, readability_filter):
+    """Referenz: dieselbe Regel pro Chunk mit regulären Ausdrücken"""
+    mask = []
+    for chunk in chunks:
+        words = _WORD.findall(chunk)
+        if not words:
+            mask.append(True)
+            continue
+        sentences = max(len(_SENTENCE_END.findall(chunk)), 1)
+        syllables = sum(len(_VOWEL_GROUP.findall(word.lower())) for word in words)
+        ease = 180 - len(words) / sentences - 58.5 * syllables / len(words)
+        mask.append(ease >= readability_filter.min_reading_ease
+                    and len(words) / sentences <= readability_filter.max_sentence_words)
+    return np.array(mask)
+
+
+def build_document(chunk_count, simple_share):
+    """Chunks aus einfachen und komplexen Abschnitten im gewünschten Verhältnis"""
+    rng = np.random.default_rng(0)
+    chunks = []
+    for _ in range(chunk_count):
+        base = SIMPLE if rng.random() < simple_share else COMPLEX
+        chunks.append((base * math.ceil(CHUNK_SIZE / len(base)))[:CHUNK_SIZE])
+    return chunks
+
+
+def run(chunk_count, simple_share, rounds):
+    chunks = build_document(chunk_count, simple_share)
+    readability_filter = ReadabilityFilter()
+
+    vectorized = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        mask = readability_filter.simple_mask(chunks)
+        vectorized.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    reference = python_mask(chunks, readability_filter)
+    loop = time.perf_counter() - start
+    agreement = (mask == reference).mean()
+
+    policy = GenerationPolicy()
+    counts = [math.ceil(len(chunk) / CHARS_PER_TOKEN) for chunk in chunks]
+    saved = sum(count + policy.budget(count, MAX_NEW_TOKENS) for count, simple in zip(counts, mask) if simple)
+    total = sum(count + policy.budget(count, MAX_NEW_TOKENS) for count in counts)
+
+    best = min(vectorized)
+    print(f"Chunks: {len(chunks)} à {CHUNK_SIZE} Zeichen")
+    print(f"Vektorisiert: {best * 1000:8.2f} ms ({best / len(chunks) * 1e6:.1f} µs pro Chunk)")
+    print(f"Python-Schleife: {loop * 1000:8.2f} ms ({loop / best:.1f}x langsamer), Übereinstimmung {agreement:.1%}")
+    print(f"Übersprungen: {mask.sum()} von {len(chunks)} Chunks ({mask.mean():.1%})")
+    print(f"Eingesparte Tokens: {saved} von {total} ({saved / total:.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chunks', type=int, default=2000)
+    parser.add_argument('--simple-share', type=float, default=0.4, help='Anteil einfacher Abschnitte')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    run(args.chunks, args.simple_share, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
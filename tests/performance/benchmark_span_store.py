@@ -0,0 +1,108 @@
+"""
+Benchmark: Speicher der Span-Darstellung
+
+Vergleicht für ein mehrseitiges PDF den Speicher von
+
+- ``get_text("dict")`` aller Seiten (verschachtelte Dicts, wie bisher),
+- einer flachen Liste von Span-Dicts (nur Text, Rechteck, Schrift, Größe, Flags),
+- dem ``SpanStore`` (Spalten-Arrays, Textpuffer, internierte Schriften).
+
+Gemessen wird mit ``tracemalloc`` der nach dem Aufbau gehaltene Speicher,
+dazu die Aufbauzeit und eine Bereichsabfrage über alle Seiten.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_span_store
+    python -m tests.performance.benchmark_span_store --pages 1000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import fitz
+
+from span_store import TEXT_FLAGS, SpanStore
+from tests.performance.benchmark_pdf_extraction import build_pdf
+
+FIELDS = ('text', 'bbox', 'font', 'size', 'flags')
+
+
+def page_dicts(doc):
+    return [page.get_text("dict", flags=TEXT_FLAGS) for page in doc]
+
+
+def span_dicts(doc):
+    spans = []
+    for page in doc:
+        for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]:
+            for line in block.get("lines", ()):
+                for span in line["spans"]:
+                    spans.append({'page': page.number, **{field: span[field] for field in FIELDS}})
+    return spans
+
+
+def measure(path, build):
+    with fitz.open(path) as doc:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = build(doc)
+        seconds = time.perf_counter() - start
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, held, peak, seconds
+
+
+def region_query_dicts(spans, rect):
+    x0, y0, x1, y1 = rect
+    return [index for index, span in enumerate(spans)
+            if span['bbox'][0] < x1 and span['bbox'][2] > x0 and span['bbox'][1] < y1 and span['bbox'][3] > y0]
+
+
+def run(pages):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'spans.pdf')
+        build_pdf(path, pages)
+        results = {}
+        for label, build in (('dict je Seite', page_dicts), ('Span-Dicts', span_dicts),
+                             ('SpanStore', SpanStore.from_document)):
+            result, held, peak, seconds = measure(path, build)
+            results[label] = (held, peak, seconds)
+            if label == 'Span-Dicts':
+                spans = result
+            elif label == 'SpanStore':
+                store = result
+            del result
+
+    print(f"PDF: {pages} Seiten, {len(store)} Spans, {len(store.fonts)} Schriften")
+    baseline = results['dict je Seite'][0]
+    for label, (held, peak, seconds) in results.items():
+        print(f"{label:>15}: {held / 2 ** 20:7.1f} MB gehalten ({baseline / held:5.1f}x), "
+              f"Spitze {peak / 2 ** 20:7.1f} MB, {seconds * 1000:6.0f} ms, "
+              f"{held / max(len(store), 1):6.0f} B/Span")
+    print(f"SpanStore.nbytes: {store.nbytes / 2 ** 20:.1f} MB")
+
+    rect = (0, 400, 595, 600)
+    start = time.perf_counter()
+    expected = region_query_dicts(spans, rect)
+    dict_seconds = time.perf_counter() - start
+    store.in_region(None, rect)  # Spalten zusammenfügen
+    start = time.perf_counter()
+    found = store.in_region(None, rect)
+    store_seconds = time.perf_counter() - start
+    assert found.tolist() == expected, "Bereichsabfrage weicht ab"
+    print(f"Bereichsabfrage über alle Seiten ({len(found)} Spans): Dicts {dict_seconds * 1000:.2f} ms, "
+          f"SpanStore {store_seconds * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=300)
+    args = parser.parse_args()
+    run(args.pages)
+
+
+if __name__ == '__main__':
+    main()
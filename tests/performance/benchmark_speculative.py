@@ -0,0 +1,114 @@
+"""
+Benchmark: assistiertes Dekodieren mit Entwurfsmodell (Akzeptanzrate, Speedup)
+
+Mit --tiny wird ein zufälliges Hauptmodell erzeugt, dessen hintere Layer
+nur schwach auf den Residual-Stream schreiben. Das Entwurfsmodell übernimmt
+Embeddings, Ausgabe-Layer und die vorderen Layer - eine künstliche, aber
+kontrollierte Annäherung an ein destilliertes Entwurfsmodell.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_speculative --model microsoft/phi-4-mini-instruct --draft <entwurfsmodell>
+    python -m tests.performance.benchmark_speculative --tiny
+"""
+import argparse
+import copy
+import time
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from speculative import AssistedDecodingStats, count_forward_passes
+
+PROMPTS = [
+    "Vereinfache den folgenden Text in einfaches de:\n\n"
+    "Die Verwaltung prüft den Antrag innerhalb von vier Wochen.\n\nVereinfachter Text:",
+    "Vereinfache den folgenden Text in einfaches de:\n\n"
+    "Der Bescheid enthält eine Rechtsbehelfsbelehrung.\n\nVereinfachter Text:",
+    "Vereinfache folgenden Text auf einfachem Deutsch:\n\n"
+    "Gegen den Bescheid kann innerhalb eines Monats Widerspruch erhoben werden.\n\nVereinfachter Text:",
+]
+
+
+def damp_upper_layers(model, num_layers, scale):
+    """Schwächt die Ausgabeprojektionen aller Layer ab ``num_layers`` ab"""
+    with torch.no_grad():
+        for layer in model.model.layers[num_layers:]:
+            layer.self_attn.o_proj.weight.mul_(scale)
+            layer.mlp.down_proj.weight.mul_(scale)
+    return model
+
+
+def truncated_draft(model, num_layers):
+    """Entwurfsmodell aus den ersten Layern des Hauptmodells"""
+    draft = copy.deepcopy(model)
+    draft.model.layers = draft.model.layers[:num_layers]
+    draft.config.num_hidden_layers = num_layers
+    if hasattr(draft.config, 'layer_types') and draft.config.layer_types:
+        draft.config.layer_types = draft.config.layer_types[:num_layers]
+    return draft.eval()
+
+
+def run(tokenizer, model, draft, max_new_tokens):
+    stats = AssistedDecodingStats()
+    timings = {'plain': 0.0, 'assisted': 0.0}
+    identical = 0
+
+    with torch.no_grad():
+        for prompt in PROMPTS:
+            input_ids = tokenizer(prompt, return_tensors='pt')['input_ids']
+            kwargs = dict(
+                input_ids=input_ids,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id,
+            )
+
+            start = time.perf_counter()
+            plain = model.generate(**kwargs)
+            timings['plain'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            with count_forward_passes(model, draft) as counts:
+                assisted = model.generate(assistant_model=draft, **kwargs)
+            timings['assisted'] += time.perf_counter() - start
+
+            stats.record(assisted.shape[-1] - input_ids.shape[-1], counts[0], counts[1])
+            identical += int(torch.equal(plain, assisted))
+
+    result = stats.as_dict()
+    print(f"Ohne Entwurfsmodell: {timings['plain']:.2f}s")
+    print(f"Mit Entwurfsmodell:  {timings['assisted']:.2f}s")
+    print(f"Speedup:             {timings['plain'] / timings['assisted']:.2f}x")
+    print(f"Akzeptanzrate:       {result['acceptance_rate'] * 100:.1f}%")
+    print(f"Tokens pro Schritt:  {result['tokens_per_target_step']:.2f}")
+    print(f"Identische Ausgaben: {identical}/{len(PROMPTS)} (greedy)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='microsoft/phi-4-mini-instruct')
+    parser.add_argument('--draft', help='Entwurfsmodell mit demselben Tokenizer')
+    parser.add_argument('--tiny', action='store_true', help='kleines Zufallsmodell verwenden')
+    parser.add_argument('--draft-layers', type=int, default=1)
+    parser.add_argument('--damping', type=float, default=0.02, help='Skalierung der hinteren Layer (--tiny)')
+    parser.add_argument('--max-new-tokens', type=int, default=64)
+    args = parser.parse_args()
+
+    if args.tiny:
+        from tests.tiny_model import build_tiny_model, build_tiny_tokenizer
+        tokenizer = build_tiny_tokenizer()
+        model = build_tiny_model(tokenizer, hidden_size=512, num_hidden_layers=8)
+        damp_upper_layers(model, args.draft_layers, args.damping)
+        draft = truncated_draft(model, args.draft_layers)
+    else:
+        if not args.draft:
+            parser.error('--draft ist ohne --tiny erforderlich')
+        tokenizer = AutoTokenizer.from_pretrained(args.model)
+        model = AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32).eval()
+        draft = AutoModelForCausalLM.from_pretrained(args.draft, torch_dtype=torch.float32).eval()
+
+    run(tokenizer, model, draft, args.max_new_tokens)
+
+
+if __name__ == '__main__':
+    main()
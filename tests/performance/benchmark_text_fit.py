@@ -0,0 +1,126 @@
+"""
+Benchmark: Schriftgröße für vereinfachte Blöcke
+
+Vergleicht die bisherige Suche (Probesatz mit ``fill_textbox``, pro
+Versuch 10 % kleiner) mit ``pdf_layout.fit_text``, das die größte
+passende Größe aus vorberechneten Glyphenbreiten bestimmt und die
+berechneten Zeilen einmal setzt. Die Blöcke haben Fließtextgröße und einen vereinfachten Text, der
+meist länger als das Original ist. Ausgegeben werden Zeit pro Block,
+Anzahl der Probesätze und die mittlere Schriftgröße.
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_text_fit
+    python -m tests.performance.benchmark_text_fit --blocks 5000
+"""
+import argparse
+import random
+import time
+
+import fitz
+
+from pdf_layout import FONT_NAME, MIN_FONT_SIZE, fit_text
+from text_fit import metrics_for
+
+WORDS = (
+    "Sie können gegen den Bescheid innerhalb eines Monats Widerspruch einlegen. "
+    "Das heißt: Sie schreiben an das Amt, dass Sie nicht einverstanden sind. "
+    "Die Verwaltung prüft Ihren Antrag noch einmal. Sie bekommen dann eine Antwort."
+).split()
+PAGE_RECT = fitz.Rect(0, 0, 595, 842)
+# Bisherige Verkleinerung pro Versuch
+SHRINK_FACTOR = 0.9
+
+
+def shrink_loop(rect, text, font_size, font):
+    """Bisheriges fit_text: Probesatz, bis der Text passt; liefert Writer und Versuche"""
+    size, attempts = font_size, 0
+    while size >= MIN_FONT_SIZE:
+        attempts += 1
+        writer = fitz.TextWriter(PAGE_RECT)
+        try:
+            overflow = writer.fill_textbox(rect, text, font=font, fontsize=size)
+        except ValueError:
+            overflow = True
+        if not overflow:
+            return writer, size, attempts
+        size *= SHRINK_FACTOR
+    return None, None, attempts
+
+
+def build_blocks(count, seed=0):
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(count):
+        lines = rng.randint(1, 8)
+        font_size = rng.uniform(9, 12)
+        width = rng.uniform(150, 480)
+        rect = fitz.Rect(60, 100, 60 + width, 100 + lines * font_size * 1.2 + 2)
+        # Vereinfachter Text: etwa 1 bis 2,5 Mal so viel wie ins Original passte
+        words = int(width / font_size / 0.5 / 6 * lines * rng.uniform(1.0, 2.5))
+        text = " ".join(rng.choice(WORDS) for _ in range(max(words, 1)))
+        blocks.append((rect, text, font_size))
+    return blocks
+
+
+def run(count, rounds):
+    blocks = build_blocks(count)
+    font = fitz.Font(FONT_NAME)
+
+    def old():
+        results = [shrink_loop(rect, text, size, font) for rect, text, size in blocks]
+        return [size for _, size, _ in results], sum(attempts for _, _, attempts in results)
+
+    calls = 0
+    fill_textbox = fitz.TextWriter.fill_textbox
+
+    def counting_fill_textbox(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return fill_textbox(*args, **kwargs)
+
+    def new():
+        return [fit_text(rect, text, size, PAGE_RECT) for rect, text, size in blocks]
+
+    results = {}
+    for label, function in (('Probesatz-Schleife', old), ('text_fit', new)):
+        timings = []
+        for _ in range(rounds):
+            # Kalter Cache: jeder Text wird neu vermessen
+            metrics_for(FONT_NAME).measure.cache_clear()
+            start = time.perf_counter()
+            output = function()
+            timings.append(time.perf_counter() - start)
+        results[label] = (min(timings), output)
+
+    old_seconds, (old_sizes, attempts) = results['Probesatz-Schleife']
+    new_seconds, _ = results['text_fit']
+
+    fitz.TextWriter.fill_textbox = counting_fill_textbox
+    try:
+        metrics = metrics_for(FONT_NAME)
+        metrics.measure.cache_clear()
+        new_sizes = [metrics.fit_size(rect, text, size, MIN_FONT_SIZE) for rect, text, size in blocks]
+        for rect, text, size in blocks:
+            fit_text(rect, text, size, PAGE_RECT)
+    finally:
+        fitz.TextWriter.fill_textbox = fill_textbox
+
+    fitted_old = [size for size in old_sizes if size]
+    fitted_new = [size for size in new_sizes if size]
+    print(f"{count} Blöcke, {len(fitted_new)} passen (vorher {len(fitted_old)})")
+    print(f"Probesatz-Schleife: {old_seconds * 1000 / count:6.3f} ms/Block, {attempts / count:4.1f} Probesätze/Block, "
+          f"mittlere Größe {sum(fitted_old) / max(len(fitted_old), 1):5.2f} pt")
+    print(f"          text_fit: {new_seconds * 1000 / count:6.3f} ms/Block, {calls / count:4.1f} Probesätze/Block, "
+          f"mittlere Größe {sum(fitted_new) / max(len(fitted_new), 1):5.2f} pt ({old_seconds / new_seconds:4.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--blocks', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    run(args.blocks, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: PDF-Upload über Zwischendateien und im Speicher
+
+Schickt ein PDF an die Hauptroute, einmal wie bisher (Upload von
+Werkzeug ab 500 KB in eine temporäre Datei, dann ``input.pdf`` speichern,
+von dort öffnen, ``simplified.pdf`` schreiben und zum Senden lesen) und
+einmal über ``SpooledRequest``/``upload_buffer`` im Speicher. Das Modell
+ist ausgeschaltet (Text bleibt unverändert), gemessen wird nur die
+Dateibehandlung samt Extraktion und Ausgabe. Jede Seite trägt ein Bild,
+damit das PDF die Größe eines gescannten Bescheids erreicht. Gezählt
+werden die dabei geschriebenen Bytes (``wchar`` aus ``/proc/self/io``,
+nur Linux).
+
+Ausführen aus dem Projektverzeichnis:
+    python -m tests.performance.benchmark_upload
+    python -m tests.performance.benchmark_upload --pages 200 --rounds 5
+"""
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+from unittest.mock import patch
+
+import fitz
+from flask import Request
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import encode_multipart
+
+import app
+from deadline import SimplificationResult
+from tests.performance.benchmark_pdf_extraction import build_pdf
+
+
+def written_bytes():
+    with open('/proc/self/io') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('wchar'))
+
+
+def add_images(path, seed=0):
+    """Ein Rauschbild pro Seite (lässt sich kaum komprimieren)"""
+    rng = random.Random(seed)
+    with fitz.open(path) as doc:
+        for page in doc:
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 160, 160), 0)
+            pixmap.set_rect(pixmap.irect, (0, 0, 0))
+            samples = bytes(rng.getrandbits(8) for _ in range(160 * 160 * 3))
+            page.insert_image(fitz.Rect(400, 40, 560, 200), pixmap=fitz.Pixmap(fitz.csRGB, 160, 160, samples, 0))
+        data = doc.tobytes()
+    return data
+
+
+def disk_route(file):
+    """Bisherige Dateibehandlung der PDF-Route"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_pdf_path = os.path.join(temp_dir, 'input.pdf')
+        file.save(input_pdf_path)
+        output_pdf_path = os.path.join(temp_dir, 'simplified.pdf')
+        app.create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path)
+        with open(output_pdf_path, 'rb') as f:
+            return f.read()
+
+
+def run(pages, rounds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'eingabe.pdf')
+        build_pdf(path, pages)
+        data = add_images(path)
+
+    # Anfrage einmal vorab kodieren; der Test-Client spoolt sonst selbst auf die Platte
+    boundary, body = encode_multipart({'file': FileStorage(io.BytesIO(data), 'eingabe.pdf')})
+
+    def post(client):
+        response = client.post('/', data=body, content_type=f'multipart/form-data; boundary={boundary}')
+        assert response.status_code == 200
+        return response.data
+
+    results = {}
+    unchanged = lambda texts, *args: SimplificationResult(list(texts), [None] * len(texts))  # noqa: E731
+    with patch('app.simplify_blocks', side_effect=unchanged), \
+            patch('app.wait_for_initialization', return_value=True):
+        client = app.app.test_client()
+        for label in ('Zwischendateien', 'im Speicher'):
+            request_class = Request if label == 'Zwischendateien' else app.app.request_class
+            route = (lambda: disk_route(app.request.files['file'])) if label == 'Zwischendateien' else None
+            with patch.object(app.app, 'request_class', request_class), \
+                    patch.dict(app.app.view_functions, {'index': route} if route else {}):
+                timings = []
+                written = written_bytes()
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    post(client)
+                    timings.append(time.perf_counter() - start)
+                results[label] = (min(timings), (written_bytes() - written) / rounds)
+
+    print(f"PDF: {pages} Seiten, {len(data) / 1024 / 1024:.1f} MB")
+    for label, (seconds, written) in results.items():
+        print(f"{label:>16}: {seconds * 1000:7.1f} ms, {written / 1024 / 1024:5.1f} MB geschrieben pro Anfrage")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    run(args.pages, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,13 @@
 import pytest
 import tempfile
 import os
+import json
+import subprocess
+import sys
 from unittest.mock import patch, MagicMock
+from flask import Response
 from app import app, create_layout_preserving_simplified_pdf
+from deadline import SimplificationResult
 
 
 class TestFlaskApp:
@@ -10,9 +15,9 @@ class TestFlaskApp:
     
     @pytest.fixture
     def client(self):
-        """Test-Client erstellen"""
+        """Test-Client erstellen; das Modell gilt als geladen"""
         app.config['TESTING'] = True
-        with app.test_client() as client:
+        with patch('app.wait_for_initialization', return_value=True), app.test_client() as client:
             yield client
     
     def test_index_get(self, client):
@@ -69,16 +74,19 @@ class TestFlaskApp:
         mock_doc = MagicMock()
         mock_doc.__len__.return_value = 1
         mock_page = MagicMock()
-        mock_page.get_text.return_value = {"blocks": []}
+        mock_page.rect.width = 595
+        mock_page.rect.height = 842
+        mock_page.get_text.return_value = []
         mock_doc.__getitem__.return_value = mock_page
         mock_fitz.return_value = mock_doc
         
         # Mock send_file
-        mock_send_file.return_value = 'PDF content'
+        mock_send_file.return_value = Response(b'PDF content', mimetype='application/pdf')
         
-        # Mock vereinfachte PDF-Erstellung
-        with patch('app.simplify_full_text') as mock_simplify:
-            mock_simplify.return_value = "Simplified text"
+        # Mock vereinfachte PDF-Erstellung: Frist nach dem ersten von zwei Chunks erreicht
+        with patch('app.PDF_LAYOUT_MODE', 'text'), patch('app.PDF_PIPELINE', False), \
+                patch('app.simplify_full_text') as mock_simplify:
+            mock_simplify.return_value = SimplificationResult(["Text eins", "Text zwei"], ["Eins", None])
             
             # Erstelle temporäre PDF-Datei
             with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
@@ -90,6 +98,10 @@ class TestFlaskApp:
                     response = client.post('/', data={'file': (f, 'test.pdf')})
                 
                 assert response.status_code == 200
+                assert response.headers['X-Simplified-Chunks'] == '1/2'
+                assert response.headers['X-Simplified-Ratio'] == '0.500'
+                assert response.headers['X-Simplification-Partial'] == 'true'
+                assert mock_simplify.call_args.kwargs['deadline'].bounded
             finally:
                 os.unlink(tmp_path)
     
@@ -110,9 +122,171 @@ class TestFlaskApp:
             os.unlink(tmp_path)
 
 
+class TestStreaming:
+    """Tests für den Streaming-Endpunkt"""
+
+    @pytest.fixture
+    def client(self):
+        """Test-Client erstellen; das Modell gilt als geladen"""
+        app.config['TESTING'] = True
+        with patch('app.wait_for_initialization', return_value=True), app.test_client() as client:
+            yield client
+
+    @patch('app.stream_full_text')
+    def test_stream_events(self, mock_stream, client):
+        """Test Server-Sent Events pro Token und Chunk"""
+        mock_stream.return_value = iter([(0, 2, "Ein"), (0, 2, " Text"), (1, 2, "Zwei")])
+
+        response = client.post('/simplify/stream', data={'text': 'Test text'})
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = [
+            (block.split('\n')[0][len('event: '):], json.loads(block.split('\n')[1][len('data: '):]))
+            for block in response.get_data(as_text=True).strip().split('\n\n')
+        ]
+        assert [event for event, _ in events] == ['token', 'token', 'chunk_end', 'token', 'chunk_end', 'done']
+        assert "".join(data['text'] for event, data in events if event == 'token') == "Ein TextZwei"
+        assert events[-1][1]['chunks'] == 2
+        assert events[-1][1]['time_to_first_token'] is not None
+
+    @patch('app.stream_full_text')
+    def test_stream_error_event(self, mock_stream, client):
+        """Test Fehler während des Streamings"""
+        mock_stream.side_effect = RuntimeError("Modellfehler")
+
+        response = client.post('/simplify/stream', data={'text': 'Test text'})
+
+        assert b'event: error' in response.data
+
+    def test_stream_empty_text(self, client):
+        """Test Streaming mit leerem Text"""
+        response = client.post('/simplify/stream', data={'text': ''})
+        assert response.status_code == 400
+
+
+class TestHealth:
+    """Tests für Liveness- und Readiness-Endpunkte"""
+
+    @pytest.fixture
+    def client(self):
+        """Test-Client erstellen"""
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+
+    def test_liveness(self, client):
+        """Test dass Liveness unabhängig vom Modell antwortet"""
+        with patch('app.get_model_status', return_value={'state': 'loading', 'ready': False}):
+            response = client.get('/health/live')
+        assert response.status_code == 200
+        assert json.loads(response.data)['status'] == 'alive'
+
+    @patch('app.latex_available', return_value=True)
+    @patch('app.get_model_status')
+    def test_readiness_while_loading(self, mock_status, mock_latex, client):
+        """Test 503 solange das Modell lädt"""
+        mock_status.return_value = {'state': 'loading', 'ready': False, 'loaded': False, 'error': None}
+
+        response = client.get('/health/ready')
+
+        assert response.status_code == 503
+        data = json.loads(response.data)
+        assert data['status'] == 'not_ready'
+        assert data['model_state'] == 'loading'
+        assert data['checks'] == {'model_ready': False, 'latex_available': True}
+
+    @patch('app.latex_available', return_value=True)
+    @patch('app.get_model_status')
+    def test_readiness_ready(self, mock_status, mock_latex, client):
+        """Test 200 mit aufgewärmtem Modell und LaTeX"""
+        mock_status.return_value = {'state': 'ready', 'ready': True, 'loaded': True, 'error': None}
+
+        response = client.get('/health/ready')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['status'] == 'ready'
+
+    @patch('app.latex_available', return_value=False)
+    @patch('app.get_model_status')
+    def test_readiness_without_latex(self, mock_status, mock_latex, client):
+        """Test 503 wenn pdflatex fehlt"""
+        mock_status.return_value = {'state': 'ready', 'ready': True, 'loaded': True, 'error': None}
+
+        response = client.get('/health/ready')
+
+        assert response.status_code == 503
+        assert json.loads(response.data)['checks']['latex_available'] is False
+
+    @patch('app.get_model_status')
+    def test_health_reports_model_state(self, mock_status, client):
+        """Test dass /health den echten Modellzustand meldet"""
+        mock_status.return_value = {'state': 'failed', 'ready': False, 'loaded': False, 'error': 'kaputt'}
+
+        data = json.loads(client.get('/health').data)
+
+        assert data['status'] == 'healthy'
+        assert data['model_loaded'] is False
+        assert data['model_state'] == 'failed'
+
+    @patch('app.stream_full_text')
+    @patch('app.wait_for_initialization', return_value=False)
+    def test_early_request_gets_503(self, mock_wait, mock_stream, client):
+        """Test schnelle 503 mit Retry-After, solange das Modell noch lädt"""
+        response = client.post('/simplify/stream', data={'text': 'Test text'})
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '10'
+        mock_wait.assert_called_once()
+        mock_stream.assert_not_called()
+
+
+class TestLiteApp:
+    """Tests für den Einstiegspunkt ohne KI-Abhängigkeiten"""
+
+    # Kaltstart ohne torch/transformers: gemessen ~0,5 s und ~65 MB (mit torch ~9 s, ~700 MB)
+    IMPORT_TIME_BUDGET = 2.5
+    RSS_BUDGET_MB = 150
+
+    LITE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import lite_app
+import_time = time.perf_counter() - start
+with open('/proc/self/status') as status:
+    rss_mb = next(int(line.split()[1]) for line in status if line.startswith('VmRSS')) / 1024
+client = lite_app.app.test_client()
+print(json.dumps({
+    'import_time': import_time,
+    'rss_mb': rss_mb,
+    'index': client.get('/').status_code,
+    'stream': client.post('/simplify/stream', data={'text': 'Ein Text.'}).status_code,
+    'ready': client.get('/health/ready').get_json()['checks'],
+    'ml_modules': sorted(name for name in ('torch', 'transformers', 'your_model_utils') if name in sys.modules),
+}))
+"""
+
+    def test_cold_start_budget(self):
+        """Test dass der Lite-Pfad torch nie importiert und schnell und schlank startet"""
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        completed = subprocess.run(
+            [sys.executable, '-c', self.LITE_SCRIPT],
+            cwd=project_dir, capture_output=True, text=True, check=True
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        assert result['ml_modules'] == []
+        assert result['import_time'] < self.IMPORT_TIME_BUDGET
+        assert result['rss_mb'] < self.RSS_BUDGET_MB
+        assert result['index'] == 200
+        assert result['stream'] == 501
+        assert 'model_ready' not in result['ready']
+
+
 class TestPDFProcessing:
     """Tests für PDF-Verarbeitung"""
     
+    @patch('app.PDF_PIPELINE', False)
     @patch('app.fitz.open')
     @patch('app.simplify_full_text')
     def test_create_layout_preserving_simplified_pdf(self, mock_simplify, mock_fitz):
@@ -124,19 +298,13 @@ class TestPDFProcessing:
         mock_page = MagicMock()
         mock_page.rect.width = 595
         mock_page.rect.height = 842
-        mock_page.get_text.return_value = {
-            "blocks": [{
-                "lines": [{
-                    "spans": [{"text": "Original text"}]
-                }]
-            }]
-        }
+        mock_page.get_text.return_value = [(50, 50, 200, 80, "Original\ntext\n", 0, 0)]
         
         mock_doc.__getitem__.return_value = mock_page
         mock_fitz.return_value = mock_doc
         
         # Mock vereinfachter Text
-        mock_simplify.return_value = "Simplified text"
+        mock_simplify.return_value = SimplificationResult(["Original text"], ["Simplified text"])
         
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as input_pdf:
             input_pdf.write(b'%PDF-1.4 fake pdf')
@@ -146,16 +314,145 @@ class TestPDFProcessing:
             output_pdf_path = output_pdf.name
         
         try:
-            create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path)
+            report = create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path, layout='text')
             
             # Überprüfe, dass Funktionen aufgerufen wurden
             mock_fitz.assert_called()
             mock_simplify.assert_called_once()
+            assert mock_simplify.call_args[0][0] == "Original text"
+            assert report['partial'] is False
+            # fitz.open ist hier gemockt, Document liest die echte Ausgabe (Ligaturen aufgelöst)
+            import fitz
+            with fitz.Document(output_pdf_path) as output:
+                text = output[0].get_text(flags=fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES)
+                assert text.strip() == "Simplified text"
             
         finally:
             os.unlink(input_pdf_path)
             os.unlink(output_pdf_path)
     
+    @patch('app.simplify_blocks')
+    def test_block_layout_rewrites_every_page(self, mock_simplify, tmp_path):
+        """Test Blockmodus: jede Seite wird in ihren Blöcken ersetzt, Bilder bleiben"""
+        import fitz
+        input_pdf_path = str(tmp_path / 'input.pdf')
+        output_pdf_path = str(tmp_path / 'output.pdf')
+        doc = fitz.open()
+        for number in range(3):
+            page = doc.new_page()
+            page.insert_textbox(fitz.Rect(72, 300, 400, 368), f"Absatz auf Seite {number}", fontsize=11)
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0)
+            page.insert_image(fitz.Rect(72, 400, 172, 500), pixmap=pixmap)
+        doc.save(input_pdf_path)
+        doc.close()
+        mock_simplify.side_effect = lambda texts, language, deadline: SimplificationResult(
+            list(texts), [text.replace("Absatz", "Text") for text in texts]
+        )
+
+        report = create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path, layout='blocks')
+
+        assert mock_simplify.call_args[0][0] == [f"Absatz auf Seite {number}" for number in range(3)]
+        assert report['simplified_chunks'] == 3
+        with fitz.open(output_pdf_path) as output:
+            assert len(output) == 3
+            for number, page in enumerate(output):
+                assert page.get_text().strip() == f"Text auf Seite {number}"
+                assert len(page.get_images()) == 1
+
+    @patch('app.simplify_blocks')
+    def test_block_layout_keeps_page_furniture(self, mock_simplify, tmp_path):
+        """Test Blockmodus: Kopfzeile und Seitenzahl bleiben, gleiche Absätze gehen einmal an das Modell"""
+        import fitz
+        input_pdf_path = str(tmp_path / 'input.pdf')
+        output_pdf_path = str(tmp_path / 'output.pdf')
+        doc = fitz.open()
+        for number in range(4):
+            page = doc.new_page()
+            page.insert_text((72, 40), "Stadt Musterstadt, Bürgeramt", fontsize=9)
+            page.insert_textbox(fitz.Rect(72, 300, 400, 368), "Gleicher Absatz auf jeder Seite", fontsize=11)
+            page.insert_text((280, 800), f"{number + 1}", fontsize=9)
+        doc.save(input_pdf_path)
+        doc.close()
+        mock_simplify.side_effect = lambda texts, language, deadline: SimplificationResult(
+            list(texts), [text.upper() for text in texts]
+        )
+
+        report = create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path, layout='blocks')
+
+        assert mock_simplify.call_args[0][0] == ["Gleicher Absatz auf jeder Seite"]
+        assert report['structural_blocks'] == 8
+        assert report['duplicate_blocks'] == 3
+        assert report['tokens_removed'] > 0
+        with fitz.open(output_pdf_path) as output:
+            for number, page in enumerate(output):
+                assert page.get_text().split("\n")[:3] == [
+                    "Stadt Musterstadt, Bürgeramt", f"{number + 1}", "GLEICHER ABSATZ AUF JEDER SEITE"
+                ]
+
+    @patch('app.simplify_blocks')
+    def test_selected_pages(self, mock_simplify, tmp_path):
+        """Test Seitenauswahl: nur diese Seiten werden gelesen, vereinfacht und ausgegeben"""
+        import fitz
+        input_pdf_path = str(tmp_path / 'input.pdf')
+        doc = fitz.open()
+        for number in range(5):
+            doc.new_page().insert_textbox(fitz.Rect(72, 300, 400, 368), f"Absatz auf Seite {number}", fontsize=11)
+        doc.save(input_pdf_path)
+        doc.close()
+        mock_simplify.side_effect = lambda texts, language, deadline: SimplificationResult(
+            list(texts), [text.upper() for text in texts]
+        )
+
+        for layout in ('blocks', 'text'):
+            output_pdf_path = str(tmp_path / f'{layout}.pdf')
+            report = create_layout_preserving_simplified_pdf(input_pdf_path, output_pdf_path, layout=layout,
+                                                             pages=[1, 3])
+
+            assert report['simplified_chunks'] == report['total_chunks']
+            with fitz.Document(output_pdf_path) as output:
+                text = "".join(page.get_text() for page in output)
+            assert "ABSATZ AUF SEITE 1" in text and "ABSATZ AUF SEITE 3" in text
+            assert "SEITE 0" not in text and "SEITE 2" not in text
+        assert mock_simplify.call_args_list[0][0][0] == ["Absatz auf Seite 1", "Absatz auf Seite 3"]
+
+    @patch('app.simplify_blocks')
+    def test_text_layout_pipeline(self, mock_simplify, tmp_path):
+        """Test Textmodus als Pipeline: Chunks in Gruppen, Ausgabe wie ohne Pipeline, Auslastung im Bericht"""
+        import math
+        import fitz
+        from app import simplification_headers
+        from your_model_utils import split_into_chunks
+        input_pdf_path = str(tmp_path / 'input.pdf')
+        doc = fitz.open()
+        for number in range(6):
+            page = doc.new_page()
+            page.insert_textbox(fitz.Rect(72, 72, 520, 700), f"Seite {number}: " + "wort " * 150, fontsize=11)
+        doc.save(input_pdf_path)
+        doc.close()
+
+        def upper(chunks):
+            return SimplificationResult(list(chunks), [chunk.upper() for chunk in chunks])
+
+        mock_simplify.side_effect = lambda texts, language, deadline: upper(texts)
+        report = create_layout_preserving_simplified_pdf(input_pdf_path, str(tmp_path / 'pipeline.pdf'), layout='text')
+        # Ohne Pipeline: ganzer Text auf einmal, dieselben Chunks
+        with patch('app.PDF_PIPELINE', False), \
+                patch('app.simplify_full_text', side_effect=lambda text, *args, **kwargs: upper(split_into_chunks(text))):
+            create_layout_preserving_simplified_pdf(input_pdf_path, str(tmp_path / 'sequential.pdf'), layout='text')
+        outputs = {}
+        for name in ('pipeline', 'sequential'):
+            with fitz.Document(str(tmp_path / f'{name}.pdf')) as output:
+                outputs[name] = [page.get_text() for page in output]
+
+        assert outputs['pipeline'] == outputs['sequential']
+        assert "SEITE 5: WORT" in "".join(outputs['pipeline'])
+        assert report['simplified_chunks'] == report['total_chunks'] > 8
+        assert mock_simplify.call_count == math.ceil(report['total_chunks'] / 8)
+        assert set(report['pipeline']['stages']) == {'extraction', 'inference', 'render'}
+        headers = simplification_headers(report)
+        assert headers['X-Pipeline-Utilization'].startswith("extraction=")
+        assert headers['X-Pipeline-Queue-Depth'].endswith("/16")
+
     @patch('app.fitz.open')
     def test_create_layout_preserving_simplified_pdf_error(self, mock_fitz):
         """Test PDF-Verarbeitung mit Fehler"""
@@ -165,14 +462,172 @@ class TestPDFProcessing:
             create_layout_preserving_simplified_pdf("input.pdf", "output.pdf")
 
 
+class TestPagedDocuments:
+    """Tests für den seitenweisen Abruf mit Seiten-Cache"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        """Test-Client mit leerem Seiten-Cache; das Modell gilt als geladen"""
+        from page_cache import PageCache
+        app.config['TESTING'] = True
+        with patch('app.wait_for_initialization', return_value=True), \
+                patch('app.page_cache', PageCache(str(tmp_path))), app.test_client() as client:
+            yield client
+
+    @pytest.fixture
+    def pdf_bytes(self):
+        import fitz
+        doc = fitz.open()
+        for number in range(3):
+            doc.new_page().insert_textbox(fitz.Rect(72, 300, 400, 368), f"Absatz auf Seite {number + 1}", fontsize=11)
+        data = doc.tobytes()
+        doc.close()
+        return data
+
+    @pytest.fixture
+    def mock_simplify(self):
+        with patch('app.simplify_blocks') as mock_simplify:
+            mock_simplify.side_effect = lambda texts, language, deadline: SimplificationResult(
+                list(texts), [text.upper() for text in texts]
+            )
+            yield mock_simplify
+
+    def upload(self, client, data):
+        from io import BytesIO
+        return client.post('/pdf/documents', data={'file': (BytesIO(data), 'dokument.pdf')},
+                           content_type='multipart/form-data')
+
+    def test_page_on_demand_is_cached(self, client, pdf_bytes, mock_simplify):
+        """Test dass eine Seite beim ersten Abruf vereinfacht und danach aus dem Cache geliefert wird"""
+        import fitz
+        from page_cache import document_key
+        response = self.upload(client, pdf_bytes)
+        assert response.status_code == 201
+        assert response.get_json() == {'document': document_key(pdf_bytes), 'pages': 3}
+        url = f"/pdf/documents/{document_key(pdf_bytes)}/pages/2"
+
+        first = client.get(url)
+        second = client.get(url)
+
+        assert first.headers['X-Page-Cache'] == 'miss'
+        assert second.headers['X-Page-Cache'] == 'hit'
+        assert first.data == second.data
+        assert second.headers['X-Simplified-Chunks'] == '1/1'
+        assert mock_simplify.call_count == 1
+        assert mock_simplify.call_args[0][0] == ["Absatz auf Seite 2"]
+        with fitz.open(stream=second.data, filetype='pdf') as output:
+            assert len(output) == 1
+            assert output[0].get_text().strip() == "ABSATZ AUF SEITE 2"
+
+    def test_partial_page_not_cached(self, client, pdf_bytes):
+        """Test dass eine nach Ablauf der Frist nur teilweise vereinfachte Seite erneut berechnet wird"""
+        key = self.upload(client, pdf_bytes).get_json()['document']
+        with patch('app.simplify_blocks', side_effect=lambda texts, language, deadline: SimplificationResult(
+                list(texts), [None] * len(texts))):
+            assert client.get(f"/pdf/documents/{key}/pages/1").headers['X-Simplification-Partial'] == 'true'
+            assert client.get(f"/pdf/documents/{key}/pages/1").headers['X-Page-Cache'] == 'miss'
+
+    def test_unknown_document_and_page(self, client, pdf_bytes, mock_simplify):
+        """Test 404 für unbekannte Dokumente und Seiten außerhalb des Dokuments"""
+        key = self.upload(client, pdf_bytes).get_json()['document']
+
+        assert client.get(f"/pdf/documents/{'0' * 64}/pages/1").status_code == 404
+        assert client.get(f"/pdf/documents/{key}/pages/4").status_code == 404
+        assert client.get(f"/pdf/documents/{key}/pages/0").status_code == 404
+        assert not mock_simplify.called
+
+    def test_invalid_upload(self, client):
+        """Test dass kein gültiges PDF abgelehnt wird"""
+        assert self.upload(client, b"kein pdf").status_code == 400
+
+    def test_pages_parameter(self, client, pdf_bytes, mock_simplify):
+        """Test Seitenauswahl beim Hochladen über die Hauptroute"""
+        from io import BytesIO
+        response = client.post('/', data={'file': (BytesIO(pdf_bytes), 'dokument.pdf'), 'pages': '2-3'},
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 200
+        assert response.headers['X-Selected-Pages'] == '2/3'
+        assert mock_simplify.call_args[0][0] == ["Absatz auf Seite 2", "Absatz auf Seite 3"]
+
+        response = client.post('/', data={'file': (BytesIO(pdf_bytes), 'dokument.pdf'), 'pages': '2-7'},
+                               content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert 'außerhalb' in response.get_json()['error']
+
+    def test_pages_parameter_invalid_pdf(self, client, mock_simplify):
+        """Test dass ein beschädigtes PDF mit Seitenauswahl abgelehnt statt mit 500 beantwortet wird"""
+        from io import BytesIO
+        response = client.post('/', data={'file': (BytesIO(b"%PDF-1.4 kaputt"), 'dokument.pdf'), 'pages': '1'},
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Ungültige PDF-Datei'}
+        assert not mock_simplify.called
+
+
+class TestInMemoryUploads:
+    """Tests für PDF-Uploads ohne Zwischendateien"""
+
+    @pytest.fixture
+    def client(self):
+        app.config['TESTING'] = True
+        with patch('app.wait_for_initialization', return_value=True), \
+                patch('app.simplify_blocks', side_effect=lambda texts, language, deadline: SimplificationResult(
+                    list(texts), [text.upper() for text in texts])), \
+                app.test_client() as client:
+            yield client
+
+    @pytest.fixture
+    def pdf_bytes(self):
+        import fitz
+        doc = fitz.open()
+        for number in range(3):
+            doc.new_page().insert_textbox(fitz.Rect(72, 300, 400, 368), f"Absatz auf Seite {number + 1}", fontsize=11)
+        data = doc.tobytes()
+        doc.close()
+        return data
+
+    def post(self, client, data):
+        from io import BytesIO
+        response = client.post('/', data={'file': (BytesIO(data), 'dokument.pdf')}, content_type='multipart/form-data')
+        assert response.status_code == 200
+        return response.data
+
+    def test_small_upload_never_touches_disk(self, client, pdf_bytes):
+        """Test dass Upload, Verarbeitung und Ausgabe ohne temporäre Dateien auskommen"""
+        import fitz
+        with patch('upload_buffer.tempfile.SpooledTemporaryFile', side_effect=AssertionError("Platte")), \
+                patch('app.tempfile.TemporaryDirectory', side_effect=AssertionError("Platte")), \
+                patch('app.fitz.open', wraps=fitz.open) as mock_open:
+            output = self.post(client, pdf_bytes)
+
+        assert all('stream' in call.kwargs for call in mock_open.call_args_list)
+        with fitz.open(stream=output, filetype='pdf') as doc:
+            assert [page.get_text().strip() for page in doc] == [f"ABSATZ AUF SEITE {n}" for n in (1, 2, 3)]
+
+    def test_large_upload_is_memory_mapped(self, client, pdf_bytes):
+        """Test dass ein Upload über der Schwelle gespoolt und speicherabgebildet dasselbe Ergebnis liefert"""
+        import fitz
+        import mmap
+        expected = self.post(client, pdf_bytes)
+        with patch.object(app.request_class, 'spool_threshold', 1024), \
+                patch('upload_buffer.mmap.mmap', wraps=mmap.mmap) as mock_mmap:
+            output = self.post(client, pdf_bytes)
+
+        assert mock_mmap.called
+        with fitz.open(stream=output, filetype='pdf') as doc, fitz.open(stream=expected, filetype='pdf') as reference:
+            assert [page.get_text() for page in doc] == [page.get_text() for page in reference]
+
+
 class TestErrorHandling:
     """Tests für Fehlerbehandlung"""
     
     @pytest.fixture
     def client(self):
-        """Test-Client erstellen"""
+        """Test-Client erstellen; das Modell gilt als geladen"""
         app.config['TESTING'] = True
-        with app.test_client() as client:
+        with patch('app.wait_for_initialization', return_value=True), app.test_client() as client:
             yield client
     
     def test_unhandled_exception(self, client):
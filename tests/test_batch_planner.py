@@ -0,0 +1,96 @@
+import pytest
+from batch_planner import (
+    plan_batches, run_batches, run_planned_batches, is_allocation_error, length_bucket
+)
+
+
+class TestPlanBatches:
+    """Tests für die Batch-Planung"""
+
+    def test_batches_respect_token_budget(self):
+        """Test dass kein Batch das Budget überschreitet"""
+        lengths = [10, 12, 11, 9, 15, 14, 13, 16]
+        batches = plan_batches(lengths, token_budget=60, max_new_tokens=4)
+
+        for batch in batches:
+            longest = max(lengths[i] for i in batch) + 4
+            assert longest * len(batch) <= 60
+        assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+    def test_batches_do_not_mix_buckets(self):
+        """Test dass kurze Chunks nicht für lange mitbezahlen"""
+        lengths = [5, 300, 6, 290, 7]
+        batches = plan_batches(lengths, token_budget=10000)
+
+        assert sorted(map(sorted, batches)) == [[0, 2, 4], [1, 3]]
+        for batch in batches:
+            assert len({length_bucket(lengths[i]) for i in batch}) == 1
+
+    def test_max_batch_size(self):
+        """Test maximale Batchgröße"""
+        batches = plan_batches([8] * 10, token_budget=10000, max_batch_size=3)
+        assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+
+    def test_oversized_sequence_runs_alone(self):
+        """Test Sequenz größer als Budget"""
+        batches = plan_batches([4, 500, 4], token_budget=100)
+        assert [1] in batches
+
+    def test_invalid_budget(self):
+        """Test ungültiges Budget"""
+        with pytest.raises(ValueError):
+            plan_batches([1, 2], token_budget=0)
+
+
+class TestRunBatches:
+    """Tests für die Batch-Ausführung"""
+
+    def test_original_order_restored(self):
+        """Test dass Ergebnisse in Originalreihenfolge zurückkommen"""
+        lengths = [30, 2, 17, 5, 9]
+        results = run_planned_batches(
+            lengths, lambda batch: [f"chunk-{i}" for i in batch], token_budget=40
+        )
+        assert results == [f"chunk-{i}" for i in range(5)]
+
+    def test_split_on_allocation_failure(self):
+        """Test Halbieren des Batches bei Speicherfehler"""
+        calls = []
+
+        def run_batch(batch):
+            calls.append(list(batch))
+            if len(batch) > 2:
+                raise RuntimeError("DefaultCPUAllocator: can't allocate memory")
+            return [i * 10 for i in batch]
+
+        results = run_batches([[0, 1, 2, 3, 4]], run_batch, total=5)
+
+        assert results == [0, 10, 20, 30, 40]
+        assert calls == [[0, 1, 2, 3, 4], [0, 1], [2, 3, 4], [2], [3, 4]]
+
+    def test_single_item_failure_is_raised(self):
+        """Test Speicherfehler bei Einzel-Batch wird weitergereicht"""
+        def run_batch(batch):
+            raise MemoryError()
+
+        with pytest.raises(MemoryError):
+            run_batches([[0, 1]], run_batch, total=2)
+
+    def test_other_errors_are_not_retried(self):
+        """Test andere Fehler werden nicht aufgeteilt"""
+        calls = []
+
+        def run_batch(batch):
+            calls.append(batch)
+            raise ValueError("kaputt")
+
+        with pytest.raises(ValueError):
+            run_batches([[0, 1, 2]], run_batch, total=3)
+        assert len(calls) == 1
+
+    def test_is_allocation_error(self):
+        """Test Erkennung von Allokationsfehlern"""
+        assert is_allocation_error(MemoryError())
+        assert is_allocation_error(RuntimeError("CUDA out of memory. Tried to allocate"))
+        assert not is_allocation_error(RuntimeError("shape mismatch"))
+        assert not is_allocation_error(ValueError("out of memory"))
@@ -0,0 +1,98 @@
+import math
+
+from deadline import Deadline, SimplificationResult, ThroughputEstimator, UNSIMPLIFIED_MARKER, join_parts
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline:
+    """Tests für Frist, Durchsatzschätzung und Teilergebnisse"""
+
+    def test_remaining_and_allows(self):
+        """Test Restzeit und Entscheidung anhand der geschätzten Dauer"""
+        clock = FakeClock()
+        deadline = Deadline(30, clock=clock)
+
+        clock.now = 10
+        assert deadline.remaining() == 20
+        assert deadline.allows(15)
+        assert deadline.allows(None)
+        assert not deadline.allows(25)
+
+        clock.now = 31
+        assert deadline.expired()
+        assert not deadline.allows(None)
+
+    def test_unbounded(self):
+        """Test Frist ohne Zeitbudget"""
+        deadline = Deadline(None)
+        assert not deadline.bounded
+        assert deadline.remaining() == math.inf
+        assert deadline.allows(1e9)
+
+    def test_throughput_moving_average(self):
+        """Test gleitender Mittelwert der Tokens pro Sekunde"""
+        estimator = ThroughputEstimator(smoothing=0.5)
+        assert estimator.estimate(100) is None
+
+        estimator.record(100, 10)
+        assert estimator.estimate(50) == 5
+        estimator.record(100, 5)
+        assert estimator.tokens_per_second == 15
+        estimator.record(0, 1)
+        assert estimator.tokens_per_second == 15
+
+    def test_result_marks_unsimplified_runs(self):
+        """Test dass nicht vereinfachte Chunks als zusammenhängendes Original markiert werden"""
+        result = SimplificationResult(["aaaa", "bb", "cc", "dd"])
+        result.outputs[0] = "A"
+        result.outputs[3] = "D"
+
+        assert result.text == f"A {UNSIMPLIFIED_MARKER} bbcc D"
+        assert result.report() == {
+            'total_chunks': 4,
+            'simplified_chunks': 2,
+            'simplified_ratio': 0.6,
+            'partial': True,
+            'skipped_chunks': 0,
+            'skipped_ratio': 0.0,
+            'tokens_saved': 0,
+        }
+        assert result.is_simplified(0) and not result.is_simplified(1)
+        assert not result.is_simplified(7)
+
+    def test_skipped_chunks_are_not_marked(self):
+        """Test dass übersprungene Chunks unmarkiert im Original stehen und als erledigt zählen"""
+        result = SimplificationResult(["aa", "bb", "cc", "dd"])
+        result.skip(0, 10)
+        result.skip(1, 5)
+        result.outputs[2] = "C"
+
+        assert result.text == f"aabb C {UNSIMPLIFIED_MARKER} dd"
+        assert result.simplified_chunks == 3
+        assert result.report()['tokens_saved'] == 15
+        assert result.report()['skipped_ratio'] == 0.5
+
+    def test_empty_result_is_complete(self):
+        """Test leerer Text gilt als vollständig vereinfacht"""
+        result = SimplificationResult()
+        assert result.text == ""
+        assert not result.partial
+        assert result.simplified_ratio == 1.0
+
+    def test_extend_and_stream_parts(self):
+        """Test dass angehängte Teilergebnisse denselben Text wie ein Gesamtergebnis ergeben"""
+        whole = SimplificationResult(["aa", "bb", "cc", "dd"], ["A", None, None, "D"])
+        result = SimplificationResult()
+        result.extend(SimplificationResult(["aa", "bb"], ["A", None]))
+        result.extend(SimplificationResult(["cc", "dd"], [None, "D"]))
+
+        assert result.text == whole.text == f"A {UNSIMPLIFIED_MARKER} bbcc D"
+        assert list(result.chunks(3)) == [("dd", "D", False)]
+        assert " ".join(join_parts(iter(list(result.chunks())))) == result.text
@@ -0,0 +1,38 @@
+from generation_policy import GenerationPolicy, parse_stop_sequences
+
+
+class TestGenerationPolicy:
+    """Tests für Budget und Stoppsequenzen"""
+
+    def test_budget_scales_with_input(self):
+        """Test Budget aus Eingabelänge, Untergrenze und Obergrenze"""
+        policy = GenerationPolicy(expansion_ratio=1.5, min_new_tokens=16)
+
+        assert policy.budget(40, 256) == 60
+        assert policy.budget(3, 256) == 16
+        assert policy.budget(400, 256) == 256
+        assert policy.budget(0, 8) == 8
+
+    def test_parse_stop_sequences(self):
+        """Test Trennung mit '|' und Zeilenumbrüche als \\n"""
+        assert parse_stop_sequences('\\n\\nText:|Vereinfachter Text:|') == ('\n\nText:', 'Vereinfachter Text:')
+        assert parse_stop_sequences('') == ()
+
+    def test_truncate_at_first_stop(self):
+        """Test Abschneiden vor der frühesten Stoppsequenz"""
+        policy = GenerationPolicy(stop_sequences=('\n\nText:', 'Vereinfachter Text:'))
+
+        assert policy.truncate("Kurz.\n\nText: noch einer") == "Kurz."
+        assert policy.truncate("A Vereinfachter Text: B\n\nText: C") == "A "
+        assert policy.truncate("Ohne Stopp") == "Ohne Stopp"
+
+    def test_filter_stream_holds_partial_stop(self):
+        """Test dass mögliche Anfänge einer Stoppsequenz zurückgehalten werden"""
+        policy = GenerationPolicy(stop_sequences=('\n\nText:',))
+
+        assert list(policy.filter_stream(["Hallo", " Welt.\n", "\nTe", "xt: mehr"])) == ["Hallo", " Welt."]
+        assert "".join(policy.filter_stream(["Zeile\n", "zwei\n"])) == "Zeile\nzwei\n"
+
+    def test_filter_stream_without_stops(self):
+        """Test Durchreichen ohne Stoppsequenzen"""
+        assert list(GenerationPolicy().filter_stream(["a", "b"])) == ["a", "b"]
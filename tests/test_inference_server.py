@@ -0,0 +1,233 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from prompt_cache import PromptTemplate
+from inference_server import (
+    InferenceClient, InferenceRequest, InferenceServer, InferenceServerError,
+    decode_request, encode_request
+)
+
+TEMPLATE = PromptTemplate('test', prefix="Vereinfache in {target_language}:\n\n", tail="\n\nVereinfachter Text:")
+
+
+@pytest.fixture
+def socket_path():
+    """Kurzer Socket-Pfad (Unix-Sockets erlauben nur ~100 Zeichen)"""
+    directory = tempfile.mkdtemp(prefix='inf-')
+    yield os.path.join(directory, 'inference.sock')
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class FakeModel:
+    """Generierungsfunktionen mit Aufzeichnung der Aufrufe"""
+
+    def __init__(self):
+        self.batch_calls = []
+        self.delay = 0
+
+    def generate_batch(self, template, texts, target_language, max_length, max_new_tokens, **kwargs):
+        self.batch_calls.append((template.name, list(texts), kwargs))
+        time.sleep(self.delay)
+        if any(text == 'fehler' for text in texts):
+            raise RuntimeError("Generierung fehlgeschlagen")
+        return [f"einfach: {text}" for text in texts]
+
+    def stream(self, template, text, target_language, max_length, max_new_tokens, **kwargs):
+        for word in text.split():
+            yield word + " "
+
+
+@pytest.fixture
+def server(socket_path):
+    fake = FakeModel()
+    server = InferenceServer(socket_path, fake.generate_batch, fake.stream, batch_window=0.3)
+    server.start()
+    server.fake = fake
+    yield server
+    server.stop()
+
+
+class TestProtocol:
+    """Tests für das Binärprotokoll"""
+
+    def test_request_roundtrip(self):
+        """Test Kodieren und Dekodieren einer Anfrage"""
+        request = InferenceRequest(
+            TEMPLATE, 'de', ["Größe – ünïcode", ""], 2048, 512,
+            {'temperature': 0.5, 'do_sample': True, 'top_k': 40, 'stop': ["\n\n", "Ende"], 'seed': None},
+            deadline_at=1234.5
+        )
+        decoded = decode_request(encode_request(request))
+
+        assert vars(decoded.template) == vars(request.template)
+        assert (decoded.target_language, decoded.texts, decoded.max_length, decoded.max_new_tokens) == \
+            ('de', ["Größe – ünïcode", ""], 2048, 512)
+        assert decoded.generation_kwargs == request.generation_kwargs
+        assert decoded.deadline_at == 1234.5
+        assert decode_request(encode_request(InferenceRequest(TEMPLATE, 'de', [], 1, 1, {}))).deadline_at is None
+
+    def test_truncated_request_rejected(self):
+        """Test dass unvollständige Nachrichten erkannt werden"""
+        data = encode_request(InferenceRequest(TEMPLATE, 'de', ["Text"], 10, 5, {}))
+        with pytest.raises(ValueError):
+            decode_request(data[:-2])
+
+
+class TestInferenceServer:
+    """Tests für Server und Client"""
+
+    def test_ping(self, server, socket_path):
+        """Test Erreichbarkeit"""
+        assert InferenceClient(socket_path).ping() is True
+        assert InferenceClient(socket_path + '.missing').ping() is False
+
+    def test_generate(self, server, socket_path):
+        """Test Generierung über den Socket"""
+        client = InferenceClient(socket_path, timeout=10)
+        result = client.generate(TEMPLATE, ["Text eins", "Text zwei"], 'de', 512, 128, temperature=0.7)
+
+        assert result == ["einfach: Text eins", "einfach: Text zwei"]
+        assert server.fake.batch_calls[0][2] == {'temperature': 0.7}
+
+    def test_stream(self, server, socket_path):
+        """Test Streaming über den Socket"""
+        client = InferenceClient(socket_path, timeout=10)
+        assert list(client.stream(TEMPLATE, "ein kurzer Text", 'de', 512, 128)) == ["ein ", "kurzer ", "Text "]
+
+    def test_error_is_reported(self, server, socket_path):
+        """Test dass Fehler des Modells beim Client ankommen"""
+        client = InferenceClient(socket_path, timeout=10)
+        with pytest.raises(InferenceServerError, match="fehlgeschlagen"):
+            client.generate(TEMPLATE, ["fehler"], 'de', 512, 128)
+
+        # Server arbeitet weiter
+        assert client.generate(TEMPLATE, ["ok"], 'de', 512, 128) == ["einfach: ok"]
+
+    def test_requests_of_workers_are_batched(self, server, socket_path):
+        """Test dass gleichzeitige Anfragen verschiedener Worker gemeinsam laufen"""
+        barrier = threading.Barrier(3)
+        results = {}
+
+        def worker(index):
+            client = InferenceClient(socket_path, timeout=10)
+            barrier.wait()
+            results[index] = client.generate(TEMPLATE, [f"Text {index}"], 'de', 512, 128, temperature=0.5)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {index: [f"einfach: Text {index}"] for index in range(3)}
+        assert len(server.fake.batch_calls) == 1
+        assert sorted(server.fake.batch_calls[0][1]) == ["Text 0", "Text 1", "Text 2"]
+
+    def test_different_parameters_not_mixed(self, server, socket_path):
+        """Test dass nur Anfragen mit gleichen Parametern gebündelt werden"""
+        barrier = threading.Barrier(2)
+
+        def worker(temperature):
+            client = InferenceClient(socket_path, timeout=10)
+            barrier.wait()
+            client.generate(TEMPLATE, ["Text"], 'de', 512, 128, temperature=temperature)
+
+        threads = [threading.Thread(target=worker, args=(value,)) for value in (0.5, 0.9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(call[2]['temperature'] for call in server.fake.batch_calls) == [0.5, 0.9]
+
+    def run_workers(self, socket_path, deadlines):
+        """Gleichzeitige Anfragen mit den angegebenen Fristen; liefert die Ergebnisse"""
+        barrier = threading.Barrier(len(deadlines))
+        results = {}
+
+        def worker(index, deadline_at):
+            client = InferenceClient(socket_path, timeout=10)
+            barrier.wait()
+            results[index] = client.generate(TEMPLATE, [f"Text {index}"], 'de', 512, 128, deadline_at=deadline_at)
+
+        threads = [threading.Thread(target=worker, args=item) for item in enumerate(deadlines)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_deadlines_do_not_split_batches(self, server, socket_path):
+        """Test dass Anfragen mit verschiedenen Fristen gemeinsam unter der engsten laufen"""
+        now = time.monotonic()
+        results = self.run_workers(socket_path, [now + 60, now + 30, None])
+
+        assert results == {index: [f"einfach: Text {index}"] for index in range(3)}
+        assert len(server.fake.batch_calls) == 1
+        assert server.fake.batch_calls[0][2] == {'deadline_at': now + 30}
+
+    def test_later_deadlines_rerun_after_cut(self, server, socket_path):
+        """Test dass eine an fremder Frist abgebrochene Anfrage erneut generiert wird"""
+        server.fake.delay = 0.6
+        results = self.run_workers(socket_path, [time.monotonic() + 0.5, None])
+
+        assert results == {index: [f"einfach: Text {index}"] for index in range(2)}
+        first, second = server.fake.batch_calls
+        assert sorted(first[1]) == ["Text 0", "Text 1"] and 'deadline_at' in first[2]
+        assert second[1:] == (["Text 1"], {})
+
+
+class TestThinClient:
+    """Tests für your_model_utils als Client eines laufenden Inferenz-Servers"""
+
+    @pytest.fixture(params=['transformers', 'onnx'])
+    def server_process(self, request, tiny_model_dir, socket_path, tmp_path):
+        """Inferenz-Server als eigener Prozess mit dem kleinen Modell, je Engine"""
+        if request.param == 'onnx':
+            pytest.importorskip('onnxruntime')
+            pytest.importorskip('onnx')
+        env = dict(os.environ, MODEL_NAME=tiny_model_dir, INFERENCE_SOCKET=socket_path, HF_HUB_OFFLINE='1',
+                   INFERENCE_ENGINE=request.param, MODEL_CACHE_DIR=str(tmp_path))
+        process = subprocess.Popen(
+            [sys.executable, 'inference_server.py'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        client = InferenceClient(socket_path, timeout=5)
+        deadline = time.monotonic() + 120
+        while not client.ping():
+            assert process.poll() is None, "Inferenz-Server beendet"
+            assert time.monotonic() < deadline, "Inferenz-Server nicht erreichbar"
+            time.sleep(0.2)
+        yield process
+        process.terminate()
+        process.wait(timeout=10)
+
+    def test_simplify_via_server(self, server_process, socket_path):
+        """Test Vereinfachung ohne eigenes Modell über den Server"""
+        import your_model_utils
+        try:
+            with patch('your_model_utils.INFERENCE_SOCKET', socket_path):
+                assert your_model_utils.connect_inference_server() is True
+            client = your_model_utils.inference_client
+
+            # Der Server hält das Modell, der Worker nicht
+            with patch('your_model_utils.model', None), patch('your_model_utils.tokenizer', None):
+                assert your_model_utils.is_model_available()
+                with patch.object(client, 'generate', wraps=client.generate) as mock_generate:
+                    batch = your_model_utils.simplify_text_batch(["Text eins", "Ein zweiter Text"], "de")
+                    single = your_model_utils.simplify_text("Ein Text zum Vereinfachen", "de")
+                pieces = list(your_model_utils.stream_full_text("Ein Text zum Streamen", "de"))
+
+            assert len(batch) == 2 and all(isinstance(text, str) and text for text in batch)
+            assert isinstance(single, str) and single
+            assert mock_generate.call_count == 2
+            assert pieces and all(index == 0 for index, _, _ in pieces)
+        finally:
+            your_model_utils.inference_client = None
@@ -1,3 +1,4 @@
+import os
 import pytest
 import torch
 from unittest.mock import patch, MagicMock
@@ -39,8 +40,12 @@ class TestModelUtils:
     def test_simplify_text_with_model(self, mock_model, mock_tokenizer):
         """Test Text-Vereinfachung mit geladenem Modell"""
         # Mock Tokenizer
-        mock_tokenizer.encode = MagicMock(return_value={'input_ids': torch.tensor([[1, 2, 3]]), 'attention_mask': torch.tensor([[1, 1, 1]])})
-        mock_tokenizer.decode = MagicMock(return_value="Vereinfachter Text: Simplified text")
+        mock_tokenizer.encode = MagicMock(
+            return_value={'input_ids': torch.tensor([[1, 2, 3]]), 'attention_mask': torch.tensor([[1, 1, 1]])}
+        )
+        mock_tokenizer.return_value = {'input_ids': torch.tensor([[1, 2, 3]]), 'attention_mask': torch.tensor([[1, 1, 1]])}
+        # Nur die neuen Tokens werden dekodiert
+        mock_tokenizer.decode = MagicMock(return_value=" Simplified text")
         
         # Mock Model
         mock_model.generate = MagicMock(return_value=torch.tensor([[1, 2, 3, 4, 5]]))
@@ -50,6 +55,7 @@ class TestModelUtils:
         
         assert result == "Simplified text"
         mock_model.generate.assert_called_once()
+        assert mock_tokenizer.decode.call_args[0][0].tolist() == [4, 5]
     
     def test_simplify_text_no_model(self):
         """Test Text-Vereinfachung ohne Modell"""
@@ -80,8 +86,8 @@ class TestModelUtils:
             'attention_mask': torch.tensor([[1, 1, 1], [1, 1, 1]])
         }
         mock_tokenizer.batch_decode = MagicMock(return_value=[
-            "Vereinfachter Text: Simplified 1",
-            "Vereinfachter Text: Simplified 2"
+            " Simplified 1",
+            " Simplified 2"
         ])
         
         # Mock Model
@@ -94,6 +100,29 @@ class TestModelUtils:
         assert result[0] == "Simplified 1"
         assert result[1] == "Simplified 2"
     
+    @patch('your_model_utils.MAX_BATCH_SIZE', 1)
+    @patch('your_model_utils.tokenizer')
+    @patch('your_model_utils.model')
+    def test_simplify_text_batch_planned(self, mock_model, mock_tokenizer):
+        """Test Aufteilung in mehrere Batches mit Originalreihenfolge"""
+        texts = ["Ein deutlich längerer Text", "Kurz"]
+
+        mock_tokenizer.return_value = {'input_ids': [[1] * 20, [1] * 3]}
+        mock_tokenizer.batch_decode = MagicMock(side_effect=[
+            [" Kurz vereinfacht"],
+            [" Lang vereinfacht"]
+        ])
+        mock_model.generate = MagicMock(return_value=torch.tensor([[1, 2, 3]]))
+        mock_model.device = torch.device('cpu')
+
+        result = simplify_text_batch(texts, "de")
+
+        assert result == ["Lang vereinfacht", "Kurz vereinfacht"]
+        assert mock_model.generate.call_count == 2
+        # Kürzester Chunk zuerst
+        first_batch = mock_tokenizer.pad.call_args_list[0][0][0]["input_ids"]
+        assert first_batch == [[1] * 3]
+
     def test_simplify_full_text_single_chunk(self):
         """Test Volltext-Vereinfachung mit einem Chunk"""
         short_text = "Short text"
@@ -131,6 +160,23 @@ class TestModelUtils:
         mock_getenv.assert_called_with('MODEL_NAME', 'microsoft/phi-4-mini-instruct')
         mock_load.assert_called_with("test-model")
 
+    def test_incomplete_engine_fails_on_instantiation(self):
+        """Test dass einer Engine ohne stream schon beim Erzeugen auffällt"""
+        from inference_engine import InferenceEngine
+
+        class BatchOnly(InferenceEngine):
+            def load(self, model_name):
+                return True
+
+            def is_loaded(self):
+                return True
+
+            def generate_batch(self, template, texts, target_language, max_length, max_new_tokens, **kwargs):
+                return list(texts)
+
+        with pytest.raises(TypeError, match='stream'):
+            BatchOnly()
+
 
 class TestModelIntegration:
     """Integration Tests für Modell-Funktionen"""
@@ -175,3 +221,639 @@ class TestModelIntegration:
             assert isinstance(result_fr, str) or result_fr == "Test"
         except Exception:
             pass
+
+
+class TestPrefixCache:
+    """Tests für den KV-Cache des Instruktions-Präfix"""
+
+    def test_prefix_computed_once_per_template(self, loaded_model):
+        """Test dass der Präfix nur einmal pro Vorlage und Sprache berechnet wird"""
+        with patch.object(loaded_model.PrefixCache, '_build',
+                          autospec=True, side_effect=loaded_model.PrefixCache._build) as mock_build:
+            simplify_text("Die Verwaltung prüft den Antrag.", "de")
+            simplify_text("Der Bescheid enthält eine Belehrung.", "de")
+            simplify_text_batch(["Text eins", "Ein zweiter Text"], "de")
+
+        assert mock_build.call_count == 2
+
+    def test_cached_generation_matches_full_prefill(self, loaded_model):
+        """Test dass Präfix-Cache dieselben Logits wie volles Prefill liefert"""
+        from prompt_cache import build_prefixed_inputs
+
+        texts = ["Die Verwaltung prüft den Antrag.", "Das ist einfach.", "Text"]
+        cache = loaded_model.get_prefix_cache()
+        entry = cache.get(loaded_model.BATCH_TEMPLATE, "de")
+        suffix_ids = cache.encode_texts(entry, loaded_model.BATCH_TEMPLATE, texts, 512)
+        input_ids, attention_mask = build_prefixed_inputs(
+            entry.prefix_ids, suffix_ids, loaded_model.tokenizer.pad_token_id
+        )
+        generation_kwargs = dict(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            max_new_tokens=4,
+            do_sample=False,
+            output_scores=True,
+            return_dict_in_generate=True,
+            pad_token_id=loaded_model.tokenizer.pad_token_id,
+        )
+
+        with torch.no_grad():
+            full = loaded_model.model.generate(**generation_kwargs)
+            cached = loaded_model.model.generate(
+                past_key_values=cache.expand(entry, len(texts)), **generation_kwargs
+            )
+
+        assert torch.equal(full.sequences, cached.sequences)
+        for full_scores, cached_scores in zip(full.scores, cached.scores):
+            assert torch.allclose(full_scores, cached_scores, atol=1e-4)
+
+    def test_prefix_cache_disabled(self, loaded_model):
+        """Test Abschalten des Präfix-Caches"""
+        with patch('your_model_utils.PREFIX_CACHE_ENABLED', False):
+            assert loaded_model.get_prefix_cache() is None
+            result = simplify_text_batch(["Text eins", "Ein zweiter Text"], "de")
+
+        assert len(result) == 2
+
+
+class TestStreaming:
+    """Tests für das Token-Streaming"""
+
+    def test_stream_matches_generate(self, loaded_model):
+        """Test dass gestreamte Stücke die vollständige Ausgabe ergeben"""
+        text = "Die Verwaltung prüft den Antrag."
+        kwargs = dict(max_new_tokens=12, do_sample=False)
+
+        streamed = list(loaded_model.stream_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs))
+        generated = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs)
+
+        assert streamed
+        assert "".join(streamed).strip() == generated
+
+    def test_stream_full_text_chunks(self, loaded_model):
+        """Test Streaming Chunk für Chunk"""
+        text = "a" * 600
+        from readability import ReadabilityFilter
+
+        with patch('your_model_utils.READABILITY_FILTER', ReadabilityFilter(enabled=False)), \
+             patch('your_model_utils.stream_simplification', side_effect=[iter(["eins", " zwei"]), iter([])]):
+            events = list(loaded_model.stream_full_text(text, "de"))
+
+        assert events == [(0, 2, "eins"), (0, 2, " zwei"), (1, 2, "a" * 100)]
+
+    def test_stream_generation_error(self, loaded_model):
+        """Test Fehler im Generierungs-Thread wird weitergereicht"""
+        with patch.object(loaded_model.model, 'generate', side_effect=RuntimeError("kaputt")):
+            with pytest.raises(RuntimeError):
+                list(loaded_model.stream_simplification(loaded_model.SIMPLIFY_TEMPLATE, "Text", "de"))
+
+
+class TestGenerationBudget:
+    """Tests für adaptives Budget, Stoppsequenzen und Dekodieren neuer Tokens"""
+
+    def test_budget_from_input_length(self, loaded_model):
+        """Test dass kurze Chunks nur ein kleines Budget erhalten"""
+        from generation_policy import GenerationPolicy
+        text = "Der Antrag wird geprüft."
+        policy = GenerationPolicy(expansion_ratio=2.0, min_new_tokens=4)
+        text_tokens = len(loaded_model.tokenizer(text, add_special_tokens=False)["input_ids"])
+
+        with patch('your_model_utils.GENERATION_POLICY', policy), \
+             patch.object(loaded_model.model, 'generate', wraps=loaded_model.model.generate) as mock_generate, \
+             patch.object(loaded_model.tokenizer, 'decode', wraps=loaded_model.tokenizer.decode) as mock_decode:
+            loaded_model.generate_simplification(
+                loaded_model.SIMPLIFY_TEMPLATE, text, "de", max_new_tokens=256, do_sample=False
+            )
+
+        assert mock_generate.call_args.kwargs['max_new_tokens'] == text_tokens * 2
+        # Nur die neuen Tokens werden dekodiert, nicht der Prompt
+        assert len(mock_decode.call_args[0][0]) <= text_tokens * 2
+
+    def test_stops_at_stop_sequence(self, loaded_model):
+        """Test dass die Generierung an einer Stoppsequenz endet und dort abschneidet"""
+        from generation_policy import GenerationPolicy
+        text = "Die Verwaltung prüft den Antrag."
+        kwargs = dict(max_new_tokens=24, do_sample=False)
+        free = GenerationPolicy(min_new_tokens=24)
+
+        with patch('your_model_utils.GENERATION_POLICY', free):
+            full = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs)
+        stop = full[len(full) // 2:len(full) // 2 + 3]
+        assert len(full) > 10 and stop.strip()
+
+        with patch('your_model_utils.GENERATION_POLICY', GenerationPolicy(min_new_tokens=24, stop_sequences=(stop,))), \
+             patch.object(loaded_model.model, 'generate', wraps=loaded_model.model.generate) as mock_generate:
+            stopped = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs)
+            streamed = "".join(loaded_model.stream_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs))
+
+        assert stopped == full[:full.index(stop)].strip()
+        assert streamed.strip() == stopped
+        assert mock_generate.call_args_list[0].kwargs['stop_strings'] == [stop]
+
+    def test_concurrent_requests_generate_one_at_a_time(self, loaded_model):
+        """Test dass Threads eines Workers (gthread) das Modell nacheinander nutzen"""
+        import threading
+        import time
+        original = loaded_model.model.generate
+        running = []
+        overlaps = []
+
+        def generate(**kwargs):
+            running.append(1)
+            overlaps.append(len(running))
+            time.sleep(0.05)
+            try:
+                return original(**kwargs)
+            finally:
+                running.pop()
+
+        def request(text):
+            loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de",
+                                                 max_new_tokens=4, do_sample=False)
+
+        with patch.object(loaded_model.model, 'generate', side_effect=generate):
+            threads = [threading.Thread(target=request, args=(f"Text {i}.",)) for i in range(3)]
+            threads.append(threading.Thread(target=lambda: "".join(loaded_model.stream_simplification(
+                loaded_model.SIMPLIFY_TEMPLATE, "Text 3.", "de", max_new_tokens=4, do_sample=False))))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert overlaps == [1, 1, 1, 1]
+
+
+COMPLEX_TEXT = ("Die Inanspruchnahme der Rechtsbehelfsbelehrung erfordert die fristgerechte "
+                "Einreichung sämtlicher erforderlichen Unterlagen bei der zuständigen Verwaltungsbehörde.")
+
+
+class TestDeadlineScheduling:
+    """Tests für fristgebundene Vereinfachung langer Texte"""
+
+    TEXT = "a" * 500 + "b" * 500 + "c" * 500
+
+    @pytest.fixture
+    def scheduler(self):
+        """Vorgetäuschte Uhr, frischer Durchsatz, ein Chunk pro Gruppe, kein lokaler Tokenizer"""
+        import your_model_utils
+        from deadline import ThroughputEstimator
+        from readability import ReadabilityFilter
+        clock = MagicMock()
+        clock.monotonic.return_value = 0.0
+        with patch('your_model_utils.time', clock), \
+             patch('your_model_utils.READABILITY_FILTER', ReadabilityFilter(enabled=False)), \
+             patch('your_model_utils.generation_throughput', ThroughputEstimator()), \
+             patch('your_model_utils.MAX_BATCH_SIZE', 1), \
+             patch('your_model_utils.tokenizer', None), \
+             patch('your_model_utils._model_available_for_request', return_value=True):
+            yield your_model_utils, clock
+
+    @staticmethod
+    def taking(clock, seconds):
+        """Generierung, die auf der vorgetäuschten Uhr ``seconds`` dauert"""
+        def generate(template, texts, *args, **kwargs):
+            clock.monotonic.return_value += seconds
+            return [text[0].upper() for text in texts]
+        return generate
+
+    def test_stops_when_estimate_exceeds_remaining(self, scheduler):
+        """Test dass kein Chunk mehr startet, dessen geschätzte Dauer die Frist überzieht"""
+        utils, clock = scheduler
+        from deadline import Deadline, UNSIMPLIFIED_MARKER
+
+        with patch('your_model_utils.generate_simplifications', side_effect=self.taking(clock, 10)) as mock_generate:
+            result = utils.simplify_document(self.TEXT, "de", Deadline(25, clock=clock.monotonic))
+
+        assert mock_generate.call_count == 2
+        assert [call.kwargs['deadline_at'] for call in mock_generate.call_args_list] == [25, 25]
+        assert result.outputs == ["A", "B", None]
+        assert result.text == f"A B {UNSIMPLIFIED_MARKER} {'c' * 500}"
+        assert result.report()['simplified_chunks'] == 2
+        assert result.partial
+        assert result.stopped
+
+    def test_interrupted_generation_keeps_original(self, scheduler):
+        """Test dass ein von max_time abgebrochener Chunk im Original bleibt"""
+        utils, clock = scheduler
+        from deadline import Deadline
+
+        with patch('your_model_utils.generate_simplifications', side_effect=self.taking(clock, 30)):
+            result = utils.simplify_document(self.TEXT, "de", Deadline(25, clock=clock.monotonic))
+
+        assert result.simplified_chunks == 0
+        assert utils.generation_throughput.tokens_per_second is None
+
+    def test_without_deadline_simplifies_everything(self, scheduler):
+        """Test ohne Frist: alle Chunks, keine Frist an der Generierung"""
+        utils, clock = scheduler
+
+        with patch('your_model_utils.generate_simplifications', side_effect=self.taking(clock, 10)) as mock_generate:
+            result = utils.simplify_document(self.TEXT, "de")
+
+        assert result.text == "A B C"
+        assert 'deadline_at' not in mock_generate.call_args.kwargs
+
+    def test_empty_output_does_not_stop_stream(self, scheduler):
+        """Test dass ein leerer Output mitten im Dokument nur diesen Chunk im Original lässt"""
+        utils, clock = scheduler
+        from deadline import SimplificationResult
+
+        def generate(template, texts, *args, **kwargs):
+            return ["" if text == "b" else text.upper() for text in texts]
+
+        chunks = ["a", "b", "c", "d", "e"]
+        with patch('your_model_utils.generate_simplifications', side_effect=generate) as mock_generate:
+            result = SimplificationResult()
+            streamed = list(utils.simplify_stream(
+                iter(chunks), result, lambda batch: utils.simplify_segments(batch, "de"), batch_size=2
+            ))
+            sequential = utils.simplify_segments(chunks, "de")
+
+        assert [output for _, output, _ in streamed] == ["A", None, "C", "D", "E"]
+        assert result.outputs == sequential.outputs
+        assert not result.stopped and not sequential.stopped
+        assert mock_generate.call_count == 5 + 5
+
+    def test_stream_yields_originals_after_deadline(self, scheduler):
+        """Test Streaming: restliche Chunks kommen unverändert, das Ergebnis markiert sie"""
+        utils, clock = scheduler
+        from deadline import Deadline, SimplificationResult
+
+        def stream(template, text, *args, **kwargs):
+            clock.monotonic.return_value += 10
+            yield text[0].upper()
+
+        result = SimplificationResult()
+        with patch('your_model_utils.stream_simplification', side_effect=stream):
+            events = list(utils.stream_full_text(self.TEXT, "de", Deadline(25, clock=clock.monotonic), result))
+
+        assert events == [(0, 3, "A"), (1, 3, "B"), (2, 3, "c" * 500)]
+        assert result.outputs == ["A", "B", None]
+
+    def test_max_time_reaches_model_generate(self, loaded_model):
+        """Test dass die Restzeit als max_time bei model.generate ankommt"""
+        from deadline import Deadline
+
+        with patch.object(loaded_model.model, 'generate', wraps=loaded_model.model.generate) as mock_generate:
+            result = loaded_model.simplify_document(COMPLEX_TEXT, "de", Deadline(60),
+                                                    max_new_tokens=8, do_sample=False)
+
+        assert 0 < mock_generate.call_args.kwargs['max_time'] <= 60
+        assert result.report()['total_chunks'] == 1
+
+    def test_simple_chunks_skip_the_model(self, scheduler):
+        """Test dass bereits einfache Chunks ohne Generierung übernommen und gezählt werden"""
+        utils, clock = scheduler
+        from readability import ReadabilityFilter
+        simple = "Das Amt prüft den Antrag. Das dauert vier Wochen. "
+        text = (simple * 10)[:500] + COMPLEX_TEXT
+
+        with patch('your_model_utils.READABILITY_FILTER', ReadabilityFilter()), \
+             patch('your_model_utils.generate_simplifications', side_effect=self.taking(clock, 10)) as mock_generate:
+            result = utils.simplify_document(text, "de")
+
+        assert mock_generate.call_count == 1
+        assert mock_generate.call_args[0][1] == [COMPLEX_TEXT]
+        assert result.outputs == [(simple * 10)[:500], "D"]
+        report = result.report()
+        assert report['skipped_chunks'] == 1 and report['skipped_ratio'] == 0.5
+        # 125 geschätzte Text-Tokens plus Budget 125 × 1,5 (Obergrenze 128)
+        assert report['tokens_saved'] == 125 + 128
+        assert not report['partial']
+
+
+class TestChunkStreams:
+    """Tests für Chunks und Vereinfachung als Strom (PDF-Pipeline)"""
+
+    def test_stream_chunks_matches_split(self):
+        """Test dass gestreamte Chunks denen des verbundenen Textes entsprechen"""
+        from your_model_utils import split_into_chunks, stream_chunks
+        pages = ["a" * 300, "", "b" * 450, "c" * 40, ""]
+
+        assert list(stream_chunks(pages, 200)) == split_into_chunks("\n".join(p for p in pages if p), 200)
+        assert list(stream_chunks([])) == []
+
+    def test_simplify_stream_stops_after_incomplete_batch(self):
+        """Test dass nach einer abgebrochenen Gruppe alle weiteren Chunks ohne Modell durchgehen"""
+        from deadline import SimplificationResult
+        from your_model_utils import simplify_stream
+        calls = []
+
+        def simplify(batch):
+            calls.append(batch)
+            outputs = [text.upper() for text in batch]
+            if len(calls) == 2:
+                outputs[-1] = None  # Frist während der zweiten Gruppe
+            return SimplificationResult(batch, outputs, stopped=len(calls) == 2)
+
+        result = SimplificationResult()
+        items = list(simplify_stream(iter(["a", "b", "c", "d", "e"]), result, simplify, batch_size=2))
+
+        assert calls == [["a", "b"], ["c", "d"]]
+        assert [output for _, output, _ in items] == ["A", "B", "C", None, None]
+        assert result.originals == ["a", "b", "c", "d", "e"]
+        assert result.partial
+
+
+class TestQuantization:
+    """Tests für den int8-Modus auf CPU"""
+
+    @pytest.fixture
+    def int8_model(self, tiny_model_dir, tmp_path):
+        """Modell im int8-Modus mit temporärem Cache-Verzeichnis laden"""
+        import your_model_utils
+        original = (your_model_utils.tokenizer, your_model_utils.model, your_model_utils.prefix_cache)
+        with patch('your_model_utils.MODEL_QUANTIZATION', 'int8'), \
+             patch('your_model_utils.MODEL_CACHE_DIR', str(tmp_path)), \
+             patch('your_model_utils.torch.cuda.is_available', return_value=False):
+            yield your_model_utils, tmp_path
+        your_model_utils.tokenizer, your_model_utils.model, your_model_utils.prefix_cache = original
+
+    def test_linear_layers_quantized_and_cached(self, int8_model, tiny_model_dir):
+        """Test Quantisierung der Linear-Layer und Ablage im Cache"""
+        from torch.ao.nn.quantized.dynamic import Linear as QuantizedLinear
+        model_utils, cache_dir = int8_model
+
+        assert load_model(tiny_model_dir) is True
+
+        layer = model_utils.model.model.layers[0]
+        assert isinstance(layer.self_attn.q_proj, QuantizedLinear)
+        assert isinstance(layer.mlp.down_proj, QuantizedLinear)
+        assert not isinstance(model_utils.model.lm_head, QuantizedLinear)
+        assert len(list(cache_dir.glob('*-int8-*.pt'))) == 1
+
+        result = model_utils.generate_simplification(
+            model_utils.SIMPLIFY_TEMPLATE, "Die Verwaltung prüft.", "de", max_new_tokens=4, do_sample=False
+        )
+        assert isinstance(result, str)
+
+    def test_cached_weights_reused(self, int8_model, tiny_model_dir):
+        """Test dass ein zweiter Start die gespeicherten int8-Gewichte nutzt"""
+        model_utils, _ = int8_model
+        assert load_model(tiny_model_dir) is True
+        first_state = model_utils.model.state_dict()
+
+        with patch('quantization.AutoModelForCausalLM.from_pretrained') as mock_from_pretrained:
+            assert load_model(tiny_model_dir) is True
+            mock_from_pretrained.assert_not_called()
+
+        ids = torch.tensor([[1, 5, 6, 7]])
+        with torch.no_grad():
+            reloaded = model_utils.model(ids).logits
+            model_utils.model.load_state_dict(first_state)
+            original = model_utils.model(ids).logits
+        assert torch.allclose(reloaded, original)
+
+
+class TestAssistedDecoding:
+    """Tests für spekulatives Dekodieren mit Entwurfsmodell"""
+
+    @pytest.fixture
+    def draft_model_dir(self, tmp_path_factory):
+        """Kleineres Zufallsmodell mit demselben Tokenizer"""
+        from tests.tiny_model import save_tiny_model
+        return save_tiny_model(
+            str(tmp_path_factory.mktemp("draft-model")), seed=1, hidden_size=32, num_hidden_layers=1
+        )
+
+    @pytest.fixture
+    def assisted_model(self, tiny_model_dir, draft_model_dir):
+        """Hauptmodell mit Entwurfsmodell laden"""
+        import your_model_utils
+        original = (your_model_utils.tokenizer, your_model_utils.model,
+                    your_model_utils.prefix_cache, your_model_utils.draft_model)
+        with patch('your_model_utils.DRAFT_MODEL_NAME', draft_model_dir):
+            assert load_model(tiny_model_dir) is True
+        your_model_utils.assisted_stats.reset()
+        yield your_model_utils
+        (your_model_utils.tokenizer, your_model_utils.model,
+         your_model_utils.prefix_cache, your_model_utils.draft_model) = original
+
+    def test_greedy_output_unchanged(self, assisted_model):
+        """Test dass assistiertes Dekodieren bei greedy dieselbe Ausgabe liefert"""
+        text = "Die Verwaltung prüft den Antrag innerhalb von vier Wochen."
+        kwargs = dict(max_new_tokens=24, do_sample=False)
+
+        assisted = assisted_model.generate_simplification(assisted_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs)
+        draft = assisted_model.draft_model
+        assisted_model.draft_model = None
+        try:
+            plain = assisted_model.generate_simplification(assisted_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs)
+        finally:
+            assisted_model.draft_model = draft
+
+        assert assisted == plain
+
+        stats = assisted_model.get_assisted_decoding_stats()
+        assert stats['generate_calls'] == 1
+        assert stats['target_steps'] > 0
+        assert stats['draft_steps'] > 0
+        assert 0.0 <= stats['acceptance_rate'] <= 1.0
+        assert stats['tokens_per_target_step'] >= 1.0
+
+    def test_batch_runs_single_rows(self, assisted_model):
+        """Test dass Batches mit Entwurfsmodell zeilenweise laufen"""
+        assert assisted_model.get_prefix_cache() is None
+
+        with patch.object(assisted_model.model, 'generate', wraps=assisted_model.model.generate) as mock_generate:
+            result = simplify_text_batch(["Text eins", "Ein zweiter Text"], "de")
+
+        assert len(result) == 2
+        assert mock_generate.call_count == 2
+        assert all(call.kwargs['input_ids'].shape[0] == 1 for call in mock_generate.call_args_list)
+        assert all(call.kwargs['assistant_model'] is assisted_model.draft_model
+                   for call in mock_generate.call_args_list)
+
+    def test_incompatible_draft_is_skipped(self, tiny_model_dir):
+        """Test dass ein unpassendes Entwurfsmodell das Hauptmodell nicht blockiert"""
+        import your_model_utils
+        original = (your_model_utils.tokenizer, your_model_utils.model, your_model_utils.prefix_cache)
+        try:
+            with patch('your_model_utils.DRAFT_MODEL_NAME', 'other-draft'), \
+                 patch('your_model_utils.load_draft_model', side_effect=ValueError("anderes Vokabular")):
+                assert load_model(tiny_model_dir) is True
+            assert your_model_utils.draft_model is None
+        finally:
+            your_model_utils.tokenizer, your_model_utils.model, your_model_utils.prefix_cache = original
+
+
+@pytest.fixture
+def compile_settings():
+    """Kompilierung mit eager-Backend aktivieren (ohne Inductor-Kompilierzeit)"""
+    torch._dynamo.reset()
+    with patch('your_model_utils.MODEL_COMPILE', True), \
+         patch('your_model_utils.COMPILE_BACKEND', 'eager'), \
+         patch('your_model_utils.COMPILE_BUCKETS', [64, 128]):
+        yield
+    torch._dynamo.reset()
+
+
+class TestCompiledGeneration:
+    """Tests für kompilierte Generierung mit statischem KV-Cache"""
+
+    def test_pad_to_bucket(self):
+        """Test Auffüllen auf die Bucket-Länge"""
+        from compiled_generation import bucket_length, pad_to_bucket
+
+        assert bucket_length(10, [64, 128]) == 64
+        assert bucket_length(64, [64, 128]) == 64
+        assert bucket_length(200, [64, 128]) == 200
+
+        input_ids = torch.tensor([[5, 6, 7]])
+        padded_ids, padded_mask = pad_to_bucket(input_ids, torch.ones_like(input_ids), 0, [8])
+        assert padded_ids.tolist() == [[0, 0, 0, 0, 0, 5, 6, 7]]
+        assert padded_mask.tolist() == [[0, 0, 0, 0, 0, 1, 1, 1]]
+
+    def test_output_matches_eager(self, loaded_model, tiny_model_dir, compile_settings):
+        """Test dass die kompilierte Generierung greedy dieselbe Ausgabe liefert"""
+        texts = ["Die Verwaltung prüft den Antrag.", "Ein zweiter, etwas längerer Text zum Prüfen."]
+        kwargs = dict(max_new_tokens=12, do_sample=False)
+        plain_single = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, texts[0], "de", **kwargs)
+        plain_batch = loaded_model.generate_simplifications(loaded_model.BATCH_TEMPLATE, texts, "de", **kwargs)
+
+        assert load_model(tiny_model_dir) is True
+        assert loaded_model.get_prefix_cache() is None
+        assert loaded_model.model.generation_config.cache_implementation == 'static'
+
+        with patch.object(loaded_model.model, 'generate', wraps=loaded_model.model.generate) as mock_generate:
+            single = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, texts[0], "de", **kwargs)
+            batch = loaded_model.generate_simplifications(loaded_model.BATCH_TEMPLATE, texts, "de", **kwargs)
+
+        assert single == plain_single
+        assert batch == plain_batch
+        # Prompts werden auf Bucket-Längen aufgefüllt
+        assert {call.kwargs['input_ids'].shape[-1] for call in mock_generate.call_args_list} <= {64, 128}
+
+    @patch('your_model_utils.os.getenv')
+    def test_initialize_model_warms_buckets(self, mock_getenv, loaded_model, tiny_model_dir, compile_settings):
+        """Test dass initialize_model die Buckets vor der ersten Anfrage aufwärmt"""
+        # os.getenv ist global gepatcht; andere Variablen normal auflösen
+        mock_getenv.side_effect = lambda key, default=None: (
+            tiny_model_dir if key == 'MODEL_NAME' else os.environ.get(key, default)
+        )
+
+        with patch('your_model_utils.warmup', wraps=loaded_model.warmup) as mock_warmup:
+            assert initialize_model() is True
+
+        mock_warmup.assert_called_once()
+        assert mock_warmup.call_args.args[2] == [64, 128]
+
+
+class TestForkSafePreload:
+    """Tests für vorgeladene, speicherabgebildete Gewichte"""
+
+    def test_weights_are_memory_mapped(self, loaded_model, tiny_model_dir, tmp_path):
+        """Test dass die Gewichte aus der safetensors-Datei im Cache abgebildet werden"""
+        kwargs = dict(max_new_tokens=12, do_sample=False)
+        text = "Die Verwaltung prüft den Antrag."
+        expected = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs)
+
+        with patch('your_model_utils.MODEL_PRELOAD', True), \
+             patch('your_model_utils.MODEL_CACHE_DIR', str(tmp_path)):
+            assert load_model(tiny_model_dir) is True
+
+        mappings = []
+        with open('/proc/self/maps') as maps:
+            for line in maps:
+                fields = line.split()
+                if len(fields) >= 6 and fields[5].startswith(str(tmp_path)) and fields[5].endswith('.safetensors'):
+                    start, end = (int(address, 16) for address in fields[0].split('-'))
+                    mappings.append((start, end))
+
+        assert mappings
+        for parameter in loaded_model.model.parameters():
+            assert any(start <= parameter.data_ptr() < end for start, end in mappings)
+        assert loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, text, "de", **kwargs) == expected
+
+    def test_init_worker_plans_threads(self):
+        """Test dass Worker nach fork ihre Threads selbst planen"""
+        with patch('your_model_utils.configure_threads') as mock_configure:
+            from your_model_utils import init_worker
+            init_worker()
+
+        mock_configure.assert_called_once()
+
+    def test_worker_unique_rss(self, tmp_path):
+        """Test dass geforkte Worker die Gewichte des Masters teilen"""
+        from tests.tiny_model import save_tiny_model
+        from tests.performance.benchmark_preload import measure_workers
+
+        model_dir = save_tiny_model(str(tmp_path / 'model'), hidden_size=1024, num_hidden_layers=4)
+        report = measure_workers(model_dir, str(tmp_path / 'cache'), workers=2, preload=True)
+
+        assert report['weights_mb'] > 100
+        assert len(report['workers']) == 2
+        for worker in report['workers']:
+            assert 'error' not in worker
+            # Nur Laufzeitdaten sind privat, die Gewichte bleiben geteilt
+            assert worker['uss'] < report['weights_mb'] / 2
+
+
+class TestBackgroundInitialization:
+    """Tests für das Laden des Modells im Hintergrund"""
+
+    @pytest.fixture
+    def fresh_state(self):
+        """Initialisierungszustand zurücksetzen und danach wiederherstellen"""
+        import your_model_utils
+        original = (
+            your_model_utils.model_state, your_model_utils.model_error,
+            your_model_utils._init_thread, your_model_utils._initialized.is_set()
+        )
+        your_model_utils.model_state = 'not_started'
+        your_model_utils._init_thread = None
+        your_model_utils._initialized.clear()
+        with patch('your_model_utils.configure_threads'):
+            yield your_model_utils
+        if your_model_utils._init_thread is not None:
+            your_model_utils._init_thread.join(5)
+        (your_model_utils.model_state, your_model_utils.model_error,
+         your_model_utils._init_thread, initialized) = original
+        if initialized:
+            your_model_utils._initialized.set()
+        else:
+            your_model_utils._initialized.clear()
+
+    def test_start_does_not_block(self, fresh_state):
+        """Test dass der Start sofort zurückkehrt und der Zustand das Laden meldet"""
+        import threading
+        release = threading.Event()
+
+        def slow_load(model_name):
+            release.wait(5)
+            return True
+
+        with patch('your_model_utils.load_model', side_effect=slow_load):
+            fresh_state.start_background_initialization()
+            assert fresh_state.get_model_status()['state'] == 'loading'
+            assert fresh_state.wait_for_initialization(0.05) is False
+
+            # Zweiter Aufruf startet keinen weiteren Thread
+            thread = fresh_state._init_thread
+            fresh_state.start_background_initialization()
+            assert fresh_state._init_thread is thread
+
+            release.set()
+            assert fresh_state.wait_for_initialization(5) is True
+
+        assert fresh_state.model_state == 'ready'
+
+    def test_failed_load_is_reported(self, fresh_state):
+        """Test dass ein Ladefehler als 'failed' mit Meldung sichtbar ist"""
+        with patch('your_model_utils.load_model', return_value=False):
+            fresh_state.start_background_initialization()
+            assert fresh_state.wait_for_initialization(5) is True
+
+        status = fresh_state.get_model_status()
+        assert status['state'] == 'failed'
+        assert status['ready'] is False
+        assert 'konnte nicht geladen werden' in status['error']
+
+    def test_early_simplification_waits(self, fresh_state):
+        """Test dass frühe Vereinfachungen höchstens MODEL_READY_TIMEOUT warten"""
+        fresh_state._set_model_state('loading')
+
+        with patch('your_model_utils.MODEL_READY_TIMEOUT', 0.05), \
+             patch('your_model_utils.tokenizer', None), \
+             patch('your_model_utils.model', None):
+            assert simplify_text("Ein Text.") == "Ein Text."
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+pytest.importorskip('onnxruntime')
+pytest.importorskip('onnx')
+
+import onnx_engine  # noqa: E402
+from onnx_engine import OnnxEngine, select_next_tokens  # noqa: E402
+
+TEXTS = [
+    "Die Verwaltung prüft den Antrag.",
+    "Der Bescheid enthält eine Rechtsbehelfsbelehrung. Das ist einfach.",
+]
+
+
+@pytest.fixture(scope="module")
+def onnx_cache(tiny_model_dir, tmp_path_factory):
+    """Cache-Verzeichnis mit dem exportierten Decoder des kleinen Modells"""
+    cache_dir = str(tmp_path_factory.mktemp("onnx-cache"))
+    import your_model_utils
+    engine = OnnxEngine(cache_dir, postprocess=your_model_utils._extract_simplified)
+    assert engine.load(tiny_model_dir) is True
+    return cache_dir
+
+
+@pytest.fixture
+def engine(onnx_cache, tiny_model_dir):
+    import your_model_utils
+    engine = OnnxEngine(onnx_cache, postprocess=your_model_utils._extract_simplified)
+    assert engine.load(tiny_model_dir) is True
+    return engine
+
+
+class TestOnnxEngine:
+    """Tests für die ONNX-Runtime-Engine"""
+
+    def test_greedy_matches_transformers(self, engine, loaded_model):
+        """Test dass Greedy-Generierung dieselben Texte wie model.generate liefert"""
+        kwargs = dict(max_new_tokens=12, do_sample=False, repetition_penalty=1.2)
+        expected = loaded_model.generate_simplifications(loaded_model.BATCH_TEMPLATE, TEXTS, "de", **kwargs)
+        single = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[0], "de", **kwargs)
+
+        assert engine.generate_batch(loaded_model.BATCH_TEMPLATE, TEXTS, "de", 512, **kwargs) == expected
+        assert engine.generate_batch(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[:1], "de", 1024, **kwargs) == [single]
+
+    def test_stream_matches_generate(self, engine, loaded_model):
+        """Test dass gestreamte Stücke zusammen die generierte Ausgabe ergeben"""
+        kwargs = dict(max_new_tokens=12, do_sample=False)
+        pieces = list(engine.stream(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[1], "de", 1024, **kwargs))
+        generated = engine.generate_batch(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[1:], "de", 1024, **kwargs)
+
+        assert len(pieces) > 1
+        assert "".join(pieces).strip() == generated[0]
+
+    def test_closed_stream_releases_engine(self, engine, loaded_model):
+        """Test dass ein abgebrochener Stream die Engine für andere Threads freigibt"""
+        pieces = engine.stream(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[1], "de", 1024, max_new_tokens=12)
+        next(pieces)
+        assert engine._lock.locked()
+
+        pieces.close()
+
+        assert not engine._lock.locked()
+
+    def test_export_is_cached(self, onnx_cache, tiny_model_dir):
+        """Test dass ein vorhandener Export wiederverwendet wird"""
+        with patch('onnx_engine.export_model') as mock_export:
+            assert OnnxEngine(onnx_cache).load(tiny_model_dir) is True
+        mock_export.assert_not_called()
+
+    def test_sampling_with_small_top_p_is_greedy(self):
+        """Test dass top-p nur das wahrscheinlichste Token übrig lässt"""
+        logits = np.random.default_rng(0).normal(size=(3, 50)).astype(np.float32)
+        sampled = select_next_tokens(logits, True, temperature=0.7, top_p=1e-6)
+        assert (sampled == logits.argmax(axis=-1)).all()
+
+    def test_selected_by_config(self, engine, loaded_model):
+        """Test dass INFERENCE_ENGINE=onnx die Vereinfachungen über ONNX Runtime laufen lässt"""
+        assert isinstance(loaded_model.create_engine('onnx'), OnnxEngine)
+        assert loaded_model.create_engine('transformers').name == 'transformers'
+
+        kwargs = dict(max_new_tokens=8, do_sample=False)
+        with patch('your_model_utils.engine', engine), \
+             patch.object(onnx_engine.OnnxEngine, '_generate_tokens', wraps=engine._generate_tokens) as mock_tokens:
+            result = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[0], "de", **kwargs)
+
+        mock_tokens.assert_called_once()
+        assert result == engine.generate_batch(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[:1], "de", 1024, **kwargs)[0]
+
+    def test_stop_sequence_matches_transformers(self, onnx_cache, tiny_model_dir, loaded_model):
+        """Test dass die ONNX-Engine an derselben Stoppsequenz endet"""
+        from generation_policy import GenerationPolicy
+        kwargs = dict(max_new_tokens=24, do_sample=False)
+        full = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[0], "de", **kwargs)
+        policy = GenerationPolicy(min_new_tokens=24, stop_sequences=(full[len(full) // 2:len(full) // 2 + 3],))
+
+        with patch('your_model_utils.GENERATION_POLICY', policy):
+            expected = loaded_model.generate_simplification(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[0], "de", **kwargs)
+            engine = OnnxEngine(onnx_cache, postprocess=loaded_model._extract_simplified, policy=policy)
+            assert engine.load(tiny_model_dir) is True
+            with patch.object(engine.session, 'run', wraps=engine.session.run) as mock_run:
+                result = engine.generate_batch(loaded_model.SIMPLIFY_TEMPLATE, TEXTS[:1], "de", 1024, **kwargs)
+
+        assert result == [expected]
+        assert mock_run.call_count < 24
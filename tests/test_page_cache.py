@@ -0,0 +1,63 @@
+import os
+
+from page_cache import PageCache, document_key
+
+
+class TestPageCache:
+    """Tests für das geteilte Verzeichnis hochgeladener Dokumente und vereinfachter Seiten"""
+
+    def test_documents_and_pages(self, tmp_path):
+        """Test Schlüssel nach Inhalt, Seiten je Variante und Trefferzählung"""
+        cache = PageCache(str(tmp_path), 1000)
+        key = cache.add_document(b"%PDF dokument", 3)
+
+        assert key == document_key(b"%PDF dokument")
+        assert cache.add_document(b"%PDF dokument", 3) == key
+        assert cache.document(key) == (b"%PDF dokument", 3)
+        assert cache.page(key, 0, 'blocks-de') is None
+        cache.put_page(key, 0, b"seite", {'partial': False}, 'blocks-de')
+        assert cache.page(key, 0, 'blocks-de') == (b"seite", {'partial': False})
+        assert cache.page(key, 0, 'text-de') is None
+        assert cache.report() == {'documents': 1, 'pages': 1, 'bytes': 18, 'hits': 1, 'misses': 2}
+
+    def test_shared_between_workers(self, tmp_path):
+        """Test dass ein bei einem Worker hochgeladenes Dokument bei einem anderen gelesen wird"""
+        upload_worker = PageCache(str(tmp_path))
+        page_worker = PageCache(str(tmp_path))
+
+        key = upload_worker.add_document(b"%PDF dokument", 2)
+        assert page_worker.document(key) == (b"%PDF dokument", 2)
+        page_worker.put_page(key, 1, b"seite", {'partial': False}, 'blocks-de')
+        assert upload_worker.page(key, 1, 'blocks-de') == (b"seite", {'partial': False})
+        assert not [name for name in os.listdir(tmp_path / key) if name.endswith('.tmp')]
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test dass das Byte-Budget die am längsten nicht genutzten Einträge verdrängt"""
+        cache = PageCache(str(tmp_path), 30)
+        first = cache.add_document(b"a" * 10, 1)
+        second = cache.add_document(b"b" * 10, 1)
+        cache.document(first)
+        cache.add_document(b"c" * 10, 1)
+        cache.add_document(b"d" * 10, 1)
+
+        assert cache.document(first) is not None
+        assert cache.document(second) is None
+        assert not (tmp_path / second).exists()
+        assert cache.report()['bytes'] == 30
+
+    def test_skips_entries_over_budget(self, tmp_path):
+        """Test dass zu große Einträge nicht gespeichert werden und nichts verdrängen"""
+        cache = PageCache(str(tmp_path), 10)
+        key = cache.add_document(b"klein", 1)
+        cache.add_document(b"x" * 11, 1)
+
+        assert cache.document(key) is not None
+        assert cache.report()['documents'] == 1
+
+    def test_rejects_foreign_keys(self, tmp_path):
+        """Test dass nur SHA-256-Schlüssel auf Dateien abgebildet werden"""
+        cache = PageCache(str(tmp_path / "seiten"))
+        (tmp_path / "geheim.pdf").write_bytes(b"x")
+
+        assert cache.document("..") is None
+        assert cache.page("../geheim", 0) is None
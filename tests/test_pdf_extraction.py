@@ -0,0 +1,90 @@
+import fitz
+import pytest
+
+import pdf_extraction
+from pdf_extraction import extract_page_texts, page_ranges, parse_pages
+
+
+@pytest.fixture(scope="module")
+def pdf_path(tmp_path_factory):
+    """PDF mit 12 Seiten und je zwei Textzeilen"""
+    path = str(tmp_path_factory.mktemp("pdf") / "dokument.pdf")
+    doc = fitz.open()
+    for number in range(12):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Seite {number} Zeile eins")
+        page.insert_text((72, 100), f"Seite {number} Zeile zwei")
+    doc.save(path)
+    doc.close()
+    yield path
+    pdf_extraction.shutdown_pool()
+
+
+def dict_extraction(path):
+    """Bisherige Extraktion über get_text("dict") und Spans"""
+    pages = []
+    with fitz.open(path) as doc:
+        for page in doc:
+            spans = [span["text"] for block in page.get_text("dict")["blocks"] if "lines" in block
+                     for line in block["lines"] for span in line["spans"]]
+            pages.append(" ".join(spans))
+    return pages
+
+
+class TestPdfExtraction:
+    """Tests für die seitenweise und parallele Textextraktion"""
+
+    def test_sequential_matches_dict_extraction(self, pdf_path):
+        """Test dass der Text pro Seite dem der Span-Extraktion entspricht (Absätze getrennt)"""
+        pages = list(extract_page_texts(pdf_path))
+
+        assert [page.split() for page in pages] == [page.split() for page in dict_extraction(pdf_path)]
+        assert pages[3] == "Seite 3 Zeile eins\nSeite 3 Zeile zwei"
+
+    def test_is_lazy(self, pdf_path):
+        """Test dass Seiten erst beim Iterieren gelesen werden"""
+        pages = extract_page_texts(pdf_path)
+        assert next(pages) == "Seite 0 Zeile eins\nSeite 0 Zeile zwei"
+        pages.close()
+
+    def test_parallel_keeps_page_order(self, pdf_path):
+        """Test dass der Prozesspool dieselben Seiten in derselben Reihenfolge liefert"""
+        sequential = list(extract_page_texts(pdf_path))
+        parallel = list(extract_page_texts(pdf_path, workers=2, min_pages=4))
+
+        assert parallel == sequential
+
+    def test_parallel_from_memory(self, pdf_path):
+        """Test dass ein PDF im Speicher über gemeinsamen Speicher parallel extrahiert wird"""
+        with open(pdf_path, 'rb') as f:
+            data = f.read()
+
+        assert list(extract_page_texts(data, workers=2, min_pages=4)) == list(extract_page_texts(pdf_path))
+        assert list(extract_page_texts(memoryview(data), workers=2, min_pages=4, pages=[3, 9])) == [
+            "Seite 3 Zeile eins\nSeite 3 Zeile zwei", "Seite 9 Zeile eins\nSeite 9 Zeile zwei"
+        ]
+
+    def test_page_ranges(self):
+        """Test Aufteilung in zusammenhängende Seitenbereiche"""
+        assert page_ranges(10, 3) == [range(0, 4), range(4, 8), range(8, 10)]
+        assert page_ranges(2, 8) == [range(0, 1), range(1, 2)]
+        assert page_ranges(0, 4) == []
+
+    def test_selected_pages(self, pdf_path):
+        """Test dass nur die ausgewählten Seiten gelesen werden, auch parallel"""
+        everything = list(extract_page_texts(pdf_path))
+        pages = [1, 2, 5, 6, 7, 11]
+
+        assert list(extract_page_texts(pdf_path, pages=pages)) == [everything[page] for page in pages]
+        assert list(extract_page_texts(pdf_path, workers=2, min_pages=4, pages=pages)) == [
+            everything[page] for page in pages
+        ]
+
+    def test_parse_pages(self):
+        """Test Seitenangaben ab 1 in Indizes ab 0"""
+        assert parse_pages("3", 10) == [2]
+        assert parse_pages("1-3, 7", 10) == [0, 1, 2, 6]
+        assert parse_pages("9-, -2, 2", 10) == [0, 1, 8, 9]
+        for spec in ("", "0", "11", "4-2", "a", "1,,2", "1-2-3"):
+            with pytest.raises(ValueError):
+                parse_pages(spec, 10)
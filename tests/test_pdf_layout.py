@@ -0,0 +1,94 @@
+import fitz
+import pytest
+
+from pdf_layout import MIN_FONT_SIZE, PageRewriter, TextBlock, extract_blocks, fit_text, rewrite_blocks
+
+LONG = ("Die Inanspruchnahme der Rechtsbehelfsbelehrung erfordert die fristgerechte "
+        "Einreichung sämtlicher erforderlichen Unterlagen.")
+
+
+@pytest.fixture
+def doc():
+    """Zwei Seiten mit je zwei Textblöcken, einem Bild und einem Rahmen"""
+    doc = fitz.open()
+    for number in range(2):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(72, 72, 300, 140), f"Seite {number}. " + LONG, fontsize=11)
+        page.insert_text((72, 400), f"Fußzeile {number}", fontsize=9)
+        page.draw_rect(fitz.Rect(60, 60, 320, 150), color=(1, 0, 0))
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), 0)
+        page.insert_image(fitz.Rect(72, 200, 172, 300), pixmap=pixmap)
+    yield doc
+    doc.close()
+
+
+class TestPdfLayout:
+    """Tests für blockweise Extraktion und Rückschreiben"""
+
+    def test_extract_blocks(self, doc):
+        """Test Blöcke mit Seite, Rechteck und zusammengefügten Zeilen"""
+        blocks = list(extract_blocks(doc))
+
+        assert [(block.page, block.text) for block in blocks] == [
+            (0, "Seite 0. " + LONG), (0, "Fußzeile 0"), (1, "Seite 1. " + LONG), (1, "Fußzeile 1")
+        ]
+        assert blocks[0].line_count > 1
+        assert blocks[0].font_size == pytest.approx(11)
+        assert blocks[1].font_size == pytest.approx(9)
+        assert fitz.Rect(blocks[0].rect) in fitz.Rect(72, 72, 300, 140)
+
+    def test_font_size_measured(self):
+        """Test dass die Schriftgröße aus den Spans stammt, nicht aus der Höhe des Rechtecks"""
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Eine Zeile", fontsize=10)
+        block, = extract_blocks(doc)
+
+        assert block.font_size == pytest.approx(10)
+        # Die Schätzung aus der Höhe zählt Ober- und Unterlängen mit
+        assert TextBlock(block.page, block.rect, block.text, block.line_count).font_size > 11
+
+    def test_rewrite_keeps_images_and_graphics(self, doc):
+        """Test dass nur der Blocktext ersetzt wird"""
+        blocks = list(extract_blocks(doc))
+        texts = ["Neu eins.", None, "Seite 1. " + LONG, "Fußzeile 1"]
+
+        replaced = rewrite_blocks(doc, blocks, texts)
+
+        assert replaced == {0: 1, 1: 0}
+        assert doc[0].get_text().split() == ["Fußzeile", "0", "Neu", "eins."]
+        assert doc[1].get_text().startswith("Seite 1.")
+        for page in doc:
+            assert len(page.get_images()) == 1
+            assert len(page.get_drawings()) == 1
+
+    def test_fit_text_shrinks(self):
+        """Test dass langer Text kleiner gesetzt wird und zu langer Text nicht passt"""
+        page_rect = fitz.Rect(0, 0, 595, 842)
+        rect = fitz.Rect(72, 72, 300, 110)
+
+        assert fit_text(rect, "Kurz", 11, page_rect) is not None
+        assert fit_text(rect, LONG * 2, 11, page_rect) is not None
+        assert fit_text(rect, LONG * 40, 11, page_rect) is None
+
+    def test_block_that_does_not_fit_stays(self, doc):
+        """Test dass ein Block mit zu langem Text sein Original behält"""
+        block = TextBlock(0, (72, 390, 200, 402), "Fußzeile 0", 1)
+
+        assert rewrite_blocks(doc, [block], [LONG * 10]) == {0: 0}
+        assert "Fußzeile 0" in doc[0].get_text()
+        assert MIN_FONT_SIZE <= block.font_size
+
+    def test_page_rewriter_writes_completed_pages(self, doc):
+        """Test dass eine Seite erst geschrieben wird, wenn alle ihre Blöcke einen Text haben"""
+        blocks = list(extract_blocks(doc))
+        pages = [block.page for block in blocks]
+        # Gruppe 0: Fließtext beider Seiten, Gruppe 1 und 2: Fußzeilen
+        groups = [[0, 2], [1], [3]]
+        assert pages == [0, 0, 1, 1]
+        rewriter = PageRewriter(doc, blocks, groups)
+
+        assert rewriter.resolve(1, "Neue Fußzeile") == {}
+        assert rewriter.resolve(0, "Neu.") == {0: 2}
+        assert rewriter.resolve(2, None) == {1: 1}
+        assert doc[0].get_text().split() == ["Neu.", "Neue", "Fußzeile"]
+        assert "Fußzeile 1" in doc[1].get_text()
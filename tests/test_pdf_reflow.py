@@ -0,0 +1,64 @@
+import fitz
+import pytest
+
+from pdf_reflow import paragraphs, stream_paragraphs, write_reflowed_pdf
+
+A4 = fitz.paper_rect('a4')
+# Story setzt Ligaturen (fi, ff); beim Lesen aufgelöst
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES
+
+
+def read_pages(path):
+    with fitz.open(path) as doc:
+        return [page.get_text(flags=TEXT_FLAGS) for page in doc]
+
+
+class TestPdfReflow:
+    """Tests für den seitenübergreifenden Fließtext"""
+
+    def test_no_paragraph_lost(self, tmp_path):
+        """Test dass bei 1000 Absätzen jeder Absatz vollständig im PDF steht"""
+        path = str(tmp_path / 'fliesstext.pdf')
+        texts = [f"Absatz {number:04d}: Das Amt prüft Ihren Antrag und schickt Ihnen die offizielle Antwort."
+                 for number in range(1000)]
+
+        pages = write_reflowed_pdf(iter(texts), path, A4)
+
+        page_texts = read_pages(path)
+        assert pages == len(page_texts) > 1
+        extracted = " ".join(" ".join(page_texts).split())
+        positions = [extracted.find(text) for text in texts]
+        assert -1 not in positions
+        assert positions == sorted(positions)
+
+    def test_long_paragraph_spans_pages(self, tmp_path):
+        """Test dass ein einzelner langer Absatz über die Seitengrenze weiterläuft"""
+        path = str(tmp_path / 'lang.pdf')
+        words = [f"Wort{number}" for number in range(3000)]
+
+        assert write_reflowed_pdf([" ".join(words)], path, A4) > 1
+        assert " ".join(read_pages(path)).split() == words
+
+    def test_empty_text_gives_one_page(self, tmp_path):
+        """Test dass leerer Text ein gültiges PDF mit einer Seite ergibt"""
+        path = str(tmp_path / 'leer.pdf')
+
+        assert write_reflowed_pdf(paragraphs("\n \n"), path, A4) == 1
+        assert read_pages(path) == [""]
+
+    def test_page_too_small(self, tmp_path):
+        """Test Fehler statt Endlosschleife bei zu kleiner Seite"""
+        with pytest.raises(ValueError):
+            write_reflowed_pdf(["Text"], str(tmp_path / 'klein.pdf'), (0, 0, 60, 60))
+
+    def test_paragraphs(self):
+        """Test nicht leere, bereinigte Zeilen als Absätze"""
+        assert list(paragraphs(" Erster.\n\n  Zweiter. \n")) == ["Erster.", "Zweiter."]
+
+    def test_stream_paragraphs_matches_joined_text(self):
+        """Test dass Absätze aus Stücken denen des verbundenen Textes entsprechen"""
+        pieces = ["Erster Absatz", "geht weiter.\nZweiter", "", "Absatz.\n", "\nDritter."]
+
+        assert list(stream_paragraphs(pieces)) == list(paragraphs(" ".join(pieces)))
+        assert list(stream_paragraphs(pieces)) == ["Erster Absatz geht weiter.", "Zweiter  Absatz.", "Dritter."]
+        assert list(stream_paragraphs([])) == []
@@ -0,0 +1,88 @@
+import fitz
+import pytest
+
+from pdf_layout import extract_blocks
+from pdf_structure import (
+    BODY, PAGE_NUMBER, REPEATED, TABLE, DocumentStructure, classify_blocks, deduplicate, is_page_number
+)
+
+PARAGRAPH = "Gegen diesen Bescheid kann innerhalb eines Monats Widerspruch erhoben werden."
+
+
+def draw_table(page, top):
+    """Tabelle mit Rahmenlinien, drei Spalten und vier Zeilen"""
+    for row in range(4):
+        for column in range(3):
+            rect = fitz.Rect(72 + column * 120, top + row * 20, 72 + (column + 1) * 120, top + (row + 1) * 20)
+            page.draw_rect(rect, color=(0, 0, 0), width=0.5)
+            page.insert_text((rect.x0 + 3, rect.y1 - 6), f"Zelle {row}{column}", fontsize=9)
+
+
+@pytest.fixture
+def doc():
+    """Vier Seiten mit Kopfzeile, Seitenzahl, eigenem Absatz und einer Tabelle auf Seite 2"""
+    doc = fitz.open()
+    for number in range(4):
+        page = doc.new_page()
+        page.insert_text((72, 40), "Stadt Musterstadt, Bürgeramt", fontsize=9)
+        page.insert_textbox(fitz.Rect(72, 200, 500, 280), f"{PARAGRAPH} Seite {number + 1}.", fontsize=11)
+        if number == 1:
+            draw_table(page, 300)
+        page.insert_text((280, 800), f"Seite {number + 1} von 4", fontsize=9)
+    yield doc
+    doc.close()
+
+
+class TestPdfStructure:
+    """Tests für die Erkennung von Kopf-/Fußzeilen, Seitenzahlen und Tabellen"""
+
+    def test_classify_blocks(self, doc):
+        """Test Arten der Blöcke; nur die Absätze bleiben Fließtext"""
+        blocks = list(extract_blocks(doc))
+        structure = classify_blocks(doc, blocks)
+        kinds = {block.text: kind for block, kind in zip(blocks, structure.kinds)}
+
+        assert kinds["Stadt Musterstadt, Bürgeramt"] == REPEATED
+        assert kinds["Seite 3 von 4"] == PAGE_NUMBER
+        assert [kind for text, kind in kinds.items() if text.startswith("Zelle")] == [TABLE] * 4
+        assert [block.text for block in (blocks[index] for index in structure.body_indices)] == [
+            f"{PARAGRAPH} Seite {number + 1}." for number in range(4)
+        ]
+
+    def test_report_counts_removed_tokens(self, doc):
+        """Test eingesparte Tokens: Strukturblöcke und Duplikate"""
+        blocks = list(extract_blocks(doc))
+        report = classify_blocks(doc, blocks).report(duplicate_blocks=1, duplicate_tokens=7)
+
+        assert (report['repeated_blocks'], report['page_number_blocks'], report['table_blocks']) == (4, 4, 4)
+        assert report['structural_blocks'] == 12
+        structural = sum(len(block.text) // 4 for block in blocks if not block.text.startswith(PARAGRAPH))
+        assert structural + 7 <= report['tokens_removed'] <= structural + 7 + 12
+
+    def test_without_tables(self, doc):
+        """Test dass Tabellenzellen ohne Tabellenerkennung Fließtext bleiben"""
+        blocks = list(extract_blocks(doc))
+
+        assert TABLE not in classify_blocks(doc, blocks, detect_tables=False).kinds
+        assert DocumentStructure.all_body(blocks).kinds == [BODY] * len(blocks)
+
+    def test_repeated_body_text_is_not_furniture(self):
+        """Test dass gleicher Fließtext in der Seitenmitte kein Kopfzeilenblock ist"""
+        doc = fitz.open()
+        for _ in range(3):
+            doc.new_page().insert_textbox(fitz.Rect(72, 300, 500, 380), PARAGRAPH, fontsize=11)
+
+        assert classify_blocks(doc, list(extract_blocks(doc))).kinds == [BODY] * 3
+
+    @pytest.mark.parametrize('text, expected', [
+        ("12", True), ("- 3 -", True), ("Seite 4 von 10", True), ("S. 7", True), ("3 / 12", True),
+        ("Seite 4 des Antrags", False), ("Artikel 3", False),
+        # Datum, Betrag und Telefonnummer sind Inhalt
+        ("12.03.2024", False), ("1.234,56", False), ("0221 / 123 45", False),
+    ])
+    def test_is_page_number(self, text, expected):
+        assert is_page_number(text) is expected
+
+    def test_deduplicate(self):
+        """Test eindeutige Texte und Zuordnung in Originalreihenfolge"""
+        assert deduplicate(["a", "b", "a", "c", "b"]) == (["a", "b", "c"], [0, 1, 0, 2, 1])
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline
+
+
+def slow(items, seconds):
+    for item in items:
+        time.sleep(seconds)
+        yield item
+
+
+class TestPipeline:
+    """Tests für die Stufen-Pipeline mit begrenzten Warteschlangen"""
+
+    def test_runs_stages_in_order(self):
+        """Test Reihenfolge, Zählung und Bericht je Stufe und Warteschlange"""
+        pipeline = Pipeline(queue_size=4)
+        pipeline.add_source('quelle', lambda: range(10))
+        pipeline.add_stage('doppelt', lambda items: (item * 2 for item in items))
+        pipeline.add_stage('summe', lambda items: [sum(items)])
+
+        assert pipeline.run() == [90]
+        report = pipeline.report()
+        assert [stage['items'] for stage in report['stages'].values()] == [10, 10, 1]
+        assert all(0 <= stage['utilization'] <= 1 for stage in report['stages'].values())
+        assert list(report['queues']) == ['quelle->doppelt', 'doppelt->summe']
+        assert all(queue['max_depth'] <= 4 for queue in report['queues'].values())
+
+    def test_stages_overlap(self):
+        """Test dass langsame Stufen gleichzeitig statt nacheinander arbeiten"""
+        pipeline = Pipeline(queue_size=2)
+        pipeline.add_source('extraktion', lambda: slow(range(10), 0.02))
+        pipeline.add_stage('inferenz', lambda items: slow(items, 0.02))
+        pipeline.add_stage('ausgabe', lambda items: slow(items, 0.02))
+
+        assert pipeline.run() == list(range(10))
+        # Nacheinander wären es 0,6 s
+        assert pipeline.report()['wall_seconds'] < 0.45
+
+    def test_queue_bounds_producer(self):
+        """Test dass eine schnelle Quelle höchstens eine volle Warteschlange vorausläuft"""
+        produced = []
+        ahead = []
+
+        def source():
+            for item in range(50):
+                produced.append(item)
+                yield item
+
+        def consumer(items):
+            for item in items:
+                ahead.append(len(produced) - item)
+                time.sleep(0.002)
+                yield item
+
+        pipeline = Pipeline(queue_size=3)
+        pipeline.add_source('quelle', source)
+        pipeline.add_stage('verbraucher', consumer)
+        pipeline.run()
+
+        # Warteschlange plus je ein Eintrag in Hand von Quelle und Verbraucher
+        assert max(ahead) <= 3 + 2
+        assert pipeline.report()['queues']['quelle->verbraucher']['max_depth'] == 3
+
+    def test_error_stops_all_stages(self):
+        """Test dass der Fehler einer Stufe weitergereicht wird und keine Stufe hängen bleibt"""
+        def failing(items):
+            for item in items:
+                if item == 3:
+                    raise RuntimeError("Modell fehlgeschlagen")
+                yield item
+
+        pipeline = Pipeline(queue_size=2)
+        pipeline.add_source('quelle', lambda: iter(range(1000)))
+        pipeline.add_stage('inferenz', failing)
+        pipeline.add_stage('ausgabe', list)
+
+        with pytest.raises(RuntimeError, match="Modell fehlgeschlagen"):
+            pipeline.run()
+        assert not [thread for thread in threading.enumerate() if thread.name.startswith('pipeline-')]
+
+    def test_source_must_come_first(self):
+        """Test Reihenfolge beim Aufbau"""
+        with pytest.raises(ValueError):
+            Pipeline().add_stage('inferenz', list)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from readability import ReadabilityFilter, reading_ease, text_statistics
+
+SIMPLE = "Das Amt prüft den Antrag. Das dauert vier Wochen. Sie bekommen dann einen Brief."
+COMPLEX = ("Die Inanspruchnahme der Rechtsbehelfsbelehrung erfordert die fristgerechte "
+           "Einreichung sämtlicher erforderlichen Unterlagen bei der zuständigen Verwaltungsbehörde.")
+
+
+class TestReadability:
+    """Tests für Lesbarkeitswerte und das Überspringen einfacher Chunks"""
+
+    def test_statistics(self):
+        """Test Zählung von Wörtern, Sätzen und Silben (Vokalgruppen)"""
+        statistics = text_statistics(["Das ist ein Haus. Es ist rot!", "Eine Straße", ""])
+
+        assert statistics['words'].tolist() == [7, 2, 0]
+        assert statistics['sentences'].tolist() == [2, 1, 0]
+        assert statistics['syllables'].tolist() == [7, 4, 0]
+
+    def test_batch_matches_single_texts(self):
+        """Test dass die gemeinsame Auswertung jeden Text getrennt zählt"""
+        texts = [SIMPLE, COMPLEX, "Größe", "Ende...", "Wörter ohne Satzzeichen"]
+        batch = text_statistics(texts)
+
+        for index, text in enumerate(texts):
+            single = text_statistics([text])
+            for key in batch:
+                assert batch[key][index] == single[key][0]
+
+    def test_amstad_formula(self):
+        """Test Flesch-Lesewert nach Amstad: 180 - ASL - 58,5 × ASW"""
+        statistics = {'words': np.array([10, 0]), 'sentences': np.array([2, 0]), 'syllables': np.array([15, 0])}
+
+        assert reading_ease(statistics).tolist() == [180 - 5 - 58.5 * 1.5, 100.0]
+
+    def test_simple_mask(self):
+        """Test dass nur einfache Chunks mit kurzen Sätzen übersprungen werden"""
+        long_sentence = " ".join(["Das ist gut"] * 8) + "."
+
+        mask = ReadabilityFilter().simple_mask([SIMPLE, COMPLEX, long_sentence, "123 456"])
+
+        assert mask.tolist() == [True, False, False, True]
+        assert not ReadabilityFilter(enabled=False).simple_mask([SIMPLE]).any()
@@ -0,0 +1,95 @@
+import fitz
+import numpy as np
+import pytest
+
+from span_store import TEXT_FLAGS, SpanStore
+
+
+@pytest.fixture
+def doc():
+    """Zwei Seiten mit Überschrift, Fließtext und einer Zeile aus zwei Schriften"""
+    doc = fitz.open()
+    for number in range(2):
+        page = doc.new_page()
+        page.insert_text((72, 80), f"Kapitel {number + 1}", fontsize=18, fontname="hebo")
+        page.insert_text((72, 120), "Erste Zeile im Text", fontsize=11)
+        page.insert_text((72, 140), "Zweite Zeile im Text", fontsize=11)
+        page.insert_text((72, 700), "Fußnote", fontsize=8, fontname="tiro")
+    yield doc
+    doc.close()
+
+
+def dict_spans(doc):
+    return [span for page in doc for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]
+            for line in block.get("lines", ()) for span in line["spans"]]
+
+
+class TestSpanStore:
+    """Tests für den spaltenweisen Span-Speicher"""
+
+    def test_matches_dict_output(self, doc):
+        """Test dass Text, Rechteck, Schrift und Größe jedes Spans erhalten bleiben"""
+        store = SpanStore.from_document(doc)
+        spans = dict_spans(doc)
+
+        assert len(store) == len(spans) == 8
+        assert store.texts(range(len(store))) == [span["text"] for span in spans]
+        assert store.span_text(4) == "Kapitel 2"
+        np.testing.assert_allclose(store.bbox, [span["bbox"] for span in spans], rtol=1e-6)
+        assert [store.fonts[font] for font in store.font] == [span["font"] for span in spans]
+        assert list(store.page) == [0, 0, 0, 0, 1, 1, 1, 1]
+        # Schriftnamen nur einmal gespeichert
+        assert len(store.fonts) == 3
+
+    def test_queries(self, doc):
+        """Test Bereichs-, Schriftgrößen- und Zeilenabfragen"""
+        store = SpanStore.from_document(doc)
+
+        headings = store.with_font_size(16)
+        assert store.texts(headings) == ["Kapitel 1", "Kapitel 2"]
+        footer = store.in_region(1, (0, 650, 595, 842))
+        assert store.texts(footer) == ["Fußnote"]
+        assert len(store.in_region(None, (0, 650, 595, 842))) == 2
+        body = store.in_region(0, (60, 100, 400, 150), contained=True)
+        assert store.texts(body) == ["Erste Zeile im Text", "Zweite Zeile im Text"]
+
+        pages, boxes, texts = store.lines()
+        assert texts[:2] == ["Kapitel 1", "Erste Zeile im Text"]
+        assert list(pages) == [0] * 4 + [1] * 4
+        assert boxes.shape == (8, 4)
+
+    def test_blocks(self, doc):
+        """Test Blöcke mit Seite, Rechteck, gewichteter Schriftgröße und Zeilen"""
+        doc[1].insert_text((72, 160), "Zeile mit Fett", fontsize=11, fontname="hebo")
+        store = SpanStore.from_document(doc)
+        expected = [block for page in doc for block in page.get_text("dict", flags=TEXT_FLAGS)["blocks"]
+                    if block.get("lines")]
+
+        pages, boxes, sizes, lines = store.blocks()
+
+        assert list(pages) == [page.number for page in doc for block in page.get_text("blocks")]
+        assert len(lines) == len(expected)
+        assert lines == [[''.join(span["text"] for span in line["spans"]) for line in block["lines"]]
+                         for block in expected]
+        np.testing.assert_allclose(boxes, [block["bbox"] for block in expected], rtol=1e-5)
+        assert sizes[0] == pytest.approx(18)
+        assert sizes[1] == pytest.approx(11)
+        assert SpanStore().blocks()[3] == []
+
+    def test_fills_page_by_page(self, doc):
+        """Test dass Abfragen zwischen zwei Seiten den bisherigen Stand sehen"""
+        store = SpanStore()
+        assert store.add_page(doc[0]) == 4
+        assert store.texts(store.with_font_size(16)) == ["Kapitel 1"]
+
+        store.add_page(doc[1])
+        assert store.texts(store.with_font_size(16)) == ["Kapitel 1", "Kapitel 2"]
+        assert store.lines()[2][-1] == "Fußnote"
+
+    def test_empty(self):
+        """Test leerer Speicher"""
+        store = SpanStore()
+
+        assert len(store) == 0
+        assert len(store.in_region(None, (0, 0, 100, 100))) == 0
+        assert store.lines()[2] == []
@@ -0,0 +1,92 @@
+import random
+
+import fitz
+import pytest
+
+from text_fit import SIZE_PRECISION, metrics_for
+
+WORDS = ("Die Verwaltung prüft den ﬁnalen Antrag  auf Förderung "
+         "Donaudampfschifffahrtsgesellschaftskapitän € 12,50 innerhalb der Frist.").split(" ")
+
+
+@pytest.fixture(scope="module")
+def metrics():
+    return metrics_for("helv")
+
+
+def fill_textbox_fits(rect, text, size):
+    """Probesatz wie bisher: passt, wenn fill_textbox keinen Rest liefert"""
+    writer = fitz.TextWriter(fitz.Rect(0, 0, 595, 842))
+    try:
+        return not writer.fill_textbox(rect, text, font=fitz.Font("helv"), fontsize=size)
+    except ValueError:
+        return False
+
+
+class TestTextFit:
+    """Tests für die Berechnung der Schriftgröße ohne Probesatz"""
+
+    def test_matches_fill_textbox(self, metrics):
+        """Test dass der berechnete Umbruch dem von fill_textbox entspricht"""
+        rng = random.Random(0)
+        for _ in range(300):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 60)))
+            if rng.random() < 0.2:
+                text = text.replace(" ", "\n", 1)
+            rect = fitz.Rect(50, 50, 50 + rng.uniform(10, 400), 50 + rng.uniform(5, 300))
+            size = rng.uniform(4, 16)
+
+            if metrics.advances(text).max(initial=0) * size > rect.width - 0.2 * size:
+                # fill_textbox verwirft Zeichen, die breiter als die Zeile sind; hier passt das nicht
+                assert not metrics.fits(rect, text, size)
+                continue
+            assert metrics.fits(rect, text, size) == fill_textbox_fits(rect, text, size), (text, rect, size)
+
+    def test_fit_size_is_largest_fitting(self, metrics):
+        """Test dass die gefundene Größe passt und eine etwas größere nicht"""
+        rect = fitz.Rect(72, 72, 300, 140)
+        text = " ".join(WORDS * 3)
+
+        size = metrics.fit_size(rect, text, 14, 4)
+
+        assert 4 < size < 14
+        assert fill_textbox_fits(rect, text, size)
+        assert not fill_textbox_fits(rect, text, size + 2 * SIZE_PRECISION)
+        assert metrics.fit_size(rect, "Kurz", 14, 4) == 14
+        assert metrics.fit_size(rect, text * 30, 14, 4) is None
+
+    def test_layout_matches_fill_textbox(self, metrics):
+        """Test dass die berechneten Zeilen genau wie mit fill_textbox gesetzt werden"""
+        rect = fitz.Rect(72, 72, 260, 400)
+        text = " ".join(WORDS * 4) + "\n\nZweiter Absatz mit  doppeltem Leerzeichen"
+        font = fitz.Font("helv")
+        doc = fitz.open()
+        doc.new_page()
+        doc.new_page()
+        expected, actual = doc[0], doc[1]
+
+        writer = fitz.TextWriter(expected.rect)
+        assert not writer.fill_textbox(rect, text, font=font, fontsize=9)
+        writer.write_text(expected)
+        writer = fitz.TextWriter(actual.rect)
+        for point, line in metrics.layout(rect, text, 9):
+            writer.append(point, line, font=font, fontsize=9)
+        writer.write_text(actual)
+
+        assert actual.get_text("words") == expected.get_text("words")
+        doc.close()
+
+    def test_measurement_is_cached(self, metrics):
+        """Test dass ein Text bei der Suche nur einmal vermessen wird"""
+        metrics.measure.cache_clear()
+        metrics.fit_size(fitz.Rect(72, 72, 300, 140), " ".join(WORDS * 3), 14, 4)
+
+        info = metrics.measure.cache_info()
+        assert info.misses == 1
+        assert info.hits > 5
+
+    def test_characters_outside_preloaded_range(self, metrics):
+        """Test Laufweiten für Zeichen außerhalb der Vorabtabelle"""
+        text = "Preis: 5 € – „gültig“ 😀"
+
+        assert metrics.advances(text).sum() == pytest.approx(fitz.Font("helv").text_length(text, fontsize=1), rel=1e-5)
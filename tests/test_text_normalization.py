@@ -0,0 +1,57 @@
+import fitz
+
+from pdf_extraction import page_text
+from text_normalization import collapse_whitespace, join_lines, normalize_text, page_paragraphs
+
+
+def block(y0, text, x0=72, line_height=12):
+    """Textblock wie aus page.get_text("blocks")"""
+    lines = text.count("\n") + 1
+    return (x0, y0, 500, y0 + lines * line_height, text, 0, 0)
+
+
+class TestTextNormalization:
+    """Tests für Silbentrennung, Unicode und Absatzrekonstruktion"""
+
+    def test_dehyphenates_line_ends(self):
+        """Test dass Trennungen aufgelöst und Komposita erhalten bleiben"""
+        lines = ["Die Ver-", "waltung prüft  den ﬁnalen", "Antrag per E-", "Mail. Landes-",
+                 "und Bundes­", "recht gilt."]
+
+        assert join_lines(lines) == "Die Verwaltung prüft den finalen Antrag per E-Mail. Landes- und Bundesrecht gilt."
+
+    def test_normalizes_unicode_and_spaces(self):
+        """Test NFKC, geschützte Leerzeichen und unsichtbare Zeichen"""
+        assert normalize_text("Ab sofort​ gilt\t§ 5 Ａbs. 1") == "Ab sofort gilt § 5 Abs. 1"
+        assert collapse_whitespace("  a \n\n b  ") == "a b"
+
+    def test_keeps_hyphen_before_digits(self):
+        """Test dass Striche ohne Buchstaben davor ("Nr. 5 -") nicht verbunden werden"""
+        assert join_lines(["Anlage 5 -", "siehe unten"]) == "Anlage 5 - siehe unten"
+
+    def test_reconstructs_paragraphs(self):
+        """Test dass bündige Blöcke ohne Satzende und Abstand ein Absatz sind"""
+        blocks = [
+            block(100, "Der Antrag ist bis zum"),
+            block(112, "31. März einzureichen."),
+            block(140, "Eine Ver-\nlängerung ist möglich."),
+            block(164, "Eingerückt", x0=90),
+            (72, 200, 200, 300, "<image>", 0, 1),
+        ]
+
+        assert page_paragraphs(blocks) == [
+            "Der Antrag ist bis zum 31. März einzureichen.",
+            "Eine Verlängerung ist möglich.",
+            "Eingerückt",
+        ]
+
+    def test_page_text_from_pdf(self):
+        """Test die Normalisierung auf einer echten Seite"""
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 100), "Die Ver-", fontsize=11)
+        page.insert_text((72, 113), "waltung entscheidet.", fontsize=11)
+        page.insert_text((72, 160), "Zweiter Absatz.", fontsize=11)
+
+        assert page_text(page) == "Die Verwaltung entscheidet.\nZweiter Absatz."
+        doc.close()
@@ -0,0 +1,151 @@
+import json
+import os
+import pytest
+import torch
+from unittest.mock import patch
+from thread_planner import (
+    ThreadPlan, available_cpus, autotune, apply_plan, candidate_plans, cgroup_cpu_limit,
+    configure_threads, load_saved_plan, plan_threads, save_plan
+)
+
+
+def write_cgroup_v2(root, content):
+    (root / 'cpu.max').write_text(content)
+    return str(root)
+
+
+def write_cgroup_v1(root, quota, period):
+    cpu_dir = root / 'cpu'
+    cpu_dir.mkdir()
+    (cpu_dir / 'cpu.cfs_quota_us').write_text(f"{quota}\n")
+    (cpu_dir / 'cpu.cfs_period_us').write_text(f"{period}\n")
+    return str(root)
+
+
+@pytest.fixture
+def restore_threads():
+    """torch-Threads und Umgebungsvariablen nach dem Test zurücksetzen"""
+    threads = torch.get_num_threads()
+    environ = {key: os.environ.get(key) for key in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'TOKENIZERS_PARALLELISM')}
+    yield
+    torch.set_num_threads(threads)
+    for key, value in environ.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+class TestCpuDetection:
+    """Tests für die Erkennung verfügbarer CPUs"""
+
+    def test_cgroup_v2_quota(self, tmp_path):
+        """Test cgroup v2 cpu.max"""
+        assert cgroup_cpu_limit(write_cgroup_v2(tmp_path, "250000 100000\n")) == 2.5
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        """Test cgroup v2 ohne Limit"""
+        assert cgroup_cpu_limit(write_cgroup_v2(tmp_path, "max 100000\n")) is None
+
+    def test_cgroup_v1_quota(self, tmp_path):
+        """Test cgroup v1 cfs_quota_us"""
+        assert cgroup_cpu_limit(write_cgroup_v1(tmp_path, 200000, 100000)) == 2.0
+
+    def test_cgroup_v1_unlimited(self, tmp_path):
+        """Test cgroup v1 ohne Limit (Quota -1)"""
+        assert cgroup_cpu_limit(write_cgroup_v1(tmp_path, -1, 100000)) is None
+
+    def test_quota_limits_affinity(self, tmp_path):
+        """Test dass die Quota die Affinitätsmaske begrenzt und abrundet"""
+        root = write_cgroup_v2(tmp_path, "250000 100000\n")
+        with patch('thread_planner.os.sched_getaffinity', return_value=set(range(8))):
+            assert available_cpus(root) == 2
+
+    def test_affinity_without_quota(self, tmp_path):
+        """Test Affinitätsmaske ohne cgroup-Limit"""
+        with patch('thread_planner.os.sched_getaffinity', return_value={0, 2, 4}):
+            assert available_cpus(str(tmp_path)) == 3
+
+    def test_fractional_quota_keeps_one_cpu(self, tmp_path):
+        """Test dass eine Quota unter einer CPU einen Thread erlaubt"""
+        root = write_cgroup_v2(tmp_path, "50000 100000\n")
+        with patch('thread_planner.os.sched_getaffinity', return_value=set(range(4))):
+            assert available_cpus(root) == 1
+
+
+class TestThreadPlan:
+    """Tests für die Thread-Planung"""
+
+    def test_cpus_are_shared_between_workers(self):
+        """Test dass die Worker zusammen nicht mehr Threads als CPUs nutzen"""
+        plan = plan_threads(cpus=8, workers=4)
+        assert plan.intra_op_threads == 2
+        assert plan.inter_op_threads == 1
+        assert plan.tokenizers_parallelism is False
+
+    def test_more_workers_than_cpus(self):
+        """Test mindestens ein Thread pro Worker"""
+        assert plan_threads(cpus=2, workers=4).intra_op_threads == 1
+
+    def test_single_worker_uses_all_cpus(self):
+        """Test ein Worker nutzt alle CPUs und Tokenizer-Parallelität"""
+        plan = plan_threads(cpus=8, workers=1)
+        assert plan.intra_op_threads == 8
+        assert plan.tokenizers_parallelism is True
+
+    def test_candidates_include_share_and_oversubscription(self):
+        """Test Kandidaten enthalten den fairen Anteil und alle CPUs"""
+        candidates = candidate_plans(cpus=8, workers=2)
+        intra_values = {intra for intra, _ in candidates}
+        assert {1, 2, 4, 8} <= intra_values
+        assert {inter for _, inter in candidates} == {1, 2}
+
+    def test_apply_plan(self, restore_threads):
+        """Test Setzen von torch-Threads und Umgebungsvariablen"""
+        apply_plan(ThreadPlan(intra_op_threads=1, inter_op_threads=torch.get_num_interop_threads(),
+                              tokenizers_parallelism=False))
+
+        assert torch.get_num_threads() == 1
+        assert os.environ['OMP_NUM_THREADS'] == '1'
+        assert os.environ['TOKENIZERS_PARALLELISM'] == 'false'
+
+    def test_saved_plan_roundtrip(self, tmp_path):
+        """Test Speichern und Laden eines Autotune-Ergebnisses"""
+        path = str(tmp_path / 'plan.json')
+        save_plan(path, 8, 4, ThreadPlan(3, 2, False), [{'intra_op_threads': 3}])
+        save_plan(path, 8, 2, ThreadPlan(4, 1, False), [])
+
+        plan = load_saved_plan(path, 8, 4)
+        assert (plan.intra_op_threads, plan.inter_op_threads, plan.source) == (3, 2, 'autotune')
+        assert load_saved_plan(path, 16, 4) is None
+        assert len(json.load(open(path))) == 2
+
+    def test_configure_prefers_saved_plan(self, tmp_path, restore_threads):
+        """Test dass ein passendes Autotune-Ergebnis die Heuristik ersetzt"""
+        path = str(tmp_path / 'plan.json')
+        cpus = available_cpus()
+        save_plan(path, cpus, 1, ThreadPlan(1, torch.get_num_interop_threads(), False), [])
+
+        assert configure_threads(1, path).source == 'autotune'
+        assert configure_threads(1, str(tmp_path / 'missing.json')).source == 'heuristic'
+
+
+class TestAutotune:
+    """Tests für den Autotune-Modus"""
+
+    def test_autotune_saves_best_plan(self, tiny_model_dir, tmp_path):
+        """Test dass Autotune misst und die schnellste Konfiguration speichert"""
+        path = str(tmp_path / 'plan.json')
+        throughput = {(1, 1): 10.0, (1, 2): 12.0}
+
+        with patch('thread_planner.measure_plan',
+                   side_effect=lambda model, workers, intra, inter, prompts, tokens: throughput[(intra, inter)]):
+            plan = autotune(tiny_model_dir, 2, path, ["Text"], candidates=[(1, 1), (1, 2)])
+
+        assert (plan.intra_op_threads, plan.inter_op_threads) == (1, 2)
+        assert load_saved_plan(path, available_cpus(), 2).inter_op_threads == 2
+
+    def test_measure_plan_runs_workers(self, tiny_model_dir):
+        """Test Messung mit echten Worker-Prozessen"""
+        from thread_planner import measure_plan
+        assert measure_plan(tiny_model_dir, 1, 1, 1, ["Vereinfache: Text"], 2) > 0
@@ -0,0 +1,85 @@
+import io
+import tempfile
+
+import fitz
+import pytest
+from flask import Flask, request
+from werkzeug.datastructures import FileStorage, Headers
+
+from pdf_extraction import open_pdf
+from security import SecurityManager
+from upload_buffer import SpooledRequest, upload_buffer
+
+
+@pytest.fixture
+def pdf_bytes():
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Hallo Welt")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class TestUploadBuffer:
+    """Tests für Uploads im Speicher und speicherabgebildete gespoolte Uploads"""
+
+    def test_request_keeps_small_uploads_in_memory(self, pdf_bytes):
+        """Test dass Uploads bis zur Schwelle in einem BytesIO landen, größere gespoolt werden"""
+        app = Flask(__name__)
+        app.request_class = type('Request', (SpooledRequest,), {'spool_threshold': 4 * len(pdf_bytes)})
+        streams = {}
+
+        @app.route('/', methods=['POST'])
+        def upload():
+            file = request.files['file']
+            streams[len(streams)] = file.stream
+            return ''
+
+        client = app.test_client()
+        client.post('/', data={'file': (io.BytesIO(pdf_bytes), 'a.pdf')})
+        client.post('/', data={'file': (io.BytesIO(pdf_bytes * 5), 'b.pdf')})
+
+        assert isinstance(streams[0], io.BytesIO)
+        assert isinstance(streams[1], tempfile.SpooledTemporaryFile)
+
+    def test_buffer_from_memory(self, pdf_bytes):
+        """Test dass ein BytesIO ohne Umweg als Inhalt geliefert wird"""
+        with upload_buffer(io.BytesIO(pdf_bytes)) as data:
+            assert data == pdf_bytes
+            with open_pdf(data) as doc:
+                assert doc[0].get_text().strip() == "Hallo Welt"
+
+    def test_buffer_from_spooled_file(self, pdf_bytes):
+        """Test dass eine gespoolte Datei speicherabgebildet geöffnet und danach freigegeben wird"""
+        stream = tempfile.SpooledTemporaryFile(max_size=16)
+        stream.write(pdf_bytes)
+
+        with upload_buffer(stream) as data:
+            assert isinstance(data, memoryview)
+            assert data == pdf_bytes
+            doc = open_pdf(data)
+            text = doc[0].get_text().strip()
+            doc.close()
+            del doc
+        assert text == "Hallo Welt"
+        with pytest.raises(ValueError):
+            data.tobytes()
+
+    def test_empty_upload(self):
+        """Test dass ein leerer Upload keinen Fehler beim Abbilden auslöst"""
+        with upload_buffer(tempfile.TemporaryFile()) as data:
+            assert data == b""
+
+    def test_size_measured_not_declared(self):
+        """Test dass die Größenprüfung den Upload misst und die Längenangabe des Clients ignoriert"""
+        security = SecurityManager()
+        security.max_file_size = 100
+        spooled = tempfile.SpooledTemporaryFile(max_size=16)
+        spooled.write(b"x" * 101)
+        spooled.seek(0)
+        for stream in (io.BytesIO(b"x" * 101), spooled):
+            file = FileStorage(stream, 'a.pdf', headers=Headers({'Content-Length': '10'}))
+            assert file.content_length == 10
+
+            assert security.validate_file_size(file)[0] is False
+            assert stream.tell() == 0
@@ -0,0 +1,63 @@
+"""
+Kleines, zufällig initialisiertes Modell für Tests und Benchmarks ohne Download
+"""
+import torch
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+CORPUS = [
+    "Vereinfache den folgenden Text in einfaches, verständliches de. "
+    "Verwende kurze Sätze und einfache Wörter. Behalte alle wichtigen Informationen bei.",
+    "Vereinfache folgenden Text auf einfachem Deutsch. Text: Vereinfachter Text:",
+    "Die Verwaltung prüft den Antrag innerhalb von vier Wochen und teilt das Ergebnis schriftlich mit.",
+    "Der Bescheid enthält eine Rechtsbehelfsbelehrung. Das ist einfach.",
+]
+
+
+def build_tiny_tokenizer(vocab_size: int = 400) -> PreTrainedTokenizerFast:
+    """Byte-Level-BPE-Tokenizer, trainiert auf einem kleinen deutschen Korpus"""
+    backend = Tokenizer(models.BPE(unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    backend.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=["<unk>", "<s>", "</s>", "<pad>"],
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+    )
+    backend.train_from_iterator(CORPUS * 10, trainer)
+    return PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        unk_token="<unk>",
+        bos_token="<s>",
+        eos_token="</s>",
+        pad_token="<pad>",
+        padding_side="left",
+    )
+
+
+def build_tiny_model(tokenizer, seed: int = 0, hidden_size: int = 64,
+                     num_hidden_layers: int = 2) -> LlamaForCausalLM:
+    """Zufällig initialisiertes Llama-Modell passend zum Tokenizer"""
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_hidden_layers,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=2048,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+    )
+    torch.manual_seed(seed)
+    return LlamaForCausalLM(config).eval()
+
+
+def save_tiny_model(path: str, seed: int = 0, **model_kwargs) -> str:
+    """Speichert Tokenizer und Modell als lokales Modellverzeichnis"""
+    tokenizer = build_tiny_tokenizer()
+    model = build_tiny_model(tokenizer, seed=seed, **model_kwargs)
+    tokenizer.save_pretrained(path)
+    model.save_pretrained(path)
+    return path
@@ -0,0 +1,213 @@
+"""
+Schriftgröße für Text in einem festen Rechteck
+
+``TextWriter.fill_textbox`` setzt den ganzen Text, um festzustellen, ob er
+passt; die bisherige Verkleinerung in Schritten hat das für jeden Block
+mehrmals getan. Hier wird der Zeilenumbruch von ``fill_textbox``
+nachgerechnet, ohne etwas zu setzen:
+
+- Die Laufweiten der Glyphen einer Schrift werden einmal (für Latein und
+  Umlaute vorab, sonst beim ersten Auftreten) in ein Array geschrieben.
+- Ein Text wird einmal vermessen (Wortbreiten als Array, in Einheiten der
+  Schriftgröße) und zwischengespeichert.
+- Alle Breiten skalieren linear mit der Schriftgröße. Der Umbruch bei einer
+  Größe ist ein ``searchsorted`` pro Zeile über die Präfixsummen der
+  Wortbreiten.
+- Die größte passende Schriftgröße wird binär gesucht.
+
+Anders als ``fill_textbox`` gilt ein Text mit einem Zeichen, das breiter
+als die Zeile ist, als nicht passend (``fill_textbox`` verwirft es still).
+
+Gesetzt wird nur die gefundene Größe, und zwar Zeile für Zeile mit den
+berechneten Umbrüchen (``layout``): ``fill_textbox`` selbst bricht mit
+quadratischem Aufwand in der Wortzahl um.
+"""
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# Codepoints, deren Laufweite vorab berechnet wird (Latein, Umlaute, Satzzeichen)
+_PRELOAD = 0x0250
+# Tabelle für die Basic Multilingual Plane, seltenere Zeichen werden direkt vermessen
+_TABLE_SIZE = 0x10000
+# Genauigkeit der Suche in Punkten
+SIZE_PRECISION = 0.05
+# Vermessene Texte je Schrift
+MEASURE_CACHE_SIZE = 4096
+
+
+@dataclass
+class MeasuredLine:
+    """Eine Textzeile (ohne Umbruch) vermessen bei Schriftgröße 1"""
+
+    width: float
+    # Präfixsummen von Wortbreite + Leerzeichen; ``ends[k]`` endet nach Wort k
+    ends: np.ndarray
+    # Zeichenbreiten je Wort, nur für Wörter, die eventuell zerteilt werden müssen
+    chars: List[np.ndarray]
+    words: np.ndarray
+
+
+class GlyphMetrics:
+    """Laufweiten einer Schrift als Array, Vermessung von Texten mit Cache"""
+
+    def __init__(self, font: fitz.Font):
+        self.font = font
+        self.ascender = font.ascender
+        # Zeilenhöhe wie in fill_textbox
+        self.line_height = font.ascender - font.descender if font.ascender - font.descender > 1 else 1.2
+        self._advances = np.full(_TABLE_SIZE, np.nan, dtype=np.float32)
+        self._advances[:_PRELOAD] = font.char_lengths(
+            ''.join(chr(code) for code in range(_PRELOAD)), fontsize=1
+        )
+        self.space = float(self._advances[ord(' ')])
+        self.measure = lru_cache(maxsize=MEASURE_CACHE_SIZE)(self._measure)
+
+    def advances(self, text: str) -> np.ndarray:
+        """Laufweite jedes Zeichens bei Schriftgröße 1"""
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        if codes.size and codes.max() >= _TABLE_SIZE:
+            return np.asarray(self.font.char_lengths(text, fontsize=1), dtype=np.float32)
+        widths = self._advances[codes]
+        missing = np.isnan(widths)
+        if missing.any():
+            unknown = np.unique(codes[missing])
+            self._advances[unknown] = self.font.char_lengths(''.join(map(chr, unknown)), fontsize=1)
+            widths = self._advances[codes]
+        return widths
+
+    def _measure(self, line: str) -> MeasuredLine:
+        widths = self.advances(line).astype(np.float64)
+        spaces = np.frombuffer(line.encode('utf-32-le'), dtype=np.uint32) == ord(' ')
+        # Wörter wie line.split(" "): auch leere Wörter zwischen doppelten Leerzeichen
+        boundaries = np.flatnonzero(spaces)
+        starts = np.concatenate(([0], boundaries + 1))
+        stops = np.concatenate((boundaries, [len(line)]))
+        cumulative = np.concatenate(([0.0], np.cumsum(widths)))
+        words = cumulative[stops] - cumulative[starts]
+        chars = [widths[start:stop] for start, stop in zip(starts, stops)]
+        return MeasuredLine(
+            width=float(cumulative[-1]),
+            ends=np.cumsum(words + self.space),
+            chars=chars,
+            words=words,
+        )
+
+    def _split_long_words(self, measured: MeasuredLine, width: float) -> Tuple[np.ndarray, List[Tuple[int, int, int]]]:
+        """Zerteilt zu breite Wörter wie ``fill_textbox``; Präfixsummen und Stücke (Wort, von, bis)"""
+        widths, pieces = [], []
+        for index, (word, chars) in enumerate(zip(measured.words, measured.chars)):
+            if word <= width:
+                widths.append(word)
+                pieces.append((index, 0, len(chars)))
+                continue
+            cumulative = np.cumsum(chars)
+            offset = 0.0
+            position = 0
+            while position < len(chars):
+                # Längster Anfang, der passt
+                stop = int(np.searchsorted(cumulative, offset + width, side='right'))
+                widths.append(cumulative[stop - 1] - offset)
+                pieces.append((index, position, stop))
+                offset = cumulative[stop - 1]
+                position = stop
+        return np.cumsum(np.asarray(widths) + self.space), pieces
+
+    def _line_stops(self, ends: np.ndarray, width: float) -> List[int]:
+        """Greedy-Umbruch: Ende (exklusiv) jeder Zeile als Index in ``ends``"""
+        stops, start, index = [], 0.0, 0
+        while index < len(ends):
+            # Letztes Wort mit Zeilenbreite <= width (Leerzeichen nach dem letzten Wort zählt nicht)
+            stop = max(int(np.searchsorted(ends, start + width + self.space, side='right')), index + 1)
+            stops.append(stop)
+            start = ends[stop - 1]
+            index = stop
+        return stops
+
+    def _too_wide(self, measured: MeasuredLine, width: float) -> bool:
+        return max(chars.max(initial=0.0) for chars in measured.chars) > width
+
+    def line_count(self, line: str, width: float) -> float:
+        """Zeilen nach dem Umbruch von ``fill_textbox`` bei Breite ``width`` (in Schriftgrößen)"""
+        if line in ("", " "):
+            return 1
+        measured = self.measure(line)
+        if measured.width <= width:
+            return 1
+        ends = measured.ends
+        if measured.words.max() > width:
+            if self._too_wide(measured, width):
+                return math.inf  # Zeichen breiter als die Zeile
+            ends, _ = self._split_long_words(measured, width)
+        return len(self._line_stops(ends, width))
+
+    def wrap(self, line: str, width: float) -> List[str]:
+        """Umbrochene Zeilen wie ``fill_textbox`` (``width`` in Schriftgrößen)"""
+        measured = self.measure(line)
+        if line in ("", " ") or measured.width <= width:
+            return [line]
+        words = line.split(" ")
+        if measured.words.max() > width:
+            ends, pieces = self._split_long_words(measured, width)
+        else:
+            ends, pieces = measured.ends, [(index, 0, len(word)) for index, word in enumerate(words)]
+        lines, start = [], 0
+        for stop in self._line_stops(ends, width):
+            lines.append(" ".join(words[index][begin:end] for index, begin, end in pieces[start:stop]))
+            start = stop
+        return lines
+
+    def layout(self, rect: fitz.Rect, text: str, size: float) -> List[Tuple[fitz.Point, str]]:
+        """Startpunkt und Text jeder Zeile, wie ``fill_textbox`` linksbündig setzt"""
+        tolerance = size * 0.2
+        width = (rect.width - tolerance) / size
+        x, y = rect.x0 + tolerance, rect.y0 + size * self.ascender
+        placed = []
+        for line in text.splitlines():
+            for part in self.wrap(line, width):
+                placed.append((fitz.Point(x, y + len(placed) * size * self.line_height), part))
+        return placed
+
+    def fits(self, rect: fitz.Rect, text: str, size: float) -> bool:
+        """Ob ``fill_textbox`` den Text bei dieser Größe ohne Rest setzt"""
+        tolerance = size * 0.2
+        top = rect.y0 + size * self.ascender
+        if rect.width <= tolerance or not rect.y0 <= top < rect.y1:
+            return False  # Startpunkt läge außerhalb des Rechtecks
+        max_lines = int((rect.y1 - top) / (size * self.line_height)) + 1
+        width = (rect.width - tolerance) / size
+        lines = 0
+        for line in text.splitlines():
+            lines += self.line_count(line, width)
+            if lines > max_lines:
+                return False
+        return True
+
+    def fit_size(self, rect: fitz.Rect, text: str, max_size: float, min_size: float) -> Optional[float]:
+        """Größte Schriftgröße in [min_size, max_size], bei der der Text passt; sonst None"""
+        if self.fits(rect, text, max_size):
+            return max_size
+        if max_size <= min_size or not self.fits(rect, text, min_size):
+            return None
+        low, high = min_size, max_size
+        for _ in range(max(1, math.ceil(math.log2((max_size - min_size) / SIZE_PRECISION)))):
+            middle = (low + high) / 2
+            if self.fits(rect, text, middle):
+                low = middle
+            else:
+                high = middle
+        return low
+
+
+_metrics = {}
+
+
+def metrics_for(font_name: str) -> GlyphMetrics:
+    """Metriken einer eingebauten Schrift (z. B. 'helv'), einmal pro Prozess"""
+    if font_name not in _metrics:
+        _metrics[font_name] = GlyphMetrics(fitz.Font(font_name))
+    return _metrics[font_name]
@@ -0,0 +1,100 @@
+"""
+Normalisierung extrahierten PDF-Textes vor dem Chunking
+
+PDF-Zeilen enthalten Silbentrennung am Zeilenende ("Ver-" / "waltung"),
+Ligaturen (U+FB01 "fi"), weiche Trennzeichen, geschützte und doppelte
+Leerzeichen. Das alles kostet Tokens und verwirrt das Modell. Hier werden
+
+- Unicode nach NFKC gefaltet (Ligaturen, Vollbreite, geschützte Leerzeichen)
+  und unsichtbare Zeichen entfernt,
+- Zeilen eines Absatzes verbunden, Trennstriche am Zeilenende aufgelöst
+  ("Ver-" + "waltung" → "Verwaltung", "E-" + "Mail" → "E-Mail",
+  "Landes-" + "und Bundesrecht" bleibt),
+- Leerraum zu einem Leerzeichen zusammengefasst,
+- Absätze aus der Blockgeometrie einer Seite rekonstruiert: Blöcke, die
+  ohne Satzende und ohne Abstand bündig aufeinander folgen, sind ein Absatz.
+"""
+import re
+import unicodedata
+from typing import Iterable, List, Sequence, Tuple
+
+# Weiches Trennzeichen, Null-Breite-Zeichen, Byte-Order-Mark
+_INVISIBLE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_SPACES = re.compile(r"\s+")
+# Trennstrich am Zeilenende nach einem Buchstaben (auch U+2010, U+00AD)
+_LINE_END_HYPHEN = re.compile("[^\\W\\d_][-\u2010\u00ad]$")
+# Ergänzungsstrich: "Landes- und Bundesrecht" behält den Strich und das Leerzeichen
+_SUSPENDED = {'und', 'oder', 'bzw', 'sowie', 'bis', 'als', 'noch', 'wie'}
+_SENTENCE_END = ('.', '!', '?', ':', ';')
+
+# Absatzgrenze: Abstand zum nächsten Block relativ zur Zeilenhöhe, Einzug in Punkten
+PARAGRAPH_GAP = 0.6
+INDENT_TOLERANCE = 2.0
+
+
+def normalize_unicode(text: str) -> str:
+    """NFKC (Ligaturen, Kompatibilitätszeichen), Tabs und Zeilenenden bleiben"""
+    return unicodedata.normalize('NFKC', text)
+
+
+def collapse_whitespace(text: str) -> str:
+    return _SPACES.sub(' ', text).strip()
+
+
+def join_lines(lines: Iterable[str]) -> str:
+    """Verbindet die Zeilen eines Absatzes und löst Trennungen am Zeilenende auf"""
+    parts: List[str] = []
+    for line in lines:
+        line = collapse_whitespace(normalize_unicode(line))
+        if not line:
+            continue
+        previous = parts[-1] if parts else ''
+        if _LINE_END_HYPHEN.search(previous):
+            word = re.match(r"\w*", line).group().lower()
+            if previous.endswith('\u00ad') or (line[0].islower() and word not in _SUSPENDED):
+                # Silbentrennung: Strich weg, Wort zusammen
+                parts[-1] = previous[:-1] + line
+                continue
+            if not line[0].islower():
+                # Bindestrich-Kompositum ("E-Mail", "Bundes-Verwaltung")
+                parts[-1] = previous + line
+                continue
+        parts.append(line)
+    return _INVISIBLE.sub('', ' '.join(parts))
+
+
+def normalize_text(text: str) -> str:
+    """Ein Absatz aus Text mit Zeilenumbrüchen"""
+    return join_lines(text.splitlines())
+
+
+def _continues(previous: Tuple, block: Tuple) -> bool:
+    """Ob ``block`` den Absatz von ``previous`` fortsetzt (gleicher Einzug, kein Abstand)"""
+    x0, y0, _, _, lines = block
+    px0, py0, _, py1, previous_lines = previous
+    line_height = (py1 - py0) / max(len(previous_lines), 1)
+    last = previous_lines[-1].rstrip() if previous_lines else ''
+    return (
+        abs(x0 - px0) <= INDENT_TOLERANCE
+        and y0 - py1 <= line_height * PARAGRAPH_GAP
+        and not last.endswith(_SENTENCE_END)
+    )
+
+
+def page_paragraphs(blocks: Sequence[Tuple]) -> List[str]:
+    """Absätze einer Seite aus ``page.get_text("blocks")`` (Textblöcke in Lesereihenfolge)"""
+    groups: List[Tuple] = []
+    for x0, y0, x1, y1, text, _, block_type in blocks:
+        if block_type != 0:
+            continue  # Bildblock
+        lines = [line for line in text.splitlines() if line.strip()]
+        if not lines:
+            continue
+        block = (x0, y0, x1, y1, lines)
+        if groups and _continues(groups[-1], block):
+            gx0, gy0, gx1, _, group_lines = groups[-1]
+            groups[-1] = (gx0, gy0, max(gx1, x1), y1, group_lines + lines)
+        else:
+            groups.append(block)
+    paragraphs = [join_lines(group[4]) for group in groups]
+    return [paragraph for paragraph in paragraphs if paragraph]
@@ -0,0 +1,271 @@
+"""
+CPU-Thread-Planung für Inferenz-Worker
+
+Jeder gunicorn-Worker ist ein eigener Prozess mit eigenem torch-Threadpool.
+Ohne Planung nutzt jeder Worker alle Kerne, und mehrere Worker verdrängen
+sich gegenseitig. Der Planer teilt die tatsächlich verfügbaren CPUs
+(Affinität und cgroup-Quota) auf die Worker auf. Der Autotune-Modus misst
+einige Konfigurationen mit parallel laufenden Workern auf dem echten Modell
+und speichert die schnellste.
+
+Autotune aus dem Projektverzeichnis:
+    python thread_planner.py --model microsoft/phi-4-mini-instruct --workers 4
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+
+@dataclass
+class ThreadPlan:
+    """Thread-Konfiguration eines Workers"""
+    intra_op_threads: int
+    inter_op_threads: int
+    tokenizers_parallelism: bool
+    source: str = 'heuristic'
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> Optional[float]:
+    """CPU-Quota aus cgroup v2 (cpu.max) oder v1 (cfs_quota_us); None ohne Limit"""
+    try:
+        with open(os.path.join(root, 'cpu.max')) as f:
+            quota, period = f.read().split()[:2]
+        if quota == 'max':
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open(os.path.join(root, 'cpu', 'cpu.cfs_quota_us')) as f:
+            quota = int(f.read())
+        with open(os.path.join(root, 'cpu', 'cpu.cfs_period_us')) as f:
+            period = int(f.read())
+        if quota <= 0 or period <= 0:
+            return None
+        return quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> int:
+    """Nutzbare CPUs: Affinitätsmaske begrenzt durch die cgroup-Quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # nicht unter Linux
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpu_limit(root)
+    if limit is not None:
+        # Angebrochene Kerne zählen nicht: 1.5 CPUs tragen keine zwei Threads
+        cpus = min(cpus, max(1, math.floor(limit)))
+    return max(1, cpus)
+
+
+def plan_threads(cpus: int, workers: int) -> ThreadPlan:
+    """Teilt die CPUs gleichmäßig auf die Worker auf"""
+    workers = max(1, workers)
+    intra_op = max(1, cpus // workers)
+    # Generierung läuft Schritt für Schritt; Inter-Op-Parallelität bringt
+    # nur weitere konkurrierende Threads
+    return ThreadPlan(
+        intra_op_threads=intra_op,
+        inter_op_threads=1,
+        # Tokenizer-Threads konkurrieren sonst mit torch und anderen Workern
+        tokenizers_parallelism=workers == 1 and intra_op > 1,
+    )
+
+
+def plan_key(cpus: int, workers: int) -> str:
+    return f"{cpus}cpu-{workers}worker"
+
+
+def load_saved_plan(path: str, cpus: int, workers: int) -> Optional[ThreadPlan]:
+    """Gespeichertes Autotune-Ergebnis für diese CPU- und Workerzahl"""
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    entry = saved.get(plan_key(cpus, workers))
+    if not entry:
+        return None
+    return ThreadPlan(
+        intra_op_threads=entry['intra_op_threads'],
+        inter_op_threads=entry['inter_op_threads'],
+        tokenizers_parallelism=entry['tokenizers_parallelism'],
+        source='autotune',
+    )
+
+
+def save_plan(path: str, cpus: int, workers: int, plan: ThreadPlan, results: List[dict]):
+    """Speichert ein Autotune-Ergebnis (weitere CPU-/Workerzahlen bleiben erhalten)"""
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+
+    entry = asdict(plan)
+    entry.pop('source')
+    entry['results'] = results
+    saved[plan_key(cpus, workers)] = entry
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(saved, f, indent=2)
+    os.replace(tmp_path, path)
+    logger.info(f"Thread-Plan gespeichert: {path}")
+
+
+def apply_plan(plan: ThreadPlan):
+    """Setzt torch-Threads und Tokenizer-Parallelität für diesen Prozess"""
+    # Auch für später gestartete Bibliotheken und Kindprozesse
+    os.environ['OMP_NUM_THREADS'] = str(plan.intra_op_threads)
+    os.environ['MKL_NUM_THREADS'] = str(plan.intra_op_threads)
+    os.environ['TOKENIZERS_PARALLELISM'] = 'true' if plan.tokenizers_parallelism else 'false'
+
+    torch.set_num_threads(plan.intra_op_threads)
+    if torch.get_num_interop_threads() != plan.inter_op_threads:
+        try:
+            torch.set_num_interop_threads(plan.inter_op_threads)
+        except RuntimeError as e:
+            # Nur möglich bevor torch parallele Arbeit gestartet hat
+            logger.warning(f"Inter-Op-Threads nicht mehr änderbar: {e}")
+
+
+def configure_threads(workers: int, plan_file: Optional[str] = None,
+                      root: str = CGROUP_ROOT) -> ThreadPlan:
+    """Plant und setzt die Threads dieses Workers beim Start"""
+    cpus = available_cpus(root)
+    plan = (load_saved_plan(plan_file, cpus, workers) if plan_file else None) or plan_threads(cpus, workers)
+    apply_plan(plan)
+    logger.info(
+        f"Thread-Plan ({plan.source}): {cpus} CPUs, {workers} Worker, "
+        f"{plan.intra_op_threads} Intra-Op-/{plan.inter_op_threads} Inter-Op-Threads"
+    )
+    return plan
+
+
+def candidate_plans(cpus: int, workers: int) -> List[Tuple[int, int]]:
+    """Zu messende (Intra-Op, Inter-Op)-Kombinationen"""
+    share = max(1, cpus // workers)
+    intra_values = {share, max(1, share // 2), cpus}
+    intra_values.update(2 ** exponent for exponent in range(share.bit_length()) if 2 ** exponent <= share)
+    return sorted((intra, inter) for intra in intra_values for inter in (1, 2))
+
+
+def _autotune_worker(model_name, intra_op, inter_op, prompts, max_new_tokens, barrier, queue):
+    torch.set_num_threads(intra_op)
+    torch.set_num_interop_threads(inter_op)
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32).eval()
+    inputs = [tokenizer(prompt, return_tensors='pt') for prompt in prompts]
+
+    # Alle Worker messen gleichzeitig, wie unter Last
+    barrier.wait()
+    generated = 0
+    start = time.perf_counter()
+    with torch.no_grad():
+        for encoded in inputs:
+            output = model.generate(
+                **encoded,
+                max_new_tokens=max_new_tokens,
+                min_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id,
+            )
+            generated += output.shape[-1] - encoded['input_ids'].shape[-1]
+    queue.put(generated / (time.perf_counter() - start))
+
+
+def measure_plan(model_name: str, workers: int, intra_op: int, inter_op: int,
+                 prompts: List[str], max_new_tokens: int) -> float:
+    """Gesamtdurchsatz (Tokens/s) aller Worker mit einer Thread-Konfiguration"""
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    queue = context.Queue()
+    processes = [
+        context.Process(
+            target=_autotune_worker,
+            args=(model_name, intra_op, inter_op, prompts, max_new_tokens, barrier, queue)
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    throughput = sum(queue.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return throughput
+
+
+def autotune(model_name: str, workers: int, plan_file: str, prompts: List[str],
+             max_new_tokens: int = 16, candidates: Optional[List[Tuple[int, int]]] = None,
+             root: str = CGROUP_ROOT) -> ThreadPlan:
+    """Misst die Kandidaten mit ``workers`` parallelen Prozessen und speichert den schnellsten"""
+    cpus = available_cpus(root)
+    results = []
+
+    for intra_op, inter_op in candidates or candidate_plans(cpus, workers):
+        throughput = measure_plan(model_name, workers, intra_op, inter_op, prompts, max_new_tokens)
+        results.append({
+            'intra_op_threads': intra_op,
+            'inter_op_threads': inter_op,
+            'tokens_per_second': throughput,
+        })
+        logger.info(f"Autotune {intra_op} Intra-Op/{inter_op} Inter-Op: {throughput:.1f} Tokens/s")
+
+    best = max(results, key=lambda result: result['tokens_per_second'])
+    plan = ThreadPlan(
+        intra_op_threads=best['intra_op_threads'],
+        inter_op_threads=best['inter_op_threads'],
+        tokenizers_parallelism=plan_threads(cpus, workers).tokenizers_parallelism,
+        source='autotune',
+    )
+    save_plan(plan_file, cpus, workers, plan, results)
+    return plan
+
+
+AUTOTUNE_PROMPTS = [
+    "Vereinfache den folgenden Text in einfaches de:\n\n"
+    "Die Verwaltung prüft den Antrag innerhalb von vier Wochen.\n\nVereinfachter Text:",
+    "Vereinfache den folgenden Text in einfaches de:\n\n"
+    "Gegen den Bescheid kann innerhalb eines Monats Widerspruch erhoben werden.\n\nVereinfachter Text:",
+]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.getenv('MODEL_NAME', 'microsoft/phi-4-mini-instruct'))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', 1)))
+    parser.add_argument('--plan-file', default=os.getenv(
+        'THREAD_PLAN_FILE', os.path.join(os.getenv('MODEL_CACHE_DIR', './models'), 'thread_plan.json')
+    ))
+    parser.add_argument('--max-new-tokens', type=int, default=16)
+    args = parser.parse_args()
+
+    plan = autotune(args.model, args.workers, args.plan_file, AUTOTUNE_PROMPTS, args.max_new_tokens)
+    print(f"Bester Plan für {args.workers} Worker: {plan.intra_op_threads} Intra-Op-, "
+          f"{plan.inter_op_threads} Inter-Op-Threads -> {args.plan_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+PDF-Uploads im Speicher statt auf der Platte
+
+Werkzeug schreibt jeden Upload über 500 KB in eine temporäre Datei; die
+PDF-Route speicherte ihn danach noch einmal als ``input.pdf``, öffnete
+ihn von dort und schrieb das Ergebnis als ``simplified.pdf``, das zum
+Senden wieder gelesen wurde. Jetzt:
+
+- ``SpooledRequest`` nimmt Uploads bis ``spool_threshold`` Bytes (laut
+  Content-Length) in einen ``BytesIO``-Puffer auf, größere in eine
+  temporäre Datei
+- ``upload_buffer`` liefert den Inhalt ohne Kopie: aus dem Puffer
+  direkt, aus der Datei speicherabgebildet (``mmap``); PyMuPDF öffnet
+  beides mit ``fitz.open(stream=...)``
+- die Ausgabe geht in einen ``BytesIO``-Puffer und von dort in die Antwort
+
+Kleine und mittlere PDFs berühren die Platte damit nicht mehr.
+"""
+import io
+import logging
+import mmap
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+from flask import Request
+
+logger = logging.getLogger(__name__)
+
+SPOOL_THRESHOLD = 8 * 1024 * 1024
+
+
+class SpooledRequest(Request):
+    """Flask-Request, der Uploads bis ``spool_threshold`` im Speicher hält"""
+
+    spool_threshold = SPOOL_THRESHOLD
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= self.spool_threshold:
+            return io.BytesIO()
+        # Größer oder Länge unbekannt (chunked): ab der Schwelle in eine temporäre Datei
+        return tempfile.SpooledTemporaryFile(max_size=self.spool_threshold, mode='rb+')
+
+
+@contextmanager
+def upload_buffer(stream: BinaryIO) -> Iterator[Union[bytes, memoryview]]:
+    """Inhalt eines Upload-Streams für ``fitz.open(stream=...)``
+
+    ``BytesIO`` liefert seinen Inhalt ohne Kopie (``getvalue`` teilt den
+    Puffer), Dateien werden speicherabgebildet. Die Abbildung wird beim
+    Verlassen geschlossen; Dokumente, die den Puffer halten, müssen bis
+    dahin freigegeben sein.
+    """
+    if isinstance(stream, io.BytesIO):
+        yield stream.getvalue()
+        return
+    stream.seek(0, io.SEEK_END)
+    if stream.tell() == 0:
+        yield b""
+        return
+    # Bei einer noch nicht ausgelagerten SpooledTemporaryFile lagert fileno() aus
+    stream.flush()
+    mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        yield view
+    finally:
+        try:
+            view.release()
+            mapped.close()
+        except BufferError:
+            # Ein Dokument hält den Puffer noch (z. B. über einen Traceback); die GC gibt ihn frei
+            logger.debug("Speicherabbildung des Uploads noch in Benutzung, wird später freigegeben")
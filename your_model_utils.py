@@ -1,8 +1,25 @@
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers import AutoTokenizer, AutoModelForCausalLM, PreTrainedModel, TextIteratorStreamer
+import gc
 import logging
+import math
 import os
-from typing import List, Optional
+import threading
+import time
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from batch_planner import run_planned_batches
+from deadline import Deadline, SimplificationResult, ThroughputEstimator
+from inference_server import InferenceClient
+from mmap_weights import load_mmap_model
+from generation_policy import GenerationPolicy, parse_stop_sequences
+from inference_engine import InferenceEngine
+from compiled_generation import compile_model, is_compiled, pad_to_bucket, parse_buckets, warmup
+from prompt_cache import PromptTemplate, PrefixCache, build_prefixed_inputs
+from quantization import load_int8_model
+from readability import ReadabilityFilter
+from thread_planner import configure_threads
+from speculative import AssistedDecodingStats, count_forward_passes, load_draft_model
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -10,132 +27,690 @@ logger = logging.getLogger(__name__)
 # Globale Variablen für das Modell
 tokenizer = None
 model = None
+prefix_cache = None
+draft_model = None
+assisted_stats = AssistedDecodingStats()
+# Gemessener Durchsatz für die Fristplanung langer Texte
+generation_throughput = ThroughputEstimator()
+inference_client = None
+
+# Zustand der Initialisierung: not_started | loading | warming | ready | failed
+model_state = 'not_started'
+model_error = None
+_initialized = threading.Event()
+_init_lock = threading.Lock()
+_init_thread = None
+# gthread-Worker bedienen mehrere Anfragen in Threads; das Modell des Workers
+# generiert trotzdem nacheinander (torch-Threads nach Plan, Zähler-Hooks)
+_generation_lock = threading.Lock()
+
+# Wie lange Vereinfachungen auf ein noch ladendes Modell warten (Sekunden)
+MODEL_READY_TIMEOUT = float(os.getenv('MODEL_READY_TIMEOUT', 30))
+
+# 'local': Modell im eigenen Prozess; 'server': Anfragen an den Inferenz-Server
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'local').lower()
+INFERENCE_SOCKET = os.getenv('INFERENCE_SOCKET', '/tmp/latex-converter-inference.sock')
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', 300))
+# Wartezeit des Servers, um Anfragen verschiedener Worker zu bündeln (Sekunden)
+INFERENCE_BATCH_WINDOW = float(os.getenv('INFERENCE_BATCH_WINDOW', 0.02))
+
+# Inferenz-Engine: 'transformers' (model.generate) oder 'onnx' (ONNX Runtime, CPU)
+INFERENCE_ENGINE = os.getenv('INFERENCE_ENGINE', 'transformers').lower()
+
+# Kleines Entwurfsmodell für assistiertes Dekodieren (leer = aus)
+DRAFT_MODEL_NAME = os.getenv('DRAFT_MODEL_NAME', '')
+
+# Speicherbudget für Batches: (längste Sequenz + neue Tokens) × Batchgröße
+BATCH_TOKEN_BUDGET = int(os.getenv('BATCH_TOKEN_BUDGET', 4096))
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 8))
+
+# Quantisierung für CPU-Inferenz: 'none' oder 'int8'
+MODEL_QUANTIZATION = os.getenv('MODEL_QUANTIZATION', 'none').lower()
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', './models')
+
+# Modell im gunicorn-Master laden (preload_app) und nach fork teilen:
+# Gewichte speicherabgebildet aus MODEL_CACHE_DIR, Thread-Setup erst im Worker
+MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'False').lower() == 'true'
+
+# KV-Cache des Instruktions-Präfix wiederverwenden
+PREFIX_CACHE_ENABLED = os.getenv('PREFIX_CACHE_ENABLED', 'True').lower() == 'true'
+
+# Maximale Wartezeit auf das nächste Token beim Streaming (Sekunden)
+STREAM_TOKEN_TIMEOUT = float(os.getenv('STREAM_TOKEN_TIMEOUT', 60))
+
+# torch.compile mit statischem KV-Cache; Warmup der Längen-Buckets beim Start
+MODEL_COMPILE = os.getenv('MODEL_COMPILE', 'False').lower() == 'true'
+COMPILE_BACKEND = os.getenv('COMPILE_BACKEND', 'inductor')
+COMPILE_BUCKETS = parse_buckets(os.getenv('COMPILE_BUCKETS', '128,256,512,1024'))
+
+# Threads pro Worker aus verfügbaren CPUs und Workerzahl (gunicorn: WEB_CONCURRENCY)
+THREAD_PLANNING_ENABLED = os.getenv('THREAD_PLANNING_ENABLED', 'True').lower() == 'true'
+WORKER_COUNT = int(os.getenv('WEB_CONCURRENCY', 1))
+THREAD_PLAN_FILE = os.getenv('THREAD_PLAN_FILE', os.path.join(MODEL_CACHE_DIR, 'thread_plan.json'))
+
+SPLIT_KEY = "Vereinfachter Text:"
+
+# Neue Tokens pro Chunk: Text-Tokens × Faktor (mindestens GENERATION_MIN_NEW_TOKENS,
+# höchstens die Obergrenze des Aufrufers); Stoppsequenzen mit '|' getrennt
+GENERATION_POLICY = GenerationPolicy(
+    expansion_ratio=float(os.getenv('GENERATION_EXPANSION_RATIO', 1.5)),
+    min_new_tokens=int(os.getenv('GENERATION_MIN_NEW_TOKENS', 16)),
+    stop_sequences=parse_stop_sequences(
+        os.getenv('GENERATION_STOP_SEQUENCES', '\\n\\nText:|' + SPLIT_KEY)
+    ),
+)
+
+# Bereits einfache Chunks (Flesch-Lesewert nach Amstad, kurze Sätze) gehen nicht an das Modell
+READABILITY_FILTER = ReadabilityFilter(
+    enabled=os.getenv('READABILITY_SKIP_ENABLED', 'True').lower() == 'true',
+    min_reading_ease=float(os.getenv('READABILITY_MIN_EASE', 70)),
+    max_sentence_words=float(os.getenv('READABILITY_MAX_SENTENCE_WORDS', 15)),
+)
+
+# Zeichen pro Chunk bei der Volltext-Vereinfachung
+MAX_CHUNK_SIZE = 500
+# Schätzung der Token-Länge, wenn kein lokaler Tokenizer geladen ist
+CHARS_PER_TOKEN = 4
+
+# Prompt-Vorlagen
+SIMPLIFY_TEMPLATE = PromptTemplate(
+    'simplify',
+    prefix=(
+        "Vereinfache den folgenden Text in einfaches, verständliches {target_language}. "
+        "Verwende kurze Sätze und einfache Wörter. Behalte alle wichtigen Informationen bei.\n\n"
+        "Text:"
+    ),
+    separator=" ",
+    tail=f"\n\n{SPLIT_KEY}"
+)
+BATCH_TEMPLATE = PromptTemplate(
+    'batch',
+    prefix="Vereinfache den folgenden Text in einfaches {target_language}:\n\n",
+    tail=f"\n\n{SPLIT_KEY}"
+)
 
 def load_model(model_name: str = "microsoft/phi-4-mini-instruct"):
     """Lädt das Transformer-Modell für Text-Vereinfachung"""
-    global tokenizer, model
-    
+    global tokenizer, model, prefix_cache, draft_model
+
     try:
         logger.info(f"Lade Modell: {model_name}")
-        
+
         # Tokenizer laden
         tokenizer = AutoTokenizer.from_pretrained(model_name)
         if tokenizer.pad_token is None:
             tokenizer.pad_token = tokenizer.eos_token
-        
+        # Decoder-Modelle generieren rechts weiter, daher links auffüllen
+        tokenizer.padding_side = "left"
+
         # Modell laden
         device = "cuda" if torch.cuda.is_available() else "cpu"
-        model = AutoModelForCausalLM.from_pretrained(
-            model_name,
-            torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-            device_map="auto" if device == "cuda" else None
-        )
-        
+        if MODEL_QUANTIZATION == "int8" and device == "cpu":
+            model = load_int8_model(model_name, MODEL_CACHE_DIR)
+        elif MODEL_PRELOAD and device == "cpu":
+            model = load_mmap_model(model_name, MODEL_CACHE_DIR, torch.float32)
+        else:
+            if MODEL_QUANTIZATION != "none":
+                logger.warning(f"Quantisierung '{MODEL_QUANTIZATION}' nur auf CPU unterstützt, lade ohne")
+            model = AutoModelForCausalLM.from_pretrained(
+                model_name,
+                torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+                device_map="auto" if device == "cuda" else None
+            )
+        # Präfix-Caches gehören zum Modell und werden neu berechnet
+        prefix_cache = None
+
+        # Entwurfsmodell ist optional; ohne läuft normales Dekodieren
+        draft_model = None
+        if DRAFT_MODEL_NAME:
+            try:
+                draft_model = load_draft_model(
+                    DRAFT_MODEL_NAME,
+                    tokenizer,
+                    device,
+                    torch.float16 if device == "cuda" else torch.float32
+                )
+                logger.info(f"Entwurfsmodell für assistiertes Dekodieren geladen: {DRAFT_MODEL_NAME}")
+            except Exception as e:
+                logger.error(f"Fehler beim Laden des Entwurfsmodells, dekodiere ohne: {e}")
+
+        if MODEL_COMPILE:
+            if draft_model is not None:
+                logger.warning("Kompilierte Generierung mit Entwurfsmodell nicht unterstützt, kompiliere nicht")
+            else:
+                compile_model(model, COMPILE_BACKEND)
+
         logger.info(f"Modell erfolgreich geladen auf {device}")
         return True
-        
+
     except Exception as e:
         logger.error(f"Fehler beim Laden des Modells: {e}")
         return False
 
-def simplify_text(text: str, target_language: str = 'de') -> str:
-    """Vereinfacht einzelnen Text"""
-    if not tokenizer or not model:
-        logger.warning("Modell nicht geladen, verwende Placeholder")
-        return text
-    
-    try:
-        prompt = (
-            f"Vereinfache den folgenden Text in einfaches, verständliches {target_language}. "
-            "Verwende kurze Sätze und einfache Wörter. Behalte alle wichtigen Informationen bei.\n\n"
-            f"Text: {text}\n\n"
-            f"Vereinfachter Text:"
+def _set_model_state(state: str, error: Optional[str] = None):
+    global model_state, model_error
+    model_state = state
+    model_error = error
+    if state in ('ready', 'failed'):
+        _initialized.set()
+    else:
+        _initialized.clear()
+
+def connect_inference_server() -> bool:
+    """Nutzt den Inferenz-Server statt eines eigenen Modells"""
+    global inference_client
+
+    inference_client = InferenceClient(INFERENCE_SOCKET, INFERENCE_TIMEOUT)
+    if inference_client.ping():
+        logger.info(f"Mit Inferenz-Server verbunden: {INFERENCE_SOCKET}")
+    else:
+        # Der Server kann nach den Web-Workern starten
+        logger.warning(f"Inferenz-Server noch nicht erreichbar: {INFERENCE_SOCKET}")
+    return True
+
+def is_model_available() -> bool:
+    """Ob Vereinfachungen möglich sind (eigenes Modell oder Inferenz-Server)"""
+    return inference_client is not None or engine.is_loaded()
+
+def wait_for_initialization(timeout: Optional[float] = None) -> bool:
+    """Wartet auf eine laufende Initialisierung; False falls sie noch läuft"""
+    if model_state == 'not_started':
+        return True
+    return _initialized.wait(timeout)
+
+def _model_available_for_request() -> bool:
+    """Wartet höchstens MODEL_READY_TIMEOUT auf das Modell, dann Placeholder"""
+    wait_for_initialization(MODEL_READY_TIMEOUT)
+    return is_model_available()
+
+def get_model_status() -> dict:
+    """Zustand für Readiness-Prüfungen: geladen, aufgewärmt, Server erreichbar"""
+    ready = model_state == 'ready'
+    if ready and inference_client is not None:
+        ready = inference_client.ping()
+    return {
+        'state': model_state,
+        'ready': ready,
+        'loaded': is_model_available(),
+        'backend': 'server' if inference_client is not None else 'local',
+        'engine': engine.name,
+        'error': model_error,
+    }
+
+def get_prefix_cache() -> Optional[PrefixCache]:
+    """Präfix-Cache des aktuellen Modells (None falls nicht nutzbar)"""
+    global prefix_cache
+
+    # Nur Transformers-Modelle liefern wiederverwendbare past_key_values;
+    # assistiertes Dekodieren und der statische Cache des kompilierten
+    # Modells unterstützen keinen vorbefüllten dynamischen Cache
+    if (not PREFIX_CACHE_ENABLED or not isinstance(model, PreTrainedModel)
+            or draft_model is not None or is_compiled(model)):
+        return None
+
+    if prefix_cache is None or prefix_cache.model is not model:
+        prefix_cache = PrefixCache(tokenizer, model)
+    return prefix_cache
+
+def get_assisted_decoding_stats() -> dict:
+    """Akzeptanzrate und Zähler des assistierten Dekodierens"""
+    return assisted_stats.as_dict()
+
+def _extract_simplified(decoded: str) -> str:
+    """Vereinfachter Text aus den neu generierten Tokens (bis zur ersten Stoppsequenz)"""
+    return GENERATION_POLICY.truncate(decoded).strip()
+
+def _new_token_budgets(texts: List[str], ceiling: int) -> List[int]:
+    """Budget neuer Tokens je Text aus seiner Token-Länge"""
+    counts = tokenizer(texts, add_special_tokens=False)["input_ids"]
+    return [GENERATION_POLICY.budget(len(ids), ceiling) for ids in counts]
+
+def _estimated_token_counts(texts: List[str]) -> List[int]:
+    """Token-Länge je Text; ohne lokalen Tokenizer (Inferenzserver, ONNX) aus der Zeichenzahl"""
+    if tokenizer is not None:
+        return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+    return [math.ceil(len(text) / CHARS_PER_TOKEN) for text in texts]
+
+def _estimated_budgets(texts: List[str], ceiling: int) -> List[int]:
+    """Wie _new_token_budgets, auch ohne lokalen Tokenizer"""
+    return [GENERATION_POLICY.budget(count, ceiling) for count in _estimated_token_counts(texts)]
+
+def _skip_simple_chunks(result: SimplificationResult, chunks: List[str], ceiling: int,
+                        first: int = 0) -> List[int]:
+    """Übernimmt bereits einfache Chunks unverändert; liefert die Indizes für das Modell"""
+    simple = READABILITY_FILTER.simple_mask(chunks).tolist()
+    if not any(simple):
+        return list(range(len(chunks)))
+
+    counts = _estimated_token_counts(chunks)
+    for index, is_simple in enumerate(simple):
+        if is_simple:
+            # Eingespart: Text-Tokens im Prompt und das Budget der Generierung
+            result.skip(first + index, counts[index] + GENERATION_POLICY.budget(counts[index], ceiling))
+    logger.info(
+        f"{sum(simple)} von {len(chunks)} Chunks bereits einfach, "
+        f"{result.tokens_saved} Tokens eingespart"
+    )
+    return [index for index, is_simple in enumerate(simple) if not is_simple]
+
+def _generate(input_ids, attention_mask, **generation_kwargs):
+    """Ruft model.generate auf und liefert nur die neuen Tokens
+
+    Endet zusätzlich an den Stoppsequenzen der Generierungs-Policy. Mit
+    Entwurfsmodell als assistiertes Dekodieren; das Entwurfsmodell kennt
+    keine Stoppsequenzen, dort wird nur nachträglich abgeschnitten.
+    Aufrufe verschiedener Threads laufen nacheinander.
+    """
+    with _generation_lock:
+        return _generate_locked(input_ids, attention_mask, **_apply_deadline(generation_kwargs))
+
+def _generate_locked(input_ids, attention_mask, **generation_kwargs):
+    if is_compiled(model):
+        # Bucket-Längen begrenzen die Zahl der kompilierten Graphen
+        input_ids, attention_mask = pad_to_bucket(
+            input_ids, attention_mask, tokenizer.pad_token_id, COMPILE_BUCKETS
         )
-        
-        inputs = tokenizer(prompt, return_tensors="pt", truncation=True, max_length=1024)
-        input_ids = inputs["input_ids"].to(model.device)
-        attention_mask = inputs["attention_mask"].to(model.device)
-        
+    prompt_length = input_ids.shape[-1]
+
+    if draft_model is None:
+        if GENERATION_POLICY.stop_sequences:
+            generation_kwargs.setdefault('stop_strings', list(GENERATION_POLICY.stop_sequences))
+            generation_kwargs.setdefault('tokenizer', tokenizer)
         with torch.no_grad():
             outputs = model.generate(
                 input_ids=input_ids,
                 attention_mask=attention_mask,
-                max_new_tokens=256,
-                temperature=0.7,
-                top_p=0.9,
-                do_sample=True,
                 pad_token_id=tokenizer.eos_token_id,
+                **generation_kwargs
             )
-        
-        decoded = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        simplified = decoded.split("Vereinfachter Text:")[-1].strip()
-        
+        return outputs[:, prompt_length:]
+
+    with torch.no_grad(), count_forward_passes(model, draft_model) as counts:
+        outputs = model.generate(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            pad_token_id=tokenizer.eos_token_id,
+            assistant_model=draft_model,
+            **generation_kwargs
+        )
+    assisted_stats.record(outputs.shape[-1] - prompt_length, counts[0], counts[1])
+    return outputs[:, prompt_length:]
+
+def warmup_compiled_model(buckets: Optional[List[int]] = None) -> List[float]:
+    """Kompiliert die Graphen des kompilierten Modells für die Längen-Buckets vorab"""
+    logger.info("Wärme kompilierte Generierung auf")
+    prompt = SIMPLIFY_TEMPLATE.render("Der Antrag wird geprüft.", 'de')
+    return warmup(_generate, tokenizer, buckets or COMPILE_BUCKETS, prompt, model.device)
+
+def _prepare_inputs(template: PromptTemplate, text: str, target_language: str,
+                    max_length: int, generation_kwargs: dict):
+    """Tokenisiert einen Prompt; mit Präfix-Cache wird nur der Text-Suffix neu kodiert"""
+    cache = get_prefix_cache()
+
+    if cache is not None:
+        entry = cache.get(template, target_language)
+        suffix_ids = cache.encode_texts(entry, template, [text], max_length)
+        input_ids, attention_mask = build_prefixed_inputs(
+            entry.prefix_ids, suffix_ids, tokenizer.pad_token_id
+        )
+        generation_kwargs['past_key_values'] = cache.expand(entry, 1)
+    else:
+        inputs = tokenizer(
+            template.render(text, target_language),
+            return_tensors="pt",
+            truncation=True,
+            max_length=max_length
+        )
+        input_ids = inputs["input_ids"]
+        attention_mask = inputs["attention_mask"]
+
+    return input_ids.to(model.device), attention_mask.to(model.device)
+
+def _transformers_generate_one(template: PromptTemplate, text: str, target_language: str,
+                               max_length: int, max_new_tokens: int, **generation_kwargs) -> str:
+    input_ids, attention_mask = _prepare_inputs(
+        template, text, target_language, max_length, generation_kwargs
+    )
+
+    budget = _new_token_budgets([text], max_new_tokens)[0]
+    new_tokens = _generate(input_ids, attention_mask, max_new_tokens=budget, **generation_kwargs)
+
+    decoded = tokenizer.decode(new_tokens[0], skip_special_tokens=True)
+    return _extract_simplified(decoded)
+
+def _transformers_stream(template: PromptTemplate, text: str, target_language: str,
+                         max_length: int, max_new_tokens: int, **generation_kwargs) -> Iterator[str]:
+    input_ids, attention_mask = _prepare_inputs(
+        template, text, target_language, max_length, generation_kwargs
+    )
+    budget = _new_token_budgets([text], max_new_tokens)[0]
+    streamer = TextIteratorStreamer(
+        tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=STREAM_TOKEN_TIMEOUT
+    )
+    errors = []
+
+    def run_generation():
+        try:
+            _generate(
+                input_ids,
+                attention_mask,
+                max_new_tokens=budget,
+                streamer=streamer,
+                **generation_kwargs
+            )
+        except Exception as e:
+            errors.append(e)
+            # Wartenden Konsumenten freigeben
+            streamer.end()
+
+    thread = threading.Thread(target=run_generation, daemon=True)
+    thread.start()
+    for piece in streamer:
+        if piece:
+            yield piece
+    thread.join()
+
+    if errors:
+        raise errors[0]
+
+def _transformers_generate_batch(template: PromptTemplate, texts: List[str], target_language: str,
+                                 max_length: int, max_new_tokens: int, **generation_kwargs) -> List[str]:
+    cache = get_prefix_cache()
+
+    # Einmal tokenisieren, Batches nach Länge und Speicherbudget planen
+    if cache is not None:
+        entry = cache.get(template, target_language)
+        encoded = cache.encode_texts(entry, template, texts, max_length)
+        lengths = [len(entry.prefix_ids) + len(ids) for ids in encoded]
+    else:
+        prompts = [template.render(text, target_language) for text in texts]
+        encoded = tokenizer(prompts, truncation=True, max_length=max_length)["input_ids"]
+        lengths = [len(ids) for ids in encoded]
+    budgets = _new_token_budgets(texts, max_new_tokens)
+
+    def run_batch(indices: List[int]) -> List[str]:
+        batch_kwargs = dict(generation_kwargs)
+        if cache is not None:
+            input_ids, attention_mask = build_prefixed_inputs(
+                entry.prefix_ids, [encoded[i] for i in indices], tokenizer.pad_token_id
+            )
+            batch_kwargs['past_key_values'] = cache.expand(entry, len(indices))
+        else:
+            inputs = tokenizer.pad(
+                {"input_ids": [encoded[i] for i in indices]},
+                padding=True,
+                return_tensors="pt"
+            )
+            input_ids = inputs["input_ids"]
+            attention_mask = inputs["attention_mask"]
+
+        new_tokens = _generate(
+            input_ids.to(model.device),
+            attention_mask.to(model.device),
+            max_new_tokens=max(budgets[i] for i in indices),
+            **batch_kwargs
+        )
+
+        decoded = tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+        return [_extract_simplified(output) for output in decoded]
+
+    return run_planned_batches(
+        lengths,
+        run_batch,
+        token_budget=BATCH_TOKEN_BUDGET,
+        max_new_tokens=max(budgets),
+        # Assistiertes Dekodieren unterstützt nur Batchgröße 1
+        max_batch_size=1 if draft_model is not None else MAX_BATCH_SIZE
+    )
+
+class TransformersEngine(InferenceEngine):
+    """Standard-Engine: model.generate aus transformers mit den globalen Modellobjekten"""
+
+    name = 'transformers'
+
+    def load(self, model_name: str) -> bool:
+        return load_model(model_name)
+
+    def is_loaded(self) -> bool:
+        return bool(tokenizer and model)
+
+    def generate_batch(self, template: PromptTemplate, texts: List[str], target_language: str,
+                       max_length: int, max_new_tokens: int, **generation_kwargs) -> List[str]:
+        if len(texts) == 1:
+            return [_transformers_generate_one(
+                template, texts[0], target_language, max_length, max_new_tokens, **generation_kwargs
+            )]
+        return _transformers_generate_batch(
+            template, texts, target_language, max_length, max_new_tokens, **generation_kwargs
+        )
+
+    def stream(self, template: PromptTemplate, text: str, target_language: str,
+               max_length: int, max_new_tokens: int, **generation_kwargs) -> Iterator[str]:
+        return _transformers_stream(
+            template, text, target_language, max_length, max_new_tokens, **generation_kwargs
+        )
+
+def create_engine(name: str) -> InferenceEngine:
+    """Engine nach Name; ohne onnxruntime bleibt es bei transformers"""
+    if name == 'onnx':
+        try:
+            from onnx_engine import OnnxEngine
+        except ImportError as e:
+            logger.error(f"ONNX-Engine nicht verfügbar ({e}), verwende transformers")
+        else:
+            if MODEL_COMPILE or DRAFT_MODEL_NAME or MODEL_QUANTIZATION != 'none' or MODEL_PRELOAD:
+                logger.warning("Kompilierung, Entwurfsmodell, Quantisierung und Preload gelten nur für transformers")
+            return OnnxEngine(
+                MODEL_CACHE_DIR,
+                postprocess=_extract_simplified,
+                policy=GENERATION_POLICY,
+                token_budget=BATCH_TOKEN_BUDGET,
+                max_batch_size=MAX_BATCH_SIZE
+            )
+    elif name != 'transformers':
+        logger.warning(f"Unbekannte INFERENCE_ENGINE '{name}', verwende transformers")
+    return TransformersEngine()
+
+engine = create_engine(INFERENCE_ENGINE)
+
+def generate_simplification(template: PromptTemplate, text: str, target_language: str = 'de',
+                            max_length: int = 1024, max_new_tokens: int = 256,
+                            **generation_kwargs) -> str:
+    """Generiert die Vereinfachung eines einzelnen Textes"""
+    if inference_client is not None:
+        return inference_client.generate(
+            template, [text], target_language, max_length, max_new_tokens, **generation_kwargs
+        )[0]
+
+    return engine.generate_batch(
+        template, [text], target_language, max_length, max_new_tokens, **generation_kwargs
+    )[0]
+
+def stream_simplification(template: PromptTemplate, text: str, target_language: str = 'de',
+                          max_length: int = 1024, max_new_tokens: int = 256,
+                          **generation_kwargs) -> Iterator[str]:
+    """Generiert die Vereinfachung eines Textes und liefert Textstücke sobald sie entstehen"""
+    if inference_client is not None:
+        yield from inference_client.stream(
+            template, text, target_language, max_length, max_new_tokens, **generation_kwargs
+        )
+        return
+
+    yield from GENERATION_POLICY.filter_stream(engine.stream(
+        template, text, target_language, max_length, max_new_tokens, **generation_kwargs
+    ))
+
+def generate_simplifications(template: PromptTemplate, texts: List[str], target_language: str = 'de',
+                             max_length: int = 512, max_new_tokens: int = 128,
+                             **generation_kwargs) -> List[str]:
+    """Generiert Vereinfachungen für mehrere Texte in geplanten Batches"""
+    if inference_client is not None:
+        return inference_client.generate(
+            template, texts, target_language, max_length, max_new_tokens, **generation_kwargs
+        )
+
+    return engine.generate_batch(
+        template, texts, target_language, max_length, max_new_tokens, **generation_kwargs
+    )
+
+def simplify_text(text: str, target_language: str = 'de') -> str:
+    """Vereinfacht einzelnen Text"""
+    if not _model_available_for_request():
+        logger.warning("Modell nicht geladen, verwende Placeholder")
+        return text
+
+    try:
+        simplified = generate_simplification(
+            SIMPLIFY_TEMPLATE,
+            text,
+            target_language,
+            max_length=1024,
+            max_new_tokens=256,
+            temperature=0.7,
+            top_p=0.9,
+            do_sample=True,
+        )
+
         return simplified if simplified else text
-        
+
     except Exception as e:
         logger.error(f"Fehler bei der Text-Vereinfachung: {e}")
         return text
 
 def simplify_text_batch(texts: List[str], target_language: str = 'de') -> List[str]:
     """Vereinfacht mehrere Texte gleichzeitig"""
-    if not tokenizer or not model:
+    if not _model_available_for_request():
         logger.warning("Modell nicht geladen, verwende Placeholder")
         return texts
-    
+
     try:
-        prompts = []
-        for text in texts:
-            prompt = (
-                f"Vereinfache den folgenden Text in einfaches {target_language}:\n\n"
-                f"{text}\n\nVereinfachter Text:"
-            )
-            prompts.append(prompt)
-        
-        # Batch-Verarbeitung
-        inputs = tokenizer(
-            prompts, 
-            return_tensors="pt", 
-            padding=True, 
-            truncation=True, 
-            max_length=512
+        simplified_texts = generate_simplifications(
+            BATCH_TEMPLATE,
+            texts,
+            target_language,
+            max_length=512,
+            max_new_tokens=128,
+            temperature=0.7,
+            top_p=0.9,
+            do_sample=True,
         )
-        input_ids = inputs["input_ids"].to(model.device)
-        attention_mask = inputs["attention_mask"].to(model.device)
-        
-        with torch.no_grad():
-            outputs = model.generate(
-                input_ids=input_ids,
-                attention_mask=attention_mask,
-                max_new_tokens=128,
-                temperature=0.7,
-                top_p=0.9,
-                do_sample=True,
-                pad_token_id=tokenizer.eos_token_id,
-            )
-        
-        decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
-        simplified_texts = []
-        
-        for output in decoded:
-            simplified = output.split("Vereinfachter Text:")[-1].strip()
-            simplified_texts.append(simplified if simplified else "Text konnte nicht vereinfacht werden")
-        
-        return simplified_texts
-        
+
+        return [
+            simplified if simplified else "Text konnte nicht vereinfacht werden"
+            for simplified in simplified_texts
+        ]
+
     except Exception as e:
         logger.error(f"Fehler bei der Batch-Text-Vereinfachung: {e}")
         return texts
 
+def split_into_chunks(text: str, max_chunk_size: int = MAX_CHUNK_SIZE) -> List[str]:
+    """Teilt Text in Chunks fester Länge"""
+    return [text[i:i+max_chunk_size] for i in range(0, len(text), max_chunk_size)]
+
+def stream_chunks(texts: Iterable[str], max_chunk_size: int = MAX_CHUNK_SIZE) -> Iterator[str]:
+    """Wie ``split_into_chunks("\\n".join(nicht leere Texte))``, Chunk für Chunk sobald er voll ist"""
+    buffer = ''
+    started = False
+    for text in texts:
+        if not text:
+            continue
+        buffer += ('\n' if started else '') + text
+        started = True
+        while len(buffer) >= max_chunk_size:
+            yield buffer[:max_chunk_size]
+            buffer = buffer[max_chunk_size:]
+    if buffer:
+        yield buffer
+
+def _deadline_kwargs(deadline: Deadline) -> dict:
+    """Absolute Frist (``time.monotonic``, auf demselben Host prozessübergreifend gültig)
+
+    Erst beim Start der Generierung wird daraus die Restzeit ``max_time``;
+    Wartezeit auf das Modell oder im Inferenz-Server zählt damit mit.
+    """
+    return {'deadline_at': deadline.expires_at} if deadline.bounded else {}
+
+def _apply_deadline(generation_kwargs: dict) -> dict:
+    """Ersetzt ``deadline_at`` durch die jetzt verbleibende Zeit als ``max_time``"""
+    deadline_at = generation_kwargs.pop('deadline_at', None)
+    if deadline_at is not None:
+        generation_kwargs['max_time'] = max(0.0, deadline_at - time.monotonic())
+    return generation_kwargs
+
+def _log_deadline_stop(remaining_chunks: int, total_chunks: int, deadline: Deadline):
+    logger.warning(
+        f"Frist erreicht: {remaining_chunks} von {total_chunks} Chunks bleiben unvereinfacht "
+        f"(Restzeit {deadline.remaining():.1f}s, Durchsatz {generation_throughput.tokens_per_second} Tokens/s)"
+    )
+
+def stream_full_text(text: str, target_language: str = 'de', deadline: Optional[Deadline] = None,
+                     result: Optional[SimplificationResult] = None) -> Iterator[Tuple[int, int, str]]:
+    """Vereinfacht längere Texte Chunk für Chunk und liefert (Chunk, Anzahl, Textstück)
+
+    Bereits einfache Chunks kommen ohne Modell unverändert. Mit Frist
+    beginnt ein Chunk nur, wenn seine geschätzte Dauer in die Restzeit
+    passt; die übrigen Chunks werden unverändert geliefert. ``result`` hält
+    fest, welche Chunks vereinfacht oder übersprungen wurden.
+    """
+    chunks = split_into_chunks(text)
+    deadline = deadline or Deadline(None)
+    result = result if result is not None else SimplificationResult()
+    first = len(result.originals)
+    result.add_chunks(chunks)
+    pending = set(_skip_simple_chunks(result, chunks, 256, first))
+
+    if pending and not _model_available_for_request():
+        logger.warning("Modell nicht geladen, verwende Placeholder")
+        pending = set()
+
+    budgets = _estimated_budgets(chunks, 256)
+    stopped = False
+    for index, chunk in enumerate(chunks):
+        if index in pending and not stopped and \
+                not deadline.allows(generation_throughput.estimate(budgets[index])):
+            _log_deadline_stop(len([i for i in pending if i >= index]), len(chunks), deadline)
+            stopped = True
+        if index not in pending or stopped:
+            yield index, len(chunks), chunk
+            continue
+
+        pieces = []
+        started = time.monotonic()
+        for piece in stream_simplification(
+            SIMPLIFY_TEMPLATE,
+            chunk,
+            target_language,
+            max_length=1024,
+            max_new_tokens=256,
+            temperature=0.7,
+            top_p=0.9,
+            do_sample=True,
+            **_deadline_kwargs(deadline)
+        ):
+            pieces.append(piece)
+            yield index, len(chunks), piece
+
+        # Ein an der Frist abgebrochener Chunk gilt als nicht vereinfacht
+        if not deadline.expired():
+            generation_throughput.record(budgets[index], time.monotonic() - started)
+            simplified = "".join(pieces).strip()
+            if simplified:
+                result.outputs[first + index] = simplified
+
+        # Wie simplify_text: ohne Ausgabe bleibt der Originaltext stehen
+        if not pieces:
+            yield index, len(chunks), chunk
+
 def simplify_full_text(text: str, target_language: str = 'de') -> str:
     """Vereinfacht längere Texte mit Chunking"""
-    if not tokenizer or not model:
+    if not _model_available_for_request():
         logger.warning("Modell nicht geladen, verwende Placeholder")
         return text
     
     try:
         # Text in Chunks aufteilen für bessere Verarbeitung
-        max_chunk_size = 500
-        chunks = [text[i:i+max_chunk_size] for i in range(0, len(text), max_chunk_size)]
+        chunks = split_into_chunks(text)
         
         if len(chunks) == 1:
             return simplify_text(text, target_language)
@@ -150,11 +725,167 @@ def simplify_full_text(text: str, target_language: str = 'de') -> str:
         logger.error(f"Fehler bei der Volltext-Vereinfachung: {e}")
         return text
 
+def simplify_document(text: str, target_language: str = 'de', deadline: Optional[Deadline] = None,
+                      template: PromptTemplate = BATCH_TEMPLATE, max_length: int = 512,
+                      max_new_tokens: int = 128, **generation_kwargs) -> SimplificationResult:
+    """Vereinfacht einen langen Text in Chunks fester Länge innerhalb einer Frist"""
+    return simplify_segments(
+        split_into_chunks(text), target_language, deadline, template,
+        max_length=max_length, max_new_tokens=max_new_tokens, **generation_kwargs
+    )
+
+def simplify_segments(chunks: List[str], target_language: str = 'de', deadline: Optional[Deadline] = None,
+                      template: PromptTemplate = BATCH_TEMPLATE, max_length: int = 512,
+                      max_new_tokens: int = 128, **generation_kwargs) -> SimplificationResult:
+    """Vereinfacht Textabschnitte (Chunks, PDF-Blöcke) in Gruppen innerhalb einer Frist
+
+    Bereits einfache Abschnitte werden ohne Modell übernommen. Vor jeder
+    Gruppe wird ihre Dauer aus dem gemessenen Durchsatz geschätzt. Passt sie
+    nicht mehr in die Restzeit, bleiben diese und alle folgenden Abschnitte
+    im Original; vereinfacht ist damit stets der Anfang des Textes.
+    """
+    deadline = deadline or Deadline(None)
+    result = SimplificationResult(list(chunks))
+    pending = _skip_simple_chunks(result, chunks, max_new_tokens)
+    if not pending:
+        return result
+    if not _model_available_for_request():
+        logger.warning("Modell nicht geladen, verwende Placeholder")
+        return result
+
+    budgets = _estimated_budgets(chunks, max_new_tokens)
+    for start in range(0, len(pending), MAX_BATCH_SIZE):
+        indices = pending[start:start + MAX_BATCH_SIZE]
+        # Ein Batch braucht so viele Schritte wie sein größtes Budget
+        tokens = max(budgets[i] for i in indices)
+        if not deadline.allows(generation_throughput.estimate(tokens)):
+            _log_deadline_stop(len(pending) - start, len(chunks), deadline)
+            result.stopped = True
+            break
+
+        started = time.monotonic()
+        try:
+            outputs = generate_simplifications(
+                template,
+                [chunks[i] for i in indices],
+                target_language,
+                max_length=max_length,
+                max_new_tokens=max_new_tokens,
+                **generation_kwargs,
+                **_deadline_kwargs(deadline)
+            )
+        except Exception as e:
+            logger.error(f"Fehler bei der Volltext-Vereinfachung: {e}")
+            result.stopped = True
+            break
+
+        if deadline.expired():
+            # Die Frist hat die Generierung abgebrochen, die Ausgaben sind unvollständig
+            _log_deadline_stop(len(pending) - start, len(chunks), deadline)
+            result.stopped = True
+            break
+        generation_throughput.record(tokens, time.monotonic() - started)
+        for index, output in zip(indices, outputs):
+            if output:
+                result.outputs[index] = output
+
+    return result
+
+def simplify_stream(chunks: Iterable[str], result: SimplificationResult,
+                    simplify: Callable[[List[str]], SimplificationResult],
+                    batch_size: int = MAX_BATCH_SIZE) -> Iterator[Tuple[str, Optional[str], bool]]:
+    """Vereinfacht einen Strom von Chunks in Gruppen und liefert (Original, Ausgabe, übersprungen)
+
+    Jede Gruppe geht an ``simplify`` (z. B. ``simplify_segments`` mit Frist),
+    sobald sie voll ist oder der Strom endet, und wird an ``result``
+    angehängt. Meldet eine Gruppe ``stopped`` (Frist, Fehler), gehen wie in
+    ``simplify_segments`` alle folgenden Chunks ohne Modell durch; ein
+    leerer Output für einzelne Chunks hält den Strom nicht an.
+    """
+    iterator = iter(chunks)
+    stopped = False
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        if stopped:
+            part = SimplificationResult(batch)
+        else:
+            part = simplify(batch)
+            stopped = part.stopped
+        first = len(result.originals)
+        result.extend(part)
+        yield from result.chunks(first)
+
 def initialize_model():
     """Initialisiert das Modell beim Start der Anwendung"""
+    if INFERENCE_BACKEND == 'server':
+        connected = connect_inference_server()
+        _set_model_state('ready')
+        return connected
+
+    _set_model_state('loading')
+    if MODEL_PRELOAD:
+        # Im Master keine Thread-Pools starten: nach fork wären sie in den
+        # Workern unbrauchbar. Threads und Warmup folgen in init_worker()
+        torch.set_num_threads(1)
+    elif THREAD_PLANNING_ENABLED:
+        # Vor dem Laden, solange torch noch keine parallele Arbeit gestartet hat
+        configure_threads(WORKER_COUNT, THREAD_PLAN_FILE)
+
     model_name = os.getenv('MODEL_NAME', 'microsoft/phi-4-mini-instruct')
-    return load_model(model_name)
+    loaded = engine.load(model_name)
+
+    if not loaded:
+        _set_model_state('failed', f"Modell {model_name} konnte nicht geladen werden")
+    elif MODEL_PRELOAD:
+        # Geladene Objekte aus der Garbage Collection nehmen, damit GC-Läufe
+        # in den Workern ihre Seiten nicht beschreiben und kopieren
+        gc.freeze()
+        # Kompilierte Graphen wärmt erst jeder Worker auf
+        _set_model_state('warming' if is_compiled(model) else 'ready')
+    elif is_compiled(model):
+        # Graphen vor der ersten Anfrage kompilieren
+        _set_model_state('warming')
+        warmup_compiled_model()
+        _set_model_state('ready')
+    else:
+        _set_model_state('ready')
+    return loaded
+
+def _initialize_in_background():
+    try:
+        initialize_model()
+    except Exception as e:
+        logger.error(f"Fehler bei der Modell-Initialisierung: {e}")
+        _set_model_state('failed', str(e))
+
+def start_background_initialization():
+    """Lädt das Modell in einem Hintergrund-Thread, damit der Worker sofort startet
+
+    Mit MODEL_PRELOAD lädt der Master synchron, da Threads den fork nicht überleben.
+    """
+    global _init_thread
+
+    with _init_lock:
+        if _init_thread is not None or model_state != 'not_started':
+            return
+        if MODEL_PRELOAD:
+            _initialize_in_background()
+            return
+        _set_model_state('loading')
+        _init_thread = threading.Thread(target=_initialize_in_background, name='model-init', daemon=True)
+        _init_thread.start()
+
+def init_worker():
+    """Richtet einen Worker nach fork aus dem vorladenden Master ein"""
+    if THREAD_PLANNING_ENABLED:
+        configure_threads(WORKER_COUNT, THREAD_PLAN_FILE)
+    if model is not None and is_compiled(model):
+        _set_model_state('warming')
+        warmup_compiled_model()
+        _set_model_state('ready')
 
-# Modell beim Import initialisieren
+# Modell beim Import im Hintergrund initialisieren
 if __name__ != "__main__":
-    initialize_model()
+    start_background_initialization()